@@ -28,6 +28,7 @@ from __future__ import division, absolute_import, print_function
     autostring             Format number (array) with given decimal precision.
     baseflow               Calculate baseflow from discharge timeseries
     cellarea               Calc areas of grid cells in m^2.
+    clear_readcache        Remove binary cache of ascii file written by fread, sread, fsread.
     climate_index_knoben   Determines continuous climate indexes based on Knoben et al. (2018).
     clockplot              The clockplot of mHM.
     closest                Index in array which entry is closest to a given number.
@@ -57,6 +58,7 @@ from __future__ import division, absolute_import, print_function
     en2ascii               Convert date notations from English YYYY-MM-DD to ascii date format DD.MM.YYYY hh:mm:ss.
     errormeasures          Definition of different error measures.
     esat                   Calculates the saturation vapour pressure of water/ice.
+    EvalCache              Cache of objective function evaluations for sce, pso and screening.
     fftngo                 Fast fourier transformation for dummies (like me)
     Field                  Generates random hydraulic conductivity fields.
     files                  Module with file list function.
@@ -67,7 +69,9 @@ from __future__ import division, absolute_import, print_function
     Filtered_Incompr_Field Generates random filtered velocity fields.
     fr2ascii               Convert date notations from French DD/MM/YYYT to ascii date format DD.MM.YYYY hh:mm:ss.
     fread                  Reads in float array from ascii file.
+    fread_iter             Iterates over blocks of rows of float array from ascii file.
     fsread                 Simultaneous read of float and string array from ascii file.
+    fsread_iter            Iterates over blocks of rows of float and string arrays from ascii file.
     ftp                    Module with functions for interacting with an open FTP connection.
     functions              Module with common functions that are used in curve_fit or fmin parameter estimations.
     fwrite                 Writes an array to ascii file
@@ -111,6 +115,7 @@ from __future__ import division, absolute_import, print_function
     mad                    Median absolute deviation test.
     mat2nc                 Converts Matlab file *.mat into NetCDF *.nc.
     means                  Calculate daily, monthly, yearly, etc. means of data depending on date stamp.
+    MeansIndex             Group indexes of dates for repeated calls of means.
     morris_sampling        Sampling of optimised trajectories for Morris measures / elementary effects
     nc2nc                  Copy netcdf file deleting, renaming, replacing variables and attribues.
     ncread                 Wrapper for readnetcdf.
@@ -143,6 +148,7 @@ from __future__ import division, absolute_import, print_function
     savitzky_golay         Smooth (and optionally differentiate) 1D data with a Savitzky-Golay filter.
     savitzky_golay2d       Smooth (and optionally differentiate) 2D data with a Savitzky-Golay filter.
     saltelli               Parameter sampling for Sobol indices calculation.
+    saltelli_eval          Evaluates a model on Saltelli samples for sobol_index in parallel with restart.
     sce                    Shuffle-Complex-Evolution algorithm for function min(max)imisation
     screening              Samples trajectories, runs model and returns measures of Morris Elemenary Effects
     semivariogram          Calculates semivariogram from spatial data.
@@ -161,6 +167,7 @@ from __future__ import division, absolute_import, print_function
     smax                   Calculating smooth maximum of two numbers
     smin                   Calculating smooth minimum of two numbers
     sobol_index            Calculates the first-order and total variance-based sensitivity indices.
+    SobolIndex             Streaming calculation of sobol_index while model outputs arrive.
     sread                  Reads in string array from ascii file.
     srrasa                 Generates stratified random 2D points within a given rectangular area.
     srrasa_trans           Generates stratified random 2D transects within a given rectangular area.
@@ -214,8 +221,11 @@ from __future__ import division, absolute_import, print_function
 
     Ascii files
     -----------
+    clear_readcache        Remove binary cache of ascii file written by fread, sread, fsread.
     fread                  Reads in float array from ascii file.
+    fread_iter             Iterates over blocks of rows of float array from ascii file.
     fsread                 Simultaneous read of float and string array from ascii file.
+    fsread_iter            Iterates over blocks of rows of float and string arrays from ascii file.
     fwrite                 Writes an array to ascii file
     head                   Return list with first n lines of file.
     lif                    Count number of lines in file.
@@ -241,6 +251,7 @@ from __future__ import division, absolute_import, print_function
     lowess                 Locally linear regression in n dimensions.
     mad                    Median absolute deviation test.
     means                  Calculate daily, monthly, yearly, etc. means of data depending on date stamp.
+    MeansIndex             Group indexes of dates for repeated calls of means.
     outlier                Rossner''s extreme standardized deviate outlier test.
     pca                    Principal component analysis (PCA) upon the first dimension of an 2D-array.
     rossner                Wrapper for outlier.
@@ -309,6 +320,7 @@ from __future__ import division, absolute_import, print_function
     elementary_effects     Morris measures mu, stddev and mu*
     ellipse_area           Area of ellipse (or circle)
     errormeasures          Definition of different error measures.
+    EvalCache              Cache of objective function evaluations for sce, pso and screening.
     fftngo                 Fast fourier transformation for dummies (like me)    
     functions              Module with common functions that are used in curve_fit or fmin parameter estimations.
     heaviside              Heaviside (or unit step) operator.
@@ -322,10 +334,12 @@ from __future__ import division, absolute_import, print_function
     pso                    Particle swarm optimization
     qa                     Module of quality assessment (error) measures.
     saltelli               Parameter sampling for Sobol indices calculation.
+    saltelli_eval          Evaluates a model on Saltelli samples for sobol_index in parallel with restart.
     sce                    Shuffle-Complex-Evolution algorithm for function min(max)imisation
     screening              Samples trajectories, runs model and returns measures of Morris Elemenary Effects
     sobol                  Generates Sobol sequences
     sobol_index            Calculates the first-order and total variance-based sensitivity indices.
+    SobolIndex             Streaming calculation of sobol_index while model outputs arrive.
 
 
     Meteorology
@@ -565,6 +579,12 @@ from __future__ import division, absolute_import, print_function
               MC, Jul 2019 - argmax, argmin
               JM, Feb 2020 - pet_oudin
               JM, Feb 2020 - climate_index_knoben
+              MC, Oct 2026 - fread_iter, fsread_iter
+              MC, Oct 2026 - clear_readcache
+              MC, Oct 2026 - EvalCache
+              MC, Oct 2026 - SobolIndex
+              MC, Oct 2026 - saltelli_eval
+              MC, Oct 2026 - MeansIndex
 """
 
 # sub-packages without dependencies to rest of jams
@@ -611,13 +631,14 @@ from .division             import division, div
 from .ellipse_area         import ellipse_area
 from .errormeasures        import bias, mae, mse, rmse, nse, kge, pear2
 from .esat                 import esat
+from .evalcache            import EvalCache
 from .fftngo               import fftngo
 from .fgui                 import directories_from_gui, directory_from_gui, file_from_gui, files_from_gui
 # from .field_gen          import Field, Incompr_Field, Filtered_Incompr_Field
 from .fill_nonfinite       import fill_nonfinite
 from .find_in_path         import find_in_path
-from .fread                import fread
-from .fsread               import fsread
+from .fread                import fread, fread_iter
+from .fsread               import fsread, fsread_iter
 from .fwrite               import fwrite
 try:
     from .gap_filling      import gap_filling
@@ -659,7 +680,7 @@ from .lowess               import lowess
 from .mad                  import mad
 from .maskgroup            import maskgroup
 from .mat2nc               import mat2nc
-from .means                import means
+from .means                import means, MeansIndex
 from .morris               import morris_sampling, elementary_effects
 from .nc2nc                import nc2nc
 try:
@@ -673,16 +694,14 @@ except:
     pass # No extra statistics in scipy and hence in JAMS. Disabled functions: outlier, rossner.
 from .pack                 import pack
 from .pareto_metrics       import sn, cz, hi, ef, aed, is_dominated, point_to_front
-try:
-    from .pawn_index       import pawn_index
-except:
-    pass # No statsmodels installed.
+from .pawn_index           import pawn_index
 from .pca                  import pca, check_pca
 from .pet_oudin            import pet_oudin
 from .pi                   import pi
 from .position             import position
 from .pritay               import pritay
 from .pso                  import pso
+from .readcache            import clear_readcache
 try:
     from .readhdf          import readhdf,  hdfread
 except ImportError:
@@ -697,6 +716,7 @@ from .river_network        import river_network, upscale_fdir
 from .rolling              import rolling
 from .romanliterals        import int2roman, roman2int
 from .saltelli             import saltelli
+from .saltelli_eval        import saltelli_eval
 from .samevalue            import samevalue
 from .sap_app              import t2sap
 from .savitzky_golay       import savitzky_golay, sg, savitzky_golay2d, sg2d
@@ -707,7 +727,7 @@ from .sendmail             import sendmail
 from .sigma_filter         import sigma_filter
 from .signature2plot       import signature2plot
 from .smooth_minmax        import smin, smax
-from .sobol_index          import sobol_index
+from .sobol_index          import sobol_index, SobolIndex
 from .sread                import sread
 from .srrasa               import srrasa, srrasa_trans
 from .str2tex              import str2tex
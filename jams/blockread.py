@@ -0,0 +1,475 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+import warnings
+from operator import methodcaller
+import numpy as np
+
+"""
+    Helper routines to read ascii files in blocks of lines and split and
+    convert all lines of a block at once with numpy.
+
+    They are the engine='numpy' of fread, sread and fsread.
+
+
+    Definition
+    ----------
+    def read_blocks(f, skip_blank=False, comment=None, blocksize=1048576):
+    def split_block(lines, sep, ncol, fill=False, errmsg=''):
+    def strip_block(sarr, strip=None, lines=None):
+    def str2float(sarr, fill=False, fill_value=0):
+    def block2float(lines, sep, iinc, strip=None, fill=False, fill_value=0, errmsg='', check=False):
+    def iter_chunks(f, blocks, chunksize, post=None):
+
+    Errors on lines with not enough columns are raised as ColumnError,
+    which is a subclass of ValueError. fread, sread and fsread raise ColumnError
+    for data lines with not enough columns with engine='python' as well,
+    so that both engines raise the same errors with the same messages.
+
+
+    License
+    -------
+    This file is part of the JAMS Python package, distributed under the MIT
+    License. The JAMS Python package originates from the former UFZ Python library,
+    Department of Computational Hydrosystems, Helmholtz Centre for Environmental
+    Research - UFZ, Leipzig, Germany.
+
+    Copyright (c) 2026 Matthias Cuntz - mc (at) macu (dot) de
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+
+    History
+    -------
+    Written,  MC, Oct 2026
+    Modified, MC, Oct 2026 - iter_chunks
+"""
+
+__all__ = ['ColumnError', 'read_blocks', 'split_block', 'strip_block', 'str2float', 'block2float', 'iter_chunks']
+
+
+class ColumnError(ValueError):
+    """
+        Line has not enough columns to index.
+    """
+    pass
+
+
+def read_blocks(f, skip_blank=False, comment=None, blocksize=1048576):
+    """
+        Generator returning the data lines of an open file in blocks.
+
+        The file is read in chunks of blocksize characters. Each block is
+        returned as a list of complete lines, stripped of trailing whitespace.
+        Comment lines are excluded. Blank lines are either excluded or
+        mark the end of the data.
+
+
+        Definition
+        ----------
+        def read_blocks(f, skip_blank=False, comment=None, blocksize=1048576):
+
+
+        Input
+        -----
+        f            open file object, positioned at the first data line
+
+
+        Optional Input Parameters
+        -------------------------
+        comment      line gets excluded if first character of line is in comment sequence
+                     sequence can be e.g. string, list or tuple
+        blocksize    number of characters read at once (default: 1048576)
+
+
+        Options
+        -------
+        skip_blank   True:  continues reading after blank line
+                     False: stops reading at first blank line (default)
+
+
+        Output
+        ------
+        Non-empty lists of lines (strings)
+
+
+        Examples
+        --------
+        >>> # Create some data
+        >>> filename = 'test_blockread.dat'
+        >>> ff = open(filename,'w')
+        >>> ff.writelines('1.1 1.2 1.3\\n')
+        >>> ff.writelines('# comment\\n')
+        >>> ff.writelines('2.1 "2.2" 2.3\\n')
+        >>> ff.writelines('3.1\\n')
+        >>> ff.close()
+
+        >>> # Read lines, split and convert
+        >>> f = open(filename, 'r')
+        >>> lines = [ l for ll in read_blocks(f, comment='#', blocksize=7) for l in ll ]
+        >>> f.close()
+        >>> print(lines)
+        ['1.1 1.2 1.3', '2.1 "2.2" 2.3', '3.1']
+        >>> sarr = strip_block(split_block(lines, None, 3, fill=True))
+        >>> print(sarr.tolist())
+        [['1.1', '1.2', '1.3'], ['2.1', '2.2', '2.3'], ['3.1', '', '']]
+        >>> print(str2float(sarr, fill=True, fill_value=-1))
+        [[ 1.1  1.2  1.3]
+         [ 2.1  2.2  2.3]
+         [ 3.1 -1.  -1. ]]
+        >>> try:
+        ...     sarr = split_block(lines, None, 3, errmsg='Line has not enough columns to index: ')
+        ... except ValueError as e:
+        ...     print(e)
+        Line has not enough columns to index: 3.1
+
+        >>> # Clean up doctest
+        >>> import os
+        >>> os.remove(filename)
+    """
+    rest = ''
+    eof  = False
+    while not eof:
+        buf = f.read(blocksize)
+        if buf:
+            lines = (rest + buf).splitlines(True)
+            # last line might be incomplete, also \r of \r\n
+            last = lines[-1]
+            if last.endswith('\r') or (last.splitlines()[0] == last):
+                rest = lines.pop()
+            else:
+                rest = ''
+        else:
+            eof   = True
+            lines = [rest] if rest else []
+        lines = list(map(str.rstrip, lines))
+        if skip_blank:
+            lines = list(filter(None, lines))
+        else:
+            try:
+                lines = lines[:lines.index('')]
+                eof   = True
+            except ValueError:
+                pass
+        if comment is not None:
+            lines = [ l for l in lines if l[0] not in comment ]
+        if len(lines) > 0:
+            yield lines
+
+
+def split_block(lines, sep, ncol, fill=False, errmsg=''):
+    """
+        Split lines at separator into 2D string array with (at least) ncol columns.
+
+
+        Definition
+        ----------
+        def split_block(lines, sep, ncol, fill=False, errmsg=''):
+
+
+        Input
+        -----
+        lines        list of strings
+        sep          column separator, None is whitespace
+        ncol         number of columns needed, i.e. largest column index+1
+
+
+        Optional Input Parameters
+        -------------------------
+        errmsg       start of error message if a line has not enough columns (default: '')
+
+
+        Options
+        -------
+        fill         True:  lines with less than ncol columns are filled with ''
+                     False: raise ColumnError if a line has less than ncol columns (default)
+
+
+        Output
+        ------
+        2D-array of strings with shape (len(lines), >=ncol)
+    """
+    rows = [ l.split(sep) for l in lines ]
+    nres = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+    if not fill:
+        ii = np.where(nres < ncol)[0]
+        if ii.size > 0:
+            raise ColumnError(errmsg+lines[ii[0]])
+    if np.all(nres == nres[0]) and (nres[0] >= ncol):
+        return np.array(rows)
+    else:
+        # irregular number of columns
+        return np.array([ r[:ncol] + ['']*(ncol-len(r)) for r in rows ])
+
+
+def strip_block(sarr, strip=None, lines=None):
+    """
+        Strip all elements of a string array exactly as line2var of fread, sread and fsread.
+
+
+        Definition
+        ----------
+        def strip_block(sarr, strip=None, lines=None):
+
+
+        Input
+        -----
+        sarr         numpy array of strings
+
+
+        Optional Input Parameters
+        -------------------------
+        strip        Strip strings with str.strip(strip).
+                     If None then strip quotes " and ' (default).
+                     If False then no strip.
+                     Otherwise strip character given by strip.
+        lines        list of strings from which sarr was split.
+                     If given, sarr will only be stripped if any of the
+                     characters to strip is present in lines.
+
+
+        Output
+        ------
+        numpy array of stripped strings
+    """
+    if (strip is not None) and (not strip):
+        return sarr
+    if sarr.size == 0:
+        return sarr
+    if lines is not None:
+        if not _has_chars(lines, strip):
+            return sarr
+    if strip is None:
+        sarr = np.char.strip(np.char.strip(sarr, '"'), "'")
+    else:
+        sarr = np.char.strip(sarr, strip)
+    return sarr
+
+
+def str2float(sarr, fill=False, fill_value=0):
+    """
+        Convert string array to float array, setting empty strings to fill_value if fill=True.
+
+
+        Definition
+        ----------
+        def str2float(sarr, fill=False, fill_value=0):
+
+
+        Input
+        -----
+        sarr         numpy array of strings
+
+
+        Optional Input Parameters
+        -------------------------
+        fill_value   value for empty strings if fill=True (default: 0)
+
+
+        Options
+        -------
+        fill         True:  empty strings are set to fill_value
+                     False: empty strings raise ValueError (default)
+
+
+        Output
+        ------
+        numpy array of floats
+    """
+    if fill:
+        ii = sarr == ''
+        if np.any(ii):
+            out = np.where(ii, '0', sarr).astype(np.float64)
+            out[ii] = fill_value
+            return out
+    return sarr.astype(np.float64)
+
+
+def block2float(lines, sep, iinc, strip=None, fill=False, fill_value=0, errmsg='', check=False):
+    """
+        Split lines at separator and convert columns iinc to 2D float array,
+        giving the same results as line2var of fread followed by conversion to float.
+
+        Regular blocks, i.e. lines with the same number of columns and without
+        characters to strip, are converted directly with numpy.
+        All other blocks are split into string arrays first.
+
+
+        Definition
+        ----------
+        def block2float(lines, sep, iinc, strip=None, fill=False, fill_value=0, errmsg='', check=False):
+
+
+        Input
+        -----
+        lines        list of strings
+        sep          column separator, None is whitespace
+        iinc         iterable of column indexes
+
+
+        Optional Input Parameters
+        -------------------------
+        strip        Strip strings with str.strip(strip).
+                     If None then strip quotes " and ' (default).
+                     If False then no strip.
+                     Otherwise strip character given by strip.
+        fill_value   value for empty cells if fill=True (default: 0)
+        errmsg       start of error message if a line has not enough columns (default: '')
+
+
+        Options
+        -------
+        fill         True:  fill empty cells and missing columns with fill_value
+                     False: raise ColumnError if a line has not enough columns (default)
+        check        True:  only check that all lines have enough columns, return None
+                     False: convert lines (default)
+
+
+        Output
+        ------
+        2D-array of floats with shape (len(lines), len(iinc))
+
+
+        Examples
+        --------
+        >>> print(block2float(['1.1,"1.2",1.3', '2.1,2.2,2.3'], ',', [2,1]))
+        [[1.3 1.2]
+         [2.3 2.2]]
+        >>> print(block2float(['1.1 1.2 1.3', '2.1'], None, [0,2], fill=True, fill_value=-1))
+        [[ 1.1  1.3]
+         [ 2.1 -1. ]]
+    """
+    iinc = list(iinc)
+    ncol = max(iinc)+1
+    nlin = len(lines)
+    # fast path if nothing to strip
+    if (strip is not None) and (not strip):
+        nostrip = True
+    else:
+        nostrip = not _has_chars(lines, strip)
+    if nostrip:
+        if sep is None:
+            rows = [ l.split() for l in lines ]
+            nres = np.fromiter(map(len, rows), dtype=np.int64, count=nlin)
+        else:
+            nres = np.fromiter(map(methodcaller('count', sep), lines), dtype=np.int64, count=nlin) + 1
+        if not fill:
+            ii = np.where(nres < ncol)[0]
+            if ii.size > 0:
+                raise ColumnError(errmsg+lines[ii[0]])
+        if check: return None
+        if np.all(nres == nres[0]) and (nres[0] >= ncol):
+            try:
+                if sep is None:
+                    arr = np.array(rows, dtype=np.float64)
+                else:
+                    # nan(...) is understood by numpy but not by Python
+                    text = sep.join(lines)
+                    if '(' in text: raise ValueError('no fast conversion')
+                    with warnings.catch_warnings():
+                        warnings.simplefilter('error')
+                        arr = np.fromstring(text, dtype=np.float64, sep=sep)
+                    if arr.size != nlin*nres[0]: raise ValueError('no fast conversion')
+                    arr = arr.reshape((nlin, nres[0]))
+                return arr[:, iinc]
+            except (ValueError, DeprecationWarning):
+                pass # empty or non-number cells
+    # general path
+    if check:
+        if not fill: null = split_block(lines, sep, ncol, fill=fill, errmsg=errmsg)
+        return None
+    sarr = split_block(lines, sep, ncol, fill=fill, errmsg=errmsg)
+    sarr = strip_block(sarr[:, iinc], strip, lines=lines)
+    return str2float(sarr, fill, fill_value)
+
+
+def iter_chunks(f, blocks, chunksize, post=None):
+    """
+        Generator returning arrays with chunksize rows from an iterator
+        returning arrays with arbitrary numbers of rows.
+
+        The open file f is closed when the iterator is exhausted or closed.
+
+
+        Definition
+        ----------
+        def iter_chunks(f, blocks, chunksize, post=None):
+
+
+        Input
+        -----
+        f            open file object, from which blocks reads
+        blocks       iterator returning tuples of numpy arrays with the same number of rows
+        chunksize    number of rows per returned chunk; the last chunk can be shorter
+
+
+        Optional Input Parameters
+        -------------------------
+        post         function called with the arrays of each chunk as arguments;
+                     its return value is returned instead of the arrays (default: None)
+
+
+        Output
+        ------
+        Tuples of numpy arrays with chunksize rows, or output of post
+
+
+        Examples
+        --------
+        >>> import io
+        >>> f = io.StringIO()
+        >>> blocks = ( (np.arange(i, dtype=np.float64),) for i in range(1,5) )
+        >>> for c in iter_chunks(f, blocks, 4, post=lambda x: x.tolist()): print(c)
+        [0.0, 0.0, 1.0, 0.0]
+        [1.0, 2.0, 0.0, 1.0]
+        [2.0, 3.0]
+        >>> print(f.closed)
+        True
+    """
+    try:
+        buf  = list()
+        nbuf = 0
+        for bb in blocks:
+            buf.append(bb)
+            nbuf += bb[0].shape[0]
+            while nbuf >= chunksize:
+                if len(buf) > 1:
+                    buf = [ tuple([ np.concatenate(cc) for cc in zip(*buf) ]) ]
+                out   = tuple([ cc[:chunksize] for cc in buf[0] ])
+                buf   = [ tuple([ cc[chunksize:] for cc in buf[0] ]) ]
+                nbuf -= chunksize
+                yield out if post is None else post(*out)
+        if nbuf > 0:
+            out = tuple([ np.concatenate(cc) for cc in zip(*buf) ])
+            yield out if post is None else post(*out)
+    finally:
+        f.close()
+
+
+# True if any character of strip (quotes if None) is in the list of strings lines
+def _has_chars(lines, strip=None):
+    text = ''.join(lines)
+    if strip is None:
+        return ('"' in text) or ("'" in text)
+    else:
+        return any([ c in text for c in strip ])
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
@@ -5,7 +5,7 @@ import numpy as np
 def date2dec(calendar = 'standard', units=None,
              excelerr = True, yr=1,
              mo=1, dy=1, hr=0, mi=0, sc=0,
-             ascii=None, eng=None):
+             ascii=None, eng=None, fr=None, us=None):
     """
         Converts numpy arrays with calendar date into
         numpy arrays with decimal date. Supported calendar
@@ -19,9 +19,8 @@ def date2dec(calendar = 'standard', units=None,
 
         Output is decimal date with day as unit.
 
-        Requires 'netcdftime.py' from the module
-        netcdftime available at:
-        http://netcdf4-python.googlecode.com
+        Decimal dates are calculated arithmetically from integer day numbers,
+        giving the same results as date2num of the module netcdftime/cftime.
 
 
         Definition
@@ -29,7 +28,7 @@ def date2dec(calendar = 'standard', units=None,
         def date2dec(calendar = 'standard', units=None,
                      excelerr = True, yr=1,
                      mo=1, dy=1, hr=0, mi=0, sc=0,
-                     ascii=None, eng=None):
+                     ascii=None, eng=None, fr=None, us=None):
 
 
         Input
@@ -46,14 +45,22 @@ def date2dec(calendar = 'standard', units=None,
                     set to 00.
                     If ascii input is chosen by user,
                     other inputs will be neglected.
-                    ascii and eng are mutually exclusive.
+                    ascii, eng, fr and us are mutually exclusive.
         eng      -> input array with strings of the format
                     'yyyy-mm-dd hh:mm:ss'. If hour, minutes
                     and/or seconds are missing, they will be
                     set to 00.
                     If eng input is chosen, other inputs will
                     be neglected.
-                    ascii and eng are mutually exclusive.
+                    ascii, eng, fr and us are mutually exclusive.
+        fr       -> input array with strings of the French format
+                    'dd/mm/yyyy hh:mm:ss', otherwise as ascii.
+        us       -> input array with strings of the American format
+                    'mm/dd/yyyy hh:mm:ss', otherwise as ascii.
+
+        Strings with two-digit days, months, hours, minutes, seconds and
+        four-digit years (leading blanks allowed) are parsed at once for all elements,
+        other strings one by one.
 
 
         Parameters
@@ -102,6 +109,7 @@ def date2dec(calendar = 'standard', units=None,
         ------------------
         units     -> Time units can be set by user. Input must be a
                      string in the format 'days since yyyy-mm-dd hh:mm:ss'.
+                     hours, minutes or seconds instead of days are possible as well.
                      Default values are set automatically.
         excelerr  -> In Excel the year 1900 is normally considered
                      as leap year, which is wrong. By default, this
@@ -117,37 +125,18 @@ def date2dec(calendar = 'standard', units=None,
 
         Restrictions
         ------------
-        Most versions of datetime do not support neagtive years,
-        i.e. Julian days < 1721423.5 = 01.01.0001 00:00.
-
-        There is an issue in netcdftime version < 0.9.5 in proleptic_gregorian for dates before year 301:
-          jams.dec2date(jams.date2dec(ascii='01.01.0300 00:00:00', calendar='proleptic_gregorian'),
-                       calendar='proleptic_gregorian')
-            [300, 1, 2, 0, 0, 0]
-          jams.dec2date(jams.date2dec(ascii='01.01.0301 00:00:00', calendar='proleptic_gregorian'),
-                       calendar='proleptic_gregorian')
-            [301, 1, 1, 0, 0, 0]
+        Dates must be valid in the standard calendar as well as in the chosen calendar.
+        Years follow the convention of cftime: there is no year 0 in the standard and julian
+        calendars, i.e. year -1 is followed by year 1, while the other calendars have a year 0.
 
         List input is only supported up to 2 dimensions.
 
-        Requires 'netcdftime.py' from module netcdftime available at:
-        http://netcdf4-python.googlecode.com
-
 
         Examples
         --------
         #calendar = 'standard'
 
-        # Some implementations of datetime have problems with negative years
-        >>> import datetime
-        >>> if datetime.MINYEAR > 0:
-        ...     print('The minimum year in your datetime implementation is ', datetime.MINYEAR)
-        ...     print('i.e. it does not support negative years (BC).')
-
-        >>> if datetime.MINYEAR > 0:
-        ...     year   = np.array([2000, 1810, 1630, 1510, 1271, 619, 2, 1])
-        ... else:
-        ...     year   = np.array([2000, 1810, 1630, 1510, 1271, 619, -1579, -4712])
+        >>> year   = np.array([2000, 1810, 1630, 1510, 1271, 619, -1579, -4712])
         >>> month  = np.array([1, 4, 7, 9, 3, 8, 8, 1])
         >>> day    = np.array([5, 24, 15, 20, 18, 27, 23, 1])
         >>> hour   = np.array([12, 16, 10, 14, 19, 11, 20, 12])
@@ -167,18 +156,16 @@ def date2dec(calendar = 'standard', units=None,
         ['2.18545602886574e+06' '1.94731300598380e+06']
 
         # ascii input
-        >>> if datetime.MINYEAR > 0:
-        ...     a = np.array(['05.01.2000 12:30:15', '24.04.1810 16:15:10', '15.07.1630 10:20:40',  '20.09.1510 14:35:50',
-        ...                   '18.03.1271 19:41:34', '27.08. 619 11:08:37', '23.08.0002 20:03:41', '01.01.0001 12:00:00'])
-        ... else:
-        ...     a = np.array(['05.01.2000 12:30:15', '24.04.1810 16:15:10', '15.07.1630 10:20:40',  '20.09.1510 14:35:50',
-        ...                   '18.03.1271 19:41:34', '27.08. 619 11:08:37', '23.08.-1579 20:03:41', '01.01.-4712 12:00:00'])
+        >>> a = np.array(['05.01.2000 12:30:15', '24.04.1810 16:15:10', '15.07.1630 10:20:40',  '20.09.1510 14:35:50',
+        ...               '18.03.1271 19:41:34', '27.08. 619 11:08:37', '23.08.-1579 20:03:41', '01.01.-4712 12:00:00'])
         >>> decimal = date2dec(calendar='standard', ascii=a)
         >>> nn = a.size
         >>> print(astr(decimal[:nn//2],14,pp=True))
         ['2.45154902100694e+06' '2.38226217719907e+06' '2.31660093101852e+06' '2.27284810821759e+06']
         >>> print(astr(decimal[nn//2:nn-2],14,pp=True))
         ['2.18536732053241e+06' '1.94738596431713e+06']
+        >>> print(astr(decimal[nn-2:],8,pp=True))
+        ['1.14492834e+06' '3.66000000e+02']
 
         # calendar = 'julian'
         >>> decimal = date2dec(calendar='julian', ascii=a)
@@ -222,18 +209,18 @@ def date2dec(calendar = 'standard', units=None,
         >>> decimal = date2dec(calendar='365_day', ascii=g)
         >>> nn = g.size
         >>> print(astr(decimal[:nn],14,pp=True))
-        ['719644.52100694458932' '359822.52100694435649' '179911.93101851851679' '     0.00000000000000']
+        ['719644.52100694447290' '359822.52100694447290' '179911.93101851851679' '     0.00000000000000']
 
         # calendar = '366_day'
         >>> decimal = date2dec(calendar='366_day', ascii=g)
         >>> print(astr(decimal[:nn],14,pp=True))
-        ['721616.52100694458932' '360808.52100694435649' '180404.93101851851679' '     0.00000000000000']
+        ['721616.52100694447290' '360808.52100694447290' '180404.93101851851679' '     0.00000000000000']
 
         # 360_day does not work with netcdftime.py version equal or below 0.9.2
         # calendar = '360_day'
         >>> decimal = date2dec(calendar='360_day', ascii=g)
         >>> print(astr(decimal[:nn],14,pp=True))
-        ['709787.52100694458932' '354894.52100694435649' '177447.93101851851679' '     0.00000000000000']
+        ['709787.52100694447290' '354894.52100694447290' '177447.93101851851679' '     0.00000000000000']
 
         >>> print(astr(date2dec(yr=1992, mo=1, dy=26, hr=2, mi=0, sc=0, calendar='decimal'),14,pp=True))
         1992.06853370763201
@@ -255,6 +242,26 @@ def date2dec(calendar = 'standard', units=None,
         >>> print((date2dec(ascii='01.03.2003 00:00:00') - date2dec(ascii='01.03.2003')) == 0.)
         True
 
+        # eng, fr and us input
+        >>> print(astr(date2dec(eng=['2000-01-05 12:30:15', '1810-04-24 16:15:10']), 14, pp=True))
+        ['2.45154902100694e+06' '2.38226217719907e+06']
+        >>> print(astr(date2dec(fr='05/01/2000 12:30:15'), 14, pp=True))
+        2.45154902100694e+06
+        >>> print(astr(date2dec(us='01/05/2000 12:30:15'), 14, pp=True))
+        2.45154902100694e+06
+
+        # units
+        >>> print(astr(date2dec(ascii='05.01.2000 12:30:15', units='hours since 2000-01-01 00:00:00'), 5, pp=True))
+        108.50417
+
+        # no year 0 in standard and julian calendars
+        >>> print(date2dec(yr=0, mo=1, dy=1, calendar='julian'))
+        Traceback (most recent call last):
+        ...
+        ValueError: date2dec error: there is no year 0 in calendar julian.
+        >>> print(astr(date2dec(yr=0, mo=1, dy=1, calendar='proleptic_gregorian'), 1, pp=True))
+        -366.0
+
 
         License
         -------
@@ -303,130 +310,40 @@ def date2dec(calendar = 'standard', units=None,
                  MC, Oct 2015 - call date2num with list instead of single netCDF4.datetime objects
                  MC, Oct 2016 - netcdftime provided even with netCDF4 > 1.0.0; make mo for months always integer
                  MC, Nov 2016 - 00, 01, etc. for integers not accepted by Python3
+                 MC, Oct 2026 - parse fixed-width strings at once; fr, us
+                              - arithmetic decimal dates from integer day numbers without netcdftime
     """
     #
     # Checks
     calendars = ['standard', 'gregorian', 'julian', 'proleptic_gregorian',
                  'excel1900', 'excel1904', '365_day', 'noleap', '366_day',
                  'all_leap', '360_day', 'decimal', 'decimal360']
-    import netCDF4 as nt
-    try:
-        tst = nt.date2num
-        tst = nt.datetime
-    except:
-        try:
-            import netcdftime as nt
-            if ((nt.__version__ <= '0.9.2') & (calendar == '360_day')):
-                raise ValueError("date2dec error: Your version of netcdftime.py is equal"
-                                 " or below 0.9.2. The 360_day calendar does not work with"
-                                 " arrays here. Please download a newer one.")
-        except:
-            import cftime as nt
     #
     calendar = calendar.lower()
     if (calendar not in calendars):
         raise ValueError("date2dec error: Wrong calendar!"
                     " Choose: "+''.join([i+' ' for i in calendars]))
-    # if ascii input is given by user, other input will be neglected
+    # if string input is given by user, other input will be neglected
     # calculation of input size and shape
-    if (ascii is not None) and (eng is not None):
-        raise ValueError("date2dec error: 'ascii' and 'eng' mutually exclusive")
-    if ascii is not None:
-        islist = type(ascii) != type(np.array(ascii))
-        isarr = np.ndim(ascii)
-        if (islist & (isarr > 2)):
-            raise ValueError("date2dec error: ascii input is list > 2D; Use array input")
-        if isarr == 0: ascii = np.array([ascii])
-        else: ascii = np.array(ascii)
-        insize   = ascii.size
-        outsize  = insize
-        outshape = ascii.shape
-        asciifl  = ascii.flatten()
-        timeobj  = np.zeros(insize, dtype=object)
-        # slicing of ascii strings to implement in datetime object. missing times
-        # will be set to 0.
-        yr = np.zeros(insize, dtype=np.int)
-        mo = np.zeros(insize, dtype=np.int)
-        dy = np.zeros(insize, dtype=np.int)
-        hr = np.zeros(insize, dtype=np.int)
-        mi = np.zeros(insize, dtype=np.int)
-        sc = np.zeros(insize, dtype=np.int)
-        for i in range(insize):
-            aa      = asciifl[i].split('.')
-            dy[i]   = int(aa[0])
-            mo[i]   = int(aa[1])
-            tail    = aa[2].split()
-            yr[i]   = int(tail[0])
-            if len(tail) > 1:
-                tim     = tail[1].split(':')
-                hr[i]   = int(tim[0])
-                if len(tim) > 1:
-                    mi[i] = int(tim[1])
-                else:
-                    mi[i] = 0
-                if len(tim) > 2:
-                    sc[i] = int(tim[2])
-                else:
-                    sc[i] = 0
-            else:
-                hr[i] = 0
-                mi[i] = 0
-                sc[i] = 0
-            if ((yr[i]==1900) & (mo[i]==2) & (dy[i]==29)):
-                timeobj[i] = nt.datetime(yr[i], 3, 1, hr[i], mi[i], sc[i])
-            else:
-                timeobj[i] = nt.datetime(yr[i], mo[i], dy[i], hr[i], mi[i], sc[i])
-    if eng is not None:
-        islist = type(eng) != type(np.array(eng))
-        isarr = np.ndim(eng)
-        if isarr == 0:
-             eng = np.array([eng])
-        else:
-             eng = np.array(eng)
+    strin = [ (ff, dd) for ff, dd in zip(['ascii', 'eng', 'fr', 'us'], [ascii, eng, fr, us]) if dd is not None ]
+    if len(strin) > 1:
+        raise ValueError("date2dec error: 'ascii', 'eng', 'fr' and 'us' mutually exclusive")
+    if len(strin) == 1:
+        fmt, dates = strin[0]
+        islist = type(dates) != type(np.array(dates))
+        isarr = np.ndim(dates)
         if (islist & (isarr > 2)):
-            raise ValueError("date2dec error: eng input is list > 2D; Use array input")
-        eng = np.array(eng)
-        insize   = eng.size
-        outsize  = insize
-        outshape = eng.shape
-        engfl    = eng.flatten()
-        timeobj  = np.zeros(insize, dtype=object)
-        # slicing of eng strings to implement in datetime object. missing times
-        # will be set to 0.
-        yr = np.zeros(insize, dtype=np.int)
-        mo = np.zeros(insize, dtype=np.int)
-        dy = np.zeros(insize, dtype=np.int)
-        hr = np.zeros(insize, dtype=np.int)
-        mi = np.zeros(insize, dtype=np.int)
-        sc = np.zeros(insize, dtype=np.int)
-        for i in range(insize):
-            ee      = engfl[i].split('-')
-            yr[i]   = int(ee[0])
-            mo[i]   = int(ee[1])
-            tail    = ee[2].split()
-            dy[i]   = int(tail[0])
-            if len(tail) > 1:
-                tim     = tail[1].split(':')
-                hr[i]   = int(tim[0])
-                if len(tim) > 1:
-                    mi[i] = int(tim[1])
-                else:
-                    mi[i] = 0
-                if len(tim) > 2:
-                    sc[i] = int(tim[2])
-                else:
-                    sc[i] = 0
-            else:
-                hr[i] = 0
-                mi[i] = 0
-                sc[i] = 0
-            if ((yr[i]==1900) & (mo[i]==2) & (dy[i]==29)):
-                timeobj[i] = nt.datetime(yr[i], 3, 1, hr[i], mi[i], sc[i])
-            else:
-                timeobj[i] = nt.datetime(yr[i], mo[i], dy[i], hr[i], mi[i], sc[i])
-    # if no ascii input, other inputs will be concidered
+            raise ValueError("date2dec error: "+fmt+" input is list > 2D; Use array input")
+        if isarr == 0: dates = np.array([dates])
+        else: dates = np.array(dates)
+        outsize  = dates.size
+        outshape = dates.shape
+        # slicing of strings. missing times will be set to 0.
+        yr, mo, dy, hr, mi, sc = _str2date(dates.flatten(), fmt)
+        indate = [yr, mo, dy, hr, mi, sc]
+    # if no string input, other inputs will be concidered
     # calculation of input sizes, shapes and number of axis
-    if ((ascii is None) and (eng is None)):
+    else:
         isnlist1 = type(yr) == type(np.array(yr))
         isarr1   = np.ndim(yr)
         if isarr1 == 0: yr = np.array([yr])
@@ -486,108 +403,18 @@ def date2dec(calendar = 'standard', units=None,
             else: raise ValueError("date2dec error: size of sc != max input or 1.")
         indate  = [yr, mo, dy, hr, mi, sc]
         insize  = [np.size(i) for i in indate]
-        inshape = [np.shape(i) for i in indate]
-        dimnum  = [len(i) for i in inshape]
         # calculation of maximum input size and maximum number of axis for
         # reshaping the output
         indate  = [i.flatten() for i in indate]
         outsize = max(insize)
-        timeobj = np.zeros(outsize, dtype=object)
-        # datetime object is constructed
-        for i in range(outsize):
-            iyr = int(indate[0][i])
-            imo = int(indate[1][i])
-            idy = int(indate[2][i])
-            ihr = int(indate[3][i])
-            imi = int(indate[4][i])
-            isc = int(indate[5][i])
-
-            if ((iyr==1900) & (imo==2) & (idy==29)):
-                timeobj[i] = nt.datetime(iyr, 3, 1, ihr, imi, isc)
-            else:
-                timeobj[i] = nt.datetime(iyr, imo, idy, ihr, imi, isc)
     # depending on chosen calendar and optional set of the time units
     # decimal date is calculated
-    output = np.zeros(outsize)
-    t0    = nt.datetime(1582, 10, 5, 0, 0, 0)
-    t1    = nt.datetime(1582, 10, 15, 0, 0, 0)
-    is121 = True if (min(timeobj)<t0) and (max(timeobj)>=t1) else False
-    if (calendar == 'standard') or (calendar == 'gregorian'):
-        if units is None:
-            units = 'days since 0001-01-01 12:00:00'
-            dec0 = 1721424
-        else:
-            dec0 = 0
-        if is121 and (nt.__version__ < '1.2.2'):
-            for ii, tt in enumerate(timeobj): output[ii] = nt.date2num(tt, units, calendar='gregorian')+dec0
-        else:
-            output = nt.date2num(timeobj, units, calendar='gregorian')+dec0
-    elif calendar == 'julian':
-        if units is None:
-            units = 'days since 0001-01-01 12:00:00'
-            dec0 = 1721424
-        else:
-            dec0 = 0
-        if is121 and (nt.__version__ < '1.2.2'):
-            for ii, tt in enumerate(timeobj): output[ii] = nt.date2num(tt, units, calendar='julian')+dec0
-        else:
-            output = nt.date2num(timeobj, units, calendar='julian')+dec0
-    elif calendar == 'proleptic_gregorian':
-        if units is None: units = 'days since 0001-01-01 00:00:00'
-        if is121 and (nt.__version__ < '1.2.2'):
-            for ii, tt in enumerate(timeobj): output[ii] = nt.date2num(tt, units, calendar='proleptic_gregorian')
-        else:
-            output = nt.date2num(timeobj, units, calendar='proleptic_gregorian')
-    elif calendar == 'excel1900':
-        doerr = False
-        if units is None:
-            units = 'days since 1899-12-31 00:00:00'
-            if excelerr: doerr = True
-        if is121 and (nt.__version__ < '1.2.2'):
-            for ii, tt in enumerate(timeobj): output[ii] = nt.date2num(tt, units, calendar='gregorian')
-        else:
-            output = nt.date2num(timeobj, units, calendar='gregorian')
-        if doerr:
-            output = np.where(output >= 60., output+1., output)
-            # date2num treats 29.02.1900 as 01.03.1990, i.e. is the same decimal number
-            if np.any((output >= 61.) & (output < 62.)):
-                for i in range(outsize):
-                    # if (timeobj[i].year==1900) & (timeobj[i].month==2) & (timeobj[i].day==29):
-                    #     output[i] -= 1.
-                    if (yr[i]==1900) & (mo[i]==2) & (dy[i]==29):
-                        output[i] -= 1.
-    elif calendar == 'excel1904':
-        if units is None: units = 'days since 1903-12-31 00:00:00'
-        if is121 and (nt.__version__ < '1.2.2'):
-            for ii, tt in enumerate(timeobj): output[ii] = nt.date2num(tt, units, calendar='gregorian')
-        else:
-            output = nt.date2num(timeobj, units, calendar='gregorian')
-    elif (calendar == '365_day') or (calendar == 'noleap'):
-        if units is None: units = 'days since 0001-01-01 00:00:00'
-        if is121 and (nt.__version__ < '1.2.2'):
-            for ii, tt in enumerate(timeobj): output[ii] = nt.date2num(tt, units, calendar='365_day')
-        else:
-            output = nt.date2num(timeobj, units, calendar='365_day')
-    elif (calendar == '366_day') or (calendar == 'all_leap'):
-        if units is None: units = 'days since 0001-01-01 00:00:00'
-        if is121 and (nt.__version__ < '1.2.2'):
-            for ii, tt in enumerate(timeobj): output[ii] = nt.date2num(tt, units, calendar='366_day')
-        else:
-            output = nt.date2num(timeobj, units, calendar='366_day')
-    elif calendar == '360_day':
-        if units is None: units = 'days since 0001-01-01 00:00:00'
-        if is121 and (nt.__version__ < '1.2.2'):
-            for ii, tt in enumerate(timeobj): output[ii] = nt.date2num(tt, units, calendar='360_day')
-        else:
-            output = nt.date2num(timeobj, units, calendar='360_day')
-    elif calendar == 'decimal':
-        ntime = np.size(yr)
+    if calendar == 'decimal':
+        yr, mo, dy, hr, mi, sc = indate
         leap  = np.array((((yr%4)==0) & ((yr%100)!=0)) | ((yr%400)==0)).astype(np.int)
-        tdy   = np.array(dy, dtype=np.float)
         diy   = np.array([ [-9,0, 31, 59, 90,120,151,181,212,243,273,304,334,365],
                            [-9,0, 31, 60, 91,121,152,182,213,244,274,305,335,366] ])
-        for i in range(ntime):
-            tdy[i] = tdy[i] + np.array(diy[leap[i],mo[i]], dtype=np.float)
+        tdy   = np.array(dy, dtype=np.float) + np.array(diy[leap,mo], dtype=np.float)
         days_year = 365.
         output    = ( np.array(yr, dtype=np.float) +
                       ((tdy-1.)*24. + np.array(hr, dtype=np.float) +
@@ -597,11 +424,9 @@ def date2dec(calendar = 'standard', units=None,
         # for numerical stability, i.e. back and forth transforms
         output += 1e-08 # 1/3 sec
     elif calendar == 'decimal360':
-        ntime = np.size(yr)
-        tdy   = np.array(dy, dtype=np.float)
+        yr, mo, dy, hr, mi, sc = indate
         diy   = np.array([-9,  0, 30, 60, 90,120,150,180,210,240,270,300,330,360])
-        for i in range(ntime):
-            tdy[i] = tdy[i] + np.array(diy[mo[i]], dtype=np.float)
+        tdy   = np.array(dy, dtype=np.float) + np.array(diy[mo], dtype=np.float)
         days_year = 360.
         output    = ( np.array(yr, dtype=np.float) +
                       ((tdy-1.)*24. + np.array(hr, dtype=np.float) +
@@ -611,7 +436,47 @@ def date2dec(calendar = 'standard', units=None,
         # for numerical stability, i.e. back and forth transforms
         output += 1e-08 # 1/3 sec
     else:
-        raise ValueError("date2dec error: calendar not implemented; should have been catched before.")
+        # integer date components; 29.02.1900 is taken as 01.03.1900 because of Excel
+        iyr, imo, idy, ihr, imi, isc = [ np.array(i).astype(np.int64) for i in indate ]
+        i1900 = (iyr==1900) & (imo==2) & (idy==29)
+        imo = np.where(i1900, 3, imo)
+        idy = np.where(i1900, 1, idy)
+        dec0 = 0
+        if (calendar == 'standard') or (calendar == 'gregorian'):
+            if units is None:
+                units = 'days since 0001-01-01 12:00:00'
+                dec0 = 1721424
+            ical = 'standard'
+        elif calendar == 'julian':
+            if units is None:
+                units = 'days since 0001-01-01 12:00:00'
+                dec0 = 1721424
+            ical = 'julian'
+        elif calendar == 'proleptic_gregorian':
+            if units is None: units = 'days since 0001-01-01 00:00:00'
+            ical = 'proleptic_gregorian'
+        elif calendar == 'excel1900':
+            if units is None: units = 'days since 1899-12-31 00:00:00'
+            ical = 'standard'
+        elif calendar == 'excel1904':
+            if units is None: units = 'days since 1903-12-31 00:00:00'
+            ical = 'standard'
+        elif (calendar == '365_day') or (calendar == 'noleap'):
+            if units is None: units = 'days since 0001-01-01 00:00:00'
+            ical = '365_day'
+        elif (calendar == '366_day') or (calendar == 'all_leap'):
+            if units is None: units = 'days since 0001-01-01 00:00:00'
+            ical = '366_day'
+        elif calendar == '360_day':
+            if units is None: units = 'days since 0001-01-01 00:00:00'
+            ical = '360_day'
+        else:
+            raise ValueError("date2dec error: calendar not implemented; should have been catched before.")
+        output = _date2num(iyr, imo, idy, ihr, imi, isc, units, ical) + dec0
+        if (calendar == 'excel1900') and (units == 'days since 1899-12-31 00:00:00') and excelerr:
+            output = np.where(output >= 60., output+1., output)
+            # 29.02.1900 was taken as 01.03.1990, i.e. is the same decimal number
+            output = np.where(i1900, output-1., output)
 
 
     # return of reshaped output
@@ -632,6 +497,217 @@ def date2dec(calendar = 'standard', units=None,
     return output
 
 
+# Positions of day, month, year in date strings of the different formats: (start, end) in fixed-width strings,
+# separator, and index of day, month, year in the split date.
+_str_formats = {'ascii': ({'dy': (0, 2), 'mo': (3, 5), 'yr': (6, 10)}, '.', (0, 1, 2)),
+                'fr':    ({'dy': (0, 2), 'mo': (3, 5), 'yr': (6, 10)}, '/', (0, 1, 2)),
+                'us':    ({'mo': (0, 2), 'dy': (3, 5), 'yr': (6, 10)}, '/', (1, 0, 2)),
+                'eng':   ({'yr': (0, 4), 'mo': (5, 7), 'dy': (8, 10)}, '-', (2, 1, 0))}
+
+
+def _str2date(dates, fmt):
+    """
+        Helper function that returns integer arrays of year, month, day, hour, minute and second
+        of the 1D array of date strings in format fmt ('ascii', 'eng', 'fr', 'us').
+
+        Strings of the fixed widths of 'dd.mm.yyyy', 'dd.mm.yyyy hh', 'dd.mm.yyyy hh:mm',
+        and 'dd.mm.yyyy hh:mm:ss' (and the same for the other formats) are sliced as byte arrays,
+        with leading blanks allowed in each number. All other strings are split one by one.
+    """
+    n    = dates.size
+    out  = [ np.zeros(n, dtype=np.int64) for i in range(6) ]
+    todo = np.ones(n, dtype=np.bool)
+    pos, sep, iord = _str_formats[fmt]
+    pos = dict(pos)
+    pos.update({'hr': (11, 13), 'mi': (14, 16), 'sc': (17, 19)})
+    keys = ['yr', 'mo', 'dy', 'hr', 'mi', 'sc']
+    # character codes: bytes or UCS4 code points
+    if dates.dtype.kind == 'S':
+        bb = np.ascontiguousarray(dates)
+        ctype = np.uint8
+    else:
+        bb = np.ascontiguousarray(dates.astype(np.unicode_))
+        ctype = np.uint32
+    ll = bb.dtype.itemsize // np.dtype(ctype).itemsize
+    if (n > 0) and (ll > 0):
+        cc = bb.view(ctype).reshape((n,ll))
+        if ll < 19:
+            cc = np.hstack((cc, np.zeros((n,19-ll), dtype=ctype)))
+        slen = np.sum(cc != 0, axis=1)
+        isdig = (cc >= 48) & (cc <= 57)
+        isbla = cc == 32
+        digit = np.where(isdig, cc.astype(np.int64)-48, 0)
+        # separators and numbers in fixed-width formats
+        seps  = [(2, sep), (5, sep), (10, ' '), (13, ':'), (16, ':')] if fmt != 'eng' else \
+                [(4, sep), (7, sep), (10, ' '), (13, ':'), (16, ':')]
+        for nlen, nnum in [(10, 3), (13, 4), (16, 5), (19, 6)]:
+            ii = np.where(todo & (slen == nlen))[0]
+            if ii.size == 0: continue
+            ok = np.ones(ii.size, dtype=np.bool)
+            for p, c in seps[0:nnum-1]:
+                ok &= cc[ii,p] == ord(c)
+            for k in keys[0:nnum]:
+                p0, p1 = pos[k]
+                # digits with optional leading blanks
+                ok &= isdig[ii,p1-1]
+                for p in range(p0, p1-1):
+                    ok &= isdig[ii,p] | (isbla[ii,p] & ~isdig[ii,p0:p].any(axis=1))
+            ii = ii[ok]
+            for k in keys[0:nnum]:
+                p0, p1 = pos[k]
+                val = np.zeros(ii.size, dtype=np.int64)
+                for p in range(p0, p1):
+                    val = val*10 + digit[ii,p]
+                out[keys.index(k)][ii] = val
+            todo[ii] = False
+    # remaining strings one by one
+    for i in np.where(todo)[0]:
+        aa      = str(dates[i].decode() if isinstance(dates[i], bytes) else dates[i]).split(sep)
+        tail    = aa[2].split()
+        dmy     = [aa[0], aa[1], tail[0]]
+        out[2][i] = int(dmy[iord[0]])
+        out[1][i] = int(dmy[iord[1]])
+        out[0][i] = int(dmy[iord[2]])
+        if len(tail) > 1:
+            tim     = tail[1].split(':')
+            out[3][i] = int(tim[0])
+            if len(tim) > 1: out[4][i] = int(tim[1])
+            if len(tim) > 2: out[5][i] = int(tim[2])
+
+    return out
+
+
+# Cumulative days before month in common and leap years
+_cumdays = np.array([ [0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334, 365],
+                      [0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335, 366] ])
+
+
+def _isleap(yr, calendar):
+    """
+        Helper function that returns True for leap years in calendar
+        ('standard', 'julian', 'proleptic_gregorian', '365_day', '366_day', '360_day').
+        Years are astronomical, i.e. with year 0.
+    """
+    if calendar == 'julian':
+        return (yr % 4) == 0
+    elif calendar == 'proleptic_gregorian':
+        return (((yr % 4) == 0) & ((yr % 100) != 0)) | ((yr % 400) == 0)
+    elif calendar == 'standard':
+        return np.where(yr < 1582, (yr % 4) == 0, (((yr % 4) == 0) & ((yr % 100) != 0)) | ((yr % 400) == 0))
+    elif calendar == '365_day':
+        return np.zeros(np.shape(yr), dtype=np.bool)
+    else:
+        return np.ones(np.shape(yr), dtype=np.bool)
+
+
+def _astro_year(yr, calendar):
+    """
+        Helper function that returns astronomical years, i.e. years with a year 0.
+        The standard and julian calendars have no year 0 (year -1 is followed by year 1).
+    """
+    if calendar in ['standard', 'julian']:
+        return np.where(yr < 0, yr+1, yr)
+    else:
+        return yr
+
+
+def _daynumber(yr, mo, dy, calendar):
+    """
+        Helper function that returns integer day numbers of astronomical years, months and days in calendar.
+        Day numbers of julian, proleptic_gregorian and standard are Julian day numbers.
+    """
+    if calendar == '365_day':
+        return 365*yr + _cumdays[0,mo-1] + dy - 1
+    elif calendar == '366_day':
+        return 366*yr + _cumdays[1,mo-1] + dy - 1
+    elif calendar == '360_day':
+        return 360*yr + 30*(mo-1) + dy - 1
+    a  = (14 - mo) // 12
+    y  = yr + 4800 - a
+    m  = mo + 12*a - 3
+    jul = dy + (153*m + 2)//5 + 365*y + y//4 - 32083
+    if calendar == 'julian':
+        return jul
+    greg = dy + (153*m + 2)//5 + 365*y + y//4 - y//100 + y//400 - 32045
+    if calendar == 'proleptic_gregorian':
+        return greg
+    else:
+        # Gregorian from 15.10.1582
+        return np.where(greg >= 2299161, greg, jul)
+
+
+def _check_date(yr, mo, dy, hr, mi, sc, calendar):
+    """
+        Helper function that raises ValueError if dates are not valid in calendar.
+        yr are astronomical years.
+    """
+    ok = (mo >= 1) & (mo <= 12) & (hr >= 0) & (hr <= 23) & (mi >= 0) & (mi <= 59) & (sc >= 0) & (sc <= 59)
+    imo = np.clip(mo, 1, 12)
+    if calendar == '360_day':
+        ndays = 30
+    else:
+        leap  = _isleap(yr, calendar).astype(np.int_)
+        ndays = _cumdays[leap,imo] - _cumdays[leap,imo-1]
+    ok &= (dy >= 1) & (dy <= ndays)
+    if calendar == 'standard':
+        # 10 days missing in October 1582
+        ok &= ~((yr == 1582) & (mo == 10) & (dy > 4) & (dy < 15))
+    if not np.all(ok):
+        i = np.where(~ok)[0][0]
+        raise ValueError('date2dec error: invalid date {:d}-{:d}-{:d} {:d}:{:d}:{:d} in calendar {:s}.'.format(
+            yr[i], mo[i], dy[i], hr[i], mi[i], sc[i], calendar))
+
+
+def _units2sec(units, calendar):
+    """
+        Helper function that returns the unit in seconds and the reference date in seconds since day number 0
+        of calendar for units of the form 'days since yyyy-mm-dd hh:mm:ss'.
+        hours, minutes, seconds are also possible instead of days.
+    """
+    import re
+    uu = re.match(r'^\s*(days?|hours?|minutes?|seconds?)\s+since\s+(-?\d+)-(\d+)-(\d+)'
+                  r'(?:[ T]+(\d+)(?::(\d+)(?::(\d+))?)?)?\s*$', units)
+    if uu is None:
+        raise ValueError("date2dec error: units must be of the form 'days since yyyy-mm-dd hh:mm:ss': "+units)
+    unit = {'d': 86400, 'h': 3600, 'm': 60, 's': 1}[uu.group(1)[0]]
+    ref  = [ int(i) if i is not None else 0 for i in uu.groups()[1:] ]
+    if (calendar in ['standard', 'julian']) and (ref[0] == 0):
+        raise ValueError('date2dec error: there is no year 0 in calendar {:s}: {:s}'.format(calendar, units))
+    ryr  = _astro_year(np.array([ref[0]], dtype=np.int64), calendar)
+    rmo  = np.array([ref[1]], dtype=np.int64)
+    rdy  = np.array([ref[2]], dtype=np.int64)
+    rsec = _daynumber(ryr, rmo, rdy, calendar)[0]*86400 + ref[3]*3600 + ref[4]*60 + ref[5]
+
+    return unit, rsec
+
+
+def _date2num(yr, mo, dy, hr, mi, sc, units, calendar):
+    """
+        Helper function that calculates decimal dates in units 'days since yyyy-mm-dd hh:mm:ss'
+        (or hours, minutes, seconds) from integer date components in calendar
+        ('standard', 'julian', 'proleptic_gregorian', '365_day', '366_day', '360_day')
+        without date objects.
+
+        The dates are checked to be valid in the standard and in the chosen calendar.
+        Results are the same as netcdftime/cftime.date2num:
+        seconds since the reference date are integers, which are divided by the unit in seconds.
+        Quotient and remainder give the correctly rounded result for integer seconds.
+    """
+    if (calendar in ['standard', 'julian']) and np.any(yr == 0):
+        raise ValueError('date2dec error: there is no year 0 in calendar {:s}.'.format(calendar))
+    ayr = _astro_year(yr, 'standard')
+    _check_date(ayr, mo, dy, hr, mi, sc, 'standard')
+    ayr = _astro_year(yr, calendar)
+    if calendar != 'standard':
+        _check_date(ayr, mo, dy, hr, mi, sc, calendar)
+    unit, rsec = _units2sec(units, calendar)
+    secs = _daynumber(ayr, mo, dy, calendar)*86400 + hr*3600 + mi*60 + sc - rsec
+    quot = secs // unit
+    rem  = secs - quot*unit
+
+    return quot.astype(np.float64) + rem.astype(np.float64)/float(unit)
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
@@ -1,11 +1,12 @@
 #!/usr/bin/env python
 from __future__ import division, absolute_import, print_function
 import numpy as np
+from jams.date2dec import _cumdays, _units2sec
 
 def dec2date(indata, calendar='standard', refdate=None, units=None,
              excelerr=True, fulldate=None, yr=False,
              mo=False, dy=False, hr=False, mi=False,
-             sc=False, ascii=False, eng=False):
+             sc=False, ascii=False, eng=False, fr=False, us=False):
     """
         Converts numpy arrays with decimal date into
         numpy arrays with calendar date. Supported time formats
@@ -24,7 +25,7 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
         def dec2date(indata, calendar='standard', refdate=None, units=None,
                      excelerr=True, fulldate=None, yr=False,
                      mo=False, dy=False, hr=False, mi=False,
-                     sc=False, ascii=False, eng=False):
+                     sc=False, ascii=False, eng=False, fr=False, us=False):
 
 
         Input
@@ -107,33 +108,22 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
                     'dd.mm.yyyy hh:mm:ss'
         eng      -> output array with strings of the format
                     'yyyy-mm-dd hh:mm:ss'
+        fr       -> output array with strings of the format
+                    'dd/mm/yyyy hh:mm:ss'
+        us       -> output array with strings of the format
+                    'mm/dd/yyyy hh:mm:ss'
 
 
         Restrictions
         ------------
-        Most versions of datetime do not support neagtive years,
-        i.e. Julian days < 1721423.5 = 01.01.0001 00:00.
-
-        There is an issue in netcdftime version < 0.9.5 in proleptic_gregorian for dates before year 301:
-          jams.dec2date(jams.date2dec(ascii='01.01.0300 00:00:00', calendar='proleptic_gregorian'),
-                       calendar='proleptic_gregorian')
-            [300, 1, 2, 0, 0, 0]
-          jams.dec2date(jams.date2dec(ascii='01.01.0301 00:00:00', calendar='proleptic_gregorian'),
-                       calendar='proleptic_gregorian')
-            [301, 1, 1, 0, 0, 0]
-
-        Requires 'netcdftime.py' from module netcdftime available at:
-        http://netcdf4-python.googlecode.com
+        Calendar dates are calculated arithmetically from integer day numbers and
+        milliseconds, the accuracy of num2date of the module netcdftime.
+        Years follow the convention of cftime: there is no year 0 in the standard and julian
+        calendars, i.e. year -1 is followed by year 1, while the other calendars have a year 0.
 
 
         Examples
         --------
-        # Some implementations of datetime have problems with negative years
-        >>> import datetime
-        >>> if datetime.MINYEAR > 0:
-        ...     print('The minimum year in your datetime implementation is ', datetime.MINYEAR)
-        ...     print('i.e. it does not support negative years (BC).')
-
         #calendar = 'standard'
         >>> year   = np.array([2000,1810,1630,1510,1271,619,1])
         >>> month  = np.array([1,4,7,9,3,8,1])
@@ -257,6 +247,12 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
 
         >>> print(dec2date(719644.52101, calendar='proleptic_gregorian', ascii = True))
         28.04.1971 12:30:15
+        >>> print(dec2date([2451549.0210069446, 0.], eng=True))
+        ['2000-01-05 12:30:15', '-4713-01-01 12:00:00']
+        >>> print(dec2date(2451549.0210069446, fr=True))
+        05/01/2000 12:30:15
+        >>> print(dec2date(2451549.0210069446, us=True))
+        01/05/2000 12:30:15
         >>> dec = date2dec(ascii='02.03.1910 03:44:55', calendar='decimal')
         >>> print(dec2date(dec, calendar='decimal', ascii=True))
         02.03.1910 03:44:55
@@ -333,6 +329,8 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
                  MC, Oct 2013 - units bugs, e.g. 01.01.0001 was substracted if Julian calendar even with units
                  MC, May 2016 - units=='month as %Y%m.%f', units=='year as %Y.%f'
                  MC, Oct 2016 - netcdftime provided even with netCDF4 > 1.0.0; make leap always integer
+                 MC, Oct 2026 - arithmetic calendar dates from integer day numbers without netcdftime
+                              - vectorized string output; fr, us
     """
     #
     # Constants
@@ -341,20 +339,6 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
                  'all_leap', '360_day', 'decimal', 'decimal360']
     #
     # Checks
-    import netCDF4 as nt
-    try:
-        tst = nt.date2num
-        tst = nt.datetime
-    except:
-        try:
-            import netcdftime as nt
-            if ((nt.__version__ <= '0.9.2') & (calendar == '360_day')):
-                raise ValueError("date2dec error: Your version of netcdftime.py is equal"
-                                 " or below 0.9.2. The 360_day calendar does not work with"
-                                 " arrays here. Please download a newer one.")
-        except:
-            import cftime as nt
-    #
     calendar = calendar.lower()
     if (calendar not in calendars):
         raise ValueError("Wrong calendar! Choose: "+''.join([i+' ' for i in calendars]))
@@ -366,9 +350,10 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
         ii = True
     else:
         ii = False
-    if ((ascii | eng | ii) & (fulldate is None)):
+    isstr = ascii | eng | fr | us
+    if ((isstr | ii) & (fulldate is None)):
         fulldate = False
-    if ((not (ascii | eng | ii)) & (fulldate is None)):
+    if ((not (isstr | ii)) & (fulldate is None)):
         fulldate = True
     if fulldate == True:
         yr = True
@@ -378,10 +363,10 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
         mi = True
         sc = True
         # Further checks
-    if np.sum(np.array([ascii,fulldate,eng])) > 1:
-        raise ValueError("dec2date error: Only one of ascii, fulldate, or eng can be chosen.")
-    if np.sum(np.array([ascii,eng,ii])) > 1:
-        raise ValueError("dec2date error: If ascii, fulldate or eng then no special selection yr,mo,dy,hr,mi,sc possible.")
+    if np.sum(np.array([ascii,fulldate,eng,fr,us])) > 1:
+        raise ValueError("dec2date error: Only one of ascii, fulldate, eng, fr, or us can be chosen.")
+    if np.sum(np.array([isstr,ii])) > 1:
+        raise ValueError("dec2date error: If ascii, fulldate, eng, fr or us then no special selection yr,mo,dy,hr,mi,sc possible.")
     #
     # Input size and shape
     islist = type(indata) != type(np.array(indata))
@@ -419,7 +404,7 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
         leap   = np.where((((year%4)==0) & ((year%100)!=0)) | ((year%400)==0), 1, 0)
         dim    = np.array([[-9,31,28,31,30,31,30,31,31,30,31,30,31],
                            [-9,31,29,31,30,31,30,31,31,30,31,30,31]])
-        indata = dim[[leap,month]] * fmo
+        indata = dim[leap,month] * fmo
         fdy    = indata % 1. # day fraction
         indata = indata - fdy
         day    = np.rint(indata % 100.).astype(np.int)
@@ -438,11 +423,9 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
         doy    = np.rint(indata - fdy).astype(np.int)
         diy    = np.array([ [-9,0, 31, 59, 90,120,151,181,212,243,273,304,334,365],
                             [-9,0, 31, 60, 91,121,152,182,213,244,274,305,335,366] ])
-        month = np.zeros(insize, dtype=np.int)
-        day   = np.zeros(insize, dtype=np.int)
-        for i in range(insize):
-            month[i] = np.where(doy[i] > np.squeeze(diy[leap[i],:]))[0][-1]
-            day[i]   = doy[i] - diy[leap[i],month[i]]
+        # last month with doy > days before month
+        month  = np.sum(doy[:,np.newaxis] > diy[leap,:], axis=1) - 1
+        day    = doy - diy[leap,month]
         secs   = np.rint(fdy * 86400.)
         hour   = np.floor(secs/3600.).astype(np.int)
         secs   = secs - 3600.*hour
@@ -459,7 +442,7 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
             else:
                 unit = 'days since 0001-01-01 12:00:00'
                 dec0 = 1721424
-            timeobj = nt.num2date(indata-dec0, unit, calendar='gregorian')
+            year, month, day, hour, minute, second = _num2date(indata-dec0, unit, 'standard')
         elif calendar == 'julian':
             dec0 = 0
             if units is not None:
@@ -469,7 +452,7 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
             else:
                 unit = 'days since 0001-01-01 12:00:00'
                 dec0 = 1721424
-            timeobj = nt.num2date(indata-dec0, unit, calendar='julian')
+            year, month, day, hour, minute, second = _num2date(indata-dec0, unit, 'julian')
         elif calendar == 'proleptic_gregorian':
             if units is not None:
                 unit = units
@@ -477,7 +460,7 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
                 unit = 'days since {0:s}'.format(refdate)
             else:
                 unit = 'days since 0001-01-01 00:00:00'
-            timeobj = nt.num2date(indata, unit, calendar = 'proleptic_gregorian')
+            year, month, day, hour, minute, second = _num2date(indata, unit, 'proleptic_gregorian')
         elif calendar == 'excel1900':
             doerr = False
             if units is not None:
@@ -489,9 +472,9 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
                 if excelerr: doerr = True
             if doerr:
                 indata1 = np.where(indata >= 61., indata-1, indata)
-                timeobj = nt.num2date(indata1, unit, calendar = 'gregorian')
+                year, month, day, hour, minute, second = _num2date(indata1, unit, 'standard')
             else:
-                timeobj = nt.num2date(indata, unit, calendar = 'gregorian')
+                year, month, day, hour, minute, second = _num2date(indata, unit, 'standard')
         elif calendar == 'excel1904':
             if units is not None:
                 unit = units
@@ -499,7 +482,7 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
                 unit = 'days since {0:s}'.format(refdate)
             else:
                 unit = 'days since 1903-12-31 00:00:00'
-            timeobj = nt.num2date(indata, unit, calendar = 'gregorian')
+            year, month, day, hour, minute, second = _num2date(indata, unit, 'standard')
         elif (calendar == '365_day') or (calendar == 'noleap'):
             if units is not None:
                 unit = units
@@ -507,7 +490,7 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
                 unit = 'days since {0:s}'.format(refdate)
             else:
                 unit = 'days since 0001-01-01 00:00:00'
-            timeobj = nt.num2date(indata, unit, calendar = '365_day')
+            year, month, day, hour, minute, second = _num2date(indata, unit, '365_day')
         elif (calendar == '366_day') or (calendar == 'all_leap'):
             if units is not None:
                 unit = units
@@ -515,7 +498,7 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
                 unit = 'days since {0:s}'.format(refdate)
             else:
                 unit = 'days since 0001-01-01 00:00:00'
-            timeobj = nt.num2date(indata, unit, calendar = '366_day')
+            year, month, day, hour, minute, second = _num2date(indata, unit, '366_day')
         elif calendar == '360_day':
             if units is not None:
                 unit = units
@@ -523,7 +506,7 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
                 unit = 'days since {0:s}'.format(refdate)
             else:
                 unit = 'days since 0001-01-01 00:00:00'
-            timeobj = nt.num2date(indata, unit, calendar = '360_day')
+            year, month, day, hour, minute, second = _num2date(indata, unit, '360_day')
         elif calendar == 'decimal':
             fyear = np.trunc(indata)
             year  = np.array(fyear, dtype=np.int)
@@ -545,16 +528,11 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
             fdoy  = (fihoy/24.)+1.
             fidoy = np.trunc(fdoy)
             idoy  = np.array(fidoy, dtype=np.int)
-            month = np.zeros(insize, dtype=np.int)
             diy   = np.array([ [-9,0, 31, 59, 90,120,151,181,212,243,273,304,334,365],
                                [-9,0, 31, 60, 91,121,152,182,213,244,274,305,335,366] ])
-            for i in range(insize):
-                ii = np.squeeze(np.where(idoy[i] > np.squeeze(diy[leap[i],:])))
-                month[i] = ii[-1]
+            month = np.sum(idoy[:,np.newaxis] > diy[leap,:], axis=1) - 1
             # days
-            fday = np.zeros(insize, dtype=np.float)
-            for i in range(insize):
-                fday[i] = np.trunc(fdoy[i] - np.float(diy[leap[i],month[i]]))
+            fday = np.trunc(fdoy - diy[leap,month].astype(np.float))
             day = np.array(fday, dtype=np.int)
             # hours
             hour = ihoy % 24
@@ -577,46 +555,32 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
             fdoy  = (fihoy/24.)+1.
             fidoy = np.trunc(fdoy)
             idoy  = np.array(fidoy, dtype=np.int)
-            month = np.zeros(insize, dtype=np.int)
             diy   = np.array([ -9, 0, 30, 60, 90, 120, 150, 180, 210, 240, 270, 300, 330, 360 ])
-            for i in range(insize):
-                ii = np.squeeze(np.where(idoy[i] > diy))
-                month[i] = ii[-1]
+            month = np.sum(idoy[:,np.newaxis] > diy[np.newaxis,:], axis=1) - 1
             # days
-            fday = np.zeros(insize, dtype=np.float)
-            for i in range(insize):
-                fday[i] = np.trunc(fdoy[i] - np.float(diy[month[i]]))
+            fday = np.trunc(fdoy - diy[month].astype(np.float))
             day = np.array(fday, dtype=np.int)
             # hours
             hour = ihoy % 24
         else:
             raise ValueError("dec2date error: calendar not implemented; should have been catched before.")
 
-        if (calendar not in ['decimal','decimal360']):
-            timeobjfl = timeobj.flatten()
-            year   = np.array([timeobjfl[i].year for i in range(insize)], dtype=np.int)
-            month  = np.array([timeobjfl[i].month for i in range(insize)], dtype=np.int)
-            day    = np.array([timeobjfl[i].day for i in range(insize)], dtype=np.int)
-            hour   = np.array([timeobjfl[i].hour for i in range(insize)], dtype=np.int)
-            minute = np.array([timeobjfl[i].minute for i in range(insize)], dtype=np.int)
-            second = np.array([timeobjfl[i].second for i in range(insize)], dtype=np.int)
-            if (calendar == 'excel1900') & excelerr:
-                ii  = np.where((indata >= 60.) & (indata < 61.))[0]
-                if np.size(ii) > 0:
-                    month[ii] = 2
-                    day[ii]   = 29
+        if (calendar == 'excel1900') & excelerr:
+            ii  = np.where((indata >= 60.) & (indata < 61.))[0]
+            if np.size(ii) > 0:
+                month[ii] = 2
+                day[ii]   = 29
     #
-    # Ascii output
-    if ascii:
-        output = ( ['%02d.%02d.%04d %02d:%02d:%02d' %
-                      (day[i], month[i], year[i], hour[i], minute[i], second[i]) for i in range(insize)] )
-        output = np.reshape(output, inshape)
-        if isarr==0:
-            output = output[0]
-    # Ascii english output
-    elif eng:
-        output = ( ['%04d-%02d-%02d %02d:%02d:%02d' %
-                    (year[i], month[i], day[i], hour[i], minute[i], second[i]) for i in range(insize)] )
+    # String output
+    if isstr:
+        if ascii:
+            output = _date2str(year, month, day, hour, minute, second, 'ascii')
+        elif eng:
+            output = _date2str(year, month, day, hour, minute, second, 'eng')
+        elif fr:
+            output = _date2str(year, month, day, hour, minute, second, 'fr')
+        else:
+            output = _date2str(year, month, day, hour, minute, second, 'us')
         output = np.reshape(output, inshape)
         if isarr==0:
             output = output[0]
@@ -665,7 +629,125 @@ def dec2date(indata, calendar='standard', refdate=None, units=None,
     return output
 
 
+def _num2date(indata, units, calendar):
+    """
+        Helper function that calculates integer arrays of year, month, day, hour, minute and second
+        from decimal dates in units 'days since yyyy-mm-dd hh:mm:ss' (or hours, minutes, seconds)
+        in calendar ('standard', 'julian', 'proleptic_gregorian', '365_day', '366_day', '360_day')
+        without date objects.
+
+        Decimal dates are rounded to milliseconds in extended precision, the accuracy of netcdftime.num2date,
+        so that dates from date2dec give back exactly the same seconds. Seconds are then truncated.
+    """
+    unit, rsec = _units2sec(units, calendar)
+    msec  = np.rint(np.asarray(indata).astype(np.longdouble) * (unit*1000)).astype(np.int64)
+    msec += rsec*1000
+    # day number and seconds of day
+    dnum = msec // 86400000
+    secs = (msec - dnum*86400000) // 1000
+    hour   = secs // 3600
+    minute = (secs - hour*3600) // 60
+    second = secs - hour*3600 - minute*60
+    # calendar date from day number
+    if calendar == '365_day':
+        year = dnum // 365
+        doy  = dnum - year*365
+        month = np.searchsorted(_cumdays[0,:], doy, side='right')
+        day   = doy - _cumdays[0,month-1] + 1
+    elif calendar == '366_day':
+        year = dnum // 366
+        doy  = dnum - year*366
+        month = np.searchsorted(_cumdays[1,:], doy, side='right')
+        day   = doy - _cumdays[1,month-1] + 1
+    elif calendar == '360_day':
+        year  = dnum // 360
+        doy   = dnum - year*360
+        month = doy // 30 + 1
+        day   = doy - (month-1)*30 + 1
+    else:
+        # Julian day number to julian (until 04.10.1582) or gregorian date
+        if calendar == 'julian':
+            greg = np.zeros(dnum.shape, dtype=np.bool)
+        elif calendar == 'proleptic_gregorian':
+            greg = np.ones(dnum.shape, dtype=np.bool)
+        else:
+            greg = dnum >= 2299161
+        a  = dnum + 32044
+        b  = np.where(greg, (4*a + 3) // 146097, 0)
+        c  = np.where(greg, a - (146097*b) // 4, dnum + 32082)
+        d  = (4*c + 3) // 1461
+        e  = c - (1461*d) // 4
+        m  = (5*e + 2) // 153
+        day   = e - (153*m + 2) // 5 + 1
+        month = m + 3 - 12*(m // 10)
+        year  = 100*b + d - 4800 + m // 10
+        # no year 0 in standard and julian calendars
+        if calendar != 'proleptic_gregorian':
+            year = np.where(year <= 0, year-1, year)
+
+    return [ np.array(i, dtype=np.int) for i in [year, month, day, hour, minute, second] ]
+
+
+def _date2str(year, month, day, hour, minute, second, fmt):
+    """
+        Helper function that returns an array of date strings in format fmt
+        ('ascii': 'dd.mm.yyyy hh:mm:ss', 'eng': 'yyyy-mm-dd hh:mm:ss',
+        'fr': 'dd/mm/yyyy hh:mm:ss', 'us': 'mm/dd/yyyy hh:mm:ss').
+
+        The characters are set at once for all dates with four-digit years;
+        other dates are formatted one by one.
+    """
+    if fmt == 'ascii':
+        form = [(day,2), '.', (month,2), '.', (year,4)]
+    elif fmt == 'eng':
+        form = [(year,4), '-', (month,2), '-', (day,2)]
+    elif fmt == 'fr':
+        form = [(day,2), '/', (month,2), '/', (year,4)]
+    else:
+        form = [(month,2), '/', (day,2), '/', (year,4)]
+    form += [' ', (hour,2), ':', (minute,2), ':', (second,2)]
+    n  = np.size(year)
+    cc = np.zeros((n,19), dtype=np.uint32)
+    ok = np.ones(n, dtype=np.bool)
+    j = 0
+    for ff in form:
+        if isinstance(ff, str):
+            cc[:,j] = ord(ff)
+            j += 1
+        else:
+            val, nd = ff
+            val = np.asarray(val)
+            ok &= (val >= 0) & (val < 10**nd)
+            for k in range(nd):
+                cc[:,j+nd-1-k] = 48 + (val // 10**k) % 10
+            j += nd
+    out = cc.view('<U19').reshape(n)
+    # e.g. negative years
+    if not np.all(ok):
+        out = out.astype(object)
+        ff  = [ '%0{:d}d'.format(f[1]) if not isinstance(f, str) else f for f in form ]
+        form0 = ''.join(ff)
+        for i in np.where(~ok)[0]:
+            out[i] = form0 % tuple([ f[0][i] for f in form if not isinstance(f, str) ])
+        out = np.array(list(out))
+
+    return out
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
 
+    # # Benchmark against netcdftime/cftime
+    # import time
+    # import cftime as nt
+    # nn = 100000
+    # dec = 2415020.5 + 36500.*np.random.random(nn)
+    # t0 = time.time()
+    # d1 = dec2date(dec, ascii=True)
+    # t1 = time.time()
+    # tobj = nt.num2date(dec-1721424, 'days since 0001-01-01 12:00:00', calendar='standard')
+    # d2 = np.array(['%02d.%02d.%04d %02d:%02d:%02d' % (t.day, t.month, t.year, t.hour, t.minute, t.second) for t in tobj])
+    # t2 = time.time()
+    # print('dec2date {:.3f} s, num2date {:.3f} s, same {:d} of {:d}'.format(t1-t0, t2-t1, np.sum(d1 == d2), nn))
+
@@ -16,6 +16,7 @@ from __future__ import division, absolute_import, print_function
     eddycorr               Calculate time lags between wind and concentrations for EddyFlux.
     eddyspec               Performs spectrum analysis with EddySpec and SpecMean and determines inductances.
     energyclosure          Computes energy closure and correction for Eddy covaraince data
+    fluxbatch              Parallel batch driver of gapfill, nee2gpp, spikeflag and ustarflag for several sites.
     fluxfill               Wrapper function for gapfill with file management and plotting.
     fluxflag               Quality flag calculation for Eddy Covariance data
     fluxpart               Wrapper function for nee2gpp including file management and plotting
@@ -70,10 +71,12 @@ from __future__ import division, absolute_import, print_function
     History
     -------
     Written  AP, Sep 2014
+    Modified MC, Oct 2026 - fluxbatch
 '''
 from .eddycorr          import eddycorr
 from .eddyspec          import eddyspec
 from .energyclosure     import energyclosure
+from .fluxbatch         import fluxbatch
 from .fluxfill          import fluxfill
 from .fluxflag          import fluxflag
 from .fluxpart          import fluxpart
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+import time
+import multiprocessing
+from multiprocessing.sharedctypes import RawArray
+import numpy as np
+from jams.eddybox.gapfill   import gapfill
+from jams.eddybox.nee2gpp   import nee2gpp
+from jams.eddybox.spikeflag import spikeflag
+from jams.eddybox.ustarflag import ustarflag
+
+__all__ = ['fluxbatch']
+
+
+# meteorological drivers and other 1D arrays per site that are put in shared memory
+_drivers = ['date', 'rg', 'tair', 'vpd', 'isday']
+# drivers needed per method
+_needed  = {'gapfill':   ['date', 'rg', 'tair', 'vpd'],
+            'nee2gpp':   ['date', 'tair', 'isday'],
+            'spikeflag': ['date', 'isday'],
+            'ustarflag': ['date', 'isday']}
+
+# shared drivers of all sites in worker processes, set by _init_shared
+_shared = dict()
+
+
+def fluxbatch(sites, method='gapfill', processes=1, timing=False, **kwargs):
+    """
+        Batch driver for gapfill, nee2gpp, spikeflag and ustarflag of several sites
+        and several flux columns per site.
+
+        One task per site and data column (one task per site for ustarflag)
+        is distributed over a pool of processes. The meteorological drivers
+        rg, tair and vpd as well as date and isday of all sites are put into
+        shared memory so that they are not copied for every task.
+        The outputs are always in the order of sites and columns, independent
+        of the order in which the tasks finish.
+
+
+        Definition
+        ----------
+        def fluxbatch(sites, method='gapfill', processes=1, timing=False, **kwargs):
+
+
+        Input
+        -----
+        sites       list of dictionaries, one per site, with the keys
+                    date    1D-array of julian days
+                    data    1D- or 2D-array (N,M) of M flux columns;
+                            for ustarflag (N,3) with CO2 flux, ustar and air temperature
+                    flag    optional, integer quality flags with the shape of data; 0 is good data.
+                            gapfill: data_flag=(flag!=0); spikeflag: inflag; ustarflag: flags
+                            (default: gapfill: data==undef; others: all 0)
+                    rg      1D-array of global radiation [W m-2]
+                    tair    1D-array of air temperature [deg C]; temperature [K] for nee2gpp
+                    vpd     1D-array of vapour pressure deficit [hPa]; [Pa] for nee2gpp
+                    isday   1D-array, True where it is day and False where it is night
+                    outdir  optional, path for plots of spikeflag and ustarflag (default: '.')
+                    Only the drivers needed by method must be given:
+                    gapfill: date, rg, tair, vpd; nee2gpp: date, tair, isday (rg, vpd with method='lasslop');
+                    spikeflag, ustarflag: date, isday
+
+
+        Optional Input
+        --------------
+        method      'gapfill', 'nee2gpp', 'spikeflag' or 'ustarflag' (default: 'gapfill')
+        processes   number of processes (default: 1 = no pool)
+        timing      if True, return also the wall time of each task in seconds (default: False)
+        **kwargs    keyword arguments passed to method, e.g. err=True for gapfill
+                    or method='lasslop' for nee2gpp (use nmethod='lasslop' because of method)
+
+
+        Output
+        ------
+        out         list with one entry per site. Each entry is a list with the outputs of
+                    method for each column of data, e.g. [(data_fill, quality), ...] for gapfill.
+                    ustarflag has only one entry per site.
+        if timing:
+        out, times  times has the same structure as out with the seconds of each task.
+
+
+        Examples
+        --------
+        >>> from jams.fread import fread
+        >>> ifile = 'test_gapfill.csv' # Tharandt 1998 = Online tool example file
+        >>> undef = -9999.
+        >>> dat   = fread(ifile, skip=2, transpose=True)
+        >>> head  = fread(ifile, skip=2, header=True)[0]
+        >>> ihead = dict(list(zip(head, list(range(len(head))))))
+        >>> jdate = (2450813.5 + dat[ihead['Day'],:] +
+        ...          np.round(dat[ihead['Hour'],:]*60.)/1440.)
+        >>> rg, tair, vpd = dat[ihead['Rg'],:], dat[ihead['Tair'],:], dat[ihead['VPD'],:]
+        >>> fluxes = np.vstack([dat[ihead['NEE'],:], dat[ihead['LE'],:], dat[ihead['H'],:]]).T
+        >>> flags  = np.vstack([dat[ihead['qcNEE'],:], dat[ihead['qcLE'],:], dat[ihead['qcH'],:]]).T
+        >>> flags  = np.where(flags > 1, 1, 0)
+
+        >>> # two half years as two sites
+        >>> n = jdate.size//2
+        >>> sites = [ {'date':jdate[i:i+n], 'data':fluxes[i:i+n,:], 'flag':flags[i:i+n,:],
+        ...            'rg':rg[i:i+n], 'tair':tair[i:i+n], 'vpd':vpd[i:i+n]} for i in [0,n] ]
+        >>> out, times = fluxbatch(sites, processes=2, timing=True, undef=undef)
+        >>> print(len(out), len(out[0]), len(times[1]))
+        2 3 3
+        >>> le_f, le_qc = gapfill(jdate[n:], fluxes[n:,1], rg[n:], tair[n:], vpd[n:],
+        ...                       data_flag=(flags[n:,1]!=0), undef=undef)
+        >>> print(np.all(out[1][1][0] == le_f), np.all(out[1][1][1] == le_qc))
+        True True
+
+        >>> # masked drivers are missing values (NaN)
+        >>> mtair = np.ma.array(tair[n:], mask=(np.arange(n) % 7 == 0))
+        >>> out = fluxbatch([dict(sites[1], tair=mtair)], undef=undef)
+        >>> le_f, le_qc = gapfill(jdate[n:], fluxes[n:,1], rg[n:], np.where(mtair.mask, np.nan, tair[n:]), vpd[n:],
+        ...                       data_flag=(flags[n:,1]!=0), undef=undef)
+        >>> print(np.all(out[0][1][0] == le_f), np.all(out[0][1][1] == le_qc))
+        True True
+
+
+        License
+        -------
+        This file is part of the JAMS Python package, distributed under the MIT
+        License. The JAMS Python package originates from the former UFZ Python library,
+        Department of Computational Hydrosystems, Helmholtz Centre for Environmental
+        Research - UFZ, Leipzig, Germany.
+
+        Copyright (c) 2026 Matthias Cuntz - mc (at) macu (dot) de
+
+        Permission is hereby granted, free of charge, to any person obtaining a copy
+        of this software and associated documentation files (the "Software"), to deal
+        in the Software without restriction, including without limitation the rights
+        to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+        copies of the Software, and to permit persons to whom the Software is
+        furnished to do so, subject to the following conditions:
+
+        The above copyright notice and this permission notice shall be included in all
+        copies or substantial portions of the Software.
+
+        THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+        IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+        FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+        AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+        LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+        OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+        SOFTWARE.
+
+
+        History
+        -------
+        Written,  MC, Oct 2026
+    """
+    method = method.lower()
+    if method not in _needed:
+        raise ValueError('fluxbatch: method must be gapfill, nee2gpp, spikeflag or ustarflag.')
+    if 'nmethod' in kwargs: kwargs['method'] = kwargs.pop('nmethod')
+
+    # drivers given for all sites
+    drivers = [ dd for dd in _drivers if all([ dd in ss for ss in sites ]) ]
+    for dd in _needed[method]:
+        if dd not in drivers:
+            raise ValueError('fluxbatch: '+dd+' must be given for all sites with method '+method+'.')
+
+    # shared memory of drivers: sites one after the other
+    ndata = [ np.size(ss['date']) for ss in sites ]
+    start = np.cumsum([0]+ndata)
+    arrs  = dict()
+    for dd in drivers:
+        typ  = 'b' if dd == 'isday' else 'd'
+        raw  = RawArray(typ, int(start[-1]))
+        arr  = np.frombuffer(raw, dtype=np.int8 if dd == 'isday' else np.float64)
+        for i, ss in enumerate(sites):
+            dat = np.ma.filled(np.ma.asarray(ss[dd]).ravel(), np.nan if typ == 'd' else 0)
+            if dat.size != ndata[i]:
+                raise ValueError('fluxbatch: '+dd+' must have the same size as date in site '+str(i)+'.')
+            arr[start[i]:start[i+1]] = dat
+        arrs[dd] = (raw, typ)
+
+    # task list in order of sites and columns
+    tasks = list()
+    ntask = list()
+    for i, ss in enumerate(sites):
+        data = np.asarray(ss['data'])
+        if data.ndim == 1: data = data[:,np.newaxis]
+        if data.shape[0] != ndata[i]:
+            raise ValueError('fluxbatch: data must have the same first dimension as date in site '+str(i)+'.')
+        if 'flag' in ss:
+            flag = np.asarray(ss['flag']).reshape(data.shape)
+        elif method == 'gapfill':
+            flag = None
+        else:
+            flag = np.zeros(data.shape, dtype=np.int)
+        outdir = ss.get('outdir', '.')
+        if method == 'ustarflag':
+            cols = [slice(None)]
+        else:
+            cols = [ slice(k, k+1) for k in range(data.shape[1]) ]
+        for cc in cols:
+            fc = None if flag is None else flag[:,cc]
+            tasks.append((method, start[i], start[i+1], data[:,cc], fc, outdir, kwargs))
+        ntask.append(len(cols))
+
+    # run tasks; map keeps the order of tasks
+    if processes > 1:
+        pool = multiprocessing.Pool(processes, initializer=_init_shared, initargs=(arrs,))
+        try:
+            res = pool.map(_fluxbatch_task, tasks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        _init_shared(arrs)
+        try:
+            res = [ _fluxbatch_task(tt) for tt in tasks ]
+        finally:
+            _shared.clear()
+
+    # sort back to sites
+    out   = list()
+    times = list()
+    k = 0
+    for nn in ntask:
+        out.append([ rr[0] for rr in res[k:k+nn] ])
+        times.append([ rr[1] for rr in res[k:k+nn] ])
+        k += nn
+
+    if timing:
+        return out, times
+    else:
+        return out
+
+
+# Make numpy arrays of the shared drivers, in pool workers or in the calling process
+def _init_shared(arrs):
+    _shared.clear()
+    for dd in arrs:
+        raw, typ = arrs[dd]
+        if typ == 'b':
+            _shared[dd] = np.frombuffer(raw, dtype=np.int8).view(np.bool_)
+        else:
+            _shared[dd] = np.frombuffer(raw, dtype=np.float64)
+
+
+# One task of fluxbatch: method on one column of one site; returns output and wall time
+def _fluxbatch_task(task):
+    method, i0, i1, data, flag, outdir, kwargs = task
+    drv = dict()
+    for dd in _shared:
+        drv[dd] = _shared[dd][i0:i1]
+        drv[dd].flags.writeable = False  # shared between tasks
+
+    t0 = time.time()
+    if method == 'gapfill':
+        dflag = None if flag is None else (flag[:,0] != 0)
+        out = gapfill(drv['date'], data[:,0], drv['rg'], drv['tair'], drv['vpd'],
+                      data_flag=dflag, **kwargs)
+    elif method == 'nee2gpp':
+        out = nee2gpp(drv['date'], data[:,0], drv['tair'], drv['isday'],
+                      rg=drv.get('rg', False), vpd=drv.get('vpd', False), **kwargs)
+    elif method == 'spikeflag':
+        out = spikeflag(drv['date'], data, flag, drv['isday'], outdir, **kwargs)
+    elif method == 'ustarflag':
+        out = ustarflag(drv['date'], data, flag, drv['isday'], outdir, **kwargs)
+    t1 = time.time()
+
+    return out, t1-t0
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
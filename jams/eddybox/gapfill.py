@@ -181,6 +181,8 @@ def gapfill(date, data, rg, tair, vpd,
                                - longestmarginalgap was only working at beginning and end of time series
                                  renamed to longgap
                                - fullday
+                  MC, Oct 2026 - vectorized gap filling over all gaps with sliding windows
+                               - integer time windows of method 6
     """
 
     # -------------------------------------------------------------
@@ -279,32 +281,18 @@ def gapfill(date, data, rg, tair, vpd,
     if firstvalid > nn:        largegap[0:(firstvalid-nn)] = True
     if lastvalid < (ndata-nn): largegap[(lastvalid+nn):]   = True
 
-    # search largegap - code from maskgroup.py
-    index  = []
-    length = []
-    count  = 0
-    for i in range(ndata):
-        if i==0:
-            if data_flg[i]:
-                index += [i]
-                count  = 1
-        if i>0:
-            if data_flg[i] and not data_flg[i-1]:
-                index += [i]
-                count  = 1
-            elif data_flg[i]:
-                count += 1
-            elif not data_flg[i] and data_flg[i-1]:
-                length += [count]
-                count = 0
-            else:
-                pass
-    if count>0:
-        length += [count]
+    # search largegap: runs of flagged data longer than nn
+    flg    = np.concatenate(([False], data_flg, [False])).astype(np.int8)
+    dflg   = np.diff(flg)
+    index  = np.where(dflg == 1)[0]
+    length = np.where(dflg == -1)[0] - index
     # set largegap
-    for i in range(len(index)):
-        if length[i] > nn:
-            largegap[index[i]:index[i]+length[i]] = True
+    ilong = length > nn
+    if np.any(ilong):
+        lg = np.zeros(ndata+1, dtype=np.int)
+        np.add.at(lg, index[ilong], 1)
+        np.add.at(lg, index[ilong]+length[ilong], -1)
+        largegap |= np.cumsum(lg[:-1]) > 0
 
     # set or unset rest of days in large gaps
     if fullday:
@@ -324,209 +312,97 @@ def gapfill(date, data, rg, tair, vpd,
     # flag for all meteorological conditions and data
     total_flag = meteo_flg & (~data_flg)
 
-    # Fill loop over all data points
-    for j in range(ndata):
-        if not err:
-            # no reason to go further, no gap -> continue
-            if (~(data_flg[j])) | largegap[j]: continue
-        # 3 Methods
-        #   1. tair, vpd and global radiation;
-        #   2. just global radiation;
-        #   3. none meteorolgical conditions: take the mean of +- hour
-
-        # for better overview: dynamic calculation of radiation threshold
-        # minimum 20; maximum 50 [Wm-2] according to private correspondence
-        # with Markus Reichstein
-        rg_devmax = np.maximum(20.,np.minimum(rg[j],rg_dev))
-
-        # Method 1: all met conditions
-        if meteo_flg[j]:
-            # search for values around the met-conditions in a window of time
-            # (one week in the first iteration and odd weeks in the next)
-            j1  = j - np.arange(1,week+1) + 1
-            j2  = j + np.arange(1,week)
-            jj  = np.append(j1,j2)
-            win = np.unique(np.sort(np.clip(jj,0,ndata-1)))
-            # get boolean array where meteo-conditions are in a given width
-            conditions = ( (np.abs(rg[win]  -rg[j])   < rg_devmax) &
-                           (np.abs(tair[win]-tair[j]) < tair_dev) &
-                           (np.abs(vpd[win] -vpd[j])  < vpd_dev) &
-                           total_flag[win] )
-            num4avg = np.sum(conditions)
-            # we need at least two samples with similar conditions
-            if num4avg >= 2:
-                nconditions = np.repeat(~conditions,ndata2).reshape(conditions.size,ndata2)
-                dat = np.ma.array(data[win,:], mask=nconditions)
-                if err:
-                    data_std[j,:]  = np.ma.std(dat, axis=0, ddof=ddof)
-                else:
-                    data_fill[j,:] = np.ma.mean(dat, axis=0)
-                    # assign also quality category of gap filling
-                    quality[j]     = 1
-                continue
-            else: # --> extend time window to two weeks
-                j1  = j - np.arange(1,2*week+1) + 1
-                j2  = j + np.arange(1,2*week)
-                jj  = np.append(j1,j2)
-                win = np.unique(np.sort(np.clip(jj,0,ndata-1)))
-                conditions = ( (np.abs(rg[win]  -rg[j])   < rg_devmax) &
-                               (np.abs(tair[win]-tair[j]) < tair_dev) &
-                               (np.abs(vpd[win] -vpd[j])  < vpd_dev) &
-                               total_flag[win] )
-                num4avg = np.sum(conditions)
-                if num4avg >= 2:
-                    nconditions = np.repeat(~conditions,ndata2).reshape(conditions.size,ndata2)
-                    dat = np.ma.array(data[win,:], mask=nconditions)
-                    if err:
-                        data_std[j,:]  = np.ma.std(dat, axis=0, ddof=ddof)
-                    else:
-                        data_fill[j,:] = np.ma.mean(dat, axis=0)
-                        quality[j]     = 1
-                    continue
-
-        # if you come here, no error estimate
-        if err: continue
+    # for better overview: dynamic calculation of radiation threshold
+    # minimum 20; maximum 50 [Wm-2] according to private correspondence
+    # with Markus Reichstein
+    rg_devmax = np.maximum(20.,np.minimum(rg,rg_dev))
 
+    # Arguments of window search, which is vectorized over all points j to fill.
+    # The time window of j goes from j-nlo+1 to j+nhi (clipped at the borders).
+    wargs = (data, rg, tair, vpd, hour, rg_devmax, tair_dev, vpd_dev,
+             total_flag, data_flg, err, ddof)
+
+    # Output array of fill or error estimate
+    if err:
+        out = data_std
+        jj  = np.arange(ndata)
+    else:
+        out = data_fill
+        # no reason to go further, no gap
+        jj  = np.where(data_flg & (~largegap))[0]
+
+    # 3 Methods
+    #   1. tair, vpd and global radiation;
+    #   2. just global radiation;
+    #   3. none meteorolgical conditions: take the mean of +- hour
+
+    # Method 1: all met conditions
+    # search for values around the met-conditions in a window of time
+    # (one week in the first iteration and two weeks in the next)
+    j1 = jj[meteo_flg[jj]]
+    for multi in range(1,3):
+        ok, val = _gapfill_window(j1, multi*week, multi*week-1, 'meteo', *wargs)
+        out[j1[ok],:] = val[ok,:]
+        if not err: quality[j1[ok]] = 1
+        jj = np.setdiff1d(jj, j1[ok], assume_unique=True)
+        j1 = j1[~ok]
+
+    # if you come here, no error estimate
+    if not err:
         # If nothing is found under similar meteo within two weeks,
         # look for global radiation within one week ->
 
         # Method 2: just global radiation available
-        if (~(rg_flg[j])):
-            j1  = j - np.arange(1,week+1) + 1
-            j2  = j + np.arange(1,week)
-            jj  = np.append(j1,j2)
-            win = np.unique(np.sort(np.clip(jj,0,ndata-1)))
-            # get boolean array where meteo-conditions are in a given width
-            conditions = ( (np.abs(rg[win]-rg[j]) < rg_devmax) &
-                           total_flag[win] )
-            num4avg = np.sum(conditions)
-            # we need at least two samples with similar conditions
-            if num4avg >= 2:
-                nconditions = np.repeat(~conditions,ndata2).reshape(conditions.size,ndata2)
-                dat = np.ma.array(data[win,:], mask=nconditions)
-                if err:
-                    data_std[j,:]  = np.ma.std(dat, axis=0, ddof=ddof)
-                else:
-                    data_fill[j,:] = np.ma.mean(dat, axis=0)
-                    quality[j]     = 1
-                continue
+        j1 = jj[~rg_flg[jj]]
+        ok, val = _gapfill_window(j1, week, week-1, 'rg', *wargs)
+        out[j1[ok],:] = val[ok,:]
+        quality[j1[ok]] = 1
+        jj = np.setdiff1d(jj, j1[ok], assume_unique=True)
 
         # If still nothing is found under similar rg within one week,
         # take the same hour within 1-7 days
 
         # Method 3: same hour
-        enough = False
+        j1 = jj
         for i in range(2):
             t_win = (nperday * (2*i+1))//2
-            j1  = j - np.arange(1,t_win+1) + 1
-            j2  = j + np.arange(1,t_win)
-            jj  = np.append(j1,j2)
-            win = np.unique(np.sort(np.clip(jj,0,ndata-1)))
-            conditions = (np.abs(hour[win]-hour[j]) < 1.1) & (~(data_flg[win]))
-            num4avg = np.sum(conditions)
-            if num4avg >= 2:
-                nconditions = np.repeat(~conditions,ndata2).reshape(conditions.size,ndata2)
-                dat = np.ma.array(data[win,:], mask=nconditions)
-                if err:
-                    data_std[j,:]  = np.ma.std(dat, axis=0, ddof=ddof)
-                else:
-                    data_fill[j,:] = np.ma.mean(dat, axis=0)
-                    if i == 0:
-                        quality[j] = 1
-                    else:
-                        quality[j] = 2
-                break
+            ok, val = _gapfill_window(j1, t_win, t_win-1, 'hour', *wargs)
+            out[j1[ok],:] = val[ok,:]
+            quality[j1[ok]] = 1 if i == 0 else 2
+            j1 = j1[~ok]
 
         # sanity check
-        if err:
-            if data_std[j,0]  != undef: continue
-        else:
-            if data_fill[j,0] != undef: continue
+        jj = jj[out[jj,0] == undef]
 
         # If still nothing is found, start a new cycle with increased window size
         # Method 4: same as 1 but for 3-12 weeks
-        if meteo_flg[j]:
-            for multi in range(3,12):
-                j1  = j - np.arange(1,multi*week+1) + 1
-                j2  = j + np.arange(1,multi*week)
-                jj  = np.append(j1,j2)
-                win = np.unique(np.sort(np.clip(jj,0,ndata-1)))
-                conditions = ( (np.abs(rg[win]  -rg[j])   < rg_devmax) &
-                               (np.abs(tair[win]-tair[j]) < tair_dev) &
-                               (np.abs(vpd[win] -vpd[j])  < vpd_dev) &
-                               total_flag[win] )
-                num4avg = np.sum(conditions)
-                # we need at least two samples with similar conditions
-                if num4avg >= 2:
-                    nconditions = np.repeat(~conditions,ndata2).reshape(conditions.size,ndata2)
-                    dat = np.ma.array(data[win,:], mask=nconditions)
-                    if err:
-                        data_std[j,:]  = np.ma.std(dat, axis=0, ddof=ddof)
-                    else:
-                        data_fill[j,:] = np.ma.mean(dat, axis=0)
-                        # assign also quality category of gap filling
-                        if multi <= 2:
-                            quality[j] = 1
-                        elif multi > 4:
-                            quality[j] = 3
-                        else:
-                            quality[j] = 2
-                    break
-            # Check because continue does not support to jump out of two loops
-            if err:
-                if data_std[j,0]  != undef: continue
-            else:
-                if data_fill[j,0] != undef: continue
+        j1 = jj[meteo_flg[jj]]
+        for multi in range(3,12):
+            ok, val = _gapfill_window(j1, multi*week, multi*week-1, 'meteo', *wargs)
+            out[j1[ok],:] = val[ok,:]
+            # assign also quality category of gap filling
+            quality[j1[ok]] = 3 if multi > 4 else 2
+            j1 = j1[~ok]
+        jj = jj[out[jj,0] == undef]
 
         # Method 5: same as 2 but for 2-12 weeks
-        if (~(rg_flg[j])):
-            for multi in range(2,12):
-                j1  = j - np.arange(1,multi*week+1) + 1
-                j2  = j + np.arange(1,multi*week)
-                jj  = np.append(j1,j2)
-                win = np.unique(np.sort(np.clip(jj,0,ndata-1)))
-                # get boolean array where meteo-conditions are in a given width
-                conditions = ( (np.abs(rg[win]  -rg[j]) < rg_devmax) &
-                               total_flag[win] )
-                num4avg = np.sum(conditions)
-                # we need at least two samples with similar conditions
-                if num4avg >= 2:
-                    nconditions = np.repeat(~conditions,ndata2).reshape(conditions.size,ndata2)
-                    dat = np.ma.array(data[win,:], mask=nconditions)
-                    if err:
-                        data_std[j,:] = np.ma.std(dat, axis=0, ddof=ddof)
-                    else:
-                        data_fill[j,:] = np.ma.mean(dat, axis=0)
-                        if multi ==0:
-                            quality[j] = 1
-                        elif multi <= 2:
-                            quality[j] = 2
-                        else:
-                            quality[j] = 3
-                    break
-            if err:
-                if data_std[j,0]  != undef: continue
-            else:
-                if data_fill[j,0] != undef: continue
+        j1 = jj[~rg_flg[jj]]
+        for multi in range(2,12):
+            ok, val = _gapfill_window(j1, multi*week, multi*week-1, 'rg', *wargs)
+            out[j1[ok],:] = val[ok,:]
+            quality[j1[ok]] = 2 if multi <= 2 else 3
+            j1 = j1[~ok]
+        jj = jj[out[jj,0] == undef]
 
         # Method 6: same as 3 but for 3-120 days
+        j1 = jj
         for i in range(3,120):
             t_win = nperday * (2*i+1)/2
-            j1  = j - np.arange(1,t_win+1) + 1
-            j2  = j + np.arange(1,t_win)
-            jj  = np.append(j1,j2)
-            win = np.unique(np.sort(np.clip(jj,0,ndata-1)))
-            conditions = (np.abs(hour[win]-hour[j]) < 1.1) & (~(data_flg[win]))
-            num4avg = np.sum(conditions)
-            if num4avg >= 2:
-                nconditions = np.repeat(~conditions,ndata2).reshape(conditions.size,ndata2)
-                dat = np.ma.array(data[win,:], mask=nconditions)
-                if err:
-                    data_std[j,:] = np.ma.std(dat, axis=0, ddof=ddof)
-                else:
-                    data_fill[j,:] = np.ma.mean(dat, axis=0)
-                    quality[j] = 3
-                break
+            nlo   = np.int(np.ceil(t_win))
+            ok, val = _gapfill_window(j1, nlo, nlo-1, 'hour', *wargs)
+            out[j1[ok],:] = val[ok,:]
+            quality[j1[ok]] = 3
+            j1 = j1[~ok]
 
     if shape != False:
         if shape != True:
@@ -549,6 +425,59 @@ def gapfill(date, data, rg, tair, vpd,
             return data_fill, quality
 
 
+# Mean (or standard deviation if err) of data under similar conditions around points jj
+# in the time windows jj-nlo+1 to jj+nhi for the fill methods of gapfill.
+# kind='meteo': similar rg, tair and vpd; 'rg': similar rg; 'hour': same hour of the day.
+# Returns boolean array if at least two similar conditions were found and the means or stddevs.
+# Points with the same window length are treated together, in blocks of maximum maxsize
+# elements, so that means and stddevs are calculated exactly as np.ma.mean and np.ma.std
+# on the window of each point.
+def _gapfill_window(jj, nlo, nhi, kind, data, rg, tair, vpd, hour,
+                    rg_devmax, tair_dev, vpd_dev, total_flag, data_flg, err, ddof,
+                    maxsize=2**22):
+    ndata, ndata2 = data.shape
+    ok  = np.zeros(jj.size, dtype=np.bool)
+    val = np.empty((jj.size,ndata2), dtype=data.dtype)
+    if jj.size == 0: return ok, val
+    lo   = np.maximum(jj-nlo+1, 0)
+    nwin = np.minimum(jj+nhi, ndata-1) - lo + 1
+    for n in np.unique(nwin):
+        ii   = np.where(nwin == n)[0]
+        nrow = max(maxsize // (n*ndata2), 1)
+        for k in range(0, ii.size, nrow):
+            ik  = ii[k:k+nrow]
+            j   = jj[ik][:,np.newaxis]
+            win = lo[ik][:,np.newaxis] + np.arange(n)
+            # get boolean array where conditions are in a given width
+            if kind == 'hour':
+                conditions = (np.abs(hour[win]-hour[j]) < 1.1) & (~(data_flg[win]))
+            else:
+                conditions = (np.abs(rg[win]-rg[j]) < rg_devmax[j]) & total_flag[win]
+                if kind == 'meteo':
+                    conditions &= ( (np.abs(tair[win]-tair[j]) < tair_dev) &
+                                    (np.abs(vpd[win] -vpd[j])  < vpd_dev) )
+            num4avg = np.sum(conditions, axis=1)
+            # we need at least two samples with similar conditions
+            enough = num4avg >= 2
+            if not np.any(enough): continue
+            cond = conditions[enough][:,:,np.newaxis]
+            cnt  = num4avg[enough][:,np.newaxis]
+            dat  = np.where(cond, data[win[enough],:], 0.)
+            davg = np.sum(dat, axis=1) * 1. / cnt
+            if err:
+                danom = np.where(cond, dat - davg[:,np.newaxis,:], 0.)
+                dvar  = np.sum(danom*danom, axis=1)
+                # np.ma.std is masked if cnt <= ddof, leaving the sum of squares as data
+                cnt   = np.broadcast_to(cnt-ddof, dvar.shape)
+                pos   = cnt > 0
+                davg  = dvar.copy()
+                davg[pos] = np.sqrt(dvar[pos] / cnt[pos])
+            ok[ik[enough]]    = True
+            val[ik[enough],:] = davg
+
+    return ok, val
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
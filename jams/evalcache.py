@@ -0,0 +1,375 @@
+#!/usr/bin/env python
+"""
+    Cache of objective function evaluations for optimisation and screening.
+
+    Function values are stored under a key made from the parameter vector that is
+    actually evaluated, i.e. after masking and limiting to bounds. Parameter vectors
+    can be rounded to a given tolerance before hashing so that nearly identical vectors
+    share one evaluation. The cache is held in memory with least-recently-used eviction
+    and can be appended to a file on disk so that restarted runs reuse prior evaluations.
+
+    The key does not know about the function, its data or arguments. A file on disk
+    must therefore only be reused with the same function, data and arguments, which
+    can be checked with a tag that is stored in the file.
+
+
+    Definition
+    ----------
+    class EvalCache(maxsize=None, atol=0., cachefile=None, tag=None):
+    def as_evalcache(cache):
+
+
+    License
+    -------
+    This file is part of the JAMS Python package, distributed under the MIT
+    License. The JAMS Python package originates from the former UFZ Python library,
+    Department of Computational Hydrosystems, Helmholtz Centre for Environmental
+    Research - UFZ, Leipzig, Germany.
+
+    Copyright (c) 2026 Matthias Cuntz - mc (at) macu (dot) de
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+
+    History
+    -------
+    Written,  MC, Oct 2026
+"""
+from __future__ import division, absolute_import, print_function
+import os
+import pickle
+from collections import OrderedDict
+import numpy as np
+
+__all__ = ['EvalCache', 'as_evalcache']
+
+
+# First entry of a cachefile, followed by the tag
+_header = 'jams.EvalCache'
+
+
+class EvalCache(object):
+    """
+        Cache of function evaluations keyed by parameter vectors.
+
+        The key of a parameter vector x is made from float64(x) or, if atol>0,
+        from round(x/atol), i.e. vectors are identical if they fall in the same
+        cell of a grid with spacing atol. Vectors close to a cell border might still
+        end up in different cells.
+
+        The least recently used entries are removed if the cache exceeds maxsize entries.
+        If cachefile is given, all existing entries are read from the file at
+        initialisation and every new entry is appended to the file, which is never shrunk.
+        The key does not include the function, its data or its arguments, or an external model.
+        Reusing cachefile after any of these changed silently returns stale values.
+        The tag, e.g. the name and version of the model and its data, is written
+        at the start of a new cachefile. An existing cachefile with another tag is rejected.
+
+        Cache copies sent to other processes, e.g. with multiprocessing, do not write to
+        cachefile but remember their new entries as well as their hits and misses,
+        which can be retrieved with pop_new() and merged into the original cache with update().
+
+
+        Definition
+        ----------
+        class EvalCache(maxsize=None, atol=0., cachefile=None, tag=None):
+
+
+        Optional Input
+        --------------
+        maxsize     maximum number of entries in memory (default: None = unlimited)
+        atol        scalar or array: absolute tolerance per parameter for identical vectors
+                    (default: 0. = exact)
+        cachefile   file name of the persistent store on disk (default: None)
+        tag         picklable identifier of function, data and arguments, e.g. a string,
+                    that must match the tag of an existing cachefile (default: None)
+
+
+        Methods
+        -------
+        key(x)                   hashable key of parameter vector x
+        get(x, default=None)     cached value of x or default; counts hits and misses
+        put(x, value)            store value of x
+        __call__(func, x)        cached value of x or func(x), which is then stored
+        map(func, xs, mapper=map)  [func(x) for x in xs] with only missing, unique x passed to
+                                 mapper, e.g. pool.map
+        update(entries, hits=0, misses=0)  add list of (key, value) pairs and hit and miss counts
+        pop_new()                list of (key, value) pairs added in a copy of the cache as well as
+                                 the hits and misses of the copy since the last call
+        stats()                  dict with 'hits', 'misses', 'hitrate', 'size', 'evictions'
+        clear()                  remove all entries in memory and reset statistics
+
+
+        Examples
+        --------
+        >>> ncall = [0]
+        >>> def rosen(x):
+        ...     ncall[0] += 1
+        ...     return np.sum(100.*(x[1:]-x[:-1]**2)**2 + (1.-x[:-1])**2)
+        >>> cache = EvalCache(maxsize=3)
+        >>> print(cache(rosen, np.array([1., 1.])), cache(rosen, np.array([1., 1.])))
+        0.0 0.0
+        >>> print(ncall[0], cache.stats()['hits'], cache.stats()['misses'])
+        1 1 1
+
+        >>> # duplicates in a batch are evaluated only once
+        >>> print(cache.map(rosen, [np.array([0., 0.]), np.array([1., 1.]), np.array([0., 0.])]))
+        [1.0, 0.0, 1.0]
+        >>> print(ncall[0])
+        2
+
+        >>> # tolerance
+        >>> cache = EvalCache(atol=1e-6)
+        >>> print(cache(rosen, np.array([0., 0.])), cache(rosen, np.array([1e-8, 0.])))
+        1.0 1.0
+        >>> print(ncall[0])
+        3
+
+        >>> # persistent store
+        >>> cache = EvalCache(cachefile='test_evalcache.pkl')
+        >>> print(cache(rosen, np.array([2., 4.])))
+        1.0
+        >>> cache = EvalCache(cachefile='test_evalcache.pkl')
+        >>> print(cache(rosen, np.array([2., 4.])), ncall[0])
+        1.0 4
+        >>> try:
+        ...     cache = EvalCache(cachefile='test_evalcache.pkl', tag='rosen v2')
+        ... except ValueError as e:
+        ...     print(e)
+        Tag 'rosen v2' does not match tag None of cachefile test_evalcache.pkl
+        >>> import os
+        >>> os.remove('test_evalcache.pkl')
+
+
+        History
+        -------
+        Written,  MC, Oct 2026
+    """
+
+    def __init__(self, maxsize=None, atol=0., cachefile=None, tag=None):
+        self.maxsize   = maxsize
+        self.atol      = np.array(atol, dtype=np.float64)
+        self.cachefile = cachefile
+        self.tag       = tag
+        self._store    = OrderedDict()
+        self._new      = None
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+        if cachefile is not None:
+            self._load()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_store'] = list(self._store.items())
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._store    = OrderedDict(state['_store'])
+        self.cachefile = None
+        self._new      = list()
+        self.hits      = 0
+        self.misses    = 0
+
+    def __len__(self):
+        return len(self._store)
+
+    def __contains__(self, x):
+        return self.key(x) in self._store
+
+    def key(self, x):
+        xx = np.array(x, dtype=np.float64).ravel() + 0. # -0. -> 0.
+        if np.any(self.atol > 0.):
+            atol = np.where(self.atol > 0., self.atol, 1.)
+            xx   = np.where(self.atol > 0., np.round(xx/atol), xx)
+        return xx.tobytes()
+
+    def get(self, x, default=None):
+        kk = self.key(x)
+        if kk in self._store:
+            val = self._store.pop(kk)
+            self._store[kk] = val
+            self.hits += 1
+            return val
+        else:
+            self.misses += 1
+            return default
+
+    def put(self, x, value):
+        self._add(self.key(x), value)
+
+    def __call__(self, func, x):
+        kk = self.key(x)
+        if kk in self._store:
+            val = self._store.pop(kk)
+            self._store[kk] = val
+            self.hits += 1
+            return val
+        self.misses += 1
+        val = func(x)
+        self._add(kk, val)
+        return val
+
+    def map(self, func, xs, mapper=map):
+        keys  = [ self.key(x) for x in xs ]
+        out   = [None] * len(keys)
+        imiss = OrderedDict() # first index of each missing key
+        todo  = []            # indexes of missing entries, including duplicates
+        for i, kk in enumerate(keys):
+            if kk in self._store:
+                out[i] = self._store.pop(kk)
+                self._store[kk] = out[i]
+                self.hits += 1
+            else:
+                if kk in imiss:
+                    self.hits += 1
+                else:
+                    imiss[kk] = i
+                    self.misses += 1
+                todo.append(i)
+        if len(imiss) > 0:
+            vals = list(mapper(func, [ xs[i] for i in imiss.values() ]))
+            new  = dict(zip(imiss.keys(), vals))
+            for kk, val in zip(imiss.keys(), vals):
+                self._add(kk, val)
+            for i in todo:
+                out[i] = new[keys[i]]
+        return out
+
+    def update(self, entries, hits=0, misses=0):
+        for kk, val in entries:
+            if kk not in self._store:
+                self._add(kk, val)
+        self.hits   += hits
+        self.misses += misses
+
+    def pop_new(self):
+        if self._new is None:
+            return [], 0, 0
+        new = (self._new, self.hits, self.misses)
+        self._new   = list()
+        self.hits   = 0
+        self.misses = 0
+        return new
+
+    def stats(self):
+        ntot = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hitrate': self.hits/ntot if ntot > 0 else 0.,
+                'size': len(self._store), 'evictions': self.evictions}
+
+    def clear(self):
+        self._store.clear()
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+
+    # Add entry, write to cachefile or remember it in copies, and evict least recently used
+    def _add(self, kk, val):
+        if isinstance(val, np.ndarray): val = val.copy()
+        self._store[kk] = val
+        if self._new is not None:
+            self._new.append((kk, val))
+        if self.cachefile is not None:
+            with open(self.cachefile, 'ab') as f:
+                pickle.dump((kk, val), f, protocol=2)
+        if self.maxsize is not None:
+            while len(self._store) > self.maxsize:
+                self._store.popitem(last=False)
+                self.evictions += 1
+
+    # Read all entries from cachefile after checking its tag; a truncated last entry is ignored.
+    # A new or empty cachefile gets a header with the tag.
+    def _load(self):
+        if (not os.path.isfile(self.cachefile)) or (os.path.getsize(self.cachefile) == 0):
+            with open(self.cachefile, 'wb') as f:
+                pickle.dump((_header, self.tag), f, protocol=2)
+            return
+        with open(self.cachefile, 'rb') as f:
+            try:
+                head, tag = pickle.load(f)
+            except (EOFError, pickle.UnpicklingError, ValueError, TypeError):
+                head, tag = None, None
+            if head != _header:
+                raise ValueError('cachefile '+str(self.cachefile)+' is not a file of EvalCache')
+            if tag != self.tag:
+                raise ValueError('Tag '+repr(self.tag)+' does not match tag '+repr(tag)+
+                                 ' of cachefile '+str(self.cachefile))
+            while True:
+                try:
+                    kk, val = pickle.load(f)
+                except (EOFError, pickle.UnpicklingError, ValueError):
+                    break
+                self._store.pop(kk, None)
+                self._store[kk] = val
+        if self.maxsize is not None:
+            while len(self._store) > self.maxsize:
+                self._store.popitem(last=False)
+
+
+def as_evalcache(cache):
+    """
+        Convert the keyword cache of optimisers and screening to an EvalCache.
+
+
+        Definition
+        ----------
+        def as_evalcache(cache):
+
+
+        Input
+        -----
+        cache       None or False: no cache
+                    True: EvalCache() in memory
+                    string: EvalCache(cachefile=cache), i.e. persistent store in file cache
+                            without tag, so the file must not be reused after changes of the function
+                    EvalCache: returned as is
+
+
+        Output
+        ------
+        EvalCache or None
+
+
+        Examples
+        --------
+        >>> print(as_evalcache(None))
+        None
+        >>> print(type(as_evalcache(True)).__name__)
+        EvalCache
+
+
+        History
+        -------
+        Written,  MC, Oct 2026
+    """
+    if (cache is None) or (cache is False):
+        return None
+    elif cache is True:
+        return EvalCache()
+    elif isinstance(cache, str):
+        return EvalCache(cachefile=cache)
+    else:
+        return cache
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
@@ -1,14 +1,16 @@
 #!/usr/bin/env python
 from __future__ import division, absolute_import, print_function
 import numpy as np
+from jams.readcache import readcache
+from jams.blockread import ColumnError, read_blocks, block2float, str2float, iter_chunks
 
-__all__ = ['fread']
+__all__ = ['fread', 'fread_iter']
 
 def fread(infile, nc=0, cname=None, skip=0, cskip=0, hskip=0, hstrip=True, separator=None,
           squeeze=False, reform=False, skip_blank=False, comment=None,
           fill=False, fill_value=0, strip=None, encoding='ascii', errors='ignore',
           header=False, full_header=False,
-          transpose=False, strarr=False, return_list=False):
+          transpose=False, strarr=False, return_list=False, engine='python', chunksize=0, cache=False):
     """
         Read numbers into 2D-array from a file.
 
@@ -22,7 +24,7 @@ def fread(infile, nc=0, cname=None, skip=0, cskip=0, hskip=0, hstrip=True, separ
                   squeeze=False, reform=False, skip_blank=False, comment=None,
                   fill=False, fill_value=0, strip=None, encoding='ascii', errors='ignore',
                   header=False, full_header=False,
-                  transpose=False, strarr=False, return_list=False):
+                  transpose=False, strarr=False, return_list=False, engine='python', chunksize=0, cache=False):
 
 
         Input
@@ -57,6 +59,25 @@ def fread(infile, nc=0, cname=None, skip=0, cskip=0, hskip=0, hstrip=True, separ
                      (default: ascii)
         errors       Errors may be given to define the error handling during encoding of the file.
                      Possible values: strict, replace, ignore (default: ignore).
+        engine       Parsing engine of the data lines (default: 'python').
+                     'python': split and convert line by line.
+                     'numpy':  read the file in blocks of characters and split and
+                               convert all lines of a block at once with numpy.
+                               Much faster and less memory intensive for large files.
+                     Both engines give the same results and raise the same error types,
+                     e.g. ColumnError; the message of a ValueError of a non-numeric entry
+                     can name a different entry with the two engines.
+        chunksize    If >0, return an iterator over blocks of chunksize rows of the file
+                     instead of one array of the whole file (default: 0).
+                     The blocks are parsed with engine='numpy'.
+                     squeeze removes only the column dimension of the blocks.
+                     See also fread_iter.
+        cache        If True or directory name, read the output from a binary cache on disk
+                     if the file and the arguments did not change since the last call with cache;
+                     otherwise read the file and write the output to the cache (default: False).
+                     The cache is the directory .jams_cache in the directory of infile (cache=True)
+                     or the given directory. Arrays are returned as copy-on-write memory maps.
+                     Remove the cache of infile with clear_readcache(infile).
 
 
         Options
@@ -280,6 +301,36 @@ def fread(infile, nc=0, cname=None, skip=0, cskip=0, hskip=0, hstrip=True, separ
          ['4.2']
          ['5.2']]
 
+        >>> # numpy engine
+        >>> print(astr(fread(filename, skip=1, skip_blank=True, comment='#!', fill=True, fill_value=-1, engine='numpy'), 1, pp=True))
+        [[' 1.1' ' 1.2' ' 1.3' ' 1.4']
+         [' 2.1' ' 2.2' ' 2.3' ' 2.4']
+         [' 3.1' ' 3.2' ' 3.3' ' 3.4']
+         [' 4.1' ' 4.2' ' 4.3' ' 4.4']
+         [' 5.1' ' 5.2' '-1.0' '-1.0']]
+        >>> print(astr(fread(filename1, nc=[1,3], skip=1, engine='numpy'), 1, pp=True))
+        [['1.2' '1.4']
+         ['nan' 'nan']]
+
+        >>> # binary cache
+        >>> dat = fread(filename, skip=1, skip_blank=True, comment='#!', fill=True, fill_value=-1, cache=True)
+        >>> dat = fread(filename, skip=1, skip_blank=True, comment='#!', fill=True, fill_value=-1, cache=True)
+        >>> print(astr(dat[-1,:], 1, pp=True))
+        [' 5.1' ' 5.2' '-1.0' '-1.0']
+        >>> from jams.readcache import clear_readcache
+        >>> import os
+        >>> clear_readcache(filename)
+        >>> os.rmdir('.jams_cache')
+
+        >>> # iterate over blocks of rows
+        >>> for dd in fread(filename, skip=1, nc=[0,1], skip_blank=True, comment='#!', chunksize=2):
+        ...     print(astr(dd, 1, pp=True))
+        [['1.1' '1.2']
+         ['2.1' '2.2']]
+        [['3.1' '3.2']
+         ['4.1' '4.2']]
+        [['5.1' '5.2']]
+
         >>> # Clean up doctest
         >>> import os
         >>> os.remove(filename)
@@ -332,8 +383,23 @@ def fread(infile, nc=0, cname=None, skip=0, cskip=0, hskip=0, hstrip=True, separ
                   MC, Aug 2019 - use codecs module and allow user encoding and error handling
                   ST, Dec 2019 - added return_list flag
                   MC, Jan 2020 - default return_list=False
+                  MC, Oct 2026 - engine='numpy' reads and converts blocks of lines with numpy
+                  MC, Oct 2026 - chunksize, fread_iter
+                  MC, Oct 2026 - cache
     """
     #
+    # Binary cache
+    if cache and (chunksize <= 0):
+        return readcache(fread, infile, cache=cache,
+                         nc=nc, cname=cname, skip=skip, cskip=cskip, hskip=hskip, hstrip=hstrip,
+                         separator=separator, squeeze=squeeze, reform=reform, skip_blank=skip_blank,
+                         comment=comment, fill=fill, fill_value=fill_value, strip=strip,
+                         encoding=encoding, errors=errors, header=header, full_header=full_header,
+                         transpose=transpose, strarr=strarr, return_list=return_list, engine=engine)
+    #
+    if engine not in ['python', 'numpy']:
+        raise ValueError('engine must be python or numpy: '+str(engine))
+    #
     # Open file
     import codecs
     f = codecs.open(infile, 'r', encoding=encoding, errors=errors)
@@ -453,32 +519,69 @@ def fread(infile, nc=0, cname=None, skip=0, cskip=0, hskip=0, hstrip=True, separ
     # Values - first line
     if (miinc >= nres) and (not fill):
         f.close()
-        raise ValueError('Line has not enough columns to index - 02: '+s)
+        raise ColumnError('Line has not enough columns to index - 02: '+s)
     var = list()
     null = line2var(res, var, iinc, strip)
     #
+    # Values - rest of file in blocks of chunksize rows
+    if chunksize > 0:
+        def blocks():
+            yield (str2float(np.array(var), fill, fill_value),)
+            for lines in read_blocks(f, skip_blank=skip_blank, comment=comment):
+                yield (block2float(lines, sep, iinc, strip=strip, fill=fill, fill_value=fill_value,
+                                   errmsg='Line has not enough columns to index - 03: '),)
+        def post(dat):
+            if (squeeze or reform) and (dat.shape[1] == 1): dat = dat[:, 0]
+            if transpose: dat = dat.T
+            return dat
+        return iter_chunks(f, blocks(), chunksize, post)
+    #
     # Values - rest of file
-    for line in f:
-        s = str(line.rstrip())
-        if len(s) == 0:
-            if skip_blank:
+    if engine == 'numpy':
+        # convert block by block but raise conversion errors only after
+        # all lines were checked for enough columns, as in engine='python'
+        ferr = None
+        try:
+            var = [str2float(np.array(var), fill, fill_value)]
+        except ValueError as e:
+            ferr = e
+        for lines in read_blocks(f, skip_blank=skip_blank, comment=comment):
+            try:
+                arr = block2float(lines, sep, iinc, strip=strip, fill=fill, fill_value=fill_value,
+                                  errmsg='Line has not enough columns to index - 03: ',
+                                  check=(ferr is not None))
+            except ColumnError:
+                f.close()
+                raise
+            except ValueError as e:
+                ferr = e
                 continue
-            else:
-                break
-        if comment is not None:
-            if (s[0] in comment): continue
-        res = s.split(sep)
-        nres = len(res)
-        if (miinc >= nres) and (not fill):
-            f.close()
-            raise ValueError('Line has not enough columns to index - 03: '+s)
-        null = line2var(res, var, iinc, strip)
-
-    f.close()
-    # list -> array
-    if fill:
-        var = [ [ fill_value if i=='' else i for i in row ] for row in var ]
-    var = np.array(var, dtype=np.float)
+            if arr is not None: var.append(arr)
+        f.close()
+        if ferr is not None: raise ferr
+        var = np.concatenate(var)
+    else:
+        for line in f:
+            s = str(line.rstrip())
+            if len(s) == 0:
+                if skip_blank:
+                    continue
+                else:
+                    break
+            if comment is not None:
+                if (s[0] in comment): continue
+            res = s.split(sep)
+            nres = len(res)
+            if (miinc >= nres) and (not fill):
+                f.close()
+                raise ColumnError('Line has not enough columns to index - 03: '+s)
+            null = line2var(res, var, iinc, strip)
+
+        f.close()
+        # list -> array
+        if fill:
+            var = [ [ fill_value if i=='' else i for i in row ] for row in var ]
+        var = np.array(var, dtype=np.float)
     if squeeze or reform: var = var.squeeze()
     if transpose: var = var.T
     if return_list:
@@ -490,6 +593,106 @@ def fread(infile, nc=0, cname=None, skip=0, cskip=0, hskip=0, hstrip=True, separ
     return var
 
 
+def fread_iter(infile, chunksize=100000, **kwargs):
+    """
+        Iterate over blocks of rows of a file, returning 2D-arrays of floats.
+
+        Only chunksize rows are held in memory at a time so that
+        files larger than memory can be processed.
+
+        This is fread(infile, chunksize=chunksize, **kwargs).
+
+
+        Definition
+        ----------
+        def fread_iter(infile, chunksize=100000, **kwargs):
+
+
+        Input
+        -----
+        infile       source file name
+
+
+        Optional Input Parameters
+        -------------------------
+        chunksize    number of rows per block (default: 100000)
+        **kwargs     all keywords of fread such as nc, cname, skip, hskip,
+                     comment, skip_blank, fill, strip, squeeze, transpose.
+                     header=True returns the header as fread.
+
+
+        Output
+        ------
+        Iterator over 2D-arrays of floats with chunksize rows;
+        the last array may have less rows.
+
+
+        Examples
+        --------
+        >>> # Create some data
+        >>> filename = 'test_fread_iter.dat'
+        >>> ff = open(filename,'w')
+        >>> ff.writelines('head1 head2 head3\\n')
+        >>> for i in range(5): ff.writelines('{:d}.1 {:d}.2 {:d}.3\\n'.format(i,i,i))
+        >>> ff.close()
+
+        >>> for dd in fread_iter(filename, chunksize=2, cname=['head1','head3'], skip=1):
+        ...     print(dd)
+        [[0.1 0.3]
+         [1.1 1.3]]
+        [[2.1 2.3]
+         [3.1 3.3]]
+        [[4.1 4.3]]
+
+        >>> # running sum of column head2
+        >>> tot = 0.
+        >>> for dd in fread_iter(filename, chunksize=2, cname='head2', skip=1, squeeze=True):
+        ...     tot += dd.sum()
+        >>> print('{:.1f}'.format(tot))
+        11.0
+
+        >>> # Clean up doctest
+        >>> import os
+        >>> os.remove(filename)
+
+
+        License
+        -------
+        This file is part of the JAMS Python package, distributed under the MIT
+        License. The JAMS Python package originates from the former UFZ Python library,
+        Department of Computational Hydrosystems, Helmholtz Centre for Environmental
+        Research - UFZ, Leipzig, Germany.
+
+        Copyright (c) 2026 Matthias Cuntz - mc (at) macu (dot) de
+
+        Permission is hereby granted, free of charge, to any person obtaining a copy
+        of this software and associated documentation files (the "Software"), to deal
+        in the Software without restriction, including without limitation the rights
+        to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+        copies of the Software, and to permit persons to whom the Software is
+        furnished to do so, subject to the following conditions:
+
+        The above copyright notice and this permission notice shall be included in all
+        copies or substantial portions of the Software.
+
+        THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+        IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+        FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+        AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+        LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+        OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+        SOFTWARE.
+
+
+        History
+        -------
+        Written,  MC, Oct 2026
+    """
+    if chunksize <= 0:
+        raise ValueError('chunksize must be > 0.')
+    return fread(infile, chunksize=chunksize, **kwargs)
+
+
 # Helper for append var with current line already splitted into list
 def line2var(res, var, iinc, strip):
     nres = len(res)
@@ -510,6 +713,22 @@ if __name__ == '__main__':
     import doctest
     doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
 
+    # # Benchmark engine='python' versus engine='numpy'
+    # import os
+    # import time
+    # filename = 'bench_fread.csv'
+    # nrow = 200000
+    # ncol = 10
+    # dat  = np.random.default_rng(1).normal(size=(nrow, ncol))
+    # np.savetxt(filename, dat, fmt='%.6f', delimiter=',',
+    #            header=','.join([ 'head{:d}'.format(i) for i in range(ncol) ]), comments='')
+    # for engine in ['python', 'numpy']:
+    #     t1 = time.time()
+    #     dd = fread(filename, skip=1, engine=engine)
+    #     t2 = time.time()
+    #     print('fread engine={:6s} {:d}x{:d}: {:.2f} s'.format(engine, nrow, ncol, t2-t1))
+    # os.remove(filename)
+
     # from autostring import astr
     # filename = 'test.dat'
     # ff = open(filename,'w')
@@ -3,14 +3,16 @@ from __future__ import division, absolute_import, print_function
 import numpy as np
 from jams.fread import fread
 from jams.sread import sread
+from jams.readcache import readcache
+from jams.blockread import ColumnError, read_blocks, split_block, strip_block, str2float, iter_chunks
 
-__all__ = ['fsread']
+__all__ = ['fsread', 'fsread_iter']
 
 def fsread(infile, nc=0, cname=None, snc=0, sname=None, skip=0, cskip=0, hskip=0, hstrip=True, separator=None,
            squeeze=False, reform=False, skip_blank=False, comment=None,
            fill=False, fill_value=0, sfill_value='', strip=None, encoding='ascii', errors='ignore',
            header=False, full_header=False,
-           transpose=False, strarr=False):
+           transpose=False, strarr=False, engine='python', chunksize=0, cache=False):
     """
         Read from a file numbers into 2D float array as well as characters into 2D string array.
 
@@ -21,7 +23,7 @@ def fsread(infile, nc=0, cname=None, snc=0, sname=None, skip=0, cskip=0, hskip=0
                    squeeze=False, reform=False, skip_blank=False, comment=None,
                    fill=False, fill_value=0, sfill_value='', strip=None, encoding='ascii', errors='ignore',
                    header=False, full_header=False,
-                   transpose=False, strarr=False):
+                   transpose=False, strarr=False, engine='python', chunksize=0, cache=False):
 
 
         Input
@@ -65,6 +67,24 @@ def fsread(infile, nc=0, cname=None, snc=0, sname=None, skip=0, cskip=0, hskip=0
                      (default: ascii)
         errors       Errors may be given to define the error handling during encoding of the file.
                      Possible values: strict, replace, ignore (default: ignore).
+        engine       Parsing engine of the data lines (default: 'python').
+                     'python': split and convert line by line.
+                     'numpy':  read the file in blocks of characters and split and
+                               convert all lines of a block at once with numpy.
+                     Both engines give the same results and raise the same error types,
+                     e.g. ColumnError; the message of a ValueError of a non-numeric entry
+                     can name a different entry with the two engines.
+        chunksize    If >0, return an iterator over blocks of chunksize rows of the file
+                     instead of the arrays of the whole file (default: 0).
+                     The blocks are parsed with engine='numpy'.
+                     squeeze removes only the column dimension of the blocks.
+                     See also fsread_iter.
+        cache        If True or directory name, read the output from a binary cache on disk
+                     if the file and the arguments did not change since the last call with cache;
+                     otherwise read the file and write the output to the cache (default: False).
+                     The cache is the directory .jams_cache in the directory of infile (cache=True)
+                     or the given directory. Arrays are returned as copy-on-write memory maps.
+                     Remove the cache of infile with clear_readcache(infile).
 
 
         Options
@@ -220,6 +240,21 @@ def fsread(infile, nc=0, cname=None, snc=0, sname=None, skip=0, cskip=0, hskip=0
         [['1.4']
          ['2.4']]
 
+        >>> # numpy engine
+        >>> a, sa = fsread(filename, cname=['head2','head4'], snc=-1, skip=1, fill=True, fill_value=-1, engine='numpy')
+        >>> print(astr(a, 1, pp=True))
+        [[' 1.2' ' 1.4']
+         ['-1.0' ' 2.4']]
+        >>> print(sa)
+        [['01.12.2012', 'name1'],
+         ['01.01.2013', 'name2']]
+
+        >>> # iterate over blocks of rows
+        >>> for a, sa in fsread(filename, nc=[1,3], snc=[0], skip=1, fill=True, fill_value=-1, strarr=True, chunksize=1):
+        ...     print(a, sa)
+        [[1.2 1.4]] [['01.12.2012']]
+        [[-1.   2.4]] [['01.01.2013']]
+
         >>> # Clean up doctest
         >>> import os
         >>> os.remove(filename)
@@ -263,9 +298,24 @@ def fsread(infile, nc=0, cname=None, snc=0, sname=None, skip=0, cskip=0, hskip=0
                   MC, Jun 2019 - open(errors='ignore') to ignore unicode characters, for example, on read
                                  -> returns header in unicode in Python2
                   MC, Aug 2019 - use codecs module and allow user encoding and error handling
+                  MC, Oct 2026 - engine='numpy' reads, splits and converts blocks of lines with numpy
+                  MC, Oct 2026 - chunksize, fsread_iter
+                  MC, Oct 2026 - cache
     """
 
+    # Binary cache
+    if cache and (chunksize <= 0):
+        return readcache(fsread, infile, cache=cache,
+                         nc=nc, cname=cname, snc=snc, sname=sname, skip=skip, cskip=cskip, hskip=hskip,
+                         hstrip=hstrip, separator=separator, squeeze=squeeze, reform=reform,
+                         skip_blank=skip_blank, comment=comment, fill=fill, fill_value=fill_value,
+                         sfill_value=sfill_value, strip=strip, encoding=encoding, errors=errors,
+                         header=header, full_header=full_header, transpose=transpose, strarr=strarr,
+                         engine=engine)
+    #
     # Input error
+    if engine not in ['python', 'numpy']:
+        raise ValueError('engine must be python or numpy: '+str(engine))
     if (nc == -1) and (snc == -1):
         raise ValueError('nc and snc must numbers or list of indices; -1 means read the rest. nc and snc cannot both be -1.')
 
@@ -277,7 +327,7 @@ def fsread(infile, nc=0, cname=None, snc=0, sname=None, skip=0, cskip=0, hskip=0
                          squeeze=squeeze, reform=reform, skip_blank=skip_blank, comment=comment,
                          fill=fill, fill_value=fill_value, strip=strip, encoding=encoding, errors=errors,
                          header=header, full_header=full_header,
-                         transpose=transpose, strarr=strarr)
+                         transpose=transpose, strarr=strarr, engine=engine, chunksize=chunksize)
     # snc!=0
     if (not isinstance(nc, (list, tuple, np.ndarray))) and (cname is None):
         if nc==0:
@@ -286,7 +336,7 @@ def fsread(infile, nc=0, cname=None, snc=0, sname=None, skip=0, cskip=0, hskip=0
                          squeeze=squeeze, reform=reform, skip_blank=skip_blank, comment=comment,
                          fill=fill, fill_value=sfill_value, strip=strip, encoding=encoding, errors=errors,
                          header=header, full_header=full_header,
-                         transpose=transpose, strarr=strarr)
+                         transpose=transpose, strarr=strarr, engine=engine, chunksize=chunksize)
 
     # Open file
     import codecs
@@ -471,44 +521,102 @@ def fsread(infile, nc=0, cname=None, snc=0, sname=None, skip=0, cskip=0, hskip=0
     # Values - first line
     if (miianc >= nres) and (not fill):
         f.close()
-        raise ValueError('Line has not enough columns to index: '+s)
+        raise ColumnError('Line has not enough columns to index: '+s)
     var  = list()
     svar = list()
     null = line2var(res, var, iinc, strip)
     null = line2var(res, svar, iisnc, False if strip is None else strip)
     #
-    # Values - rest of file
-    for line in f:
-        s = str(line.rstrip())
-        if len(s) == 0:
-            if skip_blank:
-                continue
+    # Values - rest of file in blocks of chunksize rows
+    if chunksize > 0:
+        sstrip = False if strip is None else strip
+        def blocks():
+            yield (str2float(np.array(var), fill, fill_value), np.array(svar))
+            for lines in read_blocks(f, skip_blank=skip_blank, comment=comment):
+                sarr = split_block(lines, sep, miianc+1, fill=fill,
+                                   errmsg='Line has not enough columns to index: ')
+                yield (str2float(strip_block(sarr[:, list(iinc)], strip, lines=lines), fill, fill_value),
+                       strip_block(sarr[:, list(iisnc)], sstrip, lines=lines))
+        def post(dat, sdat):
+            if squeeze or reform:
+                if dat.shape[1] == 1:  dat  = dat[:, 0]
+                if sdat.shape[1] == 1: sdat = sdat[:, 0]
+            if transpose:
+                dat  = dat.T
+                sdat = sdat.T
+            if strarr:
+                if fill: sdat = np.where(sdat=='', sfill_value, sdat)
             else:
-                break
-        if comment is not None:
-            if (s[0] in comment): continue
-        res = s.split(sep)
-        nres = len(res)
-        if (miianc >= nres) and (not fill):
-            f.close()
-            raise ValueError('Line has not enough columns to index: '+s)
-        null = line2var(res, var, iinc, strip)
-        null = line2var(res, svar, iisnc, False if strip is None else strip)
-    f.close()
-    # list -> array
-    if fill:
-        var = [ [ fill_value if i=='' else i for i in row ] for row in var ]
-    # var  = np.array(var, dtype=np.float)
-    # svar = np.array(svar, dtype=np.str)
-    # if fill:
-    #     svar = np.where(svar=='', sfill_value, svar)
-    # if squeeze or reform:
-    #     var  = var.squeeze()
-    #     svar = svar.squeeze()
-    # if transpose:
-    #     var  = var.T
-    #     svar = svar.T
-    var  = np.array(var, dtype=np.float)
+                sdat = sdat.tolist()
+                if fill:
+                    if sdat and isinstance(sdat[0], list):
+                        sdat = [ [ fill_value if i=='' else i for i in row ] for row in sdat ]
+                    else:
+                        sdat = [ fill_value if i=='' else i for i in sdat ]
+            return dat, sdat
+        return iter_chunks(f, blocks(), chunksize, post)
+    #
+    # Values - rest of file
+    if engine == 'numpy':
+        sstrip = False if strip is None else strip
+        # convert block by block but raise conversion errors only after
+        # all lines were checked for enough columns, as in engine='python'
+        ferr = None
+        try:
+            var = [str2float(np.array(var), fill, fill_value)]
+        except ValueError as e:
+            ferr = e
+        svar = [np.array(svar)]
+        for lines in read_blocks(f, skip_blank=skip_blank, comment=comment):
+            try:
+                sarr = split_block(lines, sep, miianc+1, fill=fill,
+                                   errmsg='Line has not enough columns to index: ')
+            except ValueError:
+                f.close()
+                raise
+            svar.append(strip_block(sarr[:, list(iisnc)], sstrip, lines=lines))
+            if ferr is None:
+                try:
+                    var.append(str2float(strip_block(sarr[:, list(iinc)], strip, lines=lines), fill, fill_value))
+                except ValueError as e:
+                    ferr = e
+        f.close()
+        if ferr is not None: raise ferr
+        var  = np.concatenate(var)
+        svar = np.concatenate(svar)
+        if not strarr: svar = svar.tolist()
+    else:
+        for line in f:
+            s = str(line.rstrip())
+            if len(s) == 0:
+                if skip_blank:
+                    continue
+                else:
+                    break
+            if comment is not None:
+                if (s[0] in comment): continue
+            res = s.split(sep)
+            nres = len(res)
+            if (miianc >= nres) and (not fill):
+                f.close()
+                raise ColumnError('Line has not enough columns to index: '+s)
+            null = line2var(res, var, iinc, strip)
+            null = line2var(res, svar, iisnc, False if strip is None else strip)
+        f.close()
+        # list -> array
+        if fill:
+            var = [ [ fill_value if i=='' else i for i in row ] for row in var ]
+        # var  = np.array(var, dtype=np.float)
+        # svar = np.array(svar, dtype=np.str)
+        # if fill:
+        #     svar = np.where(svar=='', sfill_value, svar)
+        # if squeeze or reform:
+        #     var  = var.squeeze()
+        #     svar = svar.squeeze()
+        # if transpose:
+        #     var  = var.T
+        #     svar = svar.T
+        var  = np.array(var, dtype=np.float)
     if squeeze or reform: var  = var.squeeze()
     if transpose: var  = var.T
     if strarr:
@@ -528,6 +636,98 @@ def fsread(infile, nc=0, cname=None, snc=0, sname=None, skip=0, cskip=0, hskip=0
     return var, svar
 
 
+def fsread_iter(infile, chunksize=100000, **kwargs):
+    """
+        Iterate over blocks of rows of a file, returning 2D float arrays and 2D string arrays.
+
+        Only chunksize rows are held in memory at a time so that
+        files larger than memory can be processed.
+
+        This is fsread(infile, chunksize=chunksize, **kwargs).
+
+
+        Definition
+        ----------
+        def fsread_iter(infile, chunksize=100000, **kwargs):
+
+
+        Input
+        -----
+        infile       source file name
+
+
+        Optional Input Parameters
+        -------------------------
+        chunksize    number of rows per block (default: 100000)
+        **kwargs     all keywords of fsread such as nc, cname, snc, sname, skip, hskip,
+                     comment, skip_blank, fill, strip, squeeze, transpose, strarr.
+                     header=True returns the header as fsread.
+
+
+        Output
+        ------
+        Iterator over the outputs of fsread for blocks of chunksize rows,
+        i.e. 2D-arrays of floats and/or lists/2D-arrays of strings depending on nc and snc;
+        the last block may have less rows.
+
+
+        Examples
+        --------
+        >>> # Create some data
+        >>> filename = 'test_fsread_iter.dat'
+        >>> ff = open(filename,'w')
+        >>> ff.writelines('date,value\\n')
+        >>> for i in range(1, 6): ff.writelines('0{:d}.01.2020,{:d}.5\\n'.format(i,i))
+        >>> ff.close()
+
+        >>> for dd, sd in fsread_iter(filename, chunksize=2, cname='value', sname='date', skip=1, squeeze=True, strarr=True):
+        ...     print(dd, sd)
+        [1.5 2.5] ['01.01.2020' '02.01.2020']
+        [3.5 4.5] ['03.01.2020' '04.01.2020']
+        [5.5] ['05.01.2020']
+
+        >>> # Clean up doctest
+        >>> import os
+        >>> os.remove(filename)
+
+
+        License
+        -------
+        This file is part of the JAMS Python package, distributed under the MIT
+        License. The JAMS Python package originates from the former UFZ Python library,
+        Department of Computational Hydrosystems, Helmholtz Centre for Environmental
+        Research - UFZ, Leipzig, Germany.
+
+        Copyright (c) 2026 Matthias Cuntz - mc (at) macu (dot) de
+
+        Permission is hereby granted, free of charge, to any person obtaining a copy
+        of this software and associated documentation files (the "Software"), to deal
+        in the Software without restriction, including without limitation the rights
+        to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+        copies of the Software, and to permit persons to whom the Software is
+        furnished to do so, subject to the following conditions:
+
+        The above copyright notice and this permission notice shall be included in all
+        copies or substantial portions of the Software.
+
+        THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+        IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+        FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+        AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+        LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+        OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+        SOFTWARE.
+
+
+        History
+        -------
+        Written,  MC, Oct 2026
+    """
+    if chunksize <= 0:
+        raise ValueError('chunksize must be > 0.')
+    return fsread(infile, chunksize=chunksize, **kwargs)
+
+
 # Helper for append var with current line already splitted into list
 def line2var(res, var, iinc, strip):
     nres = len(res)
@@ -2,7 +2,7 @@
 from __future__ import division, absolute_import, print_function
 import numpy as np
 
-def in_poly(P, coord_x, coord_y):
+def in_poly(P, coord_x, coord_y, chunksize=None, prefilter='bbox'):
     """
         Determines whether a 2D point falls within a polygon, on a vertex or
         edge, or is located outside of a polygon. The polygon can be convex or
@@ -11,22 +11,36 @@ def in_poly(P, coord_x, coord_y):
 
         Definition
         ----------
-        def in_poly(P, coord_x, coord_y):
+        def in_poly(P, coord_x, coord_y, chunksize=None, prefilter='bbox'):
 
 
         Input
         -----
         P         2D list or np.array,
-                  x and y coordinates of the point in question in the form [x,y]
+                  x and y coordinates of the point in question in the form [x,y].
+                  x and y can be arrays of the same shape for testing many points at once,
+                  e.g. P = [xx, yy] or np.array with shape (2,npoints).
         coord_x   np.array, x coordinates of the polygon
         coord_y   np.array, y coordinates of the polygon
 
 
+        Optional Input
+        --------------
+        chunksize   number of points tested at once.
+                    (default: None = 2**18)
+        prefilter   None:   test all points against all polygon edges
+                    'bbox': points outside the bounding box of the polygon are outside (default)
+                    'grid': as 'bbox' and, in addition, points in cells of a regular grid over the
+                            bounding box that are not crossed by a polygon edge get the result of the
+                            cell centre. Fastest for many points and polygons with many vertices.
+
+
         Output
         ------
         integer, 1 = point inside polygon
                  0 = point on vertex/edge
                 -1 = point outside polygon
+        or integer array with the shape of x in P for arrays of points.
 
 
         Restrictions
@@ -64,6 +78,20 @@ def in_poly(P, coord_x, coord_y):
         >>> print(in_poly(P, coord_x, coord_y))
         0
 
+        # arrays of points
+        >>> P = [np.array([4.,8.,2.,3.]), np.array([3.,6.,2.,1.])]
+        >>> print(in_poly(P, coord_x, coord_y))
+        [ 1 -1  0  0]
+        >>> xx, yy = np.meshgrid(np.arange(1.,8.), np.arange(0.,7.))
+        >>> print(in_poly([xx,yy], coord_x, coord_y, prefilter='grid'))
+        [[-1 -1 -1 -1 -1 -1 -1]
+         [-1  0  0  0  0 -1 -1]
+         [-1  0  1  1  1  0 -1]
+         [-1  0  1  1  1  1  0]
+         [-1  0  1  1  1  1 -1]
+         [-1 -1 -1  1  1 -1 -1]
+         [-1 -1 -1 -1  0 -1 -1]]
+
 
         License
         -------
@@ -100,62 +128,53 @@ def in_poly(P, coord_x, coord_y):
                   MC, Feb 2013 - ported to Python 3
                   MC, Oct 2013 - inpoly
                   MC, Apr 2014 - assert
+                  MC, Oct 2026 - arrays of points in vectorized blocks, chunksize, prefilter
     """
 
     # ironing :-)
-    coord_x, coord_y = coord_x.flatten(), coord_y.flatten()
+    coord_x, coord_y = np.asarray(coord_x, dtype=np.float64).flatten(), np.asarray(coord_y, dtype=np.float64).flatten()
 
     # test input sizes
     assert np.size(coord_x) == np.size(coord_y), 'in_poly: coord_x and coord_y must have same size.'
+    assert prefilter in [None, 'bbox', 'grid'], "in_poly: prefilter must be None, 'bbox' or 'grid'."
 
-    n = coord_x.size
-    # result is outside as long as no other test works
-    erg = -1
-
-    # relative coordinates
-    X = coord_x - P[0]
-    Y = coord_y - P[1]
-
-    # Edge test
-    if np.any((X==0.) & (Y==0.)): return 0
+    px = np.asarray(P[0], dtype=np.float64)
+    py = np.asarray(P[1], dtype=np.float64)
+    assert px.shape == py.shape, 'in_poly: x and y of points must have same shape.'
+    isscalar = px.ndim == 0
+    px, py = px.ravel(), py.ravel()
+    npts = px.size
 
-    for i in range(n):
-        # vertical Vertex test
-        j = (i+1) % n
-        if (coord_x[i] == coord_x[j]) and (coord_x[i] == P[0]):
-            ly = (P[1]-coord_y[j]) / (coord_y[i]-coord_y[j])
-            if (ly >= 0.) and (ly <= 1.): return 0
-
-        # horizontal Vertex test
-        if (coord_y[i] == coord_y[j]) and (coord_y[i] == P[1]):
-            lx = (P[0]-coord_x[j]) / (coord_x[i]-coord_x[j])
-            if (lx >= 0.) and (lx <= 1.): return 0
-
-        # Inside test
-        MX = X[i] >= 0.
-        NX = X[j] >= 0.
-        MY = Y[i] >= 0.
-        NY = Y[j] >= 0.
-
-        test1 = not((MY or NY) and (MX or NX)) or (MX and NX)
-        test2 = not(MY and NY and (MX or NX) and not(MX and NX))
-
-        if (not test1):
-            if test2:
-                tt = (Y[i]*X[j] - X[i]*Y[j]) / (X[j] - X[i])
-                if tt == 0.:
-                    return 0
-                elif tt > 0.:
-                    erg = -erg
-            else:
-                erg = -erg
-    return erg
+    # result is outside as long as no other test works
+    erg = -np.ones(npts, dtype=np.int_)
+
+    # only points in bounding box of polygon can be inside or on edge
+    if prefilter is None:
+        ii = np.arange(npts)
+    else:
+        ii = np.where((px >= coord_x.min()) & (px <= coord_x.max()) &
+                      (py >= coord_y.min()) & (py <= coord_y.max()))[0]
+    if prefilter == 'grid':
+        ii = _in_poly_grid(px, py, ii, coord_x, coord_y, erg)
+
+    if chunksize is None:
+        chunk = 2**18
+    else:
+        chunk = max(int(chunksize), 1)
+    for i in range(0, ii.size, chunk):
+        i1 = min(i+chunk, ii.size)
+        erg[ii[i:i1]] = _in_poly_points(px[ii[i:i1]], py[ii[i:i1]], coord_x, coord_y)
+
+    if isscalar:
+        return int(erg[0])
+    else:
+        return erg.reshape(np.shape(P[0]))
 
 
 def inpoly(*args, **kwargs):
     """
         wrapper for in_poly
-        def in_poly(P, coord_x, coord_y):
+        def in_poly(P, coord_x, coord_y, chunksize=None, prefilter='bbox'):
 
 
         Example
@@ -181,6 +200,79 @@ def inpoly(*args, **kwargs):
     return in_poly(*args, **kwargs)
 
 
+# in_poly for arrays of points px, py at once; loops over the polygon edges instead of the points.
+# Returns integer array with 1 = inside, 0 = on vertex/edge, -1 = outside.
+def _in_poly_points(px, py, coord_x, coord_y):
+    coord_x, coord_y = coord_x.flatten(), coord_y.flatten()
+    px, py = np.asarray(px, dtype=np.float64), np.asarray(py, dtype=np.float64)
+    n = coord_x.size
+
+    erg  = np.ones(px.shape, dtype=np.int_)  # number of sign flips of -1
+    edge = np.zeros(px.shape, dtype=np.bool_)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for i in range(n):
+            j = (i+1) % n
+            Xi = coord_x[i] - px
+            Xj = coord_x[j] - px
+            Yi = coord_y[i] - py
+            Yj = coord_y[j] - py
+            # Edge test
+            edge |= (Xi==0.) & (Yi==0.)
+            # vertical Vertex test
+            if coord_x[i] == coord_x[j]:
+                ly = (py-coord_y[j]) / (coord_y[i]-coord_y[j])
+                edge |= (coord_x[i] == px) & (ly >= 0.) & (ly <= 1.)
+            # horizontal Vertex test
+            if coord_y[i] == coord_y[j]:
+                lx = (px-coord_x[j]) / (coord_x[i]-coord_x[j])
+                edge |= (coord_y[i] == py) & (lx >= 0.) & (lx <= 1.)
+            # Inside test
+            MX = Xi >= 0.
+            NX = Xj >= 0.
+            MY = Yi >= 0.
+            NY = Yj >= 0.
+            test1 = ~((MY | NY) & (MX | NX)) | (MX & NX)
+            test2 = ~(MY & NY & (MX | NX) & ~(MX & NX))
+            tt = np.where(~test1 & test2, (Yi*Xj - Xi*Yj) / (Xj - Xi), 1.)
+            edge |= tt == 0.
+            erg[~test1 & (tt > 0.)] *= -1
+
+    return np.where(edge, 0, -erg)
+
+
+# Grid prefilter for in_poly: sets erg of points ii in grid cells that are not crossed by a polygon edge
+# to the result of the cell centre and returns the indexes of the remaining points.
+def _in_poly_grid(px, py, ii, coord_x, coord_y, erg):
+    n  = coord_x.size
+    ng = int(min(max(np.sqrt(ii.size)/4., 4.), max(n, 4), 512)) # cells per axis
+    x0, y0 = coord_x.min(), coord_y.min()
+    dx = (coord_x.max() - x0) / ng
+    dy = (coord_y.max() - y0) / ng
+    if (dx <= 0.) or (dy <= 0.): return ii
+    # cells touched by bounding boxes of edges, dilated by one cell against rounding
+    jj = np.roll(np.arange(n), -1)
+    ix0 = np.clip(np.floor((np.minimum(coord_x, coord_x[jj]) - x0) / dx).astype(np.int_) - 1, 0, ng-1)
+    ix1 = np.clip(np.floor((np.maximum(coord_x, coord_x[jj]) - x0) / dx).astype(np.int_) + 1, 0, ng-1)
+    iy0 = np.clip(np.floor((np.minimum(coord_y, coord_y[jj]) - y0) / dy).astype(np.int_) - 1, 0, ng-1)
+    iy1 = np.clip(np.floor((np.maximum(coord_y, coord_y[jj]) - y0) / dy).astype(np.int_) + 1, 0, ng-1)
+    touched = np.zeros((ng,ng), dtype=np.bool_)
+    for i in range(n):
+        touched[iy0[i]:iy1[i]+1, ix0[i]:ix1[i]+1] = True
+    # result of cell centres of untouched cells
+    iuy, iux = np.where(~touched)
+    cerg = np.zeros((ng,ng), dtype=np.int_)
+    if iuy.size > 0:
+        cerg[iuy,iux] = _in_poly_points(x0 + (iux+0.5)*dx, y0 + (iuy+0.5)*dy, coord_x, coord_y)
+    # points in untouched cells
+    kx = np.clip(np.floor((px[ii] - x0) / dx).astype(np.int_), 0, ng-1)
+    ky = np.clip(np.floor((py[ii] - y0) / dy).astype(np.int_), 0, ng-1)
+    free = ~touched[ky,kx]
+    erg[ii[free]] = cerg[ky[free],kx[free]]
+
+    return ii[~free]
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
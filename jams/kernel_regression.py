@@ -4,7 +4,9 @@ import numpy as np
 import scipy.optimize as opt # fmin_tnc
 from jams.division import division
 
-def kernel_regression(x, y, h=None, silverman=False, xout=None):
+__all__ = ['kernel_regression', 'kernel_regression_h']
+
+def kernel_regression(x, y, h=None, silverman=False, xout=None, chunksize=None, cutoff=None):
     """
         Multi-dimensional non-parametric kernel regression.
 
@@ -14,7 +16,7 @@ def kernel_regression(x, y, h=None, silverman=False, xout=None):
 
         Definition
         ----------
-        def kernel_regression(x, y, h=None, silverman=False):
+        def kernel_regression(x, y, h=None, silverman=False, xout=None, chunksize=None, cutoff=None):
 
 
         Input
@@ -29,11 +31,20 @@ def kernel_regression(x, y, h=None, silverman=False, xout=None):
                    float > 0: use for calculating regression values
         silverman  False: determine h via cross-validation
                    True:  use Silverman''s rule-of-thumb
+        xout       ndarray(nout,k) of points at which the regression is evaluated (default: x)
+        chunksize  number of regression points calculated at once.
+                   Memory use is about 3*chunksize*n floats.
+                   (default: None = such that chunksize*n*k <= 2**22, or 2**14 with cutoff)
+        cutoff     None:  gaussian kernel using all points (default)
+                   float > 0: gaussian kernel truncated at distance cutoff in units of h,
+                              using only points within cutoff found with a KD-tree (scipy.spatial.cKDTree).
+                              Faster for large n if h is small compared to the range of x;
+                              cutoff=4 changes weights by less than 1e-3.
 
 
         Output
         ------
-        Fitted values at x
+        Fitted values at x (or xout)
 
 
         References
@@ -79,6 +90,10 @@ def kernel_regression(x, y, h=None, silverman=False, xout=None):
         >>> print(np.allclose(yk, [0.605485, 0.555235, 0.509529, 0.491191, 0.553325], atol=0.0001))
         True
 
+        >>> yk = kernel_regression(x,y,h,xout=xx,cutoff=10.)
+        >>> print(np.allclose(yk, [0.605485, 0.555235, 0.509529, 0.491191, 0.553325], atol=0.0001))
+        True
+
 
         License
         -------
@@ -114,6 +129,7 @@ def kernel_regression(x, y, h=None, silverman=False, xout=None):
                                  of Yingying Dong, Boston College and Yi Cao, Cranfield University
         Modified, MC, Feb 2013 - ported to Python 3
                   MC, Apr 2014 - assert
+                  MC, Oct 2026 - blocked vectorized evaluation, chunksize, cutoff with KD-tree
     """
     #
     # Check input
@@ -129,7 +145,7 @@ def kernel_regression(x, y, h=None, silverman=False, xout=None):
     #
     # determine h
     if h is None:
-        hh = kernel_regression_h(xx,y,silverman=silverman)
+        hh = kernel_regression_h(xx,y,silverman=silverman,chunksize=chunksize,cutoff=cutoff)
     else:
         if np.size(np.shape(h))==0:
             hh = np.repeat(h,d)
@@ -149,26 +165,21 @@ def kernel_regression(x, y, h=None, silverman=False, xout=None):
     nout  = ssout[0]
     dout  = ssout[1]
     assert d == dout, 'size(x,1) != size(xout,1): '+str(d)+' != '+str(dout)
-    # allocate output
-    out = np.empty(nout)
-    # Loop through each regression point
-    for i in range(nout):
-        # scaled deference from regression point
-        z = (xx - xxout[i,:]) / hh
-        # nadaraya-watson estimator of gaussian multivariate kernel
-        out[i] = nadaraya_watson(z, y)
+    # nadaraya-watson estimator of gaussian multivariate kernel
+    num, den = _nadaraya_watson_sums(xx, y, xxout, hh, chunksize=chunksize, cutoff=cutoff)
+    out = division(num, den, np.nan)
     #
     return out
 
 
-def kernel_regression_h(x, y, silverman=False):
+def kernel_regression_h(x, y, silverman=False, chunksize=None, cutoff=None):
     """
         Optimal bandwidth for multi-dimensional non-parametric kernel regression
         using cross-validation or Silverman''s rule-of-thumb.
 
         Definition
         ----------
-        def kernel_regression_h(x, y):
+        def kernel_regression_h(x, y, silverman=False, chunksize=None, cutoff=None):
 
 
         Input
@@ -181,6 +192,10 @@ def kernel_regression_h(x, y, silverman=False):
         --------------
         silverman  False: determine h via cross-validation
                    True:  use Silverman''s rule-of-thumb
+        chunksize  number of points for which the leave-one-out estimates are calculated at once.
+                   (default: None = such that chunksize*n*k <= 2**22, or 2**14 with cutoff)
+        cutoff     None or float > 0: truncate gaussian kernel at distance cutoff in units of h,
+                   see kernel_regression (default: None)
 
 
         Output
@@ -247,6 +262,8 @@ def kernel_regression_h(x, y, silverman=False):
         Modified, MC, Feb 2013 - ported to Python 3
                   MC, Apr 2014 - assert
                   MC, Jan 2018 - bug in boot_h: x.size->x.shape[0]
+                  MC, Oct 2026 - vectorized leave-one-out estimates without copying x, chunksize, cutoff
+                               - bug in boot_h: left out and estimated point i instead of random point ind[i]
     """
     #
     # Check input
@@ -268,38 +285,32 @@ def kernel_regression_h(x, y, silverman=False):
         bounds = [(0.2*i,5.0*i) for i in h]
         if n<=100:
             h, nfeval, rc = opt.fmin_tnc(cross_valid_h, h, bounds=bounds,
-                                         args=(xx, y), approx_grad=True, disp=False,
+                                         args=(xx, y, chunksize, cutoff), approx_grad=True, disp=False,
                                          maxfun=1000, xtol=1e-10, ftol=1e-10)
         else:
             h, nfeval, rc = opt.fmin_tnc(boot_h, h, bounds=bounds,
-                                         args=(xx, y), approx_grad=True, disp=False,
+                                         args=(xx, y, chunksize, cutoff), approx_grad=True, disp=False,
                                          maxfun=1000, xtol=1e-10, ftol=1e-10)
     #
     return h
 
 
-def cross_valid_h(h, x, y):
+def cross_valid_h(h, x, y, chunksize=None, cutoff=None):
     """
         Helper function that calculates cross-validation function for the
         Nadaraya-Watson estimator, which is basically the mean square error
         where model estimate is replaced by the jackknife estimate (Haerdle et al. 2000).
     """
     n = x.shape[0]
-    # allocate output
-    out = np.empty(n)
-    # Loop through each regression point
-    for i in range(n):
-        # all-1 points
-        xx     = np.delete(x,i,axis=0)
-        yy     = np.delete(y,i,axis=0)
-        z      = (xx - x[i,:]) / h
-        out[i] = nadaraya_watson(z, yy)
+    # leave-one-out estimates at all points
+    num, den = _nadaraya_watson_sums(x, y, x, h, iself=np.arange(n), chunksize=chunksize, cutoff=cutoff)
+    out = division(num, den, np.nan)
     cv = np.sum((y-out)**2) / np.float(n)
     #
     return cv
 
 
-def boot_h(h, x, y):
+def boot_h(h, x, y, chunksize=None, cutoff=None):
     """
         Helper function that calculates bootstrap function for the
         Nadaraya-Watson estimator, which is basically the mean square error
@@ -308,15 +319,9 @@ def boot_h(h, x, y):
     """
     n   = 100
     ind = np.random.randint(x.shape[0],size=n)
-    # allocate output
-    out = np.empty(n)
-    # Loop through each bootstrap point
-    for i in range(n):
-        # all-1 points
-        xx     = np.delete(x,i,axis=0)
-        yy     = np.delete(y,i,axis=0)
-        z      = (xx - x[i,:]) / h
-        out[i] = nadaraya_watson(z, yy)
+    # leave-one-out estimates at bootstrap points
+    num, den = _nadaraya_watson_sums(x, y, x[ind,:], h, iself=ind, chunksize=chunksize, cutoff=cutoff)
+    out = division(num, den, np.nan)
     cv = np.sum((y[ind]-out)**2) / np.float(n)
     #
     return cv
@@ -334,9 +339,78 @@ def nadaraya_watson(z, y):
     return out
 
 
+def _nadaraya_watson_sums(x, y, xout, h, iself=None, chunksize=None, cutoff=None):
+    """
+        Helper function that calculates the numerator sum_j(w_ij*y_j) and the denominator sum_j(w_ij)
+        of the Nadaraya-Watson estimator with gaussian kernel at all points xout[i,:] in blocks of points.
+        If iself is given, x[iself[i],:] is left out for xout[i,:] by setting its weight to zero.
+        If cutoff is given, only points within distance cutoff in units of h are used, found with a KD-tree.
+    """
+    n    = x.shape[0]
+    nout = xout.shape[0]
+    d    = x.shape[1]
+    num  = np.zeros(nout)
+    den  = np.zeros(nout)
+    if chunksize is None:
+        if cutoff is None:
+            chunk = max(2**22//max(n*d, 1), 1) # memory of dense weights
+        else:
+            chunk = 2**14                      # KD-tree queries independent of n
+    else:
+        chunk = max(int(chunksize), 1)
+    if cutoff is None:
+        for i in range(0, nout, chunk):
+            i1 = min(i+chunk, nout)
+            # product of gaussian kernels of scaled distances per dimension
+            w = np.ones((i1-i,n))
+            for k in range(d):
+                z  = (x[np.newaxis,:,k] - xout[i:i1,k,np.newaxis]) / h[k]
+                w *= (1./np.sqrt(2.*np.pi)) * np.exp(-0.5*z*z)
+            if iself is not None:
+                w[np.arange(i1-i),iself[i:i1]] = 0.
+            num[i:i1] = np.dot(w,y)
+            den[i:i1] = np.sum(w,1)
+    else:
+        from scipy.spatial import cKDTree
+        # constant of product of gaussian kernels
+        kfac = (2.*np.pi)**(-0.5*d)
+        xs   = x / h
+        xos  = xout / h
+        tree = cKDTree(xs)
+        for i in range(0, nout, chunk):
+            i1 = min(i+chunk, nout)
+            # pairs (regression point, data point) within cutoff
+            sdm = cKDTree(xos[i:i1,:]).sparse_distance_matrix(tree, cutoff, output_type='ndarray')
+            ii  = sdm['i']
+            jj  = sdm['j']
+            w   = kfac * np.exp(-0.5*sdm['v']**2)
+            if iself is not None:
+                w = np.where(jj == iself[i+ii], 0., w)
+            num[i:i1] = np.bincount(ii, weights=w*y[jj], minlength=i1-i)
+            den[i:i1] = np.bincount(ii, weights=w, minlength=i1-i)
+    #
+    return num, den
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
+
+    # # Benchmark
+    # import time
+    # nn = 5000
+    # x = np.zeros((nn,2))
+    # x[:,0] = np.random.random(nn)
+    # x[:,1] = 1./(x[:,0]+0.1) + 0.1*np.random.random(nn)
+    # y      = 1. + x[:,0]**2 - np.sin(x[:,1])**2
+    # h = kernel_regression_h(x,y,silverman=True)
+    # for cutoff in [None, 4.]:
+    #     t0 = time.time()
+    #     cv = cross_valid_h(h,x,y,cutoff=cutoff)
+    #     t1 = time.time()
+    #     yk = kernel_regression(x,y,h,cutoff=cutoff)
+    #     t2 = time.time()
+    #     print('cutoff={}: cross_valid_h {:.3f} s, kernel_regression {:.3f} s'.format(cutoff, t1-t0, t2-t1))
     # nn = 1000
     # x = np.zeros((nn,2))
     # x[:,0] = np.arange(nn,dtype=np.float)/float(nn-1)
@@ -1,10 +1,10 @@
 #!/usr/bin/env python
 from __future__ import division, absolute_import, print_function
 import numpy as np
-from scipy.spatial.distance import pdist, squareform
 
 def kriging(x, y, z, semi_mod, semi_popt, xnew=None, ynew=None, plot=False,
-            masked=False, silent=True, eop=None, block=False):
+            masked=False, silent=True, eop=None, block=False, chunksize=1000,
+            nneigh=None, radius=None):
     """
         Kriging a surface from a set of 2D points with a given semivariogram
         model and associated optimized parameters.
@@ -25,7 +25,8 @@ def kriging(x, y, z, semi_mod, semi_popt, xnew=None, ynew=None, plot=False,
         Definition
         ----------
         def kriging(x, y, z, semi_mod, semi_popt, xnew=None, ynew=None, plot=False,
-                    masked=False, silent=True, eop=None, block=False):
+                    masked=False, silent=True, eop=None, block=False, chunksize=1000,
+                    nneigh=None, radius=None):
 
 
         Input
@@ -34,7 +35,10 @@ def kriging(x, y, z, semi_mod, semi_popt, xnew=None, ynew=None, plot=False,
         y          array, y coordinates
         z          array, values
         semi_mod   function, semivariogram model (e.g. output from the JAMS
-                   semivariogram routine)
+                   semivariogram routine), called as semi_mod(lags, semi_popt)
+                   with 2D arrays of lags of shape (observations, observations) and
+                   (points, observations), and with nneigh or radius also with 3D arrays
+                   of shape (sets of neighbours, neighbours, neighbours)
         semi_popt  array, parameters of the semivariogram model (e.g. output
                    from the JAMS semivariogram routine)
         xnew       array (n), x coordinates of the desired surface, they will be
@@ -62,6 +66,23 @@ def kriging(x, y, z, semi_mod, semi_popt, xnew=None, ynew=None, plot=False,
                    Note that kringing on a rectangular surface xnew,ynew with possible masking
                    and calculating the mean afterwards is almost always much faster,
                    except for very fine xnew,ynew grids.
+        chunksize  int, number of grid or extraction points that are kriged
+                   together with one matrix product (default: 1000).
+                   Memory use is about 3*chunksize*(size(x)+1) floats.
+        nneigh     int, if given, krige every grid or extraction point only
+                   with its nneigh nearest input points (local neighbourhood
+                   kriging). Not used with block kriging.
+        radius     float, if given, krige every grid or extraction point only
+                   with the input points within distance radius, i.e. distance <= radius,
+                   also at exactly radius; together with
+                   nneigh, at most nneigh points within radius are used.
+                   Points without input points within radius are set to NaN.
+                   Not used with block kriging.
+                   With nneigh or radius, the semivariogram matrix is inverted for
+                   every set of neighbours instead of once for all input points.
+                   Neighbours are searched with scipy.spatial.cKDTree and points
+                   with the same neighbours share one inverse matrix.
+                   Memory use is then about 2*chunksize*(number of neighbours+1)**2 floats.
 
 
         Output
@@ -176,6 +197,11 @@ def kriging(x, y, z, semi_mod, semi_popt, xnew=None, ynew=None, plot=False,
         >>> print(astr(eopz[0:8],1,pp=True))
         ['7.8' '0.7' '3.1' '1.2' '7.4' '6.7' '2.1' '1.1']
 
+        # krig on points of interest with the 10 nearest points only
+        >>> eopz, eopvar = kriging(x,y,z,semi_mod,semi_popt,eop=poi,nneigh=10)
+        >>> print(astr(eopz[0:8],1,pp=True))
+        ['7.7' '0.8' '3.1' '1.2' '7.5' '6.8' '2.2' '1.2']
+
         # krig both, whole surface and on points of interest
         >>> xnew = np.arange(np.min(x),np.max(x),5.)
         >>> ynew = np.arange(np.min(y),np.max(y),5.)
@@ -229,6 +255,9 @@ def kriging(x, y, z, semi_mod, semi_popt, xnew=None, ynew=None, plot=False,
                                       calculated by Monte-Carlo
                   MC,      Feb 2013 - ported to Python 3
                   MC,      Apr 2014 - assert
+                  MC,      Oct 2026 - krige chunks of points at once, chunksize
+                                    - vectorized masking with convex hull
+                  MC,      Oct 2026 - local neighbourhood kriging, nneigh, radius
     """
 
     if not silent:
@@ -248,21 +277,18 @@ def kriging(x, y, z, semi_mod, semi_popt, xnew=None, ynew=None, plot=False,
     assert np.size(x) == np.size(y), 'kriging: x and y must have same dimensions'
     assert np.size(x) == np.size(z), 'kriging: x and z must have same dimensions'
 
-    xy  = np.vstack((x,y)).transpose()
-    lag = squareform(pdist(xy, 'euclidean'))
-    gamma = semi_mod(lag,semi_popt)
-
-    # make A and append row and column of one's
-    A = np.vstack((gamma,np.ones(np.shape(gamma)[1])))
-    A = np.hstack((A,np.ones(np.shape(A)[0]).reshape(-1,1)))
-    A[-1,-1] = 0.
-    invA = np.linalg.inv(A)
+    local = (nneigh is not None) or (radius is not None)
+    if local:
+        assert (nneigh is None) or (nneigh > 0), 'kriging: nneigh must be > 0'
+        assert (radius is None) or (radius > 0.), 'kriging: radius must be > 0'
+    if (not local) or block:
+        invA = _krig_matrix(x, y, semi_mod, semi_popt)
 
     #######################################################################
     # calculate convex hull to hide outer areas
     if masked:
-        from convex_hull import convex_hull
-        from in_poly import in_poly
+        from jams.convex_hull import convex_hull
+        from jams.in_poly     import in_poly
         if not silent:
             print('KRIG: calculate hull...')
             start = time.time()
@@ -281,7 +307,6 @@ def kriging(x, y, z, semi_mod, semi_popt, xnew=None, ynew=None, plot=False,
         xnew, ynew = np.meshgrid(xnew, ynew)
         xnew_v = xnew.flatten()
         ynew_v = ynew.flatten()
-        length = np.size(xnew_v)
 
         #######################################################################
         # calculate every znew of xnew and ynew
@@ -289,36 +314,18 @@ def kriging(x, y, z, semi_mod, semi_popt, xnew=None, ynew=None, plot=False,
             print('KRIG: kriging...')
             start = time.time()
 
-        znew = np.empty_like(xnew_v)
-        varnew = np.empty_like(xnew_v)
-        #lamnew = np.empty((np.size(xnew_v), np.size(x)))
-        if masked:
-            mask = np.empty_like(xnew_v, dtype=int)
-
-        for igrid in range(length):
-            # make B
-            b = np.sqrt((x-xnew_v[igrid])**2 + (y-ynew_v[igrid])**2)
-            B = semi_mod(b,semi_popt)
-            B = np.append(B, 1.)
-
-            # calculate lambda
-            lmd = np.dot(invA, B)
-
-            # shorten it
-            mu  = lmd[-1]
-            lmd = lmd[:-1]
-            B   = B[:-1]
-
-            znew[igrid]   = np.dot(z,lmd)
-            varnew[igrid] = np.dot(lmd.transpose(), B) + mu
-            #lamnew[igrid,:] = lmd
+        if local:
+            znew, varnew = _krig_local(xnew_v, ynew_v, x, y, z, semi_mod, semi_popt,
+                                       chunksize, nneigh, radius)
+        else:
+            znew, varnew = _krig_points(xnew_v, ynew_v, x, y, z, invA,
+                                        semi_mod, semi_popt, chunksize)
 
-            ###################################################################
-            # calculate convex hull to hide outer areas
-            if masked:
-                mask[igrid] = in_poly([xnew_v[igrid], ynew_v[igrid]],
-                                    hull_points[:,0],
-                                    hull_points[:,1])
+        ###################################################################
+        # calculate convex hull to hide outer areas
+        if masked:
+            mask = in_poly([xnew_v, ynew_v], hull_points[:,0], hull_points[:,1],
+                           prefilter='grid')
 
         znew   = znew.reshape(np.shape(xnew))
         varnew = varnew.reshape(np.shape(xnew))
@@ -339,45 +346,24 @@ def kriging(x, y, z, semi_mod, semi_popt, xnew=None, ynew=None, plot=False,
     #######################################################################
     # krig on extraction points
     if eop is not None:
-        length = np.size(eopx)
-
         #######################################################################
         # calculate every znew of xnew and ynew
         if not silent:
             print('KRIG: kriging...')
             start = time.time()
 
-        eopz = np.empty_like(eopx)
-        eopvar = np.empty_like(eopx)
-        #eoplam = np.empty((np.size(eopx), np.size(x)))
-        if masked:
-            mask = np.empty_like(eopx, dtype=int)
-
-        for igrid in range(length):
-            # make B
-            b = np.sqrt((x-eopx[igrid])**2 + (y-eopy[igrid])**2)
-            B = semi_mod(b,semi_popt)
-            B = np.append(B, 1.)
-
-            # calculate lambda
-            lmd = np.dot(invA, B)
-
-            # shorten it
-            mu  = lmd[-1]
-            lmd = lmd[:-1]
-            B   = B[:-1]
-
-            eopz[igrid]   = np.dot(z,lmd)
-            eopvar[igrid] = np.dot(lmd.transpose(), B) + mu
-            #eoplam[igrid,:] = lmd
-
-            ###################################################################
-            # calculate convex hull to hide outer areas
-            if masked:
-                mask[igrid] = in_poly([eopx[igrid], eopy[igrid]],
-                                    hull_points[:,0], hull_points[:,1])
+        if local:
+            eopz, eopvar = _krig_local(eopx, eopy, x, y, z, semi_mod, semi_popt,
+                                       chunksize, nneigh, radius)
+        else:
+            eopz, eopvar = _krig_points(eopx, eopy, x, y, z, invA,
+                                        semi_mod, semi_popt, chunksize)
 
+        ###################################################################
+        # calculate convex hull to hide outer areas
         if masked:
+            mask = in_poly([eopx, eopy], hull_points[:,0], hull_points[:,1],
+                           prefilter='grid')
             mask = np.where(mask>0, 0, 1)
 
             eopx = np.ma.masked_array(eopx, mask)
@@ -608,6 +594,106 @@ def kriging(x, y, z, semi_mod, semi_popt, xnew=None, ynew=None, plot=False,
         return xnew, ynew, znew, varnew, eopz, eopvar
 
 
+# Inverse of semivariogram matrix of points x, y with appended row and column of one's.
+# x and y can have leading dimensions to calculate a stack of inverse matrices.
+def _krig_matrix(x, y, semi_mod, semi_popt):
+    lag = np.sqrt((x[...,:,np.newaxis]-x[...,np.newaxis,:])**2 +
+                  (y[...,:,np.newaxis]-y[...,np.newaxis,:])**2)
+    gamma = semi_mod(lag,semi_popt)
+
+    # make A and append row and column of one's
+    A = np.ones(gamma.shape[:-2]+(gamma.shape[-2]+1,gamma.shape[-1]+1))
+    A[...,:-1,:-1] = gamma
+    A[...,-1,-1]   = 0.
+
+    return np.linalg.inv(A)
+
+
+# Kriged values and variances at points px, py, calculated for chunksize points at once
+def _krig_points(px, py, x, y, z, invA, semi_mod, semi_popt, chunksize):
+    npts  = np.size(px)
+    nobs  = np.size(x)
+    pz    = np.empty(npts)
+    pvar  = np.empty(npts)
+    chunk = max(int(chunksize), 1)
+    for i in range(0, npts, chunk):
+        ii = slice(i, min(i+chunk, npts))
+        # make B for all points of chunk, with appended column of one's
+        b = np.sqrt((x[np.newaxis,:]-px[ii,np.newaxis])**2 +
+                    (y[np.newaxis,:]-py[ii,np.newaxis])**2)
+        B = np.ones((b.shape[0], nobs+1))
+        B[:,:-1] = semi_mod(b,semi_popt)
+
+        # calculate lambda
+        lmd = np.dot(B, invA.transpose())
+
+        # shorten it
+        mu  = lmd[:,-1]
+        lmd = lmd[:,:-1]
+        B   = B[:,:-1]
+
+        pz[ii]   = np.dot(lmd, z)
+        pvar[ii] = np.sum(lmd*B, axis=1) + mu
+
+    return pz, pvar
+
+
+# Kriged values and variances at points px, py using only the nneigh nearest input points
+# and/or the input points within radius. Points of a chunk with the same number of neighbours
+# are kriged together, calculating the inverse semivariogram matrix once per set of neighbours.
+def _krig_local(px, py, x, y, z, semi_mod, semi_popt, chunksize, nneigh, radius):
+    from scipy.spatial import cKDTree
+    npts  = np.size(px)
+    nobs  = np.size(x)
+    pz    = np.full(npts, np.nan)
+    pvar  = np.full(npts, np.nan)
+    chunk = max(int(chunksize), 1)
+    tree  = cKDTree(np.vstack((x,y)).transpose())
+    rmax  = np.inf if radius is None else radius
+    for i in range(0, npts, chunk):
+        ii  = np.arange(i, min(i+chunk, npts))
+        pxy = np.vstack((px[ii],py[ii])).transpose()
+        # neighbours, missing neighbours are indicated by nobs
+        if nneigh is not None:
+            # query excludes distance_upper_bound, query_ball_point includes r
+            dist, neigh = tree.query(pxy, k=min(nneigh, nobs), distance_upper_bound=np.nextafter(rmax, np.inf))
+            neigh = neigh.reshape((ii.size,-1))
+        else:
+            ball  = tree.query_ball_point(pxy, rmax)
+            nmax  = max([ len(b) for b in ball ])
+            neigh = np.full((ii.size, max(nmax,1)), nobs, dtype=np.int64)
+            for j, b in enumerate(ball):
+                neigh[j,:len(b)] = b
+        # sort so that missing neighbours are last
+        neigh = np.sort(neigh, axis=1)
+        nn    = np.sum(neigh < nobs, axis=1)
+        for m in np.unique(nn):
+            if m == 0: continue
+            jj = nn == m
+            kk = ii[jj]
+            nb = neigh[jj,:m]
+            # one inverse matrix per distinct set of neighbours
+            sets, iset = np.unique(nb, axis=0, return_inverse=True)
+            invA = _krig_matrix(x[sets], y[sets], semi_mod, semi_popt)[iset.ravel()]
+            # make B
+            b = np.sqrt((x[nb]-px[kk,np.newaxis])**2 + (y[nb]-py[kk,np.newaxis])**2)
+            B = np.ones((kk.size, m+1))
+            B[:,:-1] = semi_mod(b,semi_popt)
+
+            # calculate lambda
+            lmd = np.einsum('kij,kj->ki', invA, B)
+
+            # shorten it
+            mu  = lmd[:,-1]
+            lmd = lmd[:,:-1]
+            B   = B[:,:-1]
+
+            pz[kk]   = np.sum(lmd*z[nb], axis=1)
+            pvar[kk] = np.sum(lmd*B, axis=1) + mu
+
+    return pz, pvar
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
@@ -7,6 +7,7 @@ from __future__ import division, absolute_import, print_function
     Provided functions
     ------------------
     constant_values  Checks if a given series of data contains consecutive values which are constant over a certain time period.
+    DataStore             Incremental, append-only store of CHS level1 data with date and header indexes.
     get_flag              Get the flags at position n from CHS data flag vector.
     get_manual_flags      Get start and end dates as well as flag values for a specific variable from a manual flag file.
     get_maxflag           Get the maximal flag of the string with the individual flags.
@@ -75,6 +76,13 @@ from __future__ import division, absolute_import, print_function
     # Make level2
     flags = jams.maximum(jams.level1.get_maxflag(flags), 0)
 
+    # keep level1 data in an incremental store: append new files, read and export date windows
+    store = jams.level1.DataStore('level1_store')
+    store.append_files(newfiles)
+    sdate, record, dat, flags, hdate, hrecord, hdat, hflags = store.read(start='2026-01-01 00:00:00')
+    store.append(sdate, dat, flags, hdat, hflags, record=record)   # write back changed flags
+    store.export('level1_2026.csv', start='2026-01-01 00:00:00')
+
     # write level2 data
     ofile = infiles[0].replace('level1', 'level2')
     jams.level1.write_data_onefile(ofile, sdate, record, dat, flags, hdate, hrecord, hdat, hflags)
@@ -122,6 +130,7 @@ from __future__ import division, absolute_import, print_function
               MC, Jan 2016 - get_header_excel
               MC, Mar 2016 - write_data_dmp, write_data_one_file
               BD, Sep 2016 - spike
+              MC, Oct 2026 - DataStore
 """
 from .constant_values import constant_values
 try:
@@ -132,6 +141,7 @@ from .getset_flag     import get_flag, set_flag, get_maxflag
 from .manual_flags    import get_manual_flags
 from .spike    import spike
 from .readwrite_data  import read_data, write_data, write_data_dmp, write_data_dmp_size, write_data_one_file
+from .datastore       import DataStore
 
 # Information
 __author__   = "Matthias Cuntz"
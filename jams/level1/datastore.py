@@ -0,0 +1,434 @@
+#!/usr/bin/env python
+"""
+    Incremental, append-only store of CHS level1 data.
+
+    The store is a directory with one binary file per data column, per flag column,
+    for the record numbers and for the dates, as well as an index file with the headers.
+    Dates are kept as integer seconds since 1970-01-01 00:00:00 in increasing order.
+    New time steps are appended to the end of the files and new variables get new files,
+    so that adding a day of data does not touch the rest of the archive.
+    Arbitrary date windows of selected variables are read directly from the binary files.
+    The data can be exported to the CHS level1 ASCII format on demand.
+
+
+    Definition
+    ----------
+    class DataStore(path, norecord=False, undef=-9999., nofill=False):
+
+
+    License
+    -------
+    This file is part of the JAMS Python package, distributed under the MIT
+    License. The JAMS Python package originates from the former UFZ Python library,
+    Department of Computational Hydrosystems, Helmholtz Centre for Environmental
+    Research - UFZ, Leipzig, Germany.
+
+    Copyright (c) 2026 Matthias Cuntz - mc (at) macu (dot) de
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+
+    History
+    -------
+    Written,  MC, Oct 2026
+"""
+from __future__ import division, absolute_import, print_function
+import os
+import json
+import numpy as np
+from jams.ascii2ascii import ascii2eng
+from jams.date2dec import date2dec
+from jams.dec2date import dec2date
+from jams.level1.readwrite_data import read_data, write_data_one_file, _fill_dates
+
+__all__ = ['DataStore']
+
+# dates are seconds since
+_units = 'seconds since 1970-01-01 00:00:00'
+
+
+class DataStore(object):
+    """
+        Incremental, append-only store of CHS level1 data with date and header indexes.
+
+        Dates already in the store are overwritten in place, later dates are appended.
+        If not nofill, missing time steps are filled with undef on the smallest time step
+        of all appended dates as in read_data. Dates before the last date of the store that are not
+        yet in the store, or a smaller time step, require rewriting all files once,
+        which is done automatically.
+
+        The index file is replaced only after the binary files were written, so that an
+        interrupted append of new time steps or variables leaves the store at its previous state.
+        Rewriting all files writes new versions of the files first, which are then used
+        with the atomic replacement of the index file; the old versions are deleted afterwards.
+        Overwritten time steps are changed in place, though.
+
+
+        Definition
+        ----------
+        class DataStore(path, norecord=False, undef=-9999., nofill=False):
+
+
+        Input
+        -----
+        path      directory of the store; created if it does not exist.
+
+
+        Optional Input
+        --------------
+        norecord  True: no record numbers, i.e. files with Date, data, flag, data, flag, ...
+        undef     fill value for data and flags if non-existant (default: -9999.)
+        nofill    True: do not fill-up equal distant time steps
+
+        norecord, undef and nofill are taken from the store if it exists already.
+
+
+        Methods
+        -------
+        append(sdate, dat, flags, hdat, hflags, record=None, hdate=None, hrecord=None)
+                  add time steps and variables; existing time steps are overwritten.
+                  sdate are ascii or English dates, dat and flags (n,m)-arrays,
+                  hdat and hflags m data and flag headers.
+        append_files(files, strip=None, cache=False)
+                  read CHS level1 files with read_data and append them.
+        read(start=None, end=None, hdat=None)
+                  return sdate, record, dat, flags, hdate, hrecord, hdat, hflags
+                  (sdate, dat, flags, hdate, hdat, hflags if norecord)
+                  of the dates start <= sdate <= end and the variables hdat (default: all, sorted).
+        export(ofile, start=None, end=None, hdat=None)
+                  write read(start, end, hdat) into one CHS level1 file with write_data_one_file.
+
+
+        Attributes
+        ----------
+        nrow      number of time steps in store
+        hdat      list of data headers in store
+        hflags    list of flag headers in store
+
+
+        Examples
+        --------
+        >>> import shutil
+        >>> from tempfile import mkdtemp
+        >>> path = mkdtemp()
+        >>> store = DataStore(path)
+        >>> sdate = ['2026-01-01 00:00:00', '2026-01-01 00:30:00', '2026-01-01 01:30:00']
+        >>> dat   = np.array([[1., 2.], [3., 4.], [5., 6.]])
+        >>> flags = np.zeros((3,2), dtype=np.int)
+        >>> store.append(sdate, dat, flags, ['Ta', 'RH'], ['Ta_f', 'RH_f'], record=[1,2,4],
+        ...              hdate='TIMESTAMP', hrecord='RECORD')
+        >>> print(store.nrow, store.hdat)
+        4 ['Ta', 'RH']
+
+        # next day with new variable
+        >>> store.append(['02.01.2026 00:00:00'], np.array([[7., 8.]]), np.zeros((1,2), dtype=np.int),
+        ...              ['Ta', 'Pa'], ['Ta_f', 'Pa_f'])
+        >>> sdate, record, dat, flags, hdate, hrecord, hdat, hflags = DataStore(path).read(start='2026-01-01 01:00:00')
+        >>> print(sdate[0], sdate[-1], len(sdate))
+        2026-01-01 01:00:00 2026-01-02 00:00:00 47
+        >>> print(hdat)
+        ['Pa', 'RH', 'Ta']
+        >>> print(dat[[0,1,-1],:].astype(np.int))
+        [[-9999 -9999 -9999]
+         [-9999     6     5]
+         [    8 -9999     7]]
+        >>> print(record[0:2])
+        [-9999     4]
+        >>> shutil.rmtree(path)
+    """
+
+    def __init__(self, path, norecord=False, undef=-9999., nofill=False):
+        self.path = path
+        self.indexfile = os.path.join(path, 'index.json')
+        if os.path.exists(self.indexfile):
+            with open(self.indexfile, 'r') as f:
+                self.meta = json.load(f)
+        else:
+            if not os.path.exists(path): os.makedirs(path)
+            self.meta = {'norecord': bool(norecord), 'undef': float(undef), 'nofill': bool(nofill),
+                         'dt': None, 'nrow': 0, 'hdate': None, 'hrecord': None,
+                         'hdat': [], 'hflags': [], 'files': [], 'gen': 0, 'nreal': 0}
+            self._write_index()
+
+    @property
+    def nrow(self):
+        return self.meta['nrow']
+
+    @property
+    def hdat(self):
+        return list(self.meta['hdat'])
+
+    @property
+    def hflags(self):
+        return list(self.meta['hflags'])
+
+    # ----------------------------------------------------------------
+    # Files
+
+    def _write_index(self):
+        # replace index atomically
+        tmpfile = self.indexfile + '.tmp'
+        with open(tmpfile, 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(tmpfile, self.indexfile)
+
+    def _file(self, name, gen=None):
+        # binary file of version gen (default: current)
+        if gen is None: gen = self.meta.get('gen', 0)
+        if gen == 0:
+            return os.path.join(self.path, name+'.bin')
+        else:
+            return os.path.join(self.path, name+'.{:d}.bin'.format(gen))
+
+    def _dtype(self, name):
+        if name.startswith('dat_'):
+            return np.dtype('<f8')
+        else:
+            return np.dtype('<i8')
+
+    def _read_col(self, name, i0, i1):
+        # rows i0:i1 of binary file
+        dtype = self._dtype(name)
+        if i1 <= i0: return np.zeros(0, dtype=dtype)
+        mm  = np.memmap(self._file(name), dtype=dtype, mode='r', offset=i0*dtype.itemsize, shape=(i1-i0,))
+        out = np.array(mm)
+        del mm
+        return out
+
+    def _write_col(self, name, nold, rows, values, tail, gen=None):
+        # overwrite rows < nold in place, then write tail after the first nold rows
+        dtype = self._dtype(name)
+        if rows is not None and rows.size > 0:
+            mm = np.memmap(self._file(name), dtype=dtype, mode='r+', shape=(nold,))
+            mm[rows] = values
+            mm.flush()
+            del mm
+        if tail is not None:
+            fname = self._file(name, gen)
+            with open(fname, 'r+b' if os.path.exists(fname) else 'wb') as f:
+                f.seek(nold*dtype.itemsize)
+                f.write(np.asarray(tail, dtype=dtype).tobytes())
+                f.truncate()
+
+    def _secs(self, sdate):
+        # integer seconds of ascii or English dates
+        sdate = np.array(ascii2eng(list(np.ravel(sdate)), full=True))
+        return np.rint(np.ravel(date2dec(eng=sdate, units=_units))).astype(np.int64)
+
+    def _sdate(self, secs):
+        # English dates from seconds
+        if np.size(secs) == 0: return np.zeros(0, dtype='<U19')
+        return np.ravel(dec2date(np.asarray(secs, dtype=np.float64), units=_units, eng=True))
+
+    # ----------------------------------------------------------------
+    # Public
+
+    def append(self, sdate, dat, flags, hdat, hflags, record=None, hdate=None, hrecord=None):
+        meta   = self.meta
+        undef  = meta['undef']
+        iundef = int(undef)
+        dat    = np.array(dat, dtype=np.float64)
+        flags  = np.array(flags, dtype=np.int64)
+        if dat.ndim == 1:
+            dat   = dat[:,np.newaxis]
+            flags = flags[:,np.newaxis]
+        if isinstance(hdat, str):   hdat   = [hdat]
+        if isinstance(hflags, str): hflags = [hflags]
+        t = self._secs(sdate)
+        assert dat.shape == flags.shape, 'DataStore: dat and flags must have same shape.'
+        assert dat.shape[0] == t.size, 'DataStore: Not enough dates.'
+        assert dat.shape[1] == len(hdat), 'DataStore: Not enough data headers.'
+        assert len(hflags) == len(hdat), 'DataStore: Not enough flag headers.'
+        if not meta['norecord']:
+            if record is None:
+                record = np.ones(t.size, dtype=np.int64)*iundef
+            record = np.array(record, dtype=np.int64)
+            assert record.size == t.size, 'DataStore: Not enough record numbers.'
+        # check headers and dates before changing the store
+        if (hdate is not None) and (meta['hdate'] is not None) and (meta['hdate'] != hdate):
+            raise ValueError('DataStore: Assume the same date headers.')
+        if (not meta['norecord']) and (hrecord is not None) and (meta['hrecord'] is not None) and (meta['hrecord'] != hrecord):
+            raise ValueError('DataStore: Assume the same record headers.')
+        # input in time order without duplicates
+        ii = np.argsort(t, kind='mergesort')
+        t  = t[ii]
+        if np.any(t[1:] == t[:-1]):
+            raise ValueError('DataStore: duplicate dates in input: '+str(self._sdate(t[1:][t[1:] == t[:-1]])))
+        dat   = dat[ii,:]
+        flags = flags[ii,:]
+        if not meta['norecord']: record = record[ii]
+        # the index is only written at the end, so revert to it if anything goes wrong
+        try:
+            self._append(t, dat, flags, hdat, hflags, record, hdate, hrecord)
+        except BaseException:
+            with open(self.indexfile, 'r') as f:
+                self.meta = json.load(f)
+            raise
+
+    def _append(self, t, dat, flags, hdat, hflags, record, hdate, hrecord):
+        # append sorted, unique dates t, with checked input
+        meta   = self.meta
+        undef  = meta['undef']
+        iundef = int(undef)
+        if (hdate is not None) and (meta['hdate'] is None): meta['hdate'] = hdate
+        if (not meta['norecord']) and (hrecord is not None) and (meta['hrecord'] is None): meta['hrecord'] = hrecord
+        # new variables get undef up to now
+        nold = meta['nrow']
+        for h, hf in zip(hdat, hflags):
+            if h not in meta['hdat']:
+                name = '{:04d}'.format(len(meta['files']))
+                self._write_col('dat_'+name, 0, None, None, np.ones(nold)*undef)
+                self._write_col('flags_'+name, 0, None, None, np.ones(nold, dtype=np.int64)*iundef)
+                meta['hdat'].append(h)
+                meta['hflags'].append(hf)
+                meta['files'].append(name)
+        # dates in store
+        T = self._read_col('date', 0, nold)
+        if meta['nofill']:
+            TT = np.union1d(T, t)
+        else:
+            # time grid of read_data: smallest time step of all input dates, filled in gaps
+            # input dates are kept in file rdate; all dates are taken if it does not exist
+            nreal = meta.get('nreal', None)
+            if nreal is None:
+                nreal = 0
+                rnew  = np.union1d(T, t)
+            else:
+                rnew  = np.setdiff1d(t, self._read_col('rdate', 0, nreal))
+            self._write_col('rdate', nreal, None, None, rnew)
+            meta['nreal'] = nreal + rnew.size
+            RR = np.unique(self._read_col('rdate', 0, meta['nreal']))
+            if RR.size > 1: meta['dt'] = int(np.amin(np.diff(RR)))
+            TT = _fill_dates(RR, meta['dt']) if meta['dt'] is not None else RR
+        if (nold > 0) and ((TT.size < nold) or np.any(TT[:nold] != T)):
+            # new dates within store or smaller time step: rewrite all files once
+            T    = self._insert(T, TT)
+            nold = meta['nrow']
+        # new time steps at the end
+        tail = TT[nold:]
+        if nold > 0:
+            pos    = np.searchsorted(T, t)
+            exists = (pos < nold) & (T[np.minimum(pos, nold-1)] == t)
+        else:
+            pos    = np.zeros(t.size, dtype=np.int64)
+            exists = np.zeros(t.size, dtype=np.bool)
+        inew = np.searchsorted(tail, t[~exists])
+        irow = pos[exists]
+        # write
+        ntail = tail.size
+        self._write_col('date', nold, None, None, tail)
+        if not meta['norecord']:
+            rtail = np.ones(ntail, dtype=np.int64)*iundef
+            rtail[inew] = record[~exists]
+            self._write_col('record', nold, irow, record[exists], rtail)
+        icol = dict([ (h, i) for i, h in enumerate(hdat) ])
+        for h, name in zip(meta['hdat'], meta['files']):
+            dtail = np.ones(ntail)*undef
+            ftail = np.ones(ntail, dtype=np.int64)*iundef
+            if h in icol:
+                i = icol[h]
+                dtail[inew] = dat[~exists,i]
+                ftail[inew] = flags[~exists,i]
+                self._write_col('dat_'+name, nold, irow, dat[exists,i], dtail)
+                self._write_col('flags_'+name, nold, irow, flags[exists,i], ftail)
+            else:
+                self._write_col('dat_'+name, nold, None, None, dtail)
+                self._write_col('flags_'+name, nold, None, None, ftail)
+        meta['nrow'] = nold + ntail
+        self._write_index()
+
+    def _insert(self, T, TT):
+        # rewrite all files on the new time grid TT, which has all dates T of the store
+        # except filled time steps that are not on the new grid
+        meta   = self.meta
+        undef  = meta['undef']
+        iundef = int(undef)
+        nold   = T.size
+        kk, iold, inew = np.intersect1d(T, TT, assume_unique=True, return_indices=True)
+        names  = ['record'] if not meta['norecord'] else []
+        names += [ 'dat_'+n for n in meta['files'] ] + [ 'flags_'+n for n in meta['files'] ]
+        # write new versions of all files
+        oldgen = meta.get('gen', 0)
+        newgen = oldgen + 1
+        for name in names:
+            old = self._read_col(name, 0, nold)
+            new = np.ones(TT.size, dtype=self._dtype(name))*(undef if name.startswith('dat_') else iundef)
+            new[inew] = old[iold]
+            self._write_col(name, 0, None, None, new, gen=newgen)
+        self._write_col('date', 0, None, None, TT, gen=newgen)
+        names += ['date']
+        if not meta['nofill']:
+            self._write_col('rdate', 0, None, None, self._read_col('rdate', 0, meta['nreal']), gen=newgen)
+            names += ['rdate']
+        # switch to new versions with the index
+        meta['gen']  = newgen
+        meta['nrow'] = TT.size
+        self._write_index()
+        for name in names:
+            if os.path.exists(self._file(name, oldgen)): os.remove(self._file(name, oldgen))
+        return TT
+
+    def append_files(self, files, strip=None, cache=False):
+        meta = self.meta
+        out  = read_data(files, undef=meta['undef'], strip=strip, norecord=meta['norecord'],
+                         nofill=True, cache=cache)
+        if meta['norecord']:
+            sdate, dat, flags, iidate, hdate, hdat, hflags, iihead = out
+            self.append(sdate, dat, flags, hdat, hflags, hdate=hdate)
+        else:
+            sdate, record, dat, flags, iidate, hdate, hrecord, hdat, hflags, iihead = out
+            self.append(sdate, dat, flags, hdat, hflags, record=record, hdate=hdate, hrecord=hrecord)
+
+    def read(self, start=None, end=None, hdat=None):
+        meta = self.meta
+        nrow = meta['nrow']
+        # date window
+        T = np.memmap(self._file('date'), dtype='<i8', mode='r', shape=(nrow,)) if nrow > 0 else np.zeros(0, dtype=np.int64)
+        i0 = 0 if start is None else int(np.searchsorted(T, self._secs([start])[0], side='left'))
+        i1 = nrow if end is None else int(np.searchsorted(T, self._secs([end])[0], side='right'))
+        i1 = max(i0, i1)
+        sdate = self._sdate(np.array(T[i0:i1]))
+        del T
+        # variables
+        if hdat is None:
+            hdat = sorted(meta['hdat'])
+        elif isinstance(hdat, str):
+            hdat = [hdat]
+        icol = [ meta['hdat'].index(h) for h in hdat ]
+        hflags = [ meta['hflags'][i] for i in icol ]
+        dat    = np.empty((i1-i0, len(icol)))
+        flags  = np.empty((i1-i0, len(icol)), dtype=np.int64)
+        for j, i in enumerate(icol):
+            dat[:,j]   = self._read_col('dat_'+meta['files'][i], i0, i1)
+            flags[:,j] = self._read_col('flags_'+meta['files'][i], i0, i1)
+        hdate = meta['hdate'] if meta['hdate'] is not None else 'TIMESTAMP'
+        if meta['norecord']:
+            return sdate, dat, flags, hdate, list(hdat), hflags
+        else:
+            record  = self._read_col('record', i0, i1)
+            hrecord = meta['hrecord'] if meta['hrecord'] is not None else 'RECORD'
+            return sdate, record, dat, flags, hdate, hrecord, list(hdat), hflags
+
+    def export(self, ofile, start=None, end=None, hdat=None):
+        write_data_one_file(ofile, *self.read(start=start, end=end, hdat=hdat))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 from __future__ import division, absolute_import, print_function
+import warnings
 import numpy as np
 import jams
 from collections import OrderedDict
@@ -8,14 +9,14 @@ __all__ = ['read_data', 'write_data', 'write_data_dmp', 'write_data_dmp_size','w
 
 # --------------------------------------------------------------------
 
-def read_data(files, undef=-9999., strip=None, norecord=False, nofill=False):
+def read_data(files, undef=-9999., strip=None, norecord=False, nofill=False, cache=False):
     """
         Read and concatenate data from CHS level1 data files.
 
 
         Definition
         ----------
-        def read_data(files, undef=-9999., strip=None, norecord=False, nofill=False):
+        def read_data(files, undef=-9999., strip=None, norecord=False, nofill=False, cache=False):
 
 
         Input
@@ -31,7 +32,11 @@ def read_data(files, undef=-9999., strip=None, norecord=False, nofill=False):
                   If False then no strip (30% faster).
                   Otherwise strip character given by strip.
         norecord  True: Do not assume that second column is record number.
-        nofill    True: do not fill-up equal distant time steps
+        nofill    True: do not fill-up equal distant time steps.
+                  False: fill gaps with the smallest time step between all dates (default).
+        cache     True or directory name: read files through the binary cache of fread/sread/fsread,
+                  i.e. parse each file only once as long as it does not change (default: False).
+                  Remove the cache of a file with jams.clear_readcache(file).
 
 
         Output
@@ -50,6 +55,13 @@ def read_data(files, undef=-9999., strip=None, norecord=False, nofill=False):
         iihead    (nfile,)-list with indices in the output array of headers in the input files
 
 
+        Restrictions
+        ------------
+        Raises ValueError if a file has duplicate dates.
+        Warns if the same date has different data or flags in several files;
+        the values of the last file are taken then.
+
+
         Examples
         --------
         --> see __init__.py for full example of workflow
@@ -111,92 +123,49 @@ def read_data(files, undef=-9999., strip=None, norecord=False, nofill=False):
                                - norecord
                                - nofill
                   MC, Nov 2017 - assert files is iterable except string
+                  MC, Oct 2026 - cache
+                  MC, Oct 2026 - merge on integer time steps with searchsorted and block assignments,
+                                 report duplicate and conflicting dates
     """
 
-    debug = False
+    debug  = False
     iundef = np.int(undef)
     if not isinstance(files, (list, tuple, np.ndarray)): files = [files]
 
-    # Get unique header and time stamps of all input file
-    for cff, ff in enumerate(files):
-        ihead = jams.fread(ff, skip=1, strip=strip, header=True)        # head with TIMESTAMP and RECORD
-        if not norecord:
-            if (ihead[1].split()[0]).lower() != 'record':
-                raise ValueError('Assume the following structure: Date, Record, data, flag, data, flag, ...')
-        idate = jams.sread(ff, skip=1, nc=1, squeeze=True, strip=strip) # TIMESTAMP
-        idate = jams.ascii2eng(idate, full=True)
-        if cff == 0:
-            if norecord:
-                hdat   = ihead[1::2]
-                hflags = ihead[2::2]
-            else:
-                hdat   = ihead[2::2]
-                hflags = ihead[3::2]
-            adate  = idate
-        else:
-            if norecord:
-                hdat   += ihead[1::2]
-                hflags += ihead[2::2]
-            else:
-                hdat   += ihead[2::2]
-                hflags += ihead[3::2]
-            adate  += idate
-    hdat   = list(OrderedDict.fromkeys(hdat))   # unique data head
-    hflags = list(OrderedDict.fromkeys(hflags)) # unique flags head
-    adate  = list(OrderedDict.fromkeys(adate))  # unique dates
-    ii     = jams.argsort(hdat)
-    hdat   = [ hdat[i] for i in ii ]
-    hflags = [ hflags[i] for i in ii ]
-    adate.sort()
-
-    # Fill missing time steps in all time steps
-    if not nofill:
-        date  = jams.date2dec(eng=adate)
-        dd    = np.round(np.diff(date)*24.*60.).astype(np.int) # minutes between time steps
-        dmin  = np.amin(dd)                                    # time step in minutes
-        dt    = np.float(dmin)/(24.*60.)                       # time step in fractional day
-        igaps = np.where(dd != dmin)[0]                        # indexes of gaps
-        for i in igaps[::-1]:
-            nt      = np.round((date[i+1]-date[i])/dt).astype(np.int) # # of missing dates
-            newdate = (date[i]+np.arange(1,nt)*dt)[::-1]              # the missing dates in reverse order
-            for j in range(nt-1):
-                date.insert(i+1, newdate[j]) # fill in missing dates, last one first
-        adate = jams.dec2date(date, eng=True)
-
-    # Read files and fill in output array
-    nrow   = len(adate)
-    ncol   = len(hdat)
-    dat    = np.ones((nrow,ncol))*undef # output array without
-    flags  = np.ones((nrow,ncol), dtype=np.int)*iundef           # output array
-    if not norecord: record = np.ones(nrow, dtype=np.int)*iundef # output array
-    iidate = list()                     # list with indices of dates in dat/flag/record arrays
-    iihead = list()                     # list with indices of header in hdat/hflags lists
+    # Read all files once and get unique header and time stamps
+    units   = 'seconds since 1970-01-01 00:00:00'
+    hdat    = list()
+    hflags  = list()
+    fdate   = list() # dates of each file
+    frecord = list() # record, data, flags and data header of each file
+    fdat    = list()
+    fflags  = list()
+    fhdat   = list()
     for cff, ff in enumerate(files):
         if debug: print('File name: ', ff)
         # date, data
-        isdat, ssdat = jams.fsread(ff, skip=1, snc=[0], nc=-1, strip=strip, strarr=True) # array
-        isdate = ssdat[:,0]
+        isdat, ssdat = jams.fsread(ff, skip=1, snc=[0], nc=-1, strip=strip, strarr=True, cache=cache) # array
+        isdate = jams.ascii2eng(ssdat[:,0], full=True)
+        # date header, data header
+        ihead, shead = jams.fsread(ff, skip=1, snc=[0], nc=-1, strip=strip, header=True, cache=cache) # list
+        ihdate = shead[0]
         if norecord:
+            ihdat   = ihead[0::2]
+            ihflags = ihead[1::2]
             idat    = isdat[:,0::2]
             iflags  = isdat[:,1::2].astype(np.int)
         else:
-            irecord = isdat[:,0].astype(np.int)
-            idat    = isdat[:,1::2]
-            iflags  = isdat[:,2::2].astype(np.int)
-        isdate  = jams.ascii2eng(isdate, full=True)
-        # date header, data header
-        ihead, shead = jams.fsread(ff, skip=1, snc=[0], nc=-1, strip=strip, header=True) # list
-        ihdate   = shead[0]
-        if norecord:
-            ihdat    = ihead[0::2]
-            ihflags  = ihead[1::2]
-        else:
+            if (ihead[0].split()[0]).lower() != 'record':
+                raise ValueError('Assume the following structure: Date, Record, data, flag, data, flag, ...')
             ihrecord = ihead[0]
             ihdat    = ihead[1::2]
             ihflags  = ihead[2::2]
+            frecord.append(isdat[:,0].astype(np.int))
+            idat     = isdat[:,1::2]
+            iflags   = isdat[:,2::2].astype(np.int)
         # date and record header
         if cff == 0:
-            hdate   = ihdate
+            hdate = ihdate
             if not norecord: hrecord = ihrecord
         else:
             if norecord:
@@ -205,27 +174,86 @@ def read_data(files, undef=-9999., strip=None, norecord=False, nofill=False):
             else:
                 if (ihdate != hdate) or (ihrecord != hrecord):
                     raise ValueError('Assume the same date and record headers.')
+        hdat   += ihdat
+        hflags += ihflags
+        fdate.append(np.array(isdate))
+        fdat.append(idat)
+        fflags.append(iflags)
+        fhdat.append(ihdat)
+    hdat   = list(OrderedDict.fromkeys(hdat))   # unique data head
+    hflags = list(OrderedDict.fromkeys(hflags)) # unique flags head
+    ii     = jams.argsort(hdat)
+    hdat   = [ hdat[i] for i in ii ]
+    hflags = [ hflags[i] for i in ii ]
 
-        # fill output arrays and index lists
-        iiidate = np.where(np.in1d(adate,isdate))[0]  # indexes in dat/flags of time steps in current file
-        if debug:
-            def findDuplicates(l):      # this function returns all duplicates in a list
-                return list([x for x in l if l.count(x) > 1])
-
-            print('Numbers should match: ', iiidate.size, idat.shape[0])
-            print('duplicate dates: ',findDuplicates(list(isdate)))
-            # print('Current time steps:  ', len(isdate), [ aa for aa in isdate ])
-            # print('Selected time steps: ', len(iiidate), [ adate[aa] for aa in iiidate ])                
-
+    # Integer seconds of all time steps, converted at once
+    nfdate = [ d.size for d in fdate ]
+    sdate  = np.concatenate(fdate) if len(fdate) > 0 else np.zeros(0, dtype='<U19')
+    if sdate.size > 0:
+        secs = np.rint(np.ravel(jams.date2dec(eng=sdate, units=units))).astype(np.int64)
+    else:
+        secs = np.zeros(0, dtype=np.int64)
+    fsecs  = np.split(secs, np.cumsum(nfdate)[:-1])
+    # unique dates with index of first occurence in all files
+    usecs, ifirst = np.unique(secs, return_index=True)
+
+    # Fill missing time steps in all time steps on integer time steps
+    if (not nofill) and (usecs.size > 1):
+        asecs = _fill_dates(usecs, np.amin(np.diff(usecs)))
+    else:
+        asecs = usecs
+    nrow = asecs.size
+
+    # Dates as strings: original strings for existing time steps, computed for filled time steps
+    adate = np.empty(nrow, dtype=sdate.dtype if sdate.size > 0 else '<U19')
+    iexist = np.searchsorted(asecs, usecs)
+    adate[iexist] = sdate[ifirst]
+    if nrow > usecs.size:
+        ifill = np.ones(nrow, dtype=np.bool)
+        ifill[iexist] = False
+        adate[ifill] = np.ravel(jams.dec2date(asecs[ifill].astype(np.float64), units=units, eng=True))
+    adate = list(adate)
+
+    # Fill in output arrays with blocks of each file
+    ncol   = len(hdat)
+    dat    = np.ones((nrow,ncol))*undef # output array without
+    flags  = np.ones((nrow,ncol), dtype=np.int)*iundef           # output array
+    if not norecord: record = np.ones(nrow, dtype=np.int)*iundef # output array
+    written = np.zeros((nrow,ncol), dtype=np.bool)               # output elements written already
+    icol   = dict([ (h, i) for i, h in enumerate(hdat) ])
+    iidate = list()                     # list with indices of dates in dat/flag/record arrays
+    iihead = list()                     # list with indices of header in hdat/hflags lists
+    nconflict = 0
+    sconflict = list()
+    for cff, ff in enumerate(files):
+        # indexes in dat/flags of time steps in current file
+        iiidate = np.searchsorted(asecs, fsecs[cff])
+        # duplicate time steps in current file
+        isort = np.sort(fsecs[cff])
+        idup  = np.where(isort[1:] == isort[:-1])[0]
+        if idup.size > 0:
+            dups = np.unique(isort[idup+1])
+            raise ValueError('read_data: duplicate dates in file '+str(ff)+': '+
+                             ', '.join([ adate[i] for i in np.searchsorted(asecs, dups) ]))
+        iiihead = [ icol[h] for h in fhdat[cff] ]
+        if debug: print('Numbers should match: ', iiidate.size, fdat[cff].shape[0])
+        # conflicting data or flags of time steps in several files
+        if len(iiihead) > 0:
+            ij   = np.ix_(iiidate, iiihead)
+            conf = written[ij] & ((dat[ij] != fdat[cff]) | (flags[ij] != fflags[cff]))
+            if np.any(conf):
+                iconf = np.where(np.any(conf, axis=1))[0]
+                nconflict += iconf.size
+                sconflict.extend([ adate[iiidate[i]] for i in iconf[:5-len(sconflict)] ])
+            dat[ij]     = fdat[cff]          # write at appropriate places in dat
+            flags[ij]   = fflags[cff]        # write at appropriate places in flags
+            written[ij] = True
+        if not norecord: record[iiidate] = frecord[cff] # write at appropriate places in record
         iidate.append(iiidate)
-        if not norecord: record[iiidate] = irecord[:] # write at appropriate places in record
-        iiihead = list()
-        for i, h in enumerate(ihdat):
-            hh = hdat.index(h)
-            iiihead.extend([hh])
-            dat[iiidate, hh]   = idat[:,i]            # write at appropriate places in dat
-            flags[iiidate, hh] = iflags[:,i]          # write at appropriate places in flags
         iihead.append(iiihead)
+    if nconflict > 0:
+        warnings.warn('read_data: '+str(nconflict)+' time steps with different data or flags in several files,'
+                      ' taking the last file, e.g. at '+', '.join(sconflict))
 
     if norecord:
         return adate, dat, flags, iidate, hdate, hdat, hflags, iihead
@@ -1374,6 +1402,20 @@ def write_data_record_one_file(infile, sdate, record, dat, flags, hdate, hrecord
 
 # --------------------------------------------------------------------
 
+# Fill missing time steps of length dt in gaps of sorted unique integer dates secs.
+# Missing dates are counted from the date before each gap as in the original read_data.
+def _fill_dates(secs, dt):
+    if (secs.size < 2) or (dt <= 0): return secs
+    dd    = np.diff(secs)                     # time between time steps
+    igaps = np.where(dd > dt)[0]              # indexes of gaps
+    if igaps.size == 0: return secs
+    nt    = np.maximum(np.rint(dd[igaps]/dt).astype(np.int64), 1) # time steps in gaps including end
+    start = np.repeat(secs[igaps], nt-1)
+    kk    = np.arange(start.size) - np.repeat(np.cumsum(nt-1)-(nt-1), nt-1) + 1
+    return np.union1d(secs, start + kk*dt)    # with the missing dates
+
+# --------------------------------------------------------------------
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
@@ -4,9 +4,12 @@ import numpy as np
 from jams.date2dec import date2dec
 from jams.dec2date import dec2date
 
+__all__ = ['means', 'MeansIndex']
+
+
 def means(date, dat, year=False, month=False, day=False, hour=False, half_hour=False, minute=False,
           meanday=False, meanmonth=False, seasonal=False,
-          sum=False, max=False, min=False, onlydat=False):
+          sum=False, max=False, min=False, onlydat=False, undef=None):
     """
         Calculate daily, monthly, yearly, etc. means of data depending on date stamp.
 
@@ -29,12 +32,13 @@ def means(date, dat, year=False, month=False, day=False, hour=False, half_hour=F
         ----------
         def means(date, dat, year=False, month=False, day=False, hour=False, half_hour=False, minute=False,
                   meanday=False, meanmonth=False, seasonal=False,
-                  sum=False, max=False, min=False, onlydat=False):
+                  sum=False, max=False, min=False, onlydat=False, undef=None):
 
 
         Input
         -----
         date      1D array with Julian dates
+                  or MeansIndex(date) to reuse the group indexes of the dates in repeated calls.
         dat       ND (masked-)array
 
 
@@ -53,6 +57,8 @@ def means(date, dat, year=False, month=False, day=False, hour=False, half_hour=F
         max       if True, calculate maxima instead of means.
         min       if True, calculate minima instead of means.
         onlydat   if True, return only meandat, else return [outdate, meandat]
+        undef     if given, values of dat equal to undef are ignored (like masked values)
+                  and undefined averages are set to undef instead of being masked.
 
 
         Output
@@ -74,6 +80,10 @@ def means(date, dat, year=False, month=False, day=False, hour=False, half_hour=F
         For example, remove 15 minutes in decimal days from time steps of half an hour:
         date = jams.date2dec(ascii=adate) - 15./(24.*60.)
 
+        The dates are converted and grouped only once per averaging option, and all groups are
+        then reduced at once. Pass MeansIndex(date) instead of date to keep the groups
+        between calls with the same dates.
+
 
         Examples
         --------
@@ -205,6 +215,22 @@ def means(date, dat, year=False, month=False, day=False, hour=False, half_hour=F
          ['2.000' '2.000']
          ['3.000' '3.000']]
 
+        # Reuse group indexes
+        >>> idx = MeansIndex(jdates)
+        >>> odates, xout = means(idx, x[:,0], month=True)
+        >>> print(astr(xout, 3, pp=True))
+        ['5.000' '2.000' '3.000']
+        >>> print(astr(means(idx, x[:,0], month=True, max=True, onlydat=True), 3, pp=True))
+        ['6.000' '2.000' '3.000']
+
+        # undef
+        >>> x = np.arange(len(jdates))+1.
+        >>> x[0] = -9999.
+        >>> print(astr(means(jdates, x, month=True, undef=-9999., onlydat=True), 3, pp=True))
+        ['5.000' '2.000' '3.000']
+        >>> print(astr(means(jdates, x, meanmonth=True, undef=-9999., onlydat=True)[0:4], 3, pp=True))
+        ['    5.000' '    2.000' '    3.000' '-9999.000']
+
         License
         -------
         This file is part of the JAMS Python package, distributed under the MIT
@@ -243,13 +269,16 @@ def means(date, dat, year=False, month=False, day=False, hour=False, half_hour=F
                   MC, Jun 2019 - bug in minute averaging: compred unique minutes to hours instead of minutes
                                - half_hour inspired by Robin Leucht for level1 data
                                - did not take keyword 'retrospective' from Robin Leucht but added a Note above for this case
+                  MC, Oct 2026 - group indexes computed once and all groups reduced at once
+                               - MeansIndex, undef
     """
     # Constants
-    myundef  = 9e33
     ismasked = type(dat) == np.ma.core.MaskedArray
 
     # Assure array
     if not ismasked: dat = np.array(dat)
+    if undef is not None:
+        dat = np.ma.array(dat, mask=(dat==undef), keep_mask=True)
 
     # Assure ND-array
     isone = False
@@ -265,9 +294,14 @@ def means(date, dat, year=False, month=False, day=False, hour=False, half_hour=F
     allaggs = sum+max+min
     assert allaggs <= 1, "only one aggregation option sum, min, max possible"
 
+    if isinstance(date, MeansIndex):
+        idx = date
+    else:
+        idx = MeansIndex(date)
+
     # average 1st dim
     if allopts == 0:
-        dout = 0.5*(date[-1]+date[0])
+        dout = 0.5*(idx.date[-1]+idx.date[0])
         if sum:
             out = np.ma.sum(dat, 0)
         elif max:
@@ -276,285 +310,42 @@ def means(date, dat, year=False, month=False, day=False, hour=False, half_hour=F
             out = np.ma.amin(dat, 0)
         else:
             out = np.ma.mean(dat, 0)
+        if undef is not None:
+            out = np.ma.filled(out, undef)
         if isone:
             if onlydat:
                 return out[0]
             else:
-                return dout, out[0]            
+                return dout, out[0]
         else:
             if onlydat:
                 return out
             else:
                 return dout, out
     else:
-        yr, mo, dy, hr, mn, sc = dec2date(date)
-
-        # year
-        if year:
-            yrs  = np.unique(yr)
-            nout = yrs.size
-            dout = np.ones(nout)*myundef
-            if ismasked:
-                out  = np.ma.ones([nout]+list(dat.shape[1:]))*myundef
-            else:
-                out  = np.ones([nout]+list(dat.shape[1:]))*myundef
-            zahl = 0
-            for i in yrs:
-                ii = np.where(yr==i)[0]
-                if np.size(ii) > 0:
-                    dout[zahl] = date2dec(yr=i, mo=6, dy=15, hr=12)
-                    if sum:
-                        out[zahl,:] = np.ma.sum(dat[ii,:],0)
-                    elif max:
-                        out[zahl,:] = np.ma.amax(dat[ii,:],0)
-                    elif min:
-                        out[zahl,:] = np.ma.amin(dat[ii,:],0)
-                    else:
-                        out[zahl,:] = np.ma.mean(dat[ii,:],0)
-                    zahl += 1
-
-        # month
-        if month:
-            yrs  = np.unique(yr)
-            mos  = np.unique(mo)
-            nout = yrs.size*mos.size
-            dout = np.ones(nout)*myundef
-            if ismasked:
-                out  = np.ma.ones([nout]+list(dat.shape[1:]))*myundef
-            else:
-                out  = np.ones([nout]+list(dat.shape[1:]))*myundef
-            zahl = 0
-            for i in yrs:
-                for j in mos:
-                    ii = np.where((yr==i) & (mo==j))[0]
-                    if np.size(ii) > 0:
-                        dout[zahl]  = date2dec(yr=i, mo=j, dy=15, hr=12)
-                        if sum:
-                            out[zahl,:] = np.ma.sum(dat[ii,:],0)
-                        elif max:
-                            out[zahl,:] = np.ma.amax(dat[ii,:],0)
-                        elif min:
-                            out[zahl,:] = np.ma.amin(dat[ii,:],0)
-                        else:
-                            out[zahl,:] = np.ma.mean(dat[ii,:],0)
-                        zahl += 1
-
-        # day
-        if day:
-            yrs  = np.unique(yr)
-            mos  = np.unique(mo)
-            dys  = np.unique(dy)
-            nout = yrs.size*mos.size*dys.size
-            dout = np.ones(nout)*myundef
-            if ismasked:
-                out  = np.ma.ones([nout]+list(dat.shape[1:]))*myundef
-            else:
-                out  = np.ones([nout]+list(dat.shape[1:]))*myundef
-            zahl = 0
-            for i in yrs:
-                for j in mos:
-                    for k in dys:
-                        ii = np.where((yr==i) & (mo==j) & (dy==k))[0]
-                        if np.size(ii) > 0:
-                            dout[zahl]  = date2dec(yr=i, mo=j, dy=k, hr=12)
-                            if sum:
-                                out[zahl,:] = np.ma.sum(dat[ii,:],0)
-                            elif max:
-                                out[zahl,:] = np.ma.amax(dat[ii,:],0)
-                            elif min:
-                                out[zahl,:] = np.ma.amin(dat[ii,:],0)
-                            else:
-                                out[zahl,:] = np.ma.mean(dat[ii,:],0)
-                            zahl += 1
-
-        # hour
-        if hour:
-            yrs  = np.unique(yr)
-            mos  = np.unique(mo)
-            dys  = np.unique(dy)
-            hrs  = np.unique(hr)
-            nout = yrs.size*mos.size*dys.size*hrs.size
-            dout = np.ones(nout)*myundef
-            if ismasked:
-                out  = np.ma.ones([nout]+list(dat.shape[1:]))*myundef
-            else:
-                out  = np.ones([nout]+list(dat.shape[1:]))*myundef
-            zahl = 0
-            for i in yrs:
-                for j in mos:
-                    for k in dys:
-                        for l in hrs:
-                            ii = np.where((yr==i) & (mo==j) & (dy==k) & (hr==l))[0]
-                            if np.size(ii) > 0:
-                                dout[zahl]  = date2dec(yr=i, mo=j, dy=k, hr=l, mi=30)
-                                if sum:
-                                    out[zahl,:] = np.ma.sum(dat[ii,:],0)
-                                elif max:
-                                    out[zahl,:] = np.ma.amax(dat[ii,:],0)
-                                elif min:
-                                    out[zahl,:] = np.ma.amin(dat[ii,:],0)
-                                else:
-                                    out[zahl,:] = np.ma.mean(dat[ii,:],0)
-                                zahl += 1
-        # half_hour
-        if half_hour:
-            yrs  = np.unique(yr)
-            mos  = np.unique(mo)
-            dys  = np.unique(dy)
-            hrs  = np.unique(hr)
-            nout = yrs.size*mos.size*dys.size*hrs.size*2
-            dout = np.ones(nout)*myundef
-            if ismasked:
-                out  = np.ma.ones([nout]+list(dat.shape[1:]))*myundef
-            else:
-                out  = np.ones([nout]+list(dat.shape[1:]))*myundef
-            zahl = 0
-            for i in yrs:
-                for j in mos:
-                    for k in dys:
-                        for l in hrs:
-                            for m in range(2):
-                                ii = np.where((yr==i) & (mo==j) & (dy==k) & (hr==l) & ((mn//30)==m))[0]
-                                if np.size(ii) > 0:
-                                    dout[zahl]  = date2dec(yr=i, mo=j, dy=k, hr=l, mi=15+m*30)
-                                    if sum:
-                                        out[zahl,:] = np.ma.sum(dat[ii,:],0)
-                                    elif max:
-                                        out[zahl,:] = np.ma.amax(dat[ii,:],0)
-                                    elif min:
-                                        out[zahl,:] = np.ma.amin(dat[ii,:],0)
-                                    else:
-                                        out[zahl,:] = np.ma.mean(dat[ii,:],0)
-                                    zahl += 1
-
-        # minute
-        if minute:
-            yrs  = np.unique(yr)
-            mos  = np.unique(mo)
-            dys  = np.unique(dy)
-            hrs  = np.unique(hr)
-            mns  = np.unique(mn)
-            nout = yrs.size*mos.size*dys.size*hrs.size*mns.size
-            dout = np.ones(nout)*myundef
-            if ismasked:
-                out  = np.ma.ones([nout]+list(dat.shape[1:]))*myundef
-            else:
-                out  = np.ones([nout]+list(dat.shape[1:]))*myundef
-            zahl = 0
-            for i in yrs:
-                for j in mos:
-                    for k in dys:
-                        for l in hrs:
-                            for m in mns:
-                                ii = np.where((yr==i) & (mo==j) & (dy==k) & (hr==l) & (mn==m))[0]
-                                if np.size(ii) > 0:
-                                    dout[zahl]  = date2dec(yr=i, mo=j, dy=k, hr=l, mi=m, sc=30)
-                                    if sum:
-                                        out[zahl,:] = np.ma.sum(dat[ii,:],0)
-                                    elif max:
-                                        out[zahl,:] = np.ma.amax(dat[ii,:],0)
-                                    elif min:
-                                        out[zahl,:] = np.ma.amin(dat[ii,:],0)
-                                    else:
-                                        out[zahl,:] = np.ma.mean(dat[ii,:],0)
-                                    zahl += 1
-
-        # Mean daily
-        if meanday:
-            nout = 24
-            hrs  = range(nout)
-            dout = np.ones(nout)*myundef
-            if ismasked:
-                out  = np.ma.ones([nout]+list(dat.shape[1:]))*myundef
-            else:
-                out  = np.ones([nout]+list(dat.shape[1:]))*myundef
-            zahl = 0
-            for i in hrs:
-                dout[zahl] = date2dec(yr=yr[0], mo=1, dy=1, hr=i, mi=30)
-                ii = np.where(hr==i)[0]
-                if np.size(ii) > 0:
-                    if sum:
-                        out[zahl,:] = np.ma.sum(dat[ii,:],0)
-                    elif max:
-                        out[zahl,:] = np.ma.amax(dat[ii,:],0)
-                    elif min:
-                        out[zahl,:] = np.ma.amin(dat[ii,:],0)
-                    else:
-                        out[zahl,:] = np.ma.mean(dat[ii,:],0)
-                zahl += 1
-            if np.any(out==myundef):
-                out = np.ma.array(out, mask=(out==myundef), keep_mask=True)
-
-        # Mean monthly
-        if meanmonth:
-            nout = 12
-            mos  = range(1,nout+1)
-            dout = np.ones(nout)*myundef
-            if ismasked:
-                out  = np.ma.ones([nout]+list(dat.shape[1:]))*myundef
-            else:
-                out  = np.ones([nout]+list(dat.shape[1:]))*myundef
-            zahl = 0
-            for i in mos:
-                dout[zahl] = date2dec(yr=yr[0], mo=i, dy=15, hr=12, mi=0)
-                ii = np.where(mo==i)[0]
-                if np.size(ii) > 0:
-                    if sum:
-                        out[zahl,:] = np.ma.sum(dat[ii,:],0)
-                    elif max:
-                        out[zahl,:] = np.ma.amax(dat[ii,:],0)
-                    elif min:
-                        out[zahl,:] = np.ma.amin(dat[ii,:],0)
-                    else:
-                        out[zahl,:] = np.ma.mean(dat[ii,:],0)
-                zahl += 1
-            if np.any(out==myundef):
-                out = np.ma.array(out, mask=(out==myundef), keep_mask=True)
-
-        # Seasonal
-        if seasonal:
-            dim = np.array([[-9,31,28,31,30,31,30,31,31,30,31,30,31],
-                            [-9,31,29,31,30,31,30,31,31,30,31,30,31]])
-            # leaps = np.array((((yr%4)==0) & ((yr%100)!=0)) | ((yr%400)==0)).astype(np.int)
-            leaps = (((yr%4)==0) & ((yr%100)!=0)) | ((yr%400)==0)
-            leap  = np.any(leaps)
-            ileap = int(leap)
-            if leap:
-                iileap = np.argmax(leaps)
-                nout = 366
-            else:
-                iileap = 0
-                nout = 365
-            dys = range(1,nout+1)
-            dout = np.ones(nout)*myundef
-            if ismasked:
-                out  = np.ma.ones([nout]+list(dat.shape[1:]))*myundef
-            else:
-                out  = np.ones([nout]+list(dat.shape[1:]))*myundef
-            zahl = 0
-            for i in range(1,13):
-                for j in range(1,dim[ileap,i]+1):
-                    dout[zahl] = date2dec(yr=yr[iileap], mo=i, dy=j, hr=12, mi=0)
-                    ii = np.where((mo==i) & (dy==j))[0]
-                    if np.size(ii) > 0:
-                        if sum:
-                            out[zahl,:] = np.ma.sum(dat[ii,:],0)
-                        elif max:
-                            out[zahl,:] = np.ma.amax(dat[ii,:],0)
-                        elif min:
-                            out[zahl,:] = np.ma.amin(dat[ii,:],0)
-                        else:
-                            out[zahl,:] = np.ma.mean(dat[ii,:],0)
-                    zahl += 1
-            if np.any(out==myundef):
-                out = np.ma.array(out, mask=(out==myundef), keep_mask=True)
-
-    ii = np.where(dout != myundef)[0]
-    if len(ii) > 0:
-        dout = dout[ii]
-        out  = out[ii,:]
-    else:
-        raise ValueError("all values undefined after mean.")
+        if year:        opt = 'year'
+        elif month:     opt = 'month'
+        elif day:       opt = 'day'
+        elif hour:      opt = 'hour'
+        elif half_hour: opt = 'half_hour'
+        elif minute:    opt = 'minute'
+        elif meanday:   opt = 'meanday'
+        elif meanmonth: opt = 'meanmonth'
+        else:           opt = 'seasonal'
+        order, start, igrp, dout = idx.groups(opt)
+        if dout.size == 0:
+            raise ValueError("all values undefined after mean.")
+        if sum:
+            how = 'sum'
+        elif max:
+            how = 'max'
+        elif min:
+            how = 'min'
+        else:
+            how = 'mean'
+        out = _reduce_groups(dat, order, start, igrp, dout.size, how, ismasked or (undef is not None))
+        if undef is not None:
+            out = np.ma.filled(out, undef)
 
     if isone:
         if onlydat:
@@ -568,6 +359,183 @@ def means(date, dat, year=False, month=False, day=False, hour=False, half_hour=F
             return dout, out
 
 
+class MeansIndex(object):
+    """
+        Group indexes of dates for means.
+
+        Dates are converted to year, month, day, hour and minute once. The groups of an
+        averaging option of means (year, month, day, hour, half_hour, minute, meanday,
+        meanmonth, seasonal) are computed at the first request and kept for later calls
+        of means with the same dates.
+
+
+        Definition
+        ----------
+        class MeansIndex(date):
+
+
+        Input
+        -----
+        date      1D array with Julian dates
+
+
+        Methods
+        -------
+        groups(opt)   order, start, igrp, dout of averaging option opt:
+                      dates sorted by order fall into segments starting at start,
+                      which are the groups igrp of the output with centred dates dout.
+                      order is None if the dates are already sorted by group.
+
+
+        Examples
+        --------
+        >>> from date2dec import date2dec
+        >>> dates  = ['01.01.1990 12:00:00', '01.02.1990 12:00:00', '01.03.1990 12:00:00',
+        ...           '01.01.1990 12:10:00', '01.01.1990 13:00:00', '01.01.1990 14:00:00']
+        >>> idx = MeansIndex(date2dec(ascii=dates))
+        >>> order, start, igrp, dout = idx.groups('month')
+        >>> print(order, start, igrp)
+        [0 3 4 5 1 2] [0 4 5] [0 1 2]
+    """
+
+    def __init__(self, date):
+        self.date = np.ravel(np.array(date))
+        self._cal   = None
+        self._cache = {}
+
+    def _calendar(self):
+        # year, month, day, hour, minute of dates
+        if self._cal is None:
+            if self.date.size > 0:
+                self._cal = dec2date(self.date)[0:5]
+            else:
+                self._cal = [ np.zeros(0, dtype=np.int) for i in range(5) ]
+        return self._cal
+
+    def groups(self, opt):
+        if opt in self._cache:
+            return self._cache[opt]
+        yr, mo, dy, hr, mn = self._calendar()
+        # integer group keys in chronological order
+        dkey = (yr*12 + (mo-1))*31 + (dy-1)
+        if opt == 'year':
+            key = yr
+        elif opt == 'month':
+            key = yr*12 + (mo-1)
+        elif opt == 'day':
+            key = dkey
+        elif opt == 'hour':
+            key = dkey*24 + hr
+        elif opt == 'half_hour':
+            key = dkey*48 + hr*2 + mn//30
+        elif opt == 'minute':
+            key = dkey*1440 + hr*60 + mn
+        elif opt == 'meanday':
+            key = hr
+        elif opt == 'meanmonth':
+            key = mo-1
+        elif opt == 'seasonal':
+            leaps = (((yr%4)==0) & ((yr%100)!=0)) | ((yr%400)==0)
+            ileap = int(np.any(leaps))
+            cumdays = np.array([[0,31,59,90,120,151,181,212,243,273,304,334],
+                                [0,31,60,91,121,152,182,213,244,274,305,335]])
+            key = cumdays[ileap,mo-1] + (dy-1)
+        else:
+            raise ValueError("MeansIndex error: unknown averaging option: "+str(opt))
+        key = np.asarray(key, dtype=np.int64)
+        # sort by group and find segments
+        if np.all(key[1:] >= key[:-1]):
+            order = None
+            skey  = key
+        else:
+            order = np.argsort(key, kind='mergesort')
+            skey  = key[order]
+        if skey.size > 0:
+            start = np.flatnonzero(np.r_[True, skey[1:] != skey[:-1]])
+        else:
+            start = np.zeros(0, dtype=np.int)
+        ifirst = start if order is None else order[start]
+        # centred dates
+        if opt in ['year', 'month', 'day', 'hour', 'half_hour', 'minute']:
+            igrp = np.arange(start.size)
+            y, m, d, h, n = [ i[ifirst] for i in [yr, mo, dy, hr, mn] ]
+            if opt == 'year':
+                dout = date2dec(yr=y, mo=6, dy=15, hr=12)
+            elif opt == 'month':
+                dout = date2dec(yr=y, mo=m, dy=15, hr=12)
+            elif opt == 'day':
+                dout = date2dec(yr=y, mo=m, dy=d, hr=12)
+            elif opt == 'hour':
+                dout = date2dec(yr=y, mo=m, dy=d, hr=h, mi=30)
+            elif opt == 'half_hour':
+                dout = date2dec(yr=y, mo=m, dy=d, hr=h, mi=15+(n//30)*30)
+            else:
+                dout = date2dec(yr=y, mo=m, dy=d, hr=h, mi=n, sc=30)
+        else:
+            igrp = skey[start]
+            if opt == 'meanday':
+                dout = date2dec(yr=yr[0], mo=1, dy=1, hr=np.arange(24), mi=30)
+            elif opt == 'meanmonth':
+                dout = date2dec(yr=yr[0], mo=np.arange(1,13), dy=15, hr=12, mi=0)
+            else:
+                leaps = (((yr%4)==0) & ((yr%100)!=0)) | ((yr%400)==0)
+                if np.any(leaps):
+                    iileap = np.argmax(leaps)
+                    dim = np.array([31,29,31,30,31,30,31,31,30,31,30,31])
+                else:
+                    iileap = 0
+                    dim = np.array([31,28,31,30,31,30,31,31,30,31,30,31])
+                smo = np.repeat(np.arange(1,13), dim)
+                sdy = np.concatenate([ np.arange(1,i+1) for i in dim ])
+                dout = date2dec(yr=yr[iileap], mo=smo, dy=sdy, hr=12, mi=0)
+        dout = np.array(dout, dtype=np.float).reshape(-1)
+        self._cache[opt] = (order, start, igrp, dout)
+
+        return self._cache[opt]
+
+
+def _reduce_groups(dat, order, start, igrp, nout, how, ismasked):
+    """
+        Helper function that reduces dat in 1st dimension over the groups given by MeansIndex.groups
+        with mean, sum, max or min (how). Returns float array with nout rows, which is a masked array
+        if ismasked or if groups are missing (meanday, meanmonth, seasonal).
+        Groups without valid data are masked.
+    """
+    if order is not None:
+        dat = dat[order]
+    mask = np.ma.getmaskarray(dat)
+    valid = ~mask
+    if how == 'max':
+        fill = -np.inf
+    elif how == 'min':
+        fill = np.inf
+    else:
+        fill = 0.
+    dd = np.ma.filled(dat.astype(np.float64), fill) if ismasked else np.array(dat, dtype=np.float64)
+    shape = [nout] + list(dat.shape[1:])
+    out = np.zeros(shape)
+    cnt = np.zeros(shape, dtype=np.int64)
+    if start.size > 0:
+        if ismasked:
+            cnt[igrp] = np.add.reduceat(valid.astype(np.int64), start, axis=0)
+        else:
+            nn = np.diff(np.r_[start, dat.shape[0]])
+            cnt[igrp] = nn.reshape([nn.size] + [1]*(dat.ndim-1))
+        if how == 'max':
+            out[igrp] = np.maximum.reduceat(dd, start, axis=0)
+        elif how == 'min':
+            out[igrp] = np.minimum.reduceat(dd, start, axis=0)
+        else:
+            out[igrp] = np.add.reduceat(dd, start, axis=0)
+            if how == 'mean':
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    out[igrp] = out[igrp] / cnt[igrp]
+    if ismasked or np.any(cnt == 0):
+        out = np.ma.array(out, mask=(cnt == 0))
+
+    return out
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
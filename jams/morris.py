@@ -8,7 +8,7 @@ from __future__ import division, absolute_import, print_function
 
     Definitions
     -----------
-    def morris_sampling(NumFact, LB, UB, N=500, p=4, r=10, GroupMat=np.array([]), Diagnostic=0):
+    def morris_sampling(NumFact, LB, UB, N=500, p=4, r=10, GroupMat=np.array([]), Diagnostic=0, chunksize=None):
     def elementary_effects(NumFact, Sample, OutFact, Output, p=4, Group=[], Diagnostic=False):
 
 
@@ -37,6 +37,8 @@ from __future__ import division, absolute_import, print_function
                           of the factors that belong to the fixed group. All the other elements are zero.
         Diagnostic        1=plot the histograms and compute the efficiency of the samplign or not,
                           0 otherwise (default)
+        chunksize         Number of trajectories for which the distances to all other trajectories
+                          are calculated at once (default: None = automatic)
 
     elementary_effects
         p                 Number of levels
@@ -115,6 +117,7 @@ from __future__ import division, absolute_import, print_function
                            - several little improvements on speed
               MC & FG, Aug 2018 - Distance matrix not done for all trajectories at once because of very
                                   large memory requirement.
+              MC, Oct 2026 - vectorised trajectory distances and selection in Optimized_Groups
 """
 import numpy as np
 
@@ -325,7 +328,7 @@ def  Sampling_Function_2(p, k, r, LB, UB, GroupMat=np.array([])):
 
 
 
-def Optimized_Groups(NumFact, LB, UB, N=500, p=4, r=10, GroupMat=np.array([]), Diagnostic=0):
+def Optimized_Groups(NumFact, LB, UB, N=500, p=4, r=10, GroupMat=np.array([]), Diagnostic=0, chunksize=None):
     """
         Optimisation in the choice of trajectories for Morris experiment,
         that means elementary effects
@@ -333,7 +336,7 @@ def Optimized_Groups(NumFact, LB, UB, N=500, p=4, r=10, GroupMat=np.array([]), D
 
         Definition
         ----------
-        def Optimized_Groups(NumFact, LB, UB, N=500, p=4, r=10, GroupMat=np.array([]), Diagnostic=0):
+        def Optimized_Groups(NumFact, LB, UB, N=500, p=4, r=10, GroupMat=np.array([]), Diagnostic=0, chunksize=None):
 
 
         Input
@@ -353,6 +356,9 @@ def Optimized_Groups(NumFact, LB, UB, N=500, p=4, r=10, GroupMat=np.array([]), D
                           of the factors that belong to the fixed group. All the other elements are zero.
         Diagnostic        1=plot the histograms and compute the efficiency of the samplign or not,
                           0 otherwise (default)
+        chunksize         Number of trajectories for which the distances to all other trajectories
+                          are calculated at once with cdist. Memory use is about chunksize*N*(NumFact+1)**2 floats.
+                          (default: None = such that chunksize*N*(NumFact+1)**2 <= 2**22)
 
 
         Output
@@ -409,6 +415,8 @@ def Optimized_Groups(NumFact, LB, UB, N=500, p=4, r=10, GroupMat=np.array([]), D
                                - several little improvements on speed
                   MC & FG, Aug 2018 - Distance matrix not done for all trajectories at once because of very
                                  large memory requirement.
+                  MC, Oct 2026 - duplicates by sorted trajectory points, cdist for chunks of trajectories,
+                                 greedy selection for all starting trajectories at once, chunksize
     """
     from scipy.spatial import distance
 
@@ -428,61 +436,60 @@ def Optimized_Groups(NumFact, LB, UB, N=500, p=4, r=10, GroupMat=np.array([]), D
     else:
         sizeb = NumFact + 1
 
-    # Compute the distance between all pair of trajectories (sum of the distances between points)
-    # The distance matrix is a matrix N*N
-    # The distance is defined as the sum of the distances between all pairs of points
-    #   if the two trajectories differ, 0 otherwise
-    Dist = np.zeros((N,N))
+    # Trajectories (N,sizeb,NumFact)
+    Traj = OutMatrix.reshape((N,sizeb,NumFact))
+
+    # Eliminate replicated trajectories, i.e. trajectories with the same set of points,
+    # keeping the first occurence. Two trajectories are identified by their sorted points.
     Diff_Traj = np.arange(0.0,N,1.0)
-    for j in range(N):   # combine all trajectories: eg N=3: 0&1; 0&2; 1&2 (is not dependent from sequence)
-        for z in range(j+1,N):
-            MyDist = distance.cdist(OutMatrix[sizeb*(j):sizeb*(j+1),:],OutMatrix[sizeb*(z):sizeb*(z+1),:])
-            if np.where(MyDist==0.)[0].size == sizeb:
-                # Same trajectory. If the number of zeros in Dist matrix is equal to
-                # (NumFact+1) then the trajectory is a replica. In fact (NumFact+1) is the maximum number of
-                # points that two trajectories can have in common
-                Dist[j,z] = 0.
-                Dist[z,j] = 0.
-                # Memorise the replicated trajectory
-                Diff_Traj[z] = -1.  #the z value identifies the duplicate
-            else:
-                # Define the distance between two trajectories as
-                # the minimum distance among their points
-                dd = np.sum(MyDist)
-                Dist[j,z] = dd
-                Dist[z,j] = dd
-
-    # prepare array with excluded duplicates (alternative would be deleting rows)
-    iidup = np.where(Diff_Traj==-1.)[0]
-    dupli = iidup.size
+    seen = set()
+    for j in range(N):
+        tt = Traj[j,:,:]
+        hh = tt[np.lexsort(tt.T[::-1]),:].tobytes()
+        if hh in seen:
+            Diff_Traj[j] = -1.  # the j value identifies the duplicate
+        else:
+            seen.add(hh)
     iiind = np.where(Diff_Traj!=-1.)[0]
-    New_N = iiind.size # N - iidup.size
-    New_OutMatrix = np.zeros((sizeb*New_N,NumFact))
-    New_OutFact   = np.zeros((sizeb*New_N,1))
-
-    # Eliminate replicated trajectories in the sampled matrix
-    ID=0
-    for i in range(N):
-        if Diff_Traj[i] != -1.:
-            New_OutMatrix[ID*sizeb:(ID+1)*sizeb,:] = OutMatrix[i*sizeb:(i+1)*sizeb,:]
-            New_OutFact[ID*sizeb:(ID+1)*sizeb,:] = OutFact[i*sizeb:(i+1)*sizeb,:]
-            ID+=1
-
-    # Select in the distance matrix only the rows and columns of different trajectories
-    #   Dist_Diff = np.delete(Dist_Diff,np.where(Diff_Traj==-1.)[0])
-    Dist_Diff = Dist[iiind,:] #moet 2D matrix zijn... wis rijen ipv hou bij
-    Dist_Diff = Dist_Diff[:,iiind] #moet 2D matrix zijn... wis rijen ipv hou bij
+    New_N = iiind.size
+    New_Traj      = Traj[iiind,:,:]
+    New_OutMatrix = New_Traj.reshape((sizeb*New_N,NumFact))
+    New_OutFact   = OutFact.reshape((N,sizeb))[iiind,:].reshape((sizeb*New_N,1))
+
+    # Compute the distance between all pair of different trajectories (sum of the distances between points)
+    # The distance matrix is a matrix New_N*New_N
+    # Distances are calculated with cdist for chunks of trajectories with all following trajectories,
+    # keeping the upper triangle.
+    if chunksize is None:
+        chunk = max(2**22//max(New_N*sizeb*sizeb, 1), 1)
+    else:
+        chunk = max(int(chunksize), 1)
+    Dist_Diff = np.zeros((New_N,New_N))
+    for j in range(0, New_N, chunk):
+        j1 = min(j+chunk, New_N)
+        MyDist = distance.cdist(New_OutMatrix[sizeb*j:sizeb*j1,:], New_OutMatrix[sizeb*j:,:])
+        dd = MyDist.reshape((j1-j,sizeb,New_N-j,sizeb)).sum(axis=(1,3))
+        for i in range(j1-j):
+            Dist_Diff[j+i,j+i+1:] = dd[i,i+1:]
+    iu = np.triu_indices(New_N, k=1)
+    Dist_Diff[(iu[1],iu[0])] = Dist_Diff[iu]
 
     # Select the optimal set of trajectories
+    # greedy, starting from each trajectory m: add the trajectory with maximum distance to the ones so far
     Traj_Vec = np.zeros((New_N,r), dtype=np.int)
     OptDist  = np.zeros((New_N,r))
-    for m in range(New_N):                # each row in Traj_Vec
-        Traj_Vec[m,0]  = m
-        for z in range(1,r):              # elements in columns after first
-            New_Dist_Diff = np.sqrt(np.sum(Dist_Diff[Traj_Vec[m,:z],:]**2, axis=0))
-            ii            = New_Dist_Diff.argmax()
-            Traj_Vec[m,z] = ii
-            OptDist[m,z]  = New_Dist_Diff[ii]
+    mchunk   = max(2**22//max(New_N, 1), 1)
+    for m in range(0, New_N, mchunk):
+        m1 = min(m+mchunk, New_N)
+        im = np.arange(m1-m)
+        Traj_Vec[m:m1,0] = np.arange(m,m1)
+        Sum_Dist2 = Dist_Diff[m:m1,:]**2
+        for z in range(1,r):          # elements in columns after first
+            New_Dist_Diff    = np.sqrt(Sum_Dist2)
+            ii               = New_Dist_Diff.argmax(axis=1)
+            Traj_Vec[m:m1,z] = ii
+            OptDist[m:m1,z]  = New_Dist_Diff[im,ii]
+            if z < r-1: Sum_Dist2 += Dist_Diff[ii,:]**2
 
     # Construct optimal matrix
     SumOptDist = np.sum(OptDist, axis=1)
@@ -785,12 +792,12 @@ def Morris_Measure_Groups(NumFact, Sample, OutFact, Output, p=4, Group=[], Diagn
     return SAmeas_out, OutMatrix
 
 
-def morris_sampling(NumFact, LB, UB, N=500, p=4, r=10, GroupMat=np.array([]), Diagnostic=0):
+def morris_sampling(NumFact, LB, UB, N=500, p=4, r=10, GroupMat=np.array([]), Diagnostic=0, chunksize=None):
     """
         Wrapper function for Optimized_Groups.
-        def Optimized_Groups(NumFact, LB, UB, N=500, p=4, r=10, GroupMat=np.array([]), Diagnostic=0):
+        def Optimized_Groups(NumFact, LB, UB, N=500, p=4, r=10, GroupMat=np.array([]), Diagnostic=0, chunksize=None):
     """
-    return Optimized_Groups(NumFact, LB, UB, N, p, r, GroupMat, Diagnostic)
+    return Optimized_Groups(NumFact, LB, UB, N, p, r, GroupMat, Diagnostic, chunksize)
 
 
 def elementary_effects(NumFact, Sample, OutFact, Output, p=4, Group=[], Diagnostic=False):
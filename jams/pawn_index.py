@@ -1,19 +1,36 @@
 #!/usr/bin/env python
 from __future__ import division, absolute_import, print_function
 import numpy as np
-from statsmodels.distributions.empirical_distribution import ECDF
-# error in statsmodel 0.9.0 using old scipy.misc
-# One could use in the meantime ecdf from
-#     https://stackoverflow.com/questions/15792552/numpy-scipy-equivalent-of-r-ecdfxx-function
-# def ecdf(x):
-#     xs = np.sort(x)
-#     ys = np.arange(1, len(xs)+1)/float(len(xs))
-#     return xs, ys
+
+
+# Exact two-sample KS statistics of rows of cond against the unconditional sample,
+# given the sorted unconditional sample us and its unique values uu.
+def _pawn_ks(args):
+    cond, us, uu = args
+    nr, nc = cond.shape
+    nu = us.size
+    nm = uu.size
+    # Difference of the ECDFs is right-continuous and only changes at sample points,
+    # so its supremum is the maximum at the points of both samples.
+    cs = np.sort(cond, axis=1)
+    # at conditional points; only the last of tied values has the correct ECDF
+    fu = np.searchsorted(us, cs, side='right') / nu
+    fc = np.arange(1, nc+1) / nc
+    last = np.ones((nr,nc), dtype=np.bool)
+    last[:,:-1] = cs[:,1:] != cs[:,:-1]
+    d1 = np.max(np.where(last, np.abs(fc[np.newaxis,:] - fu), 0.), axis=1)
+    # at unconditional points: count conditional values <= uu[j] per row
+    pos  = np.searchsorted(uu, cs, side='left') + (nm+1)*np.arange(nr)[:,np.newaxis]
+    ncle = np.cumsum(np.bincount(pos.ravel(), minlength=nr*(nm+1)).reshape((nr,nm+1)), axis=1)[:,:nm]
+    fuu  = np.searchsorted(us, uu, side='right') / nu
+    d2 = np.max(np.abs(ncle/nc - fuu[np.newaxis,:]), axis=1)
+    return np.maximum(d1, d2)
 
 
 def pawn_index( uncond, cond,
                 alpha=0.05,
-                pawn_stat='median'):
+                pawn_stat='median',
+                chunksize=None, processes=1, pool=None):
     """
         Estimation of parameter sensitivity using the PAWN method introduced by
               Pianosi, F. & Wagener T., 2015
@@ -25,7 +42,8 @@ def pawn_index( uncond, cond,
         ----------
         def pawn_index( uncond, cond,
                         alpha=0.05,
-                        pawn_stat='median'):
+                        pawn_stat='median',
+                        chunksize=None, processes=1, pool=None):
 
         Input
         ----------
@@ -43,6 +61,14 @@ def pawn_index( uncond, cond,
                         default: 0.05
         pawn_stat       statistic used for PAWN index; e.g. 'max', 'mean', 'median'
                         default: 'median'
+        chunksize       number of conditional sets (replicates times parameters) for which
+                        KS statistics are calculated at once. Memory use is about 4*chunksize*(nc+nu) numbers.
+                        default: None = such that chunksize*(nc+nu) <= 2**22
+        processes       number of processes to calculate chunks in parallel
+                        default: 1 = no pool
+        pool            pool of workers with a map method such as multiprocessing.Pool
+                        or schwimmbad.MPIPool; overrides processes
+                        default: None
 
 
         Output
@@ -56,6 +82,12 @@ def pawn_index( uncond, cond,
         1. PAWN statistics are limited to 'max', 'mean', 'median' at the moment
 
 
+        Notes
+        -----
+        KS statistics are the exact suprema of the differences between the empirical CDFs
+        of the conditional and unconditional samples, calculated from the sorted samples.
+
+
         References
         ----------
         Pianosi, F. & Wagener T., 2015
@@ -113,7 +145,7 @@ def pawn_index( uncond, cond,
         >>> T_stat, influential = pawn_index(uncond, cond, pawn_stat=pawn_stat, alpha=alpha)
         >>>
         >>> print('PAWN_index :: T_stat       =',astr(T_stat,3,pp=True))
-        PAWN_index :: T_stat       = ['0.460' '0.110' '0.270']
+        PAWN_index :: T_stat       = ['0.470' '0.110' '0.270']
         >>> print('certainty  :: influential  =',astr(influential,3,pp=True))
         certainty  :: influential  = ['1.000' '0.000' '0.860']
 
@@ -145,77 +177,76 @@ def pawn_index( uncond, cond,
         History
         -------
         Written,  JM, Dec 2017
+        Modified, MC, Oct 2026 - exact KS statistics from sorted samples, vectorized over replicates and parameters
+                               - chunksize, processes, pool
     """
 
-    uncond = np.array(uncond)
-    cond   = np.array(cond)
-    
+    if pawn_stat not in ['max', 'median', 'mean']:
+        raise ValueError("Statistic not implemented yet!")
+
+    uncond = np.array(uncond, dtype=np.float64).ravel()
+    cond   = np.array(cond, dtype=np.float64)
+
     nn    = np.shape(cond)[0]      # number replicates
     npara = np.shape(cond)[1]      # number parameters
     nc    = np.shape(cond)[2]      # number conditional sets
     nu    = np.shape(uncond)[0]    # number unconditional sets
-    
-    # estimated CDF of unconditional sets
-    ecdf_uncond = ECDF(uncond)
-
-    # estimated CDF of conditional sets
-    ecdf_cond = [ [ ECDF(cond[irepl][ipara]) for ipara in range(npara) ] for irepl in range(nn) ]
-
-    # get CDF values
-    lb  = min(np.min(uncond),np.min(cond))  
-    ub  = max(np.max(uncond),np.max(cond))
-    lb1 = lb - (ub-lb)*0.15
-    ub1 = ub + (ub-lb)*0.15
-    lb  = lb1
-    ub  = ub1
-    x_grid = np.arange(lb,ub+(ub-lb)/4000.,(ub-lb)/4000.)
-
-    uncond_cdf = ecdf_uncond(x_grid)
-
-    T_stats     = []   # PAWN sensitivity index
-    informative = []   # gives certainty of parameter being informative (1.0=informative, 0.0=non-informative)
-    cond_cdf    = [ [ [] for ipara in range(npara) ] for irepl in range(nn) ]
-    for ipara in range(npara):
-        KS_stat              = []
-        count_influential    = 0.0
-        count_noninformative = 0.0
-        for irepl in range(nn):
-
-            cond_cdf[irepl][ipara] = ecdf_cond[irepl][ipara](x_grid)
-                
-            # Eq. 10 in Zadeh et al. (2017), EMS
-            #           "Comparison of variance-based and moment-independent global
-            #           sensitivity approaches by application to the SWAT model"
-            stat = np.max(np.abs(cond_cdf[irepl][ipara]-uncond_cdf))
-            KS_stat.append(stat)
-
-            # null-hypothesis: two samples come from common distribution
-            # rejected null hypothesis means that parameter is influential
-            # reject null: p-value is equal or smaller than significance level alpha=0.05
-            # found on:
-            #       https://en.m.wikipedia.org/wiki/Kolmogorov-Smirnov_test
-            # and:
-            #       Massey (1951) and Marsaglia et al. (2003)
-            ks_crit = np.sqrt(-0.5*np.log(alpha/2.0)) * np.sqrt((nu + nc) / (nu * nc * 1.0))
-            if stat > ks_crit:
-                count_influential    += 1.0
-            else:
-                count_noninformative += 1.0
-
-        if (pawn_stat == 'max'):
-            T_stat = np.max(KS_stat)
-        elif (pawn_stat == 'median'):
-            T_stat = np.median(KS_stat)
-        elif (pawn_stat == 'mean'):
-            T_stat = np.mean(KS_stat)
-        else:
-            raise ValueError("Statistic not implemented yet!")
 
-        informative.append(count_influential*1./nn)
-        T_stats.append(T_stat)
-
-    T_stats     = np.array(T_stats)
-    informative = np.array(informative)    
+    # sorted unconditional sets and their unique values
+    us = np.sort(uncond)
+    uu = np.unique(us)
+
+    # KS statistics of all replicates and parameters in chunks of conditional sets
+    # Eq. 10 in Zadeh et al. (2017), EMS
+    #           "Comparison of variance-based and moment-independent global
+    #           sensitivity approaches by application to the SWAT model"
+    rows = cond.reshape((nn*npara,nc))
+    nrow = nn*npara
+    if chunksize is None:
+        chunk = max(2**22//max(nc+uu.size, 1), 1)
+    else:
+        chunk = max(int(chunksize), 1)
+    chunks = [ (rows[i:min(i+chunk,nrow),:], us, uu) for i in range(0, nrow, chunk) ]
+    if pool is not None:
+        ipool = pool
+    elif (processes > 1) and (len(chunks) > 1):
+        import multiprocessing
+        ipool = multiprocessing.Pool(processes)
+    else:
+        ipool = None
+    try:
+        if ipool is None:
+            KS_stat = list(map(_pawn_ks, chunks))
+        else:
+            KS_stat = ipool.map(_pawn_ks, chunks)
+    except BaseException:
+        # do not leave own worker processes behind
+        if (pool is None) and (ipool is not None): ipool.terminate()
+        raise
+    finally:
+        if (pool is None) and (ipool is not None):
+            ipool.close()
+            ipool.join()
+    KS_stat = np.concatenate(KS_stat).reshape((nn,npara))
+
+    # null-hypothesis: two samples come from common distribution
+    # rejected null hypothesis means that parameter is influential
+    # reject null: p-value is equal or smaller than significance level alpha=0.05
+    # found on:
+    #       https://en.m.wikipedia.org/wiki/Kolmogorov-Smirnov_test
+    # and:
+    #       Massey (1951) and Marsaglia et al. (2003)
+    ks_crit = np.sqrt(-0.5*np.log(alpha/2.0)) * np.sqrt((nu + nc) / (nu * nc * 1.0))
+    # gives certainty of parameter being informative (1.0=informative, 0.0=non-informative)
+    informative = np.sum(KS_stat > ks_crit, axis=0) * 1./nn
+
+    # PAWN sensitivity index
+    if (pawn_stat == 'max'):
+        T_stats = np.max(KS_stat, axis=0)
+    elif (pawn_stat == 'median'):
+        T_stats = np.median(KS_stat, axis=0)
+    elif (pawn_stat == 'mean'):
+        T_stats = np.mean(KS_stat, axis=0)
 
     return T_stats, informative
 
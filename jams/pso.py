@@ -1,12 +1,16 @@
 #!/usr/bin/env python
 from __future__ import division, absolute_import, print_function
 from functools import partial
+import os
+import sys
+import time
 import subprocess
 from distutils.util import strtobool
 import numpy as np
 from jams.const import huge
 from jams.npyio import savez_compressed
 from jams.closest import closest
+from jams.evalcache import as_evalcache
 # ToDo:
 #   Handling constraints
 #   write tmp/population files (as in SCE of Fortran)
@@ -76,8 +80,38 @@ def _ext_obj_wrapper(func, lb, ub, mask,
         return func(params)
 
 
+def _async_eval_wrapper(is_feasible, obj, i, x):
+    '''
+        Wrapper function for asynchronous PSO to be used with partial:
+            aeval = partial(_async_eval_wrapper, is_feasible, obj)
+        Checks constraints of particle i at position x and calculates the objective if feasible.
+
+        Returns particle index, feasibility, objective value, process id, as well as
+        start and end time of evaluation. Exceptions are returned instead of raised
+        so that they can be raised again in the calling process.
+    '''
+    t0 = time.time()
+    try:
+        fs = is_feasible(x)
+        fx = obj(x) if fs else np.nan
+    except Exception as e:
+        return e
+    return i, fs, fx, os.getpid(), t0, time.time()
+
+
 # Function wrappers for objective and constraints
 # used with functools.partial
+def _cache_wrapper(cache, obj, x):
+    '''
+        Wrapper function for objective with cache of function values
+        to be used with partial:
+            cobj = partial(_cache_wrapper, cache, obj)
+        obj is only called if x is not in cache:
+            fx = cobj(x)
+    '''
+    return cache(obj, x)
+
+
 def _obj_wrapper(func, arg, kwarg, x):
     '''
         Wrapper function for function to be optimised
@@ -501,8 +535,8 @@ def pso(func, x0, lb, ub,
         init='lhs', strategy='canonical', topology='gbest', kl=1,
         memetic='no', nmemetic=1, nlocal=5, rrwde=0.01, pls=0.2,
         includex0=False, seed=None,
-        processes=1,
-        verbose=0, pout=False, cout=False,
+        processes=1, asynchronous=False, nqueue=None, cache=None,
+        verbose=0, pout=False, cout=False, uout=False,
         restart=False, restartfile1='pso.restart.npz', restartfile2='pso.restart.txt',
         parameterfile=None, parameterwriter=None,
         objectivefile=None, objectivereader=None,
@@ -521,8 +555,8 @@ def pso(func, x0, lb, ub,
                 minstep=1e-8, minobj=1e-8, maxit=False,
                 init='lhs', strategy='canonical', topology='gbest', kl=1,
                 includex0=False, seed=None,
-                processes=1,
-                verbose=0, pout=False, cout=False,
+                processes=1, asynchronous=False, nqueue=None, cache=None,
+                verbose=0, pout=False, cout=False, uout=False,
                 restart=False, restartfile1='pso.restart.npz', restartfile2='pso.restart.txt',
                 parameterfile=None, parameterwriter=None,
                 objectivefile=None, objectivereader=None,
@@ -592,7 +626,7 @@ def pso(func, x0, lb, ub,
                     (Default: 'lhs')
                     'random': random sampling from uniform distribution
                     'lhs':    latin hypercube sampling from uniform distributions
-                    'sobol':  quasirandom Sobol sequence (only up to 40 dimensions)
+                    'sobol':  quasirandom Sobol sequence (only up to 1111 dimensions)
         strategy    string
                     PSO variants.
                     (Default: 'canonical')
@@ -725,12 +759,39 @@ def pso(func, x0, lb, ub,
         processes   int
                     The number of processes to use to evaluate objective function and constraints.
                     (Default: 1)
+        asynchronous  boolean
+                    True: asynchronous (non-generational) PSO. After the synchronous evaluation of the initial swarm,
+                    each particle's best position, its best neighbor, velocity and position are updated as soon
+                    as its evaluation returns, and it is directly resubmitted to the work queue. One iteration is
+                    counted for every swarmsize evaluations so that maxn has the same meaning as in the
+                    synchronous PSO. Results depend on the order in which evaluations return and are
+                    hence not reproducible with processes>1. Not available with MPI and memetic PSO.
+                    (Default: False)
+        nqueue      int
+                    Maximum number of evaluations submitted at once to the processes in asynchronous PSO.
+                    (Default: processes)
+        cache       boolean, string or EvalCache
+                    Cache objective function values of particle positions so that identical positions,
+                    e.g. at the bounds or x0 at masked dimensions, or positions of earlier runs
+                    are not evaluated again. Cached values count as function calls.
+                    (Default: None)
+                    True:      cache in memory
+                    string:    cache in memory and in the file with that name on disk,
+                               which is read at the start of later runs, e.g. after restart;
+                               the file gives stale values if the function, its data or arguments
+                               changed; use a new file or EvalCache with tag then
+                    EvalCache: use given cache, e.g. EvalCache(maxsize=10000, atol=1e-8, cachefile='pso.cache');
+                               cache.stats() gives number of hits and misses afterwards
         pout        boolean
                     True: include best per-particle positions and their objective values in output.
                     (Default: False)
         cout        boolean
                     True: include number of function calls in output.
                     (Default: False)
+        uout        boolean
+                    True: include utilization statistics of the processes in asynchronous PSO in output
+                    (None if not asynchronous).
+                    (Default: False)
         restart           boolean
                           if True, continue from saved state in restartfile1/2.
                           (Default: False)
@@ -768,6 +829,17 @@ def pso(func, x0, lb, ub,
                     The best known position of each particle.
         fp          1D-array
                     The objective values at each position in p.
+        ncall       int
+                    Number of function calls if cout.
+        ustat       dict
+                    Utilization statistics of asynchronous PSO if uout:
+                    'neval'        number of asynchronous evaluations, including cached function values
+                    'wall'         wall time of asynchronous iterations [s]
+                    'busy'         summed evaluation time over all processes [s]
+                    'utilization'  busy / (processes * wall)
+                    'workers'      utilization per worker process (busy / wall)
+                    'tmean', 'tmin', 'tmax'  mean, minimum and maximum time per evaluation [s]
+                    Cached function values are not included in busy, workers and times.
 
 
         License
@@ -815,6 +887,9 @@ def pso(func, x0, lb, ub,
                                - external function - mask, x0, parameterfile, parameterwriter,
                                                      objectivefile, objectivereader, shell, debug
                   MC, Dec 2016 - includex0, restart, mpi, memetic
+                  MC, Oct 2026 - Sobol sequences up to 1111 dimensions
+                  MC, Oct 2026 - asynchronous, nqueue, uout
+                  MC, Oct 2026 - cache
     """
     # Get MPI communicator
     try:
@@ -873,7 +948,7 @@ def pso(func, x0, lb, ub,
     inits = ['random', 'lhs', 'sobol']
     assert init.lower() in inits, 'Initialisation {:} not in {:}'.format(init, inits)
     if init.lower() == 'sobol':
-        assert len(lb) <= 40, "Sobol' sequences only work up to 40 dimensions."
+        assert len(lb) <= 1111, "Sobol' sequences only work up to 1111 dimensions."
     # Strategy keyword
     ptypes = ['original', 'inertia', 'canonical', 'fips', 'nips']
     assert strategy.lower() in ptypes, 'PSO implementation {:} not in {:}'.format(strategy, ptypes)
@@ -883,6 +958,12 @@ def pso(func, x0, lb, ub,
     # Mmemetic keyword
     mtypes = ['no', 'global', 'local']
     assert memetic.lower() in mtypes, 'Memetic implementation {:} not in {:}'.format(memetic, mtypes)
+    # Cache of objective function values
+    cache = as_evalcache(cache)
+    # Asynchronous PSO
+    if asynchronous:
+        assert csize == 1, 'Asynchronous PSO not available with MPI, use processes.'
+        assert memetic.lower() == 'no', 'Asynchronous PSO not available with memetic PSO.'
     # Parameterfile etc. keywords if func is name of executable
     if isinstance(func, (str,list)):
         if parameterfile is None:
@@ -953,6 +1034,11 @@ def pso(func, x0, lb, ub,
                           parameterfile1, parameterwriter, objectivefile1, objectivereader, shell, debug, passrank)
         else:
             obj = partial(_obj_wrapper, func, arg, kwarg)
+        # Objective with cache for evaluations in this process
+        if cache is None:
+            cobj = obj
+        else:
+            cobj = partial(_cache_wrapper, cache, obj)
 
         # Check for constraint function(s) and partialise them
         if f_ieqcons is None:
@@ -1002,11 +1088,11 @@ def pso(func, x0, lb, ub,
             x = rand[crank*iS:crank*iS+iS,:]
             v = rand[S+crank*iS:S+crank*iS+iS,:]
         elif init.lower() == 'sobol':
-            import sobol
+            from jams.sobol import i4_sobol_generate
             nskip = D*S + crank*D*iS
-            x = sobol.i4_sobol_generate(D,iS,nskip).transpose()
+            x = i4_sobol_generate(D,iS,nskip).transpose()
             nskip = 2*D*S + crank*D*iS
-            v = sobol.i4_sobol_generate(D,iS,nskip).transpose()
+            v = i4_sobol_generate(D,iS,nskip).transpose()
         elif init.lower() == 'lhs':
             x = np.empty((iS,D), dtype=np.float64)
             v = np.empty((iS,D), dtype=np.float64)
@@ -1046,15 +1132,22 @@ def pso(func, x0, lb, ub,
 
         # Calculate first objective and constraints for each particle
         if processes > 1:
-            fs = np.array(mp_pool.map(is_feasible, x))
-            ii = np.where(fs)[0]
-            if ii.size > 0:
-                fx[ii] = np.array(mp_pool.map(obj, x[ii,:]))
+            try:
+                fs = np.array(mp_pool.map(is_feasible, x))
+                ii = np.where(fs)[0]
+                if ii.size > 0:
+                    if cache is None:
+                        fx[ii] = np.array(mp_pool.map(obj, x[ii,:]))
+                    else:
+                        fx[ii] = np.array(cache.map(obj, x[ii,:], mapper=mp_pool.map))
+            except BaseException:
+                mp_pool.terminate()
+                raise
         else:
             for i in range(iS):
                 fs[i] = is_feasible(x[i,:])
                 if fs[i]:
-                    fx[i] = obj(x[i,:])
+                    fx[i] = cobj(x[i,:])
         # maximise
         if maxit: fx *= -1.
 
@@ -1144,6 +1237,11 @@ def pso(func, x0, lb, ub,
                           parameterfile1, parameterwriter, objectivefile1, objectivereader, shell, debug, passrank)
         else:
             obj = partial(_obj_wrapper, func, arg, kwarg)
+        # Objective with cache for evaluations in this process
+        if cache is None:
+            cobj = obj
+        else:
+            cobj = partial(_cache_wrapper, cache, obj)
 
         # Check for constraint function(s) and partialise them
         if f_ieqcons is None:
@@ -1165,8 +1263,169 @@ def pso(func, x0, lb, ub,
             import multiprocessing
             mp_pool = multiprocessing.Pool(processes)
 
+    # Iterate swarm asynchronously:
+    # update and resubmit each particle as soon as its evaluation returns
+    ustat = None
+    if asynchronous:
+        from collections import deque
+        try:
+            import queue
+        except ImportError:
+            import Queue as queue
+        aeval = partial(_async_eval_wrapper, is_feasible, obj)
+        ceval = partial(_async_eval_wrapper, is_feasible, cobj)
+        inpool = np.zeros(S, dtype=bool) # particles evaluated in pool
+        cached = np.zeros(S, dtype=bool) # particles with function value in cache
+        if nqueue is None: nqueue = max(processes, 1)
+        vmax  = np.abs(ub - lb)
+        vmin  = -vmax
+        done  = queue.Queue()   # returned evaluations
+        ready = deque(range(S)) # particles waiting for evaluation at x
+        nrun  = 0               # evaluations in work queue
+        neval = 0               # evaluations in current iteration
+        nall  = 0               # all evaluations including cached
+        tev   = []              # time per evaluation, without cached
+        busy  = dict()          # summed evaluation time per process, without cached
+        stop  = it >= maxn
+        it0   = it              # iterations before asynchronous PSO
+        t0    = time.time()
+        try:
+            while True:
+                # fill the bounded work queue
+                while (not stop) and (nrun < nqueue) and (len(ready) > 0):
+                    i = ready.popleft()
+                    cached[i] = (cache is not None) and (x[i,:] in cache)
+                    if (processes > 1) and (not cached[i]):
+                        inpool[i] = True
+                        if sys.version_info[0] > 2:
+                            # errors such as pickling are put in the queue as well
+                            mp_pool.apply_async(aeval, (i, x[i,:].copy()), callback=done.put, error_callback=done.put)
+                        else:
+                            mp_pool.apply_async(aeval, (i, x[i,:].copy()), callback=done.put)
+                    else:
+                        # serial or cached
+                        done.put(ceval(i, x[i,:]))
+                    nrun += 1
+                if nrun == 0: break
+
+                # next returned evaluation
+                res = done.get()
+                nrun -= 1
+                if isinstance(res, BaseException): raise res
+                i, fsi, fxi, pid, ts, te = res
+                nall += 1
+                # cached values are taken in this process and do not count for utilization
+                if not cached[i]:
+                    tev.append(te-ts)
+                    busy[pid] = busy.get(pid, 0.) + (te-ts)
+                # cache function value of evaluation in pool
+                if inpool[i]:
+                    inpool[i] = False
+                    if (cache is not None) and fsi:
+                        cache.update([(cache.key(x[i,:]), fxi)], misses=1)
+
+                # Store particle's best position (if constraints are satisfied)
+                fs[i] = fsi
+                if fsi:
+                    fx[i] = -fxi if maxit else fxi
+                    # NaN/Inf
+                    if not np.isfinite(fx[i]):
+                        large = max(fp.max(), fx[np.isfinite(fx)].max())
+                        large = 1.1*large if large>0. else 0.9*large
+                        fx[i] = large
+                    if fx[i] < fp[i]:
+                        p[i,:] = x[i,:].copy()
+                        fp[i]  = fx[i]
+                gp  = p
+                fgp = fp
+
+                # Stop if minimum found, only wait for evaluations in work queue
+                if (not stop) and (fgp.min() < minobj):
+                    if verbose>=1: print('minobj found (1).')
+                    stop = True
+                if stop: continue
+
+                # Best neighbor of particle
+                if (topology.lower() == 'gbest') or (topology.lower() == 'mbest'):
+                    ii = np.argmin(fgp)
+                else:
+                    nn = get_neighbor_indeces(i, S, topology, kl=kl)
+                    ii = nn[np.argmin(fgp[nn])]
+                gi = gp[ii,:]
+
+                # Update the particle's velocity
+                if (strategy.lower() == 'fips') or (strategy.lower() == 'nips'):
+                    rand = np.random.uniform(size=(2+S,D))
+                else:
+                    rand = np.random.uniform(size=(2,D))
+                rp = rand[0,:]
+                rg = rand[1,:]
+                if strategy.lower() == 'original':    # Kennedy & Eberhart, 2001
+                    v[i,:] = inertia*v[i,:] + phip*rp*(p[i,:] - x[i,:]) + phig*rg*(gi - x[i,:])
+                    v[i,:] = np.clip(v[i,:], vmin, vmax)
+                elif strategy.lower() == 'inertia':   # Shi & Eberhart (1998)
+                    inertia = imax - float(it)/float(maxn-1) * (imax-imin)
+                    v[i,:] = inertia*v[i,:] + phip*rp*(p[i,:] - x[i,:]) + phig*rg*(gi - x[i,:])
+                    v[i,:] = np.clip(v[i,:], vmin, vmax)
+                elif strategy.lower() == 'canonical': # Clerc & Kennedy (2000)
+                    v[i,:] = inertia * (v[i,:] + phip*rp*(p[i,:] - x[i,:]) + phig*rg*(gi - x[i,:]))
+                    v[i,:] = np.clip(v[i,:], lb, ub)
+                elif strategy.lower() == 'fips':      # Mendes & Kennedy (2004)
+                    acc_coeff = (phip + phig) / float(S)
+                    ri = rand[2:,:]
+                    v[i,:] = inertia * (v[i,:] + np.sum(ri[:,:]*acc_coeff*(gp[:,:]-x[i,:]), axis=0))
+                elif strategy.lower() == 'nips':      # Mendes & Kennedy (2004)
+                    acc_coeff = (phip + phig) / float(S)
+                    ri = rand[2:,:]
+                    ii = get_neighbor_indeces(i, S, topology, kl=kl)
+                    v[i,:] = inertia * (v[i,:] + np.sum(ri[ii,:]*acc_coeff*(gp[ii,:]-x[i,:]), axis=0))
+
+                # Update the particle's position, limited to bounds, and resubmit
+                x[i,:] = np.clip(np.where(mask1, x[i,:] + v[i,:], x0), lb, ub)
+                ready.append(i)
+
+                # One iteration per swarmsize evaluations
+                neval += 1
+                if neval == S:
+                    neval = 0
+                    it   += 1
+                    if it >= maxn: stop = True
+
+                    # save restart
+                    if restartfile1 is not None:
+                        rs1, rs2, rs3, rs4, rs5 = np.random.get_state()
+                        exec("savez_compressed("+saveargarray+")")
+                        p2 = open(restartfile2, 'w')
+                        exec("print("+saveargint+", file=p2)")
+                        exec("print("+saveargfloat+", file=p2)")
+                        exec("print("+saveargbool+", file=p2)")
+                        exec("print("+saveargstring+", file=p2)")
+                        p2.close()
+        except BaseException:
+            if processes > 1: mp_pool.terminate()
+            raise
+        finally:
+            if processes > 1:
+                mp_pool.close()
+                mp_pool.join()
+        # end of asynchronous swarm iteration
+
+        # utilization of processes
+        twall = max(time.time() - t0, 1e-12)
+        nproc = max(processes, 1)
+        tbusy = sum(busy.values())
+        ustat = {'neval': nall, 'wall': twall, 'busy': tbusy,
+                 'utilization': tbusy/(nproc*twall),
+                 'workers': [ busy[k]/twall for k in sorted(busy) ],
+                 'tmean': np.mean(tev) if len(tev) > 0 else 0.,
+                 'tmin': np.min(tev) if len(tev) > 0 else 0.,
+                 'tmax': np.max(tev) if len(tev) > 0 else 0.}
+        if verbose>=1:
+            print('Asynchronous evaluations: {:d}, wall time: {:.3f} s, utilization of {:d} processes: {:.1f}%'.format(
+                ustat['neval'], twall, nproc, 100.*ustat['utilization']))
+
     # Iterate swarm
-    while it < maxn:
+    while (not asynchronous) and (it < maxn):
         # Stop if minimum found
         if fgp.min() < minobj:
             if (verbose>=1) and (crank == 0): print('minobj found (1).')
@@ -1189,12 +1448,12 @@ def pso(func, x0, lb, ub,
                 # stepsize is lower or equal to closest particle - lots of steps with improvements
                 iib = allnorm.argmin()
                 dx = np.abs(gp[iib,:]-xl)
-                xnew, fxnew, ilgood = rwde(obj, is_feasible,
+                xnew, fxnew, ilgood = rwde(cobj, is_feasible,
                                            xl, fxl,
                                            xl-dx, xl+dx,
                                            lb, ub, x0, mask1, maxit, nlocal=nlocal)
                 # # take global minimum for x and p
-                # xnew, fxnew, ilgood = cbls(obj, is_feasible,
+                # xnew, fxnew, ilgood = cbls(cobj, is_feasible,
                 #                            xl, fxl, # x, f(x)
                 #                            xl,      # p - particles best
                 #                            xl-dx, xl+dx,
@@ -1253,12 +1512,12 @@ def pso(func, x0, lb, ub,
                     # dx      = np.abs(p[i,:]-xl)      # stepzise in real parameter range
                     norm    = np.linalg.norm(range2range01(p[i,:],lb,ub)-xl01)
                     if norm < rrwde:
-                        xnew, fxnew, ilgood = rwde(obj, is_feasible,
+                        xnew, fxnew, ilgood = rwde(cobj, is_feasible,
                                                    xl, fxl,
                                                    xl-dx, xl+dx,
                                                    lb, ub, x0, mask1, maxit, nlocal=nlocal)
                     else:
-                        xnew, fxnew, ilgood = cbls(obj, is_feasible,
+                        xnew, fxnew, ilgood = cbls(cobj, is_feasible,
                                                    xl, fxl, # x, f(x)
                                                    p[i,:],  # p - particles best
                                                    xl-dx, xl+dx,
@@ -1355,16 +1614,23 @@ def pso(func, x0, lb, ub,
 
         # Update objectives and constraints
         if processes > 1:
-            fs = np.array(mp_pool.map(is_feasible, x))
-            ii = np.where(fs)[0]
-            if ii.size > 0:
-                fx[ii] = np.array(mp_pool.map(obj, x[ii,:]))
-                if maxit: fx[ii] *= -1.
+            try:
+                fs = np.array(mp_pool.map(is_feasible, x))
+                ii = np.where(fs)[0]
+                if ii.size > 0:
+                    if cache is None:
+                        fx[ii] = np.array(mp_pool.map(obj, x[ii,:]))
+                    else:
+                        fx[ii] = np.array(cache.map(obj, x[ii,:], mapper=mp_pool.map))
+                    if maxit: fx[ii] *= -1.
+            except BaseException:
+                mp_pool.terminate()
+                raise
         else:
             for i in range(iS):
                 fs[i] = is_feasible(x[i,:])
                 if fs[i]:
-                    fx[i] = obj(x[i,:])
+                    fx[i] = cobj(x[i,:])
                     if maxit: fx[i] *= -1.
 
         # NaN/Inf
@@ -1426,6 +1692,10 @@ def pso(func, x0, lb, ub,
 
     if not any(map(is_feasible, gp)) and (crank == 0): print("PSO could not find any feasible point in the search space.")
 
+    if (cache is not None) and (verbose>=1):
+        cstat = cache.stats()
+        print('Cache on process {:d}: {:d} hits, {:d} misses.'.format(crank, cstat['hits'], cstat['misses']))
+
     # write parameter file with best parameters
     if crank == 0:
         if isinstance(func, (str,list)):
@@ -1440,7 +1710,12 @@ def pso(func, x0, lb, ub,
     if pout:
         out += [p, fp]
     if cout:
-        out += [it*S+tlocal]
+        if asynchronous:
+            out += [it0*S+ustat['neval']]
+        else:
+            out += [it*S+tlocal]
+    if uout:
+        out += [ustat]
 
     return out
 
@@ -1615,6 +1890,19 @@ if __name__ == '__main__':
     #                    seed=seed, restart=False)
     # if crank == 0: print('Rosenbrock constraint - ', bestx, bestf)
 
+    # # Asynchronous PSO
+    # from jams.functions import rosenbrock
+    # npara = 2
+    # lb = -2*np.ones(npara)
+    # ub = 5*np.ones(npara)
+    # x0 = np.zeros(npara)
+    # seed = 1234
+    # bestx, bestf, ustat = pso(rosenbrock, x0, lb, ub, processes=4, asynchronous=True,
+    #                           init='lhs', strategy='canonical', topology='gbest', verbose=1,
+    #                           swarmsize=40, maxn=250, restartfile1=None,
+    #                           seed=seed, uout=True)
+    # print('Rosenbrock asynchronous - ', bestx, bestf, ustat['utilization'])
+
     # # Clean up doctest
     # import os
     # os.remove('pso.restart.npz')
@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+import os
+import hashlib
+import shutil
+import numpy as np
+
+"""
+    Binary cache for fread, sread and fsread.
+
+    The outputs of a read are stored as .npy files in a sidecar directory
+    so that later reads of the same unchanged file with the same arguments
+    load the binary files instead of parsing the ascii file.
+    Numeric arrays are memory-mapped (copy-on-write) on load.
+
+
+    Definition
+    ----------
+    def readcache(func, infile, cache=True, **kwargs):
+    def clear_readcache(infile, cache=True):
+
+
+    License
+    -------
+    This file is part of the JAMS Python package, distributed under the MIT
+    License. The JAMS Python package originates from the former UFZ Python library,
+    Department of Computational Hydrosystems, Helmholtz Centre for Environmental
+    Research - UFZ, Leipzig, Germany.
+
+    Copyright (c) 2026 Matthias Cuntz - mc (at) macu (dot) de
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+
+    History
+    -------
+    Written,  MC, Oct 2026
+"""
+
+__all__ = ['readcache', 'clear_readcache']
+
+
+def readcache(func, infile, cache=True, **kwargs):
+    """
+        Call func(infile, **kwargs) through a binary cache on disk.
+
+        The cache entry of infile is identified by the name of func and the keyword
+        arguments. It is valid as long as modification time and size of infile do not
+        change. Otherwise infile is read again and the cache entry is overwritten.
+
+        Outputs are stored as .npy files in the directory
+            dirname(infile)/.jams_cache/basename(infile)-phash-hash
+        where phash is made from the full path of infile, and hash from the full path of infile, func and kwargs.
+        The keyword engine is not part of hash because both engines give the same output.
+        Numeric and string arrays are memory-mapped in copy-on-write mode on load.
+        Lists are stored as string arrays and returned as lists.
+        Outputs that cannot be stored exactly, e.g. lists of mixed types, are not cached.
+
+
+        Definition
+        ----------
+        def readcache(func, infile, cache=True, **kwargs):
+
+
+        Input
+        -----
+        func         read function such as fread, sread or fsread, called as
+                     func(infile, cache=False, **kwargs)
+        infile       source file name
+
+
+        Optional Input Parameters
+        -------------------------
+        cache        True: cache directory .jams_cache in directory of infile (default)
+                     string: name of cache directory
+        **kwargs     keyword arguments passed to func
+
+
+        Output
+        ------
+        Output of func(infile, **kwargs)
+
+
+        Examples
+        --------
+        >>> from jams.fread import fread
+        >>> filename = 'test_readcache.dat'
+        >>> ff = open(filename,'w')
+        >>> ff.writelines('head1 head2 head3 head4\\n')
+        >>> ff.writelines('1.1 1.2 1.3 1.4\\n')
+        >>> ff.writelines('2.1 2.2 2.3 2.4\\n')
+        >>> ff.close()
+
+        >>> # First read parses the file and writes the cache, second read loads the cache
+        >>> print(readcache(fread, filename, skip=1, nc=[1,3]))
+        [[1.2 1.4]
+         [2.2 2.4]]
+        >>> dat = readcache(fread, filename, skip=1, nc=[1,3])
+        >>> print(type(dat).__name__, dat)
+        memmap [[1.2 1.4]
+         [2.2 2.4]]
+        >>> dat = readcache(fread, filename, skip=1, nc=[1,3], engine='numpy')
+        >>> print(type(dat).__name__)
+        memmap
+        >>> print(readcache(fread, filename, skip=1, nc=[1,3], header=True))
+        ['head2', 'head4']
+
+        >>> # Changing the file invalidates the cache
+        >>> ff = open(filename,'a')
+        >>> ff.writelines('3.1 3.2 3.3 3.4\\n')
+        >>> ff.close()
+        >>> print(readcache(fread, filename, skip=1, nc=[1,3]))
+        [[1.2 1.4]
+         [2.2 2.4]
+         [3.2 3.4]]
+
+        >>> # Clean up doctest
+        >>> clear_readcache(filename)
+        >>> import os
+        >>> os.remove(filename)
+        >>> os.rmdir('.jams_cache')
+    """
+    cdir = _cache_dir(infile, cache)
+    sfun = func.__name__
+    # both engines give the same output
+    keys = sorted([ k for k in kwargs.keys() if k != 'engine' ])
+    args = ', '.join([ '{:s}={!r}'.format(k, _hashable(kwargs[k])) for k in keys ])
+    ident = os.path.abspath(infile)+': '+sfun+'('+args+')'
+    hsh  = hashlib.sha1(ident.encode('utf-8')).hexdigest()[:16]
+    edir = os.path.join(cdir, _entry_base(infile)+hsh)
+    st   = os.stat(infile)
+    stat = '{:d} {:d}'.format(getattr(st, 'st_mtime_ns', int(st.st_mtime*1e9)), st.st_size)
+
+    # Try cache
+    out = _load_entry(edir, stat)
+    if out is not None:
+        return out
+
+    # Read and write cache
+    out = func(infile, cache=False, **kwargs)
+    _save_entry(edir, stat, out)
+
+    return out
+
+
+def clear_readcache(infile, cache=True):
+    """
+        Remove all cache entries of a file written by readcache,
+        i.e. by fread, sread and fsread with cache=True.
+
+
+        Definition
+        ----------
+        def clear_readcache(infile, cache=True):
+
+
+        Input
+        -----
+        infile       source file name
+
+
+        Optional Input Parameters
+        -------------------------
+        cache        True: cache directory .jams_cache in directory of infile (default)
+                     string: name of cache directory
+
+
+        Output
+        ------
+        None
+
+
+        Examples
+        --------
+        --> see readcache
+    """
+    cdir = _cache_dir(infile, cache)
+    if not os.path.isdir(cdir): return
+    # only entries of this path, also in cache directories shared by files with the same name
+    base = _entry_base(infile)
+    for ee in os.listdir(cdir):
+        if ee.startswith(base) and (len(ee) == len(base)+16):
+            shutil.rmtree(os.path.join(cdir, ee), ignore_errors=True)
+
+    return
+
+
+# Directory of cache
+def _cache_dir(infile, cache):
+    if isinstance(cache, str):
+        return cache
+    else:
+        return os.path.join(os.path.dirname(os.path.abspath(infile)), '.jams_cache')
+
+
+# Start of names of cache entries of infile: basename-hash of full path-
+def _entry_base(infile):
+    phsh = hashlib.sha1(os.path.abspath(infile).encode('utf-8')).hexdigest()[:8]
+    return os.path.basename(infile)+'-'+phsh+'-'
+
+
+# Representation of keyword values independent of the type of iterable
+def _hashable(val):
+    if isinstance(val, (list, tuple, np.ndarray)):
+        return [ _hashable(v) for v in val ]
+    elif isinstance(val, range):
+        return list(val)
+    else:
+        return val
+
+
+# Load cache entry if it exists and corresponds to stat of file
+def _load_entry(edir, stat):
+    sfile = os.path.join(edir, 'stat')
+    if not os.path.isfile(sfile): return None
+    with open(sfile, 'r') as f:
+        lines = f.read().splitlines()
+    if (len(lines) < 3) or (lines[0] != stat): return None
+    kinds = lines[1].split()
+    out   = list()
+    for i, kind in enumerate(kinds):
+        try:
+            arr = np.load(os.path.join(edir, '{:d}.npy'.format(i)), mmap_mode='c')
+        except (IOError, ValueError):
+            return None
+        if kind == 'list':
+            arr = np.asarray(arr).tolist()
+        out.append(arr)
+    if lines[2] == 'single':
+        return out[0]
+    else:
+        return tuple(out)
+
+
+# Write cache entry; do not write anything if outputs are not arrays or lists of one type
+def _save_entry(edir, stat, out):
+    single = not isinstance(out, tuple)
+    if single: out = (out,)
+    kinds = list()
+    arrs  = list()
+    for oo in out:
+        if isinstance(oo, np.ndarray):
+            if (oo.dtype == object) or (oo.size == 0): return
+            kinds.append('array')
+            arrs.append(oo)
+        elif isinstance(oo, list):
+            try:
+                arr = np.array(oo)
+            except ValueError:
+                return # ragged lists
+            if (arr.dtype == object) or (arr.size == 0) or (arr.tolist() != oo): return
+            kinds.append('list')
+            arrs.append(arr)
+        else:
+            return
+    try:
+        if os.path.isdir(edir): shutil.rmtree(edir)
+        os.makedirs(edir)
+        for i, arr in enumerate(arrs):
+            np.save(os.path.join(edir, '{:d}.npy'.format(i)), arr)
+        # stat last so that incomplete entries are not valid
+        with open(os.path.join(edir, 'stat'), 'w') as f:
+            print(stat, file=f)
+            print(' '.join(kinds), file=f)
+            print('single' if single else 'tuple', file=f)
+    except (IOError, OSError):
+        # e.g. read-only directory
+        shutil.rmtree(edir, ignore_errors=True)
+
+    return
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
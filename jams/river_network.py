@@ -34,9 +34,6 @@ yy_offset = yy_offset.ravel() # yy_offset for neighboring cells
 xx_offset = xx_offset.ravel() # xx_offset for neighboring cells
 # local flow direction sorted in the order of yy_offset and xx_offset
 local_flow_direction = np.array([8, 16, 32, 4, -1, 64, 2, 1, 128])
-# same as local_flow_direction but reverted. This means these are the
-# flow directions of neighboring cells flowing into the local cell.
-inflow_direction = np.array([128, 1, 2, 64, -9999, 4, 32, 16, 8])
 
 
 def cal_fdir(locs, fdir, factor):
@@ -50,37 +47,27 @@ def cal_fdir(locs, fdir, factor):
     #
     # ORIGIN is in the upper left corner -> y axis increases to the bottom
     # loc = [nrow, ncol]
-    nloc = locs[0].shape[0]
-    fds = np.zeros((nloc))
-    for kk in range(nloc):
-        # loop over all locations having maximum flow direction
-        loc = [locs[0][kk], locs[1][kk]]
-        fd = fdir[loc[0], loc[1]]
-        if fd == 2:
-            if loc[1] + 1 < factor:
-                fd = 4
-            elif loc[0] + 1 < factor:
-                fd = 1
-        elif fd == 8:
-            if loc[1] > 0:
-                fd = 4
-            elif loc[0] + 1 < factor:
-                fd = 16
-        elif fd == 32:
-            if loc[1] > 0:
-                fd = 64
-            elif loc[0] > 0:
-                fd = 16
-        elif fd == 128:
-            if loc[1] + 1 < factor:
-                fd = 64
-            elif loc[0] > 0:
-                fd = 1
-        fds[kk] = fd
+    locs = (np.asarray(locs[0]), np.asarray(locs[1]))
+    return _coarse_fdir(np.ma.getdata(fdir)[locs], locs[0], locs[1], factor)
+
+
+# coarse flow direction of fine cells with flow directions fd at rows yloc and columns xloc within a block of factor x factor cells
+def _coarse_fdir(fd, yloc, xloc, factor):
+    fds = np.array(fd, dtype=np.float64)
+    # diagonal flow directions pointing into the block
+    fds = np.where((fd == 2)   & (xloc + 1 < factor), 4,
+          np.where((fd == 2)   & (yloc + 1 < factor), 1, fds))
+    fds = np.where((fd == 8)   & (xloc > 0),          4,
+          np.where((fd == 8)   & (yloc + 1 < factor), 16, fds))
+    fds = np.where((fd == 32)  & (xloc > 0),          64,
+          np.where((fd == 32)  & (yloc > 0),          16, fds))
+    fds = np.where((fd == 128) & (xloc + 1 < factor), 64,
+          np.where((fd == 128) & (yloc > 0),          1, fds))
     return fds
 
 
-def upscale_fdir(sn, factor, print_info=False, return_maxlocs=False, do_co=False, redo_fa=True, missing_value=-9999.):
+def upscale_fdir(sn, factor, print_info=False, return_maxlocs=False, do_co=False, redo_fa=True, missing_value=-9999.,
+                 maxlocs_array=False):
     """
         Upscales a river network by a factor (integer > 1), that has to be a divisible of the
         resolution of the flow direction. Direction is given by the cell with the largest flow
@@ -88,13 +75,15 @@ def upscale_fdir(sn, factor, print_info=False, return_maxlocs=False, do_co=False
 
         Definition
         ----------
-        upscale_fdir(sn, factor, print_info=False, return_maxlocs=False, do_co=False, redo_fa=True)
+        upscale_fdir(sn, factor, print_info=False, return_maxlocs=False, do_co=False, redo_fa=True,
+                     missing_value=-9999., maxlocs_array=False)
 
 
         Input
         -----
         sn            river_network object containing flow direction, flow accumulation and sinks
-        factor        integer indicating by which factor the flow direction should be upscaled
+        factor        integer indicating by which factor the flow direction should be upscaled,
+                      or list of integers to upscale the same river_network by several factors
 
         Optional Input Parameters
         -------------------------
@@ -102,6 +91,11 @@ def upscale_fdir(sn, factor, print_info=False, return_maxlocs=False, do_co=False
         return_maxlocs flag for return locations of cell determining flow directions at given river_network object
         do_co          flag for calculating channel order
         redo_fa        flow recalculating flow accumulation at coarser river_network
+        missing_value  fill value of upscaled flow direction and accumulation
+        maxlocs_array  flag for returning maxlocs as two integer masked arrays with the shape of the
+                       upscaled flow direction, giving row and column of the cell determining the flow
+                       direction of each coarse cell, instead of a list of all cells with maximum flow
+                       accumulation per coarse cell
 
         Options
         -------
@@ -109,6 +103,8 @@ def upscale_fdir(sn, factor, print_info=False, return_maxlocs=False, do_co=False
         Output
         ------
         river_network object at coarser resolution with upscaled flow direction
+        maxlocs, river_network object if return_maxlocs
+        list of the above if factor is a list
 
         Restrictions
         ------------
@@ -146,6 +142,17 @@ def upscale_fdir(sn, factor, print_info=False, return_maxlocs=False, do_co=False
         [[1.0 2.0 4.0]
          [64.0 16.0 4.0]
          [64.0 64.0 1.0]]
+        >>> maxlocs, sn3 = upscale_fdir(sn, 3, return_maxlocs=True, maxlocs_array=True)
+        >>> print(maxlocs[0])
+        [[2 2 2]
+         [3 5 5]
+         [6 6 6]]
+        >>> print(maxlocs[1])
+        [[2 5 7]
+         [2 3 6]
+         [1 3 8]]
+        >>> print([ sn3.fdir.shape for sn3 in upscale_fdir(sn, [1, 3, 9]) ])
+        [(9, 9), (3, 3), (1, 1)]
 
 
         License
@@ -180,56 +187,76 @@ def upscale_fdir(sn, factor, print_info=False, return_maxlocs=False, do_co=False
         -------
         Written,  ST, Feb 2016
         Modified, MC, Nov 2016 - ported to Python 3
+                  MC, Oct 2026 - vectorized over blocks, list of factors, maxlocs_array
     """
     # consistency checks
     if not np.ma.isMaskedArray(sn.fa):
         raise ValueError('***ERROR: upscale_fdir requires flow accumulation as masked array in river_network')
+    # fine scale flow accumulation is prepared once for all factors
+    fa_mask = np.ma.getmaskarray(sn.fa)
+    fa_fill = np.where(fa_mask, -np.inf, np.ma.getdata(sn.fa).astype(np.float64))
+    if np.ndim(factor) == 0:
+        return _upscale_fdir(sn, int(factor), fa_fill, fa_mask, print_info=print_info,
+                             return_maxlocs=return_maxlocs, do_co=do_co, redo_fa=redo_fa,
+                             missing_value=missing_value, maxlocs_array=maxlocs_array)
+    else:
+        return [ _upscale_fdir(sn, int(ff), fa_fill, fa_mask, print_info=print_info,
+                               return_maxlocs=return_maxlocs, do_co=do_co, redo_fa=redo_fa,
+                               missing_value=missing_value, maxlocs_array=maxlocs_array)
+                 for ff in factor ]
+
+
+# upscale_fdir for one factor, fa_fill is flow accumulation with masked values set to -inf
+def _upscale_fdir(sn, factor, fa_fill, fa_mask, print_info=False, return_maxlocs=False, do_co=False,
+                  redo_fa=True, missing_value=-9999., maxlocs_array=False):
     if any(np.array(sn.fdir.shape) % factor != 0):
         raise ValueError('***ERROR: factor: ' + str(factor) + ' is not a divisible of flow direction shape')
-    # create upscaled arrays
-    new_shape = np.array(sn.fdir.shape) // factor
-    new_fd = np.ma.masked_array(np.zeros(new_shape) + missing_value,
-                                mask=np.ones(new_shape), fill_value=missing_value)
-    new_fa = np.ma.masked_array(np.zeros(new_shape) + missing_value,
-                                mask=np.ones(new_shape), fill_value=missing_value)
-
-    # create maxlocs list
-    maxlocs = []
-    for ii in range(new_fd.shape[0]):
-        for jj in range(new_fd.shape[1]):
-            # extract part of map evaluated
-            tmp_fa = sn.fa[ii * factor: (ii + 1) * factor, jj * factor: (jj + 1) * factor]
-            tmp_fd = sn.fdir[ii * factor: (ii + 1) * factor, jj * factor: (jj + 1) * factor]
-            if np.all(tmp_fa.mask):
-                if print_info: print('cell is masked ', ii, jj)
-                # cell is masked
-                new_fd[ii, jj] = -9999.
-                new_fa[ii, jj] = -9999.
-            else:
-                # determine locations of maximum flow accumulations
-                maxloc = np.ma.where(tmp_fa == np.ma.amax(tmp_fa))
-                # calculate coarse scale flow direction
-                coarse_fd = cal_fdir(maxloc, tmp_fd, factor)
-                if maxloc[0].shape[0] > 1:
-                    # if there is more than one outflow cell, check whether flow directions are different
-                    if print_info:
-                        print(coarse_fd, ' flow directions of same cells')
-                    # evaluate when there are more than one cell if maximum flow directions are different
-                    if np.any(np.diff(coarse_fd) > 0):
-                        print('***Warning: multiple cells with same flow accumulation but different flow directions found, arbitrarily choose first one')
-                # store flow direction and flow accumulation
-                new_fd[ii, jj] = coarse_fd[0]
-                new_fa[ii, jj] = tmp_fa[maxloc[0][0], maxloc[1][0]]
-                if print_info:
-                    print('maxloc = ', maxloc)
-                    print('tmp_fd = ', tmp_fd[maxloc], coarse_fd[0])
-                    print('tmp_fa = ', tmp_fa[maxloc])
-                    print('----------------')
-                    print('new_fd = ', new_fd[ii, jj])
-                    print('new_fa = ', new_fa[ii, jj])
-                    print('================')
-                # add to store maximum locations
-                maxlocs.append([maxloc[0] + ii * factor, maxloc[1] + jj * factor])
+    # blocks of factor x factor cells, cells of block in last dimension in row-major order
+    new_shape = tuple(np.array(sn.fdir.shape) // factor)
+    def blocks(arr):
+        return arr.reshape((new_shape[0], factor, new_shape[1], factor)).swapaxes(1, 2).reshape(new_shape + (factor * factor,))
+    bfa   = blocks(fa_fill)
+    bmask = np.all(blocks(fa_mask), axis=2)
+    # coarse scale flow direction of all cells
+    kk    = np.arange(factor * factor)
+    bfd   = _coarse_fdir(blocks(np.ma.getdata(sn.fdir)), kk // factor, kk % factor, factor)
+    # first location of maximum flow accumulation in each block
+    imax  = np.argmax(bfa, axis=2)
+    famax = np.take_along_axis(bfa, imax[..., np.newaxis], axis=2)[..., 0]
+    coarse_fd = np.take_along_axis(bfd, imax[..., np.newaxis], axis=2)[..., 0]
+    yloc  = imax // factor
+    xloc  = imax % factor
+    iy, ix = np.meshgrid(np.arange(new_shape[0]), np.arange(new_shape[1]), indexing='ij')
+    yfine = yloc + iy * factor
+    xfine = xloc + ix * factor
+    new_fd = np.ma.masked_array(np.where(bmask, -9999., coarse_fd), mask=np.zeros(new_shape, dtype=bool),
+                                fill_value=missing_value)
+    new_fa = np.ma.masked_array(np.where(bmask, -9999., famax), mask=np.zeros(new_shape, dtype=bool),
+                                fill_value=missing_value)
+    # all locations of maximum flow accumulations
+    ismax = (bfa == famax[..., np.newaxis]) & ~bmask[..., np.newaxis]
+    nmax  = np.sum(ismax, axis=2)
+    # if there is more than one outflow cell, check whether flow directions are different
+    if print_info:
+        for ii, jj in zip(*np.where(nmax > 1)):
+            print(bfd[ii, jj][ismax[ii, jj]], ' flow directions of same cells')
+    bb  = np.nonzero(ismax.reshape((-1, factor * factor)))[0]
+    fds = bfd[ismax]
+    # evaluate when there are more than one cell if maximum flow directions are different
+    for ii in np.unique(bb[1:][(bb[1:] == bb[:-1]) & (np.diff(fds) > 0)]):
+        print('***Warning: multiple cells with same flow accumulation but different flow directions found, arbitrarily choose first one')
+    if print_info:
+        for ii, jj in zip(*np.where(bmask)):
+            print('cell is masked ', ii, jj)
+    # maxlocs
+    if return_maxlocs:
+        if maxlocs_array:
+            maxlocs = [np.ma.masked_array(yfine, mask=bmask), np.ma.masked_array(xfine, mask=bmask)]
+        else:
+            kk = np.nonzero(ismax.reshape((-1, factor * factor)))[1]
+            kk = np.split(kk, np.cumsum(nmax.ravel())[:-1])
+            maxlocs = [ [kk[bb] // factor + iy.flat[bb] * factor, kk[bb] % factor + ix.flat[bb] * factor]
+                        for bb in np.where(~bmask.ravel())[0] ]
     # upscale sinks
     upscale_sinks = tuple(np.array(sn.sinks)/int(factor))
     # return
@@ -402,30 +429,27 @@ class river_network(object):
                                          mask=np.ones(self.fdir.shape), fill_value=missing_value)
             self.fa = np.ma.masked_array(np.zeros(self.fdir.shape) + missing_value,
                                          mask=np.ones(self.fdir.shape), fill_value=missing_value)
-            for ii in range(self.sinks[0].shape[0]):
-                self.co, self.fa = self.network_properties(self.fdir, self.sinks[0][ii], self.sinks[1][ii],
-                                                           do_co=do_co, co=self.co,
-                                                           do_fa=do_fa, fa=self.fa,
-                                                           missing_value=missing_value,
-                                                           print_info=print_info)
+            self.co, self.fa = self.network_properties(self.fdir, self.sinks[0], self.sinks[1],
+                                                       do_co=do_co, co=self.co,
+                                                       do_fa=do_fa, fa=self.fa,
+                                                       missing_value=missing_value,
+                                                       print_info=print_info)
         elif do_co and not do_fa:
             self.co = np.ma.masked_array(np.zeros(self.fdir.shape) + missing_value,
                                          mask=np.ones(self.fdir.shape), fill_value=missing_value)
-            for ii in range(self.sinks[0].shape[0]):
-                self.co = self.network_properties(self.fdir, self.sinks[0][ii], self.sinks[1][ii],
-                                                  do_co=do_co, co=self.co,
-                                                  do_fa=do_fa,
-                                                  missing_value=missing_value,
-                                                  print_info=print_info)
+            self.co = self.network_properties(self.fdir, self.sinks[0], self.sinks[1],
+                                              do_co=do_co, co=self.co,
+                                              do_fa=do_fa,
+                                              missing_value=missing_value,
+                                              print_info=print_info)
         elif not do_co and do_fa:
             self.fa = np.ma.masked_array(np.zeros(self.fdir.shape) + missing_value,
                                          mask=np.ones(self.fdir.shape), fill_value=missing_value)
-            for ii in range(self.sinks[0].shape[0]):
-                self.fa = self.network_properties(self.fdir, self.sinks[0][ii], self.sinks[1][ii],
-                                                  do_co=do_co,
-                                                  do_fa=do_fa, fa=self.fa,
-                                                  missing_value=missing_value,
-                                                  print_info=print_info)
+            self.fa = self.network_properties(self.fdir, self.sinks[0], self.sinks[1],
+                                              do_co=do_co,
+                                              do_fa=do_fa, fa=self.fa,
+                                              missing_value=missing_value,
+                                              print_info=print_info)
 
 
     def flow_direction(self, print_info=False):
@@ -511,21 +535,41 @@ class river_network(object):
             History
             -------
             Written,  ST & DS, Dec 2015
+            Modified, MC, Oct 2026 - vectorized with shifted arrays
         """
-        # global variable used: correct_direction
-        fd = np.zeros(self.dem.shape)
+        # global variables used: yy_offset, xx_offset, local_flow_direction
         #
-        for ii in range(self.dem.shape[0]):
-            for jj in range(self.dem.shape[1]):
-                if self.dem.mask[ii, jj]:
-                    continue
-                if print_info:
-                    print('processing cell: ', ii, jj)
-                # get mask of neighbors and y and x locations
-                neighbors, yy, xx = self._get_neighbors(self.dem, ii, jj)
-                # get position of cell with steepest gradient
-                pos_min = np.ma.argmin(self.dem[yy, xx] - self.dem[ii, jj])
-                fd[ii, jj] = local_flow_direction[neighbors][pos_min]
+        # The neighbor with the smallest elevation difference is searched by comparing shifted arrays
+        # for all neighbors in the order of yy_offset and xx_offset, giving the same result as
+        # np.ma.argmin over the neighbors of each cell, i.e. the first neighbor in case of ties.
+        dem  = np.ma.getdata(self.dem)
+        mask = np.ma.getmaskarray(self.dem)
+        ny, nx = dem.shape
+        if np.issubdtype(dem.dtype, np.floating):
+            huge = np.inf
+        else:
+            huge = np.iinfo(dem.dtype).max
+        fd   = np.zeros(self.dem.shape)
+        dmin = np.zeros(dem.shape, dtype=dem.dtype)   # minimum difference so far
+        isel = np.full(dem.shape, -1, dtype=np.int64) # neighbor with minimum difference so far
+        for kk in range(yy_offset.size):
+            dy = yy_offset[kk]
+            dx = xx_offset[kk]
+            # cells having a neighbor at offset kk, and these neighbors
+            ci = (slice(max(0, -dy), ny - max(0, dy)), slice(max(0, -dx), nx - max(0, dx)))
+            ni = (slice(max(0, dy), ny + min(0, dy)), slice(max(0, dx), nx + min(0, dx)))
+            diff = np.where(mask[ni], huge, dem[ni] - dem[ci])
+            dm   = dmin[ci]
+            il   = isel[ci]
+            # first minimum or first NaN as np.ma.argmin
+            better = (il < 0) | (diff < dm)
+            if np.issubdtype(dem.dtype, np.floating):
+                better |= np.isnan(diff) & ~np.isnan(dm)
+            dm[better] = diff[better]
+            il[better] = kk
+        fd[~mask] = local_flow_direction[isel[~mask]]
+        if print_info:
+            print('flow direction calculated for ', np.sum(~mask), ' cells')
         return fd
 
 
@@ -548,8 +592,8 @@ class river_network(object):
             -----
             self          self - river_network object
             fd            flow direction field, basically river_network.fd
-            yy            row coordinate of sink
-            xx            column coordinate of sink
+            yy            row coordinate(s) of sink(s)
+            xx            column coordinate(s) of sink(s)
 
 
             Optional Input Parameters
@@ -631,6 +675,9 @@ class river_network(object):
             Written,  ST & DS, Dec 2015
             Modified, MC, Nov 2016 - ported to Python 3
                       MC, Oct 2018 - int indices in fa[]
+                      MC, Oct 2026 - arrays of sinks
+                                   - topological order over flat index arrays instead of
+                                     walking upstream cell by cell
         """
         if co is None and do_co:
             co = np.ma.masked_array(np.zeros(fd.shape) + missing_value,
@@ -638,44 +685,11 @@ class river_network(object):
         if fa is None and do_fa:
             fa = np.ma.masked_array(np.zeros(fd.shape) + missing_value,
                                     mask=np.ones(fd.shape), fill_value=missing_value)
-        # flow direction stack to emulate recursion
         if not do_co and not do_fa:
-            raise ValueERROR('***ERROR: neither fa nor co calculated')
-        fd_stack = [[yy, xx]] # start at initial sink
-        while fd_stack:
-            if print_info:
-                print('current flow accumulation stack: ', fd_stack)
-            upstream = self._get_upstream(fd, fd_stack[-1])
-            if print_info:
-                print('upstream locations: ', upstream)
-            if do_co:
-                # use co for identifying upstream cells
-                ext = [l for l in upstream if co.data[int(l[0]),int(l[1])] == missing_value]
-            else:
-                # use fa for identifying upstream cells
-                ext = [l for l in upstream if fa.data[int(l[0]),int(l[1])] == missing_value]
-            if ext:
-                fd_stack.extend(ext)
-                continue
-            # all upstream cells are available
-            # note that headwaters dont have an upstream cell
-            cell = fd_stack.pop() # save cell
-            if do_co:
-                co_upstream = [co[loc[0], loc[1]] for loc in upstream]
-                co_max = np.amax(co_upstream + [1])
-                # if two streams of equal co merge, increment channel order
-                if len(np.where(co_upstream == co_max)[0]) > 1:
-                    co_max += 1
-                co.data[int(cell[0]), int(cell[1])] = co_max
-                co.mask[int(cell[0]), int(cell[1])] = False
-                if print_info:
-                    print('co (channel order) of upstream: ', co_upstream)
-            if do_fa:
-                fa_upstream = [ fa[int(loc[0]), int(loc[1])] for loc in upstream ]
-                fa.data[int(cell[0]), int(cell[1])] = np.sum(fa_upstream) + 1
-                fa.mask[int(cell[0]), int(cell[1])] = False
-                if print_info:
-                    print('sum of upstream: ', np.sum(fa_upstream))
+            raise ValueError('***ERROR: neither fa nor co calculated')
+        sinks = (np.atleast_1d(yy).astype(np.int64), np.atleast_1d(xx).astype(np.int64))
+        self._network_properties(fd, sinks, do_co=do_co, co=co, do_fa=do_fa, fa=fa,
+                                 missing_value=missing_value, print_info=print_info)
         if do_co and do_fa:
             return co, fa
         elif do_co and not do_fa:
@@ -684,36 +698,133 @@ class river_network(object):
             return fa
 
 
+    def _network_properties(self, fd, sinks, do_co=True, co=None, do_fa=True, fa=None,
+                            missing_value=-9999., print_info=False):
+        # Calculates channel order co and/or flow accumulation fa in place for all cells upstream of sinks.
+        #
+        # Cells are processed in topological order from the headwaters downstream in waves over flat
+        # index arrays: a cell is processed as soon as all its upstream cells are processed. Cells that
+        # already have a value other than missing_value in co (fa if not do_co) are not recalculated
+        # and their upstream cells are not visited, except for the sinks themselves.
+        shape   = fd.shape
+        ncell   = fd.size
+        down    = self._get_downstream(fd)
+        # upstream cells of each cell in compressed sparse row format
+        isup    = np.where(down >= 0)[0]
+        order   = isup[np.argsort(down[isup], kind='stable')]
+        nup     = np.bincount(down[isup], minlength=ncell)
+        upstart = np.concatenate(([0], np.cumsum(nup)))
+        # known cells
+        if do_co:
+            known = np.ma.getdata(co).ravel() != missing_value
+        else:
+            known = np.ma.getdata(fa).ravel() != missing_value
+        # visit all cells upstream of the sinks, stop at known cells
+        visited = np.zeros(ncell, dtype=bool)
+        front   = np.unique(np.ravel_multi_index(sinks, shape))
+        visited[front] = True
+        calc    = [front] # cells to calculate
+        while front.size > 0:
+            nn    = nup[front]
+            start = np.repeat(upstart[front] - np.cumsum(nn) + nn, nn)
+            ups   = order[start + np.arange(np.sum(nn))]
+            ups   = ups[~visited[ups]]
+            visited[ups] = True
+            front = ups[~known[ups]]
+            calc.append(front)
+        calc = np.concatenate(calc)
+        docalc = np.zeros(ncell, dtype=bool)
+        docalc[calc] = True
+        if print_info:
+            print('calculating network properties of ', calc.size, ' cells')
+        # accumulators of upstream cells
+        ndone = np.zeros(ncell, dtype=np.int64)
+        if do_fa:
+            fav    = np.ma.getdata(fa).astype(np.float64).ravel()
+            fa_sum = np.zeros(ncell)
+        if do_co:
+            cov    = np.ma.getdata(co).astype(np.float64).ravel()
+            co_max = np.ones(ncell)                  # maximum of upstream channel orders and 1
+            co_num = np.zeros(ncell, dtype=np.int64) # number of upstream cells with co_max
+        # start with headwaters and known upstream cells
+        front = np.where(visited & (~docalc | (nup == 0)))[0]
+        while front.size > 0:
+            # cells of front have all upstream cells processed
+            cc = front[docalc[front]]
+            if do_fa:
+                fav[cc] = fa_sum[cc] + 1.
+            if do_co:
+                cov[cc] = co_max[cc] + (co_num[cc] > 1)
+            # pass to downstream cells, sorted by downstream cell
+            dd    = down[front]
+            ii    = (dd >= 0)
+            ii[ii] = docalc[dd[ii]]
+            src   = front[ii]
+            dd    = dd[ii]
+            isort = np.argsort(dd, kind='stable')
+            src   = src[isort]
+            dd    = dd[isort]
+            if dd.size == 0: break
+            tgt, istart, nn = np.unique(dd, return_index=True, return_counts=True)
+            if do_fa:
+                fa_sum[tgt] += np.add.reduceat(fav[src], istart)
+            if do_co:
+                cup  = cov[src]
+                cmax = np.maximum.reduceat(cup, istart)
+                ncnt = np.add.reduceat((cup == np.repeat(cmax, nn)).astype(np.int64), istart)
+                old  = co_max[tgt]
+                co_num[tgt] = np.where(cmax > old, ncnt, np.where(cmax == old, co_num[tgt] + ncnt, co_num[tgt]))
+                co_max[tgt] = np.maximum(old, cmax)
+            ndone[tgt] += nn
+            front = tgt[ndone[tgt] == nup[tgt]]
+        # cells in loops of flow directions are never reached
+        done = calc[(ndone[calc] == nup[calc])]
+        yy, xx = np.unravel_index(done, shape)
+        if do_fa:
+            fa[yy, xx] = fav[done]
+        if do_co:
+            co[yy, xx] = cov[done]
+        return
+
+
     def _get_sinks(self):
         # set sinks to maximum flow accumulation
         return np.ma.where(self.fa == np.amax(self.fa))
 
 
-    def _get_neighbors(self, arr, yy_loc, xx_loc):
-        # global variables used: yy_offset, xx_offset
+    def _get_downstream(self, fd):
+        # global variables used: yy_offset, xx_offset, local_flow_direction
         #
-        yy_ind = yy_offset + yy_loc
-        xx_ind = xx_offset + xx_loc
-        # create mask for valid neighbors
-        neighbors = ((yy_ind >= 0) &
-                     (yy_ind < arr.shape[0]) &
-                     (xx_ind >= 0) &
-                     (xx_ind < arr.shape[1]))
-        return neighbors, yy_ind[neighbors], xx_ind[neighbors]
-
-
-    def _get_upstream(self, fd, loc):
-        # global variable used: inflow_direction
-        #
-        # get mask of neighbors and y and x locations
-        neighbors, yy, xx = self._get_neighbors(fd, loc[0], loc[1])
-        # mask inflowing cells
-        upstream_mask = (fd.data[yy.astype(np.int), xx.astype(np.int)] == inflow_direction[neighbors])
-        yy_upstream = yy[upstream_mask]
-        xx_upstream = xx[upstream_mask]
-        return [ [yy_upstream[ii], xx_upstream[ii]] for ii in range(np.sum(upstream_mask)) ]
+        # flat index of downstream cell of each cell, -1 for sinks, masked values and cells flowing out of the grid
+        fdd  = np.ma.getdata(fd)
+        ny, nx = fdd.shape
+        down = np.full(fdd.shape, -1, dtype=np.int64)
+        yy, xx = np.meshgrid(np.arange(ny), np.arange(nx), indexing='ij')
+        for kk in range(local_flow_direction.size):
+            if local_flow_direction[kk] == -1: continue
+            ii = fdd == local_flow_direction[kk]
+            yd = yy[ii] + yy_offset[kk]
+            xd = xx[ii] + xx_offset[kk]
+            inside = (yd >= 0) & (yd < ny) & (xd >= 0) & (xd < nx)
+            jj = np.where(ii)
+            down[jj[0][inside], jj[1][inside]] = yd[inside] * nx + xd[inside]
+        return down.ravel()
 
 
 if __name__ == '__main__':
     import doctest
     doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
+
+    # # Benchmark on synthetic DEMs: inclined plane with random noise
+    # import time
+    # rng = np.random.RandomState(1)
+    # for nn in [500, 1000, 2000]:
+    #     yy, xx = np.meshgrid(np.arange(nn), np.arange(nn), indexing='ij')
+    #     dem = np.ma.array(yy + xx + 5. * rng.random_sample((nn, nn)), mask=np.zeros((nn, nn), dtype=bool))
+    #     t1 = time.time()
+    #     sn = river_network(dem=dem, sinks=np.array([[0], [0]]))
+    #     t2 = time.time()
+    #     sinks = np.ma.where(sn.fdir == -1)
+    #     sn = river_network(fdir=sn.fdir, do_fa=True, do_co=True, sinks=sinks)
+    #     t3 = time.time()
+    #     print('river_network {:d}x{:d}: flow direction {:.2f} s, flow accumulation and channel order {:.2f} s'.format(nn, nn, t2-t1, t3-t2))
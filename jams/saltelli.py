@@ -105,6 +105,7 @@ def saltelli(params, nbase, lhs=False, nskip=1):
         Written,  MC, May 2012
         Modified, MC, Feb 2013 - ported to Python 3
                   MC, Apr 2014 - assert
+                  MC, Oct 2026 - import i4_sobol_generate from jams.sobol
     """
     #
     # Check input
@@ -130,8 +131,8 @@ def saltelli(params, nbase, lhs=False, nskip=1):
             pA[i,:] = lat[i,:]
             pB[i,:] = lat[i+nparams,:]
     else:
-        import sobol
-        sob = sobol.i4_sobol_generate(2*nparams,nbase,nskip)
+        from jams.sobol import i4_sobol_generate
+        sob = i4_sobol_generate(2*nparams,nbase,nskip)
         for i in range(nparams):
             pA[i,:] = zoff[i] + zmul[i]*sob[i,:]
             pB[i,:] = zoff[i] + zmul[i]*sob[i+nparams,:]
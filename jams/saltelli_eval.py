@@ -0,0 +1,347 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+from functools import partial
+import os
+import subprocess
+import numpy as np
+from jams.saltelli import saltelli
+from jams.evalcache import as_evalcache
+
+__all__ = ['saltelli_eval']
+
+
+def _ext_obj_wrapper(func, lb, ub, mask,
+                     parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug,
+                     params):
+    '''
+        Wrapper function for external program to be evaluated
+        to be used with partial:
+            obj = partial(_ext_obj_wrapper, func, lb, ub, mask,
+                          parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug)
+        This allows then calling obj with only the argument params:
+            fx = obj(params)
+
+
+        Definition
+        ----------
+        def _ext_obj_wrapper(func, lb, ub, mask,
+                             parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug,
+                             params):
+
+
+        Input
+        -----
+        func              string or list for external executable
+        lb                (npars) lower bounds of parameters
+        ub                (npars) upper bounds of parameters
+        mask              (npars) mask to include (1) or exclude (0) parameter
+        parameterfile     Parameter file for executable
+        parameterwriter   Python function for writing parameter file
+        objectivefile     File with model output from executable
+        objectivereader   Python function for reading model output
+        shell             If True, the specified command will be executed through the shell.
+        debug             If True, model output is displayed for executable.
+        params            (npars) parameter set
+
+
+        Output
+        ------
+        Model output
+
+
+        History
+        -------
+        Written,  MC, Oct 2026 - from screening
+    '''
+    # Individual file names for each process
+    randst = np.random.RandomState()
+    pid = str(randst.randint(2147483647))
+    parameterwriter(parameterfile+'.'+pid, params, lb, ub, mask)
+    if isinstance(func, str):
+        func1 = [func, pid]
+    else:
+        func1 = func+[pid]
+    if debug:
+        err = subprocess.check_call(func1, stderr=subprocess.STDOUT, shell=shell)
+    else:
+        err = subprocess.check_output(func1, stderr=subprocess.STDOUT, shell=shell)
+    obj = objectivereader(objectivefile+'.'+pid)
+    os.remove(objectivefile+'.'+pid)
+    return obj
+
+
+def _obj_wrapper(func, arg, kwarg, x):
+    '''
+        Wrapper function for function to be evaluated
+        to be used with partial:
+            obj = partial(_obj_wrapper, func, arg, kwarg)
+        This allows then calling obj with only the argument x:
+            fx = obj(x)
+        which translates to:
+            fx = func(x, *arg, **kwarg)
+    '''
+    return func(x, *arg, **kwarg)
+
+
+def saltelli_eval(func, params, nbase, x=None, lhs=False, nskip=1,
+                  arg=(), kwarg={},
+                  processes=1, pool=None, cache=None, chunksize=None,
+                  restart=False, restartfile=None,
+                  verbose=0,
+                  parameterfile=None, parameterwriter=None,
+                  objectivefile=None, objectivereader=None,
+                  shell=False, debug=False):
+    """
+        Evaluates a model on the parameter sets of jams.saltelli and returns the model outputs
+        f(A), f(B) and f(B_A) in the layout of ya, yb and yc of jams.sobol_index.
+
+
+        Definition
+        ----------
+        def saltelli_eval(func, params, nbase, x=None, lhs=False, nskip=1,
+                          arg=(), kwarg={},
+                          processes=1, pool=None, cache=None, chunksize=None,
+                          restart=False, restartfile=None,
+                          verbose=0,
+                          parameterfile=None, parameterwriter=None,
+                          objectivefile=None, objectivereader=None,
+                          shell=False, debug=False):
+
+
+        Input
+        -----
+        func        python function or string for external executable
+                    The model, returning a scalar or a 1D-array (e.g. a time series) for a parameter set.
+        params      (nparams,2) array of parameter ranges
+        nbase       base sample size
+
+
+        Optional Input
+        --------------
+        x           (nparams,nbase*(nparams+2)) array of parameter sets in the order of jams.saltelli
+                    (Default: None = saltelli(params, nbase, lhs=lhs, nskip=nskip))
+        lhs         if True: latin hypercube sampling, otherwise sobol sequence if x is None (Default: False)
+        nskip       number of sobol sequences to skip at the beginning if x is None (Default: 1)
+        arg         tuple (Default: empty tuple)
+                    Additional arguments passed to func (only for Python functions).
+        kwarg       dict (Default: empty dict)
+                    Additional keyword arguments passed to func (only for Python functions).
+        processes   int (Default: 1)
+                    The number of processes to evaluate the model in parallel with multiprocessing.
+        pool        pool of workers with a map method such as multiprocessing.Pool
+                    or schwimmbad.MPIPool; overrides processes (Default: None)
+        cache       boolean, string or EvalCache (Default: None)
+                    Evaluate identical parameter sets only once and reuse model outputs of earlier runs.
+                    True:      cache in memory
+                    string:    cache in memory and in the file with that name on disk,
+                               which is read at the start of later runs;
+                               the file gives stale values if the function, its data or arguments,
+                               or the executable changed; use a new file or EvalCache with tag then
+                    EvalCache: use given cache
+        chunksize   int (Default: None = all parameter sets at once, or 1/100 of them if restartfile is given)
+                    Number of parameter sets evaluated before outputs are stored and restartfile is written.
+        restart     boolean (Default: False)
+                    If True, continue from the model outputs saved in restartfile.
+        restartfile string (Default: None)
+                    npz-file in which model outputs are saved after each chunk of parameter sets.
+                    The file is not removed at the end.
+        verbose     int (Default: 0)
+                    Print progress if >0.
+        parameterfile     string (Default: None)
+                          Parameter file for executable; must be given if func is name of executable
+        parameterwriter   function (Default: None)
+                          Python function for writing parameter file if func is name of executable.
+                          It is called as parameterwriter(parameterfile, params, lb, ub, mask).
+        objectivefile     string (Default: None)
+                          File with model output of executable; must be given if func is name of executable
+        objectivereader   function (Default: None)
+                          Python function for reading model output if func is name of executable
+        shell             boolean (Default: False)
+                          If True, the specified executable will be executed through the shell.
+        debug             boolean (Default: False)
+                          If True, model output is displayed for executable.
+
+
+        Output
+        ------
+        ya, yb, yc
+        ya       (nbase) model outputs f(A) or (ntime,nbase) if func returns arrays of size ntime
+        yb       (nbase) model outputs f(B) or (ntime,nbase)
+        yc       (nparams,nbase) model outputs f(B_A) or (ntime,nparams,nbase)
+
+
+        Restrictions
+        ------------
+        1. yc is f(B_A), i.e. f(B) with one parameter of A, as sampled by jams.saltelli.
+           Use a method of jams.sobol_index for yc=f(B_A) such as 'Mai2012'.
+        2. The restartfile is only used if x is the same as in the interrupted run.
+
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> from functions import ishigami_homma
+        >>> from sobol_index import sobol_index
+        >>> from autostring import astr
+        >>> params = np.array([[-np.pi, np.pi], [-np.pi, np.pi], [-np.pi, np.pi]])
+        >>> ya, yb, yc = saltelli_eval(ishigami_homma, params, 2000, arg=(7., 0.1))
+        >>> print(ya.shape, yb.shape, yc.shape)
+        (2000,) (2000,) (3, 2000)
+        >>> si, sti = sobol_index(ya=ya, yb=yb, yc=yc, method='Mai2012')
+        >>> print(astr(si,2,pp=True))
+        ['0.32' '0.44' '0.01']
+
+        >>> # Model returning time series; restart after interruption
+        >>> def model(x):
+        ...     return np.sum(x) * np.arange(1., 4.)
+        >>> ya, yb, yc = saltelli_eval(model, params, 10, restartfile='test_saltelli_eval.npz', chunksize=7)
+        >>> print(ya.shape, yb.shape, yc.shape)
+        (3, 10) (3, 10) (3, 3, 10)
+        >>> ya1, yb1, yc1 = saltelli_eval(model, params, 10, restartfile='test_saltelli_eval.npz', restart=True)
+        >>> print(np.all(yc1 == yc))
+        True
+        >>> import os
+        >>> os.remove('test_saltelli_eval.npz')
+
+
+        License
+        -------
+        This file is part of the JAMS Python package, distributed under the MIT
+        License. The JAMS Python package originates from the former UFZ Python library,
+        Department of Computational Hydrosystems, Helmholtz Centre for Environmental
+        Research - UFZ, Leipzig, Germany.
+
+        Copyright (c) 2026 Matthias Cuntz - mc (at) macu (dot) de
+
+        Permission is hereby granted, free of charge, to any person obtaining a copy
+        of this software and associated documentation files (the "Software"), to deal
+        in the Software without restriction, including without limitation the rights
+        to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+        copies of the Software, and to permit persons to whom the Software is
+        furnished to do so, subject to the following conditions:
+
+        The above copyright notice and this permission notice shall be included in all
+        copies or substantial portions of the Software.
+
+        THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+        IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+        FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+        AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+        LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+        OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+        SOFTWARE.
+
+
+        History
+        -------
+        Written,  MC, Oct 2026
+    """
+    # Checks
+    assert hasattr(func, '__call__') or isinstance(func, (str,list)), 'Invalid function handle or external call.'
+    params = np.array(params)
+    assert np.size(params[0,:]) == 2, 'parameter ranges must be given in form (nparams,2).'
+    if isinstance(func, (str,list)):
+        if parameterfile is None: raise IOError('parameterfile must be given if func is name of executable.')
+        if parameterwriter is None: raise IOError('parameterwrite must be given if func is name of executable.')
+        if objectivefile is None: raise IOError('objectivefile must be given if func is name of executable.')
+        if objectivereader is None: raise IOError('objectivereader must be given if func is name of executable.')
+
+    # Parameter sets
+    nparams = params.shape[0]
+    nso     = nbase*(nparams+2)
+    if x is None:
+        x = saltelli(params, nbase, lhs=lhs, nskip=nskip)
+    else:
+        x = np.array(x, dtype=np.float64)
+        assert x.shape == (nparams,nso), 'x must have shape (nparams,nbase*(nparams+2)).'
+
+    # Partialise model
+    lb = params[:,0]
+    ub = params[:,1]
+    if isinstance(func, (str,list)):
+        obj = partial(_ext_obj_wrapper, func, lb, ub, np.ones(nparams, dtype=np.bool),
+                      parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug)
+    else:
+        obj = partial(_obj_wrapper, func, arg, kwarg)
+
+    # Model outputs evaluated so far
+    ndone = 0
+    out   = None
+    if restart:
+        if (restartfile is None) or (not os.path.isfile(restartfile)):
+            raise IOError('restartfile not found for restart.')
+        with np.load(restartfile) as pp:
+            if (pp['x'].shape != x.shape) or np.any(pp['x'] != x):
+                raise ValueError('Parameter sets in restartfile differ from x.')
+            ndone = int(pp['ndone'])
+            if ndone > 0:
+                out = np.empty((pp['out'].shape[0],nso))
+                out[:,0:ndone] = pp['out']
+        if (verbose > 0): print('Restart with {:d} of {:d} parameter sets evaluated'.format(ndone, nso))
+
+    # Pool
+    if pool is not None:
+        ipool = pool
+    elif processes > 1:
+        import multiprocessing
+        ipool = multiprocessing.Pool(processes)
+    else:
+        ipool = None
+    if ipool is None:
+        mapper = map
+    else:
+        mapper = ipool.map
+    cache = as_evalcache(cache)
+
+    # Evaluate in chunks and store model outputs directly in out(ntime,nso)
+    if chunksize is None:
+        if restartfile is None:
+            chunk = nso
+        else:
+            chunk = max(nso//100, 1)
+    else:
+        chunk = max(int(chunksize), 1)
+    try:
+        for j in range(ndone, nso, chunk):
+            j1 = min(j+chunk, nso)
+            xs = [ x[:,i] for i in range(j, j1) ]
+            if cache is None:
+                fx = list(mapper(obj, xs))
+            else:
+                fx = cache.map(obj, xs, mapper=mapper)
+            fx = np.array(fx, dtype=np.float64)
+            if out is None:
+                out = np.empty((fx[0].size,nso))
+            out[:,j:j1] = fx.reshape((j1-j,out.shape[0])).T
+            ndone = j1
+            if restartfile is not None:
+                # write to temporary file first so that an interruption leaves a valid restartfile
+                with open(restartfile+'.tmp', 'wb') as ff:
+                    np.savez_compressed(ff, x=x, out=out[:,0:ndone], ndone=ndone)
+                getattr(os, 'replace', os.rename)(restartfile+'.tmp', restartfile)
+            if (verbose > 0): print('Evaluated {:d} of {:d} parameter sets'.format(ndone, nso))
+    except BaseException:
+        # do not leave own worker processes behind
+        if (pool is None) and (ipool is not None): ipool.terminate()
+        raise
+    finally:
+        if (pool is None) and (ipool is not None):
+            ipool.close()
+            ipool.join()
+    if (verbose > 0) and (cache is not None):
+        cstat = cache.stats()
+        print('Cache: {:d} hits, {:d} misses'.format(cstat['hits'], cstat['misses']))
+
+    # A=0:nbase, B=nbase:nbase*2, C=nbase*2:nso
+    ya = out[:,0:nbase]
+    yb = out[:,nbase:2*nbase]
+    yc = out[:,2*nbase:nso].reshape((out.shape[0],nparams,nbase))
+    if out.shape[0] == 1:
+        return ya[0,:], yb[0,:], yc[0,:,:]
+    else:
+        return ya, yb, yc
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
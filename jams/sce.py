@@ -1,14 +1,19 @@
 #!/usr/bin/env python
 from __future__ import division, absolute_import, print_function
+import os
+import shutil
 import subprocess
+import tempfile
+from functools import partial
 from distutils.util import strtobool
 import numpy as np
 from jams.const import huge
 from jams.npyio import savez_compressed
+from jams.evalcache import as_evalcache
 # ToDo: write tmp/population files (of Fortran)
 # ToDo: write out also in logfile if not None (use jams.tee as in joptimise)
 
-def SampleInputMatrix(nrows, npars, bl, bu, distname='randomUniform'):
+def SampleInputMatrix(nrows, npars, bl, bu, distname='randomUniform', rng=None):
     '''
         Create input parameter matrix (nrows,npars) for
         nrows simulations and npars parameters with bounds bl and bu
@@ -16,7 +21,7 @@ def SampleInputMatrix(nrows, npars, bl, bu, distname='randomUniform'):
 
         Definition
         ----------
-        def SampleInputMatrix(nrows, npars, bl, bu, distname='randomUniform'):
+        def SampleInputMatrix(nrows, npars, bl, bu, distname='randomUniform', rng=None):
 
 
         Input
@@ -30,6 +35,8 @@ def SampleInputMatrix(nrows, npars, bl, bu, distname='randomUniform'):
         Optional Input
         --------------
         distname          initial sampling ditribution (not implemented yet, takes uniform distribution)
+        rng               random number generator with method rand such as np.random.RandomState
+                          (default: np.random)
 
 
         Output
@@ -77,24 +84,29 @@ def SampleInputMatrix(nrows, npars, bl, bu, distname='randomUniform'):
         Written,  Q. Duan, Sep 2004
         Modified, S. Van Hoey 2011 - ported to Python
                   MC, Oct 2013     - adapted to JAMS package and sync with JAMS Fortran version
+                  MC, Oct 2026     - rng
     '''
+    if rng is None: rng = np.random
     x = np.zeros((nrows,npars))
     bound = bu-bl
     for i in range(nrows):
         # x[i,:]= bl + DistSelector([0.0,1.0,npars],distname='randomUniform')*bound # only used in full Vhoeys-framework
-        x[i,:]= bl + np.random.rand(1,npars)*bound
+        x[i,:]= bl + rng.rand(1,npars)*bound
     return x
 
 
 def cce(functn, s, sf, bl, bu, mask, icall, maxn, alpha, beta, maxit, printit,
-        parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug):
+        parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug,
+        workdir=None, rng=None, cache=None):
     '''
         Generate a new point in a simplex
 
 
         Definition
         ----------
-        def cce(functn, s, sf, bl, bu, mask, icall, maxn, alpha, beta, maxit, printit):
+        def cce(functn, s, sf, bl, bu, mask, icall, maxn, alpha, beta, maxit, printit,
+                parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug,
+                workdir=None, rng=None, cache=None):
 
 
         Input
@@ -121,7 +133,11 @@ def cce(functn, s, sf, bl, bu, mask, icall, maxn, alpha, beta, maxit, printit,
 
         Optional Input
         --------------
-        None
+        workdir           Directory for per-process working directories of the executable,
+                          see call_function (default: None)
+        rng               random number generator with method rand such as np.random.RandomState
+                          (default: np.random)
+        cache             EvalCache for function values, see call_function (default: None)
 
 
         Output
@@ -166,6 +182,7 @@ def cce(functn, s, sf, bl, bu, mask, icall, maxn, alpha, beta, maxit, printit,
         Written,  Q. Duan, Sep 2004
         Modified, S. Van Hoey 2011 - ported to Python
                   MC, Oct 2013 - adapted to JAMS package and sync with JAMS Fortran version
+                  MC, Oct 2026 - workdir, rng
     '''
 
     '''
@@ -209,11 +226,11 @@ def cce(functn, s, sf, bl, bu, mask, icall, maxn, alpha, beta, maxit, printit,
     if idx[0].size != 0: ibound = 2
 
     if ibound >= 1:
-        snew = SampleInputMatrix(1,nopt,bl,bu,distname='randomUniform')[0]  #checken!!
+        snew = SampleInputMatrix(1,nopt,bl,bu,distname='randomUniform',rng=rng)[0]  #checken!!
         snew = np.where(mask, snew, sb)
 
     fuc = call_function(functn, snew, bl, bu, mask,
-                        parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug)
+                        parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug, workdir, cache)
     fnew = -fuc if maxit else fuc
     if printit==1: print('  f, X: ', fnew, snew)
     icall += 1
@@ -223,17 +240,17 @@ def cce(functn, s, sf, bl, bu, mask, icall, maxn, alpha, beta, maxit, printit,
         snew = sw + beta*(ce-sw)
         snew = np.where(mask, snew, sb)
         fuc = call_function(functn, snew, bl, bu, mask,
-                            parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug)
+                            parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug, workdir, cache)
         fnew = -fuc if maxit else fuc
         if printit==1: print('  f, X: ', fnew, snew)
         icall += 1
 
     # Both reflection and contraction have failed, attempt a random point;
         if fnew > fw:
-            snew = SampleInputMatrix(1,nopt,bl,bu,distname='randomUniform')[0]  #checken!!
+            snew = SampleInputMatrix(1,nopt,bl,bu,distname='randomUniform',rng=rng)[0]  #checken!!
             snew = np.where(mask, snew, sb)
             fuc = call_function(functn, snew, bl, bu, mask,
-                                parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug)
+                                parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug, workdir, cache)
             fnew = -fuc if maxit else fuc
             if printit==1: print('  f, X: ', fnew, snew)
             icall += 1
@@ -243,7 +260,8 @@ def cce(functn, s, sf, bl, bu, mask, icall, maxn, alpha, beta, maxit, printit,
 
 
 def call_function(functn, params, bl, bu, mask,
-                  parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug):
+                  parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug,
+                  workdir=None, cache=None):
     '''
         Call python function or external executable
 
@@ -251,7 +269,8 @@ def call_function(functn, params, bl, bu, mask,
         Definition
         ----------
         def call_function(functn, params, bl, bu, mask,
-                          parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug):
+                          parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug,
+                          workdir=None, cache=None):
 
 
         Input
@@ -268,6 +287,15 @@ def call_function(functn, params, bl, bu, mask,
         shell             If True, the specified command will be executed through the shell.
         debug             If True, model output is displayed for executable.
 
+
+        Optional Input
+        --------------
+        workdir           If given, the executable is run in the directory workdir/sce.pid,
+                          which is unique for each process pid. Relative paths of parameterfile and
+                          objectivefile are then relative to this directory (default: None)
+        cache             If given, EvalCache with function values of already evaluated parameter sets.
+                          functn is only called if params is not in cache (default: None)
+
         Output
         ------
         Function value
@@ -276,19 +304,112 @@ def call_function(functn, params, bl, bu, mask,
         History
         -------
         Written,  MC, Nov 2016
+        Modified, MC, Oct 2026 - workdir
+                  MC, Oct 2026 - cache
+                  MC, Oct 2026 - run executable in workdir/sce.pid
     '''
+    if cache is not None:
+        return cache(partial(_call_function_wrapper, functn, bl, bu, mask,
+                             parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug,
+                             workdir), params)
     if isinstance(functn, (str,list)):
+        if workdir is None:
+            wdir  = None
+            func1 = functn
+        else:
+            wdir = os.path.join(os.path.abspath(workdir), 'sce.'+str(os.getpid()))
+            parameterfile = os.path.join(wdir, parameterfile)
+            objectivefile = os.path.join(wdir, objectivefile)
+            pdir = os.path.dirname(parameterfile)
+            if not os.path.isdir(pdir): os.makedirs(pdir)
+            # executables given by relative path are relative to the current directory
+            func1 = functn
+            if not shell:
+                exe = functn if isinstance(functn, str) else functn[0]
+                if (os.path.dirname(exe) != '') and os.path.exists(exe):
+                    exe   = os.path.abspath(exe)
+                    func1 = exe if isinstance(functn, str) else [exe]+functn[1:]
         parameterwriter(parameterfile, params, bl, bu, mask)
         if debug:
-            err = subprocess.call(functn, shell=shell)
+            err = subprocess.call(func1, shell=shell, cwd=wdir)
         else:
-            err = subprocess.check_output(functn, shell=shell)
+            err = subprocess.check_output(func1, shell=shell, cwd=wdir)
         obj = objectivereader(objectivefile)
         return obj
     else:
         return functn(params)
 
 
+# call_function with params as last argument to be used with partial and map
+def _call_function_wrapper(functn, bl, bu, mask,
+                           parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug,
+                           workdir, params):
+    return call_function(functn, params, bl, bu, mask,
+                         parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug,
+                         workdir)
+
+
+# Evolve one complex cx with function values cf for nspl steps.
+# Returns new complex, function values, number of function calls,
+# and new entries of a copy of cache in another process.
+# Random numbers from rng or from np.random.RandomState(seed) if seed is not None,
+# i.e. complexes can be evolved in parallel with individual seeds.
+def _evolve_complex(functn, bl, bu, mask, nps, nspl, maxn, alpha, beta, maxit, printit,
+                    parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug,
+                    workdir, cxfs, rng=None, cache=None):
+    cx, cf, seed = cxfs
+    if seed is not None: rng = np.random.RandomState(seed)
+    npg  = cf.size
+    icall = 0
+    # Evolve sub-population igs for nspl steps:
+    for loop in range(nspl):
+
+        # Select simplex by sampling the complex according to a linear
+        # probability distribution
+        lcs    = np.zeros(nps, dtype=np.int)
+        lcs[0] = 1
+        for k3 in range(1,nps):
+            for i in range(1000):
+                # lpos = 1 + int(np.floor(npg+0.5-np.sqrt((npg+0.5)**2 - npg*(npg+1)*np.random.random())))
+                lpos = int(np.floor(npg+0.5-np.sqrt((npg+0.5)**2 - npg*(npg+1)*rng.rand())))
+                # idx=find(lcs(1:k3-1)==lpos)
+                idx = (lcs[0:k3]==lpos).nonzero()  # check of element al eens gekozen
+                if idx[0].size == 0: break
+            lcs[k3] = lpos
+        lcs.sort()
+
+        # Construct the simplex:
+        s  = np.zeros((nps,cx.shape[1]))
+        s  = cx[lcs,:]
+        sf = cf[lcs]
+
+        # remember largest for treating of NaNs
+        large = cf[np.isfinite(cf)].max()
+        large = 1.1*large if large>0. else 0.9*large
+
+        snew, fnew, icall = cce(functn, s, sf, bl, bu, mask, icall, maxn, alpha, beta, maxit, printit,
+                                parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug,
+                                workdir, rng, cache)
+        # Replace the worst point in Simplex with the new point:
+        s[-1,:] = snew
+        sf[-1]  = fnew
+
+        # Replace the simplex into the complex;
+        cx[lcs,:] = s
+        cf[lcs]   = sf
+
+        # Sort the complex;
+        cf  = np.where(np.isfinite(cf), cf, large)
+        idx = np.argsort(cf)
+        cf  = np.sort(cf)
+        cx  = cx[idx,:]
+    # End of Inner Loop for Competitive Evolution of Simplexes: for loop in range(nspl):
+
+    new = cache.pop_new() if cache is not None else ([], 0, 0)
+
+    return cx, cf, icall, new
+
+
 def sce(functn, x0, bl, bu,
         mask=None,
         maxn=1000, kstop=10, pcento=0.0001,
@@ -299,7 +420,8 @@ def sce(functn, x0, bl, bu,
         restart=False, restartfile1='sce.restart.npz', restartfile2='sce.restart.txt',
         parameterfile=None, parameterwriter=None,
         objectivefile=None, objectivereader=None,
-        shell=False, debug=False):
+        shell=False, debug=False,
+        processes=1, pool=None, workdir=None, cache=None):
     '''
         Shuffled-Complex-Evolution algorithm for function minimalisation
 
@@ -316,7 +438,8 @@ def sce(functn, x0, bl, bu,
                 restart=False, restartfile1='sce.restart.npz', restartfile2='sce.restart.txt',
                 parameterfile=None, parameterwriter=None,
                 objectivefile=None, objectivereader=None,
-                shell=False, debug=False):
+                shell=False, debug=False,
+                processes=1, pool=None, workdir=None, cache=None):
 
 
         Input
@@ -361,6 +484,33 @@ def sce(functn, x0, bl, bu,
         objectivereader   Python function for reading objective value if functn is name of executable
         shell             If True, the specified executable will be executed through the shell (default: False).
         debug             If True, model output is displayed for executable (default: False).
+        processes         number of processes for the evaluations of the initial population
+                          and for evolving the complexes in parallel (default: 1 = no pool)
+        pool              pool of workers with a map method such as multiprocessing.Pool
+                          or schwimmbad.MPIPool; overrides processes (default: None)
+                          If processes>1 or pool is given, each complex is evolved with its own
+                          random number generator seeded from the main generator. Results are hence
+                          the same for any number of processes and after restart, but they differ from
+                          the serial algorithm, which uses one random number stream for all complexes.
+                          functn must be picklable then, i.e. not a lambda function.
+        workdir           If processes>1 or pool is given, an executable is run in its own directory
+                          for each worker process pid, i.e. in sce.tmp/sce.pid, where sce.tmp is a temporary
+                          directory in workdir that is removed at the end (default: '.').
+                          Relative paths of parameterfile and objectivefile are relative to this directory.
+                          Executables given with a relative path, e.g. './model', are taken relative
+                          to the current directory, except with shell=True.
+        cache             Cache function values of parameter sets, e.g. of the same parameter sets after
+                          masking or limiting to bounds, or from earlier runs (default: None).
+                          True: cache in memory
+                          string: cache in memory and in the file with that name on disk,
+                                  which is read at the start of later runs;
+                                  the file gives stale values if the function, its data or arguments,
+                                  or the executable changed; use a new file or EvalCache with tag then
+                          EvalCache: use given cache, e.g. EvalCache(maxsize=10000, atol=1e-8, cachefile='sce.cache',
+                                     tag='model v1');
+                                     cache.stats() gives number of hits and misses afterwards
+                          Cached function values count as function evaluations so that results do
+                          not change if cache is given.
 
 
         Output
@@ -396,6 +546,14 @@ def sce(functn, x0, bl, bu,
         >>> print(astr(bestf,3))
         0.001
 
+        >>> # Complexes evolved in parallel, independent of the number of processes
+        >>> bestx, bestf, icall = sce(rosenbrock, x0, bl, bu, seed=1, maxn=1000, outf=True, outcall=True, printit=2, restartfile1=None,
+        ...                           processes=2)
+        >>> print(astr(icall))
+        604
+        >>> print(astr(bestx,3))
+        ['1.000' '1.000']
+
         >>> nopt = 30
         >>> bl = np.ones((30))*(-10.)
         >>> bu = np.ones((30))*(10.)
@@ -447,6 +605,8 @@ def sce(functn, x0, bl, bu,
                   MC, Nov 2016 - restart - only Python 2
                   MC, Nov 2016 - restartfile1=None
                   MC, Nov 2016 - return -bestf if maxit
+                  MC, Oct 2026 - processes, pool, workdir for parallel evaluations of population and complexes
+                  MC, Oct 2026 - cache
     '''
 
     '''
@@ -504,237 +664,255 @@ def sce(functn, x0, bl, bu,
         if objectivereader is None:
             raise IOError('objectivereader must be given if functn is name of executable.')
 
-    if not restart:
-        # Initialize SCE parameters:
-        nopt = len(x0)
-        if npg   is None: npg   = 2*nopt+1
-        if nps   is None: nps   = nopt+1
-        if nspl  is None: nspl  = 2*nopt+1
-        if mings is None: mings = ngs
-        npt = npg*ngs
-
-        # assure numpy array
-        bl = np.array(bl)
-        bu = np.array(bu)
-
-        bound = bu-bl
-
-        # Seed random number generator
-        np.random.seed(seed=seed)
-
-        if mask is None: mask = np.ones(nopt, dtype=np.bool)
-
-        large = 0.5*huge
-
-        # Create an initial population to fill array x(npt,nopt):
-        x = SampleInputMatrix(npt, nopt, bl, bu, distname='randomUniform')
-        for i in range(npt):
-            x[i,:] = np.where(mask, x[i,:], x0)
-        if iniflg==1: x[0,:] = x0
-
-        icall = 0
-        xf = np.zeros(npt)
-        for i in range (npt):
-            fuc = call_function(functn, x[i,:], bl, bu, mask,
-                                parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug)
-            xf[i] = -fuc if maxit else fuc
-            if printit==1: print('  f, X: ', xf[i], x[i,:])
-            icall += 1
+    # Cache of function values
+    cache = as_evalcache(cache)
 
-        # remember largest for treating of NaNs
-        large = xf[np.isfinite(xf)].max()
-        large = 1.1*large if large>0. else 0.9*large
-
-        # Sort the population in order of increasing function values;
-        xf = np.where(np.isfinite(xf), xf, large)
-        idx = np.argsort(xf)
-        xf  = np.sort(xf)
-        x   = x[idx,:]
-
-        # Record the best and worst points;
-        bestx  = x[0,:]
-        bestf  = xf[0]
-        worstx = x[-1,:]
-        worstf = xf[-1]
-
-        allbestf = bestf
-        allbestx = bestx
-
-        # Compute the standard deviation for each parameter
-        xnstd = np.std(x,axis=0)
-
-        # Computes the normalized geometric range of the parameters
-        gnrng = np.exp(np.mean(np.log((np.max(x,axis=0)-np.min(x,axis=0))/bound)))
-
-        if printit<2:
-            print('The Initial Loop: 0. Best f: {:f}, worst f {:f}'.format(bestf, worstf))
-            print('  best X: ', bestx)
-            print('')
+    # Pool for parallel evaluations
+    if pool is not None:
+        ipool = pool
+    elif processes > 1:
+        import multiprocessing
+        ipool = multiprocessing.Pool(processes)
+    else:
+        ipool = None
+    # Temporary directory for the working directories of the executable in worker processes
+    if (ipool is None) or (not isinstance(functn, (str,list))):
+        workdir = None
+    else:
+        if workdir is None: workdir = '.'
+        workdir = tempfile.mkdtemp(prefix='sce.', suffix='.tmp', dir=workdir)
+
+    try:
+        if not restart:
+            # Initialize SCE parameters:
+            nopt = len(x0)
+            if npg   is None: npg   = 2*nopt+1
+            if nps   is None: nps   = nopt+1
+            if nspl  is None: nspl  = 2*nopt+1
+            if mings is None: mings = ngs
+            npt = npg*ngs
+
+            # assure numpy array
+            bl = np.array(bl)
+            bu = np.array(bu)
+
+            bound = bu-bl
+
+            # Seed random number generator
+            np.random.seed(seed=seed)
+
+            if mask is None: mask = np.ones(nopt, dtype=np.bool)
+
+            large = 0.5*huge
+
+            # Create an initial population to fill array x(npt,nopt):
+            x = SampleInputMatrix(npt, nopt, bl, bu, distname='randomUniform')
+            for i in range(npt):
+                x[i,:] = np.where(mask, x[i,:], x0)
+            if iniflg==1: x[0,:] = x0
+
+            icall = 0
+            xf = np.zeros(npt)
+            if ipool is None:
+                for i in range (npt):
+                    fuc = call_function(functn, x[i,:], bl, bu, mask,
+                                        parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug,
+                                        cache=cache)
+                    xf[i] = -fuc if maxit else fuc
+                    if printit==1: print('  f, X: ', xf[i], x[i,:])
+                    icall += 1
+            else:
+                obj = partial(_call_function_wrapper, functn, bl, bu, mask,
+                              parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug,
+                              workdir)
+                if cache is None:
+                    fuc = np.array(ipool.map(obj, [ x[i,:] for i in range(npt) ]), dtype=np.float64)
+                else:
+                    fuc = np.array(cache.map(obj, [ x[i,:] for i in range(npt) ], mapper=ipool.map), dtype=np.float64)
+                xf[:] = -fuc if maxit else fuc
+                if printit==1:
+                    for i in range(npt): print('  f, X: ', xf[i], x[i,:])
+                icall += npt
+
+            # remember largest for treating of NaNs
+            large = xf[np.isfinite(xf)].max()
+            large = 1.1*large if large>0. else 0.9*large
+
+            # Sort the population in order of increasing function values;
+            xf = np.where(np.isfinite(xf), xf, large)
+            idx = np.argsort(xf)
+            xf  = np.sort(xf)
+            x   = x[idx,:]
+
+            # Record the best and worst points;
+            bestx  = x[0,:]
+            bestf  = xf[0]
+            worstx = x[-1,:]
+            worstf = xf[-1]
+
+            allbestf = bestf
+            allbestx = bestx
+
+            # Compute the standard deviation for each parameter
+            xnstd = np.std(x,axis=0)
+
+            # Computes the normalized geometric range of the parameters
+            gnrng = np.exp(np.mean(np.log((np.max(x,axis=0)-np.min(x,axis=0))/bound)))
 
-        # Check for convergence
-        if icall >= maxn:
             if printit<2:
-                print('Optimisation terminated because trial number {:d} '
-                      'reached maximum number of trials {:d} at the initial loop.'.format(maxn,icall))
+                print('The Initial Loop: 0. Best f: {:f}, worst f {:f}'.format(bestf, worstf))
+                print('  best X: ', bestx)
+                print('')
 
-        if gnrng < peps:
-            if printit<2:
-                print('The population has converged to a small parameter space {:f} (<{:f}).'.format(gnrng, peps))
-
-        # Begin evolution loops:
-        nloop  = 0
-        criter = []
-        criter_change = 1e+5
-
-        # save restart
-        if restartfile1 is not None:
-            rs1, rs2, rs3, rs4, rs5 = np.random.get_state()
-            exec("savez_compressed("+saveargarray+")")
-            p = open(restartfile2, 'w')
-            exec("print("+saveargint+", file=p)")
-            exec("print("+saveargfloat+", file=p)")
-            exec("print("+saveargbool+", file=p)")
-            exec("print("+saveargstring+", file=p)")
-            p.close()
-
-    else: # if no restart
-
-        # load restart
-        p1 = open(restartfile1, 'rb')
-        pp = np.load(p1)
-        for i in pp.files: exec(i+" = pp['"+i+"']")
-        p1.close()
-        p2 = open(restartfile2, 'r')
-        for i, pp in enumerate(p2.readline().rstrip().split()): exec(restartint[i]+" = int(pp)")
-        for i, pp in enumerate(p2.readline().rstrip().split()): exec(restartfloat[i]+" = float(pp)")
-        for i, pp in enumerate(p2.readline().rstrip().split()): exec(restartbool[i]+" = bool(strtobool(pp))")
-        for i, pp in enumerate(p2.readline().rstrip().split()): exec(restartstring[i]+" = pp")
-        p2.close()
-        np.random.set_state((rs1, rs2, rs3, rs4, rs5))
-
-    # Outer Loop
-    while icall<maxn and gnrng>peps and criter_change>pcento:
-        nloop += 1
-
-        # Loop on complexes (sub-populations);
-        for igs in range(ngs):
-            # Partition the population into complexes (sub-populations);
-            cx = np.zeros((npg,nopt))
-            cf = np.zeros((npg))
+            # Check for convergence
+            if icall >= maxn:
+                if printit<2:
+                    print('Optimisation terminated because trial number {:d} '
+                          'reached maximum number of trials {:d} at the initial loop.'.format(maxn,icall))
 
+            if gnrng < peps:
+                if printit<2:
+                    print('The population has converged to a small parameter space {:f} (<{:f}).'.format(gnrng, peps))
+
+            # Begin evolution loops:
+            nloop  = 0
+            criter = []
+            criter_change = 1e+5
+
+            # save restart
+            if restartfile1 is not None:
+                rs1, rs2, rs3, rs4, rs5 = np.random.get_state()
+                exec("savez_compressed("+saveargarray+")")
+                p = open(restartfile2, 'w')
+                exec("print("+saveargint+", file=p)")
+                exec("print("+saveargfloat+", file=p)")
+                exec("print("+saveargbool+", file=p)")
+                exec("print("+saveargstring+", file=p)")
+                p.close()
+
+        else: # if no restart
+
+            # load restart
+            p1 = open(restartfile1, 'rb')
+            pp = np.load(p1)
+            for i in pp.files: exec(i+" = pp['"+i+"']")
+            p1.close()
+            p2 = open(restartfile2, 'r')
+            for i, pp in enumerate(p2.readline().rstrip().split()): exec(restartint[i]+" = int(pp)")
+            for i, pp in enumerate(p2.readline().rstrip().split()): exec(restartfloat[i]+" = float(pp)")
+            for i, pp in enumerate(p2.readline().rstrip().split()): exec(restartbool[i]+" = bool(strtobool(pp))")
+            for i, pp in enumerate(p2.readline().rstrip().split()): exec(restartstring[i]+" = pp")
+            p2.close()
+            np.random.set_state((rs1, rs2, rs3, rs4, rs5))
+
+        # Outer Loop
+        while icall<maxn and gnrng>peps and criter_change>pcento:
+            nloop += 1
+
+            # Loop on complexes (sub-populations);
+            # Partition the population into complexes (sub-populations);
             k1 = np.array(range(npg))
-            k2 = k1*ngs+igs
-            cx[k1,:] = x[k2,:]
-            cf[k1]   = xf[k2]
-
-            # Evolve sub-population igs for nspl steps:
-            for loop in range(nspl):
-
-                # Select simplex by sampling the complex according to a linear
-                # probability distribution
-                lcs    = np.zeros(nps, dtype=np.int)
-                lcs[0] = 1
-                for k3 in range(1,nps):
-                    for i in range(1000):
-                        # lpos = 1 + int(np.floor(npg+0.5-np.sqrt((npg+0.5)**2 - npg*(npg+1)*np.random.random())))
-                        lpos = int(np.floor(npg+0.5-np.sqrt((npg+0.5)**2 - npg*(npg+1)*np.random.rand())))
-                        # idx=find(lcs(1:k3-1)==lpos)
-                        idx = (lcs[0:k3]==lpos).nonzero()  # check of element al eens gekozen
-                        if idx[0].size == 0: break
-                    lcs[k3] = lpos
-                lcs.sort()
-
-                # Construct the simplex:
-                s  = np.zeros((nps,nopt))
-                s  = cx[lcs,:]
-                sf = cf[lcs]
-
-                # remember largest for treating of NaNs
-                large = cf[np.isfinite(cf)].max()
-                large = 1.1*large if large>0. else 0.9*large
-
-                snew, fnew, icall = cce(functn, s, sf, bl, bu, mask, icall, maxn, alpha, beta, maxit, printit,
-                                        parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug)
-                # Replace the worst point in Simplex with the new point:
-                s[-1,:] = snew
-                sf[-1]  = fnew
-
-                # Replace the simplex into the complex;
-                cx[lcs,:] = s
-                cf[lcs]   = sf
-
-                # Sort the complex;
-                cf  = np.where(np.isfinite(cf), cf, large)
-                idx = np.argsort(cf)
-                cf  = np.sort(cf)
-                cx  = cx[idx,:]
-            # End of Inner Loop for Competitive Evolution of Simplexes: for loop in range(nspl):
-            # i.e. end of evolve sub-population igs for nspl steps
-
-            # Replace the complex back into the population;
-            x[k2,:] = cx[k1,:]
-            xf[k2]  = cf[k1]
-        # End of Loop on Complex Evolution: for igs in range(ngs):
-
-        # Shuffled the complexes;
-        idx = np.argsort(xf)
-        xf  = np.sort(xf)
-        x   = x[idx,:]
-
-        # Record the best and worst points;
-        bestx  = x[0,:]
-        bestf  = xf[0]
-        worstx = x[-1,:]
-        worstf = xf[-1]
-
-        allbestx = np.append(allbestx,bestx, axis=0) #appenden en op einde reshapen!!
-        allbestf = np.append(allbestf,bestf)
-
-        # Compute the standard deviation for each parameter
-        xnstd=np.std(x,axis=0)
-
-        # Computes the normalized geometric range of the parameters
-        gnrng=np.exp(np.mean(np.log((np.max(x,axis=0)-np.min(x,axis=0))/bound)))
-
-        if printit<2:
-            print('Evolution loop {0:d}, trials {1:d}. Best f: {2:f}, worst f {3:f}'.format(nloop, icall, bestf, worstf))
-            print('  best X: ', bestx)
-            print('')
-
-        # Check for convergency;
-        if icall >= maxn:
-            if printit<2:
-                print('Optimisation terminated because trial number {:d} '
-                      'reached maximum number of trials {:d}.'.format(maxn,icall))
+            cxs = list()
+            for igs in range(ngs):
+                k2 = k1*ngs+igs
+                cxs.append([x[k2,:], xf[k2]])
+
+            # Evolve each sub-population for nspl steps;
+            # each complex with its own random seed if complexes are evolved in parallel
+            evolve = partial(_evolve_complex, functn, bl, bu, mask, nps, nspl, maxn, alpha, beta, maxit, printit,
+                             parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug,
+                             workdir, cache=cache)
+            if ipool is None:
+                cxs = [ evolve((cx, cf, None), rng=np.random) for cx, cf in cxs ]
+            else:
+                seeds = np.random.randint(0, 2**31-1, size=ngs)
+                cxs = ipool.map(evolve, [ (cx, cf, seeds[igs]) for igs, (cx, cf) in enumerate(cxs) ])
+
+            # Replace the complexes back into the population;
+            for igs in range(ngs):
+                k2 = k1*ngs+igs
+                cx, cf, ncall, new = cxs[igs]
+                x[k2,:] = cx[k1,:]
+                xf[k2]  = cf[k1]
+                icall  += ncall
+                # merge new function values of cache copies in worker processes
+                if cache is not None: cache.update(*new)
+            # End of Loop on Complex Evolution
+
+            # Shuffled the complexes;
+            idx = np.argsort(xf)
+            xf  = np.sort(xf)
+            x   = x[idx,:]
+
+            # Record the best and worst points;
+            bestx  = x[0,:]
+            bestf  = xf[0]
+            worstx = x[-1,:]
+            worstf = xf[-1]
+
+            allbestx = np.append(allbestx,bestx, axis=0) #appenden en op einde reshapen!!
+            allbestf = np.append(allbestf,bestf)
+
+            # Compute the standard deviation for each parameter
+            xnstd=np.std(x,axis=0)
+
+            # Computes the normalized geometric range of the parameters
+            gnrng=np.exp(np.mean(np.log((np.max(x,axis=0)-np.min(x,axis=0))/bound)))
 
-        if gnrng < peps:
             if printit<2:
-                print('The population has converged to a small parameter space {:f} (<{:f}).'.format(gnrng, peps))
+                print('Evolution loop {0:d}, trials {1:d}. Best f: {2:f}, worst f {3:f}'.format(nloop, icall, bestf, worstf))
+                print('  best X: ', bestx)
+                print('')
 
-        criter = np.append(criter,bestf)
+            # Check for convergency;
+            if icall >= maxn:
+                if printit<2:
+                    print('Optimisation terminated because trial number {:d} '
+                          'reached maximum number of trials {:d}.'.format(maxn,icall))
 
-        if nloop >= kstop: # nodig zodat minimum zoveel doorlopen worden
-            criter_change = np.abs(criter[nloop-1]-criter[nloop-kstop])*100
-            criter_change = criter_change/np.mean(np.abs(criter[nloop-kstop:nloop]))
-            if criter_change < pcento:
+            if gnrng < peps:
                 if printit<2:
-                    print('The best point has improved by less then {:f} in the last {:d} loops.'.format(pcento, kstop))
-
-        # save restart
-        if restartfile1 is not None:
-            rs1, rs2, rs3, rs4, rs5 = np.random.get_state()
-            exec("savez_compressed("+saveargarray+")")
-            p = open(restartfile2, 'w')
-            exec("print("+saveargint+", file=p)")
-            exec("print("+saveargfloat+", file=p)")
-            exec("print("+saveargbool+", file=p)")
-            exec("print("+saveargstring+", file=p)")
-            p.close()
-    # End of the Outer Loop: while icall<maxn and gnrng>peps and criter_change>pcento
+                    print('The population has converged to a small parameter space {:f} (<{:f}).'.format(gnrng, peps))
+
+            criter = np.append(criter,bestf)
+
+            if nloop >= kstop: # nodig zodat minimum zoveel doorlopen worden
+                criter_change = np.abs(criter[nloop-1]-criter[nloop-kstop])*100
+                criter_change = criter_change/np.mean(np.abs(criter[nloop-kstop:nloop]))
+                if criter_change < pcento:
+                    if printit<2:
+                        print('The best point has improved by less then {:f} in the last {:d} loops.'.format(pcento, kstop))
+
+            # save restart
+            if restartfile1 is not None:
+                rs1, rs2, rs3, rs4, rs5 = np.random.get_state()
+                exec("savez_compressed("+saveargarray+")")
+                p = open(restartfile2, 'w')
+                exec("print("+saveargint+", file=p)")
+                exec("print("+saveargfloat+", file=p)")
+                exec("print("+saveargbool+", file=p)")
+                exec("print("+saveargstring+", file=p)")
+                p.close()
+        # End of the Outer Loop: while icall<maxn and gnrng>peps and criter_change>pcento
+    except BaseException:
+        # do not leave own worker processes behind
+        if (pool is None) and (ipool is not None): ipool.terminate()
+        raise
+    finally:
+        # close own pool
+        if (pool is None) and (ipool is not None):
+            ipool.close()
+            ipool.join()
+        # remove working directories of executable
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
 
     if printit<2:
         print('Search stopped at trial number {0:d} with normalized geometric range {1:f}. '.format(icall, gnrng))
         print('The best point has improved by {:f} in the last {:d} loops.'.format(criter_change, kstop))
+        if cache is not None:
+            cstat = cache.stats()
+            print('Cache: {:d} hits, {:d} misses.'.format(cstat['hits'], cstat['misses']))
 
     # reshape allbestx
     allbestx = allbestx.reshape(allbestx.size//nopt,nopt)
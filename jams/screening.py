@@ -5,6 +5,7 @@ import os
 import subprocess
 import numpy as np
 from jams.morris import morris_sampling, elementary_effects
+from jams.evalcache import as_evalcache
 
 def _ext_obj_wrapper(func, lb, ub, mask,
                      parameterfile, parameterwriter, objectivefile, objectivereader, shell, debug, rank,
@@ -92,7 +93,7 @@ def _obj_wrapper(func, arg, kwarg, x):
 def screening(func, x0, lb, ub, mask=None,
               arg=(), kwarg={},
               nt=-1, nsteps=6, ntotal=-1,
-              processes=1, pool=None,
+              processes=1, pool=None, cache=None,
               verbose=0,
               parameterfile=None, parameterwriter=None,
               objectivefile=None, objectivereader=None,
@@ -106,7 +107,7 @@ def screening(func, x0, lb, ub, mask=None,
         def screening(func, x0, lb, ub, mask=None,
                       arg=(), kwarg={},
                       nt=-1, nsteps=6, ntotal=-1,
-                      processes=1,
+                      processes=1, pool=None, cache=None,
                       verbose=0,
                       parameterfile=None, parameterwriter=None,
                       objectivefile=None, objectivereader=None,
@@ -149,6 +150,16 @@ def screening(func, x0, lb, ub, mask=None,
                     MPI pools can only be opened and closed once. So if you want to use screening several
                     times in one program, then you have to choose the pool and later close the pool in the
                     wrapping progam and pass it to screening.
+        cache       boolean, string or EvalCache (Default: None)
+                    Evaluate identical parameter sets only once, e.g. points shared by several trajectories,
+                    and reuse function values of earlier runs.
+                    True:      cache in memory
+                    string:    cache in memory and in the file with that name on disk,
+                               which is read at the start of later runs;
+                               the file gives stale values if the function, its data or arguments,
+                               or the executable changed; use a new file or EvalCache with tag then
+                    EvalCache: use given cache, e.g. EvalCache(cachefile='screening.cache');
+                               cache.stats() gives number of hits and misses afterwards
         parameterfile     string (Default: None)
                           Parameter file for executable; must be given if func is name of executable
         parameterwriter   function (Default: None)
@@ -208,6 +219,7 @@ def screening(func, x0, lb, ub, mask=None,
         Written,  Matthias Cuntz, Dec 2017
         Modified, Matthias Cuntz, Dec 2017 - output for nt=1 also (npara,3)
                   Matthias Cuntz, Dec 2019 - bug: default ntotal was not set if ntotal<0 (but nt instead)
+                  Matthias Cuntz, Oct 2026 - cache
     """
     # Get MPI communicator
     try:
@@ -283,7 +295,14 @@ def screening(func, x0, lb, ub, mask=None,
 
     # Calculate all model runs
     if (crank==0) and (verbose > 0): print('Calculate objective functions')
-    fx = np.array(ipool.map(obj, x))
+    cache = as_evalcache(cache)
+    if cache is None:
+        fx = np.array(ipool.map(obj, x))
+    else:
+        fx = np.array(cache.map(obj, x, mapper=ipool.map))
+        if (crank==0) and (verbose > 0):
+            cstat = cache.stats()
+            print('Cache: {:d} hits, {:d} misses'.format(cstat['hits'], cstat['misses']))
     if pool is None: ipool.close()
 
     # Calc elementary effects
@@ -36,6 +36,8 @@ from __future__ import division, absolute_import, print_function
 # History
 # MC, May 2012 - removed math
 #              - from numpy import *  -> import numpy as np
+# MC, Oct 2026 - i4_sobol_block, Sobol: vectorized points with direction numbers calculated once
+#              - i4_sobol_generate with i4_sobol_block
 import numpy as np
 
 def i4_bit_hi1( n ):
@@ -189,11 +191,189 @@ def i4_sobol_generate( m, n, skip ):
 #
 #       Output, real R(M,N), the points.
 #
-    r=np.zeros((m,n))
-    for j in range(1, n+1):
-        seed = skip + j - 2
-        [ r[0:m,j-1], seed ] = i4_sobol( m, seed )
-    return r
+#   The points are calculated all at once with i4_sobol_block,
+#   which gives the same points as consecutive calls of i4_sobol.
+#
+    if ( n < 1 ):
+        return np.zeros((m,0))
+    seed = np.maximum(skip + np.arange(n) - 1, 0)
+    r = i4_sobol_block( m, seed[-1]-seed[0]+1, seed[0] )
+    return r[seed-seed[0],:].T
+
+
+def i4_sobol_block( dim_num, n, seed=0, leap=1 ):
+#*****************************************************************************80
+#
+## I4_SOBOL_BLOCK generates a block of quasirandom Sobol vectors at once.
+#
+#   Discussion:
+#
+#       The points have the indexes SEED, SEED+LEAP, ..., SEED+(N-1)*LEAP
+#       in the Sobol sequence and are the same as returned by I4_SOBOL.
+#
+#       The integer Sobol vector of index K is the XOR of the direction numbers
+#       at the 1-bits of the Gray code of K (Antonov and Saleev).
+#       Consecutive points (LEAP=1) differ only in one direction number,
+#       given by the lowest zero bit of the previous index, so that they are
+#       calculated with a cumulative XOR over the points.
+#
+#       The direction numbers are calculated only once per dimension.
+#       Different SEEDs and/or LEAPs give independent streams of the sequence,
+#       e.g. for parallel workers.
+#
+#   Parameters:
+#
+#       Input, integer DIM_NUM, the number of spatial dimensions.
+#       DIM_NUM must satisfy 1 <= DIM_NUM <= 1111.
+#
+#       Input, integer N, the number of points to generate.
+#
+#       Input, integer SEED, the index of the first point (default: 0).
+#
+#       Input, integer LEAP, the index increment between points (default: 1).
+#
+#       Output, real QUASI(N,DIM_NUM), the quasirandom vectors.
+#
+    vv, recip = _sobol_directions( dim_num )
+    maxc = vv.shape[1]
+    seed = max(np.int(np.floor( seed )), 0)
+    leap = np.int( leap )
+    if ( leap < 1 ):
+        raise ValueError('I4_SOBOL_BLOCK: LEAP must be >= 1.')
+    if ( n < 1 ):
+        return np.zeros((0,dim_num))
+    if ( seed + (n-1)*leap >= 2**maxc ):
+        raise ValueError('I4_SOBOL_BLOCK: Too many points, index must be < 2**%d.'%maxc)
+
+    if ( leap == 1 ):
+        # first point from Gray code, then XOR the direction number of the lowest zero bit
+        # of the previous index
+        q = np.empty((n,dim_num), dtype=np.int64)
+        q[0,:] = _sobol_gray( vv, np.array([seed], dtype=np.int64) )[0,:]
+        k = np.arange(seed, seed+n-1, dtype=np.int64)
+        l = _i4_bit_lo0_array( k )
+        q[1:,:] = vv[:,l-1].T
+        np.bitwise_xor.accumulate(q, axis=0, out=q)
+    else:
+        k = seed + leap * np.arange(n, dtype=np.int64)
+        q = _sobol_gray( vv, k )
+
+    return q * recip
+
+
+class Sobol(object):
+    """
+        Stateful generator of quasirandom Sobol sequences.
+
+        Each call of random(n) returns the next n points (n,dim_num) of the sequence,
+        every leap-th point starting at index seed. The direction numbers are
+        calculated only once.
+
+
+        Definition
+        ----------
+        class Sobol(dim_num, seed=0, leap=1):
+
+
+        Input
+        -----
+        dim_num     number of dimensions, 1 <= dim_num <= 1111
+
+
+        Optional Input
+        --------------
+        seed        index of first point in Sobol sequence (default: 0)
+        leap        index increment between points (default: 1)
+                    Parallel workers can use independent streams by either
+                    different seeds, e.g. seed=iworker*npoints, or by seed=iworker, leap=nworker.
+
+
+        Methods
+        -------
+        random(n)   next n points, array (n,dim_num)
+        skip(n)     skip n points
+        reset()     reset to initial seed
+
+
+        Examples
+        --------
+        >>> sob = Sobol(3)
+        >>> print(sob.random(4))
+        [[0.   0.   0.  ]
+         [0.5  0.5  0.5 ]
+         [0.75 0.25 0.75]
+         [0.25 0.75 0.25]]
+        >>> print(sob.random(2))
+        [[0.375 0.375 0.625]
+         [0.875 0.875 0.125]]
+        >>> print(sob.seed)
+        6
+
+        >>> # same as i4_sobol_generate
+        >>> print(np.all(Sobol(5, seed=9).random(100) == i4_sobol_generate(5, 100, 10).T))
+        True
+
+        >>> # two interleaved streams
+        >>> s1 = Sobol(2, leap=2)
+        >>> s2 = Sobol(2, seed=1, leap=2)
+        >>> print(np.all(np.vstack((s1.random(3), s2.random(3)))[[0,3,1,4,2,5],:] == Sobol(2).random(6)))
+        True
+
+
+        History
+        -------
+        Written,  MC, Oct 2026
+    """
+
+    def __init__(self, dim_num, seed=0, leap=1):
+        _sobol_directions( dim_num ) # check dim_num and calculate direction numbers
+        self.dim_num = dim_num
+        self.seed0   = max(np.int(np.floor( seed )), 0)
+        self.leap    = np.int( leap )
+        self.seed    = self.seed0
+
+    def random(self, n):
+        quasi = i4_sobol_block( self.dim_num, n, self.seed, self.leap )
+        self.seed += n * self.leap
+        return quasi
+
+    def skip(self, n):
+        self.seed += n * self.leap
+
+    def reset(self):
+        self.seed = self.seed0
+
+
+# Scaled direction numbers (dim_num,maxcol) and 1/(common denominator) of i4_sobol per dimension
+_directions = dict()
+def _sobol_directions( dim_num ):
+    if ( dim_num < 1 or dim_num > 1111 ):
+        raise ValueError('I4_SOBOL: The spatial dimension DIM_NUM should satisfy 1 <= DIM_NUM <= 1111.')
+    if dim_num not in _directions:
+        i4_sobol( dim_num, 0 ) # sets module variables v, maxcol and recipd
+        _directions[dim_num] = (v[0:dim_num,0:maxcol].astype(np.int64), recipd)
+    return _directions[dim_num]
+
+
+# Integer Sobol vectors (n,dim_num) of indexes k from the Gray codes of k
+def _sobol_gray( vv, k ):
+    gray = k ^ (k >> 1)
+    q = np.zeros((k.size,vv.shape[0]), dtype=np.int64)
+    for b in range(vv.shape[1]):
+        ib = np.where( (gray >> b) & 1 )[0]
+        if ib.size > 0: q[ib,:] ^= vv[:,b]
+    return q
+
+
+# i4_bit_lo0 for arrays: position of the low 0 bit base 2
+def _i4_bit_lo0_array( n ):
+    low = (~n) & (n+1)   # lowest 0 bit of n as power of 2
+    bit = np.ones(n.shape, dtype=np.int64)
+    low = low >> 1
+    while np.any(low > 0):
+        bit += low > 0
+        low  = low >> 1
+    return bit
 
 
 def i4_sobol( dim_num, seed ):
@@ -1468,3 +1648,22 @@ def isprime(n):
             return False
         p+=1
     return True
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
+
+    # import time
+    # t1 = time.time()
+    # r = np.zeros((40,5000))
+    # for j in range(5000):
+    #     r[:,j], seed = i4_sobol(40, j)
+    # t2 = time.time()
+    # r2 = i4_sobol_generate(40, 5000, 1)
+    # t3 = time.time()
+    # sob = Sobol(100)
+    # for i in range(10): r3 = sob.random(100000)
+    # t4 = time.time()
+    # print('i4_sobol loop: ', t2-t1, ' i4_sobol_generate: ', t3-t2, ' Sobol(100) 10^6 points: ', t4-t3, np.all(r == r2))
+    # # i4_sobol loop:  8.05  i4_sobol_generate:  0.115  Sobol(100) 10^6 points:  3.07 True
@@ -2,10 +2,14 @@
 from __future__ import division, absolute_import, print_function
 import numpy as np
 
+__all__ = ['sobol_index', 'SobolIndex']
+
+
 def sobol_index(s=None, ns=None, ya=None, yb=None, yc=None,
                 si=True, sti=True,
                 mean=False, wmean=False,
-                method='Mai1999'):
+                method='Mai1999',
+                nboot=0, ci=0.95, seed=None, chunksize=None):
     """
         Calculates the first-order Si and total STi variance-based sensitivity indices
         summarised in Saltelli et al. (2010) with improvements of Mai et al. (2014).
@@ -16,7 +20,8 @@ def sobol_index(s=None, ns=None, ya=None, yb=None, yc=None,
         def sobol_index(s=None, ns=None, ya=None, yb=None, yc=None,
                         si=True, sti=True,
                         mean=False, wmean=False,
-                        method='Mai1999'):
+                        method='Mai1999',
+                        nboot=0, ci=0.95, seed=None, chunksize=None):
 
 
         Optional Input
@@ -69,11 +74,21 @@ def sobol_index(s=None, ns=None, ya=None, yb=None, yc=None,
                    'Mai1999'      - SI of Mai2013 (Saltelli2010 with var([f(A),f(B)])) and STi of Jansen1999 (yc=f(A_B))
                                     Si  = 1/n*sum_j(f(B)_j*(f(A_B^i)_j - f(A)_j))/var([f(A),f(B)])
                                     STi = 1/2n*sum_j(f(A)_j - f(A_B^i)_j)^2/var(f(A))
+        nboot      number of bootstrap samples for confidence intervals of Si and STi (default: 0 = none).
+                   Bootstrap samples draw the same parameter sets for ya, yb and yc.
+        ci         confidence level of bootstrap intervals (default: 0.95)
+        seed       seed of random number generator for bootstrap samples (default: None)
+        chunksize  number of time steps (first dimension of 2D input) calculated at once.
+                   Memory use is about 3*chunksize*k*ns floats.
+                   (default: None = such that chunksize*k*ns <= 2**22)
 
 
         Output
         ------
         First-order sensitivity indices Si and Total sensitivity indices STi.
+        Then mean and weighted mean of Si and STi if requested.
+        If nboot>0, lower and upper bounds of the confidence intervals of Si and STi
+        in arrays with an additional first dimension of size 2.
 
 
         Restrictions
@@ -83,6 +98,8 @@ def sobol_index(s=None, ns=None, ya=None, yb=None, yc=None,
            that the user provided ya, yb and yc.
         3. yc is either f(A_B) or f(B_A) depending on the method.
         4. method='Sobol2007' would need f(A_B) and f(B_A) and is therefore not available here.
+        5. Indices are calculated from sums over the parameter sets so that results can differ
+           from direct formulas in the last digits.
 
 
         References
@@ -375,6 +392,21 @@ def sobol_index(s=None, ns=None, ya=None, yb=None, yc=None,
         >>> print('Sal :: si[t2]  =',astr(isi3[2,:],3,pp=True))
         Sal :: si[t2]  = [' 0.286' ' 0.149' '-0.030']
 
+        >>> # Bootstrap confidence intervals
+        >>> isi3, sici3 = sobol_index(s2, ns, sti=False, nboot=100, seed=1)
+        >>> print(sici3.shape)
+        (2, 100, 3)
+        >>> print(np.all(sici3[0,:,:] <= sici3[1,:,:]))
+        True
+
+        >>> # Streaming: model outputs of parameter sets arriving in blocks
+        >>> sobi = SobolIndex(method='mai1999')
+        >>> for i in range(0, nsets, 250):
+        ...     sobi.update(iya[:,i:i+250], iyb[:,i:i+250], iyc2[:,:,i:i+250])
+        >>> isi3, isti3 = sobi.index()
+        >>> print('Sal :: si[t2]  =',astr(isi3[2,:],3,pp=True))
+        Sal :: si[t2]  = [' 0.286' ' 0.149' '-0.030']
+
         License
         -------
         This file is part of the JAMS Python package, distributed under the MIT
@@ -412,6 +444,8 @@ def sobol_index(s=None, ns=None, ya=None, yb=None, yc=None,
                   MC, Sep 2013 - saltelli
                   MC, Sep 2013 - method, removed saltelli
                   MC, Apr 2014 - assert
+                  MC, Oct 2026 - one kernel for all parameters on chunks of time steps,
+                                 nboot, ci, seed, chunksize, SobolIndex for streaming
     """
     # Check input
     assert (si+sti) > 0, 'No output chosen: si=False and sti=False.'
@@ -454,84 +488,235 @@ def sobol_index(s=None, ns=None, ya=None, yb=None, yc=None,
             raise ValueError('ya and yb must have same size as yc[1].')
         nn = iyC.shape[1]
 
+    mm = _check_method(method)
+
+    # Indices for chunks of time steps
+    if chunksize is None:
+        chunk = max(2**22//max(nn*nsa, 1), 1)
+    else:
+        chunk = max(int(chunksize), 1)
+    if nboot > 0:
+        rng  = np.random.RandomState(seed)
+        iboot = rng.randint(0, nsa, size=(nboot,nsa))
+        qq   = [50.*(1.-ci), 50.*(1.+ci)]
+        isici  = np.empty((2,ntime,nn))
+        istici = np.empty((2,ntime,nn))
+    isi   = np.empty((ntime,nn))
+    isti  = np.empty((ntime,nn))
+    varA  = np.empty(ntime)
+    varB  = np.empty(ntime)
+    varAB = np.empty(ntime)
+    for t in range(0, ntime, chunk):
+        t1 = min(t+chunk, ntime)
+        sums = _sobol_sums(iyA[t:t1,:], iyB[t:t1,:], iyC[t:t1,:,:], mm)
+        isi[t:t1,:], isti[t:t1,:], varA[t:t1], varB[t:t1], varAB[t:t1] = _sobol_from_sums(sums, mm)
+        if nboot > 0:
+            bsi  = np.empty((nboot,t1-t,nn))
+            bsti = np.empty((nboot,t1-t,nn))
+            for b in range(nboot):
+                ib = iboot[b,:]
+                sums = _sobol_sums(iyA[t:t1,ib], iyB[t:t1,ib], iyC[t:t1,:,ib], mm)
+                bsi[b,:,:], bsti[b,:,:] = _sobol_from_sums(sums, mm)[0:2]
+            isici[:,t:t1,:]  = np.percentile(bsi,  qq, axis=0)
+            istici[:,t:t1,:] = np.percentile(bsti, qq, axis=0)
+
+    out = _sobol_output(isi, isti, varA, varB, varAB, mm, isone, si, sti, mean, wmean)
+    if nboot > 0:
+        if isone:
+            isici  = isici[:,0,:]
+            istici = istici[:,0,:]
+        if not isinstance(out, list): out = [out]
+        if si:  out += [isici]
+        if sti: out += [istici]
+
+    if isinstance(out, list) and (len(out) == 1):
+        return out[0]
+    else:
+        return out
+
+
+class SobolIndex(object):
+    """
+        Streaming calculation of first-order Si and total STi variance-based sensitivity indices
+        as in sobol_index, accumulating the necessary sums while model outputs arrive.
+
+
+        Definition
+        ----------
+        class SobolIndex(method='Mai1999'):
+
+
+        Optional Input
+        --------------
+        method     string, case-insensitive (default: 'Mai1999')
+                   see sobol_index
+
+
+        Methods
+        -------
+        update(ya, yb, yc)     add model outputs of a block of nb parameter sets:
+                               ya: (nb) or (ntime,nb) model outputs f(A)
+                               yb: (nb) or (ntime,nb) model outputs f(B)
+                               yc: (k,nb) or (ntime,k,nb) model outputs f(A_B) or f(B_A)
+        index(si=True, sti=True, mean=False, wmean=False)
+                               Si and/or STi of all parameter sets so far, as well as
+                               mean and variance weighted mean if 2D input (see sobol_index)
+
+
+        Examples
+        --------
+        --> see sobol_index
+
+
+        History
+        -------
+        Written,  MC, Oct 2026
+    """
+
+    def __init__(self, method='Mai1999'):
+        self.method = _check_method(method)
+        self.n      = 0
+        self.sums   = None
+        self.isone  = False
+
+    def update(self, ya, yb, yc):
+        ya = np.asarray(ya, dtype=np.float64)
+        yb = np.asarray(yb, dtype=np.float64)
+        yc = np.asarray(yc, dtype=np.float64)
+        if ya.ndim == 1:
+            self.isone = True
+            ya = ya[np.newaxis,:]
+            yb = yb[np.newaxis,:]
+            yc = yc[np.newaxis,:,:]
+        if not ((ya.shape[1] == yb.shape[1]) & (ya.shape[1] == yc.shape[2])):
+            raise ValueError('ya and yb must have same size as yc[1].')
+        sums = _sobol_sums(ya, yb, yc, self.method)
+        if self.sums is None:
+            self.sums = sums
+        else:
+            self.sums = _sobol_merge(self.sums, sums)
+        self.n = self.sums['n']
+
+    def index(self, si=True, sti=True, mean=False, wmean=False):
+        assert (si+sti) > 0, 'No output chosen: si=False and sti=False.'
+        assert self.sums is not None, 'No model outputs given yet.'
+        isi, isti, varA, varB, varAB = _sobol_from_sums(self.sums, self.method)
+        return _sobol_output(isi, isti, varA, varB, varAB, self.method, self.isone, si, sti, mean, wmean)
+
+
+# Methods and the sums over parameter sets j they need, besides number, means and
+# squared deviations of f(A) and f(B):
+#   sAC  = sum_j(f(A)_j*f(C^i)_j)           sBC  = sum_j(f(B)_j*f(C^i)_j)
+#   sACB = sum_j(f(A)_j*(f(C^i)_j-f(B)_j))  sBCA = sum_j(f(B)_j*(f(C^i)_j-f(A)_j))
+#   sAAC = sum_j(f(A)_j*(f(A)_j-f(C^i)_j))
+#   sBC2 = sum_j((f(B)_j-f(C^i)_j)^2)        sAC2 = sum_j((f(A)_j-f(C^i)_j)^2)
+_sobol_sumnames = {'saltelli2008': ['sAC', 'sBC'],
+                   'homma1996':    ['sACB', 'sBC'],
+                   'saltelli2010': ['sBCA', 'sAAC'],
+                   'jansen1999':   ['sBC2', 'sAC2'],
+                   'mai2012':      ['sACB', 'sBC'],
+                   'mai2013':      ['sBCA', 'sAAC'],
+                   'mai2014':      ['sBC2', 'sAC2'],
+                   'mai1999':      ['sBCA', 'sAC2']}
+
+
+# Lower case method name if implemented
+def _check_method(method):
     mm = method.lower()
+    if mm == 'sobol2007':
+        raise ValueError('Sobol2007 would need f(A_B) and f(B_A). It is thus not implemented here.')
+    if mm not in _sobol_sumnames:
+        raise ValueError('method unknown: {0}.'.format(method))
+    return mm
+
+
+# Sums over parameter sets (last dimension) for all time steps (ntime) and all parameters (k)
+# of ya (ntime,n), yb (ntime,n), yc (ntime,k,n)
+def _sobol_sums(ya, yb, yc, mm):
+    n = ya.shape[1]
+    sums = {'n': n}
+    sums['meanA'] = np.mean(ya, axis=1)
+    sums['meanB'] = np.mean(yb, axis=1)
+    sums['m2A']   = np.sum((ya - sums['meanA'][:,np.newaxis])**2, axis=1)
+    sums['m2B']   = np.sum((yb - sums['meanB'][:,np.newaxis])**2, axis=1)
+    iyA = ya[:,np.newaxis,:]
+    iyB = yb[:,np.newaxis,:]
+    for ss in _sobol_sumnames[mm]:
+        if ss == 'sAC':
+            sums[ss] = np.sum(iyA*yc, axis=2)
+        elif ss == 'sBC':
+            sums[ss] = np.sum(iyB*yc, axis=2)
+        elif ss == 'sACB':
+            sums[ss] = np.sum(iyA*(yc - iyB), axis=2)
+        elif ss == 'sBCA':
+            sums[ss] = np.sum(iyB*(yc - iyA), axis=2)
+        elif ss == 'sAAC':
+            sums[ss] = np.sum(iyA*(iyA - yc), axis=2)
+        elif ss == 'sBC2':
+            sums[ss] = np.sum((iyB - yc)**2, axis=2)
+        elif ss == 'sAC2':
+            sums[ss] = np.sum((iyA - yc)**2, axis=2)
+    return sums
+
+
+# Combine number, mean and sum of squared deviations of two sets (Chan et al. 1979)
+def _merge_moments(n1, mean1, m21, n2, mean2, m22):
+    n  = n1 + n2
+    dd = mean2 - mean1
+    return n, mean1 + dd*(n2/n), m21 + m22 + dd**2*(n1*n2/n)
+
+
+# Combine sums of two blocks of parameter sets
+def _sobol_merge(s1, s2):
+    sums = dict()
+    for kk in s1:
+        if kk.startswith('s'): sums[kk] = s1[kk] + s2[kk]
+    n, sums['meanA'], sums['m2A'] = _merge_moments(s1['n'], s1['meanA'], s1['m2A'], s2['n'], s2['meanA'], s2['m2A'])
+    n, sums['meanB'], sums['m2B'] = _merge_moments(s1['n'], s1['meanB'], s1['m2B'], s2['n'], s2['meanB'], s2['m2B'])
+    sums['n'] = n
+    return sums
+
+
+# Si (ntime,k), STi (ntime,k), var(f(A)), var(f(B)), var([f(A),f(B)]) (ntime) from sums
+def _sobol_from_sums(sums, mm):
+    nsa   = sums['n']
+    meanA = sums['meanA'][:,np.newaxis]
+    meanB = sums['meanB'][:,np.newaxis]
+    varA  = sums['m2A']/nsa
+    varB  = sums['m2B']/nsa
+    varAB = _merge_moments(nsa, sums['meanA'], sums['m2A'], nsa, sums['meanB'], sums['m2B'])[2]/(2*nsa)
+    ivarA  = varA[:,np.newaxis]
+    ivarB  = varB[:,np.newaxis]
+    ivarAB = varAB[:,np.newaxis]
     if mm == 'saltelli2008':
-        meanA = np.mean(iyA, axis=1)
-        varA  = np.var(iyA,  axis=1)
-        isi  = np.empty((ntime,nn))
-        isti = np.empty((ntime,nn))
-        for i in range(nn):
-            iyCi      = iyC[:,i,:]
-            isi[:,i]  = (np.mean(iyA*iyCi, axis=1) - meanA**2) / varA
-            isti[:,i] = 1. - (np.mean(iyB*iyCi, axis=1) - meanA**2) / varA
+        isi  = (sums['sAC']/nsa - meanA**2) / ivarA
+        isti = 1. - (sums['sBC']/nsa - meanA**2) / ivarA
     elif mm == 'homma1996':
-        meanA = np.mean(iyA, axis=1)
-        varA  = np.var(iyA,  axis=1)
-        isi  = np.empty((ntime,nn))
-        isti = np.empty((ntime,nn))
-        for i in range(nn):
-            iyCi      = iyC[:,i,:]
-            isi[:,i]  = np.mean(iyA*(iyCi - iyB), axis=1) / varA
-            isti[:,i] = 1. - (np.mean(iyB*iyCi, axis=1) - meanA**2) / varA
-            #old code isti[:,i] = 1. - (np.mean(iyB*(iyCi-iyA), axis=1)) / varA
-    elif mm == 'sobol2007':
-        raise ValueError('Sobol2007 would need f(A_B) and f(B_A). It is thus not implemented here.')
+        isi  = sums['sACB']/nsa / ivarA
+        isti = 1. - (sums['sBC']/nsa - meanA**2) / ivarA
     elif mm == 'saltelli2010':
-        varA  = np.var(iyA,  axis=1)
-        isi  = np.empty((ntime,nn))
-        isti = np.empty((ntime,nn))
-        for i in range(nn):
-            iyCi      = iyC[:,i,:]
-            isi[:,i]  = np.mean(iyB*(iyCi - iyA), axis=1) / varA
-            isti[:,i] = np.mean(iyA*(iyA - iyCi), axis=1) / varA
+        isi  = sums['sBCA']/nsa / ivarA
+        isti = sums['sAAC']/nsa / ivarA
     elif mm == 'jansen1999':
-        varA  = np.var(iyA,  axis=1)
-        isi  = np.empty((ntime,nn))
-        isti = np.empty((ntime,nn))
-        for i in range(nn):
-            iyCi      = iyC[:,i,:]
-            isi[:,i]  = 1. - np.sum((iyB -iyCi)**2, axis=1) / (2.*nsa * varA)
-            isti[:,i] = np.sum((iyA -iyCi)**2, axis=1) / (2.*nsa * varA)
+        isi  = 1. - sums['sBC2'] / (2.*nsa * ivarA)
+        isti = sums['sAC2'] / (2.*nsa * ivarA)
     elif mm == 'mai2012':
-        meanB = np.mean(iyB, axis=1)
-        varB  = np.var(iyB,  axis=1)
-        varAB = np.var(np.append(iyA, iyB, axis=1), axis=1)
-        isi  = np.empty((ntime,nn))
-        isti = np.empty((ntime,nn))
-        for i in range(nn):
-            iyCi      = iyC[:,i,:]
-            isi[:,i]  = np.mean(iyA*(iyCi - iyB), axis=1) / varAB
-            isti[:,i] = 1. - (np.mean(iyB*iyCi, axis=1) - meanB**2) / varB
+        isi  = sums['sACB']/nsa / ivarAB
+        isti = 1. - (sums['sBC']/nsa - meanB**2) / ivarB
     elif mm == 'mai2013':
-        varA  = np.var(iyA,  axis=1)
-        varAB = np.var(np.append(iyA, iyB, axis=1), axis=1)
-        isi  = np.empty((ntime,nn))
-        isti = np.empty((ntime,nn))
-        for i in range(nn):
-            iyCi      = iyC[:,i,:]
-            isi[:,i]  = np.mean(iyB*(iyCi - iyA), axis=1) / varAB
-            isti[:,i] = np.mean(iyA*(iyA - iyCi), axis=1) / varA
+        isi  = sums['sBCA']/nsa / ivarAB
+        isti = sums['sAAC']/nsa / ivarA
     elif mm == 'mai2014':
-        varA  = np.var(iyA,  axis=1)
-        varAB = np.var(np.append(iyA, iyB, axis=1), axis=1)
-        isi  = np.empty((ntime,nn))
-        isti = np.empty((ntime,nn))
-        for i in range(nn):
-            iyCi      = iyC[:,i,:]
-            isi[:,i]  = 1. - np.sum((iyB -iyCi)**2, axis=1) / (2.*nsa * varAB)
-            isti[:,i] = np.sum((iyA -iyCi)**2, axis=1) / (2.*nsa * varA)
+        isi  = 1. - sums['sBC2'] / (2.*nsa * ivarAB)
+        isti = sums['sAC2'] / (2.*nsa * ivarA)
     elif mm == 'mai1999':
-        varA  = np.var(iyA,  axis=1)
-        varAB = np.var(np.append(iyA, iyB, axis=1), axis=1)
-        isi  = np.empty((ntime,nn))
-        isti = np.empty((ntime,nn))
-        for i in range(nn):
-            iyCi      = iyC[:,i,:]
-            isi[:,i]  = np.mean(iyB*(iyCi - iyA), axis=1) / varAB
-            isti[:,i] = np.sum((iyA -iyCi)**2, axis=1) / (2.*nsa * varA)
-    else:
-        raise ValueError('method unknown: {0}.'.format(method))
+        isi  = sums['sBCA']/nsa / ivarAB
+        isti = sums['sAC2'] / (2.*nsa * ivarA)
+    return isi, isti, varA, varB, varAB
+
 
+# Output list of sobol_index with mean and variance weighted mean over time steps
+def _sobol_output(isi, isti, varA, varB, varAB, mm, isone, si, sti, mean, wmean):
     if not isone:
         # simple mean
         if mean:
@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 from __future__ import division, absolute_import, print_function
 import numpy as np
+from jams.readcache import readcache
+from jams.blockread import ColumnError, read_blocks, split_block, strip_block, iter_chunks
 
 __all__ = ['sread']
 
@@ -8,7 +10,7 @@ def sread(infile, nc=0, cname=None, skip=0, cskip=0, hskip=0, hstrip=True, separ
           squeeze=False, reform=False, skip_blank=False, comment=None,
           fill=False, fill_value='', strip=None, encoding='ascii', errors='ignore',
           header=False, full_header=False,
-          transpose=False, strarr=False):
+          transpose=False, strarr=False, engine='python', chunksize=0, cache=False):
     """
         Read strings into string array from a file.
         Lines or columns can be skipped.
@@ -26,7 +28,7 @@ def sread(infile, nc=0, cname=None, skip=0, cskip=0, hskip=0, hstrip=True, separ
                   squeeze=False, reform=False, skip_blank=False, comment=None,
                   fill=False, fill_value='', strip=None, encoding='ascii', errors='ignore',
                   header=False, full_header=False,
-                  transpose=False, strarr=False):
+                  transpose=False, strarr=False, engine='python', chunksize=0, cache=False):
 
 
         Input
@@ -58,6 +60,21 @@ def sread(infile, nc=0, cname=None, skip=0, cskip=0, hskip=0, hstrip=True, separ
                      (default: ascii)
         errors       Errors may be given to define the error handling during encoding of the file.
                      Possible values: strict, replace, ignore (default: ignore).
+        engine       Parsing engine of the data lines (default: 'python').
+                     'python': split line by line.
+                     'numpy':  read the file in blocks of characters and split
+                               all lines of a block at once with numpy.
+                     Both engines give the same results and raise the same error types.
+        chunksize    If >0, return an iterator over blocks of chunksize rows of the file
+                     instead of all lines of the file (default: 0).
+                     The blocks are parsed with engine='numpy'.
+                     squeeze removes only the column dimension of the blocks.
+        cache        If True or directory name, read the output from a binary cache on disk
+                     if the file and the arguments did not change since the last call with cache;
+                     otherwise read the file and write the output to the cache (default: False).
+                     The cache is the directory .jams_cache in the directory of infile (cache=True)
+                     or the given directory. Arrays are returned as copy-on-write memory maps.
+                     Remove the cache of infile with clear_readcache(infile).
 
 
         Options
@@ -237,6 +254,18 @@ def sread(infile, nc=0, cname=None, skip=0, cskip=0, hskip=0, hstrip=True, separ
         >>> print(sread(filename, cname=['  head1','head2'], skip=1, skip_blank=True, comment='#!', hstrip=False))
         [['1.2'], ['2.2'], ['3.2'], ['4.2']]
 
+        >>> # numpy engine
+        >>> print(sread(filename4, skip=2, fill=True, fill_value='-1', engine='numpy'))
+        [['1.1', '1.2', '1.3', '1.4'], ['2.1', '-1', '2.3', '2.4']]
+        >>> print(sread(filename, cname=['head1','head2'], skip=1, skip_blank=True, comment='#!', engine='numpy'))
+        [['1.1', '1.2'], ['2.1', '2.2'], ['3.1', '3.2'], ['4.1', '4.2']]
+
+        >>> # iterate over blocks of rows
+        >>> for dd in sread(filename, cname='head2', skip=1, skip_blank=True, comment='#!', squeeze=True, chunksize=3):
+        ...     print(dd)
+        ['1.2', '2.2', '3.2']
+        ['4.2']
+
         >>> # Clean up doctest
         >>> import os
         >>> os.remove(filename)
@@ -288,8 +317,23 @@ def sread(infile, nc=0, cname=None, skip=0, cskip=0, hskip=0, hstrip=True, separ
                   MC, Jul 2019 - errors='ignore' compatible with Python2 and Python3
                                  -> returns header in unicode in Python2
                   MC, Aug 2019 - use codecs module and allow user encoding and error handling
+                  MC, Oct 2026 - engine='numpy' reads and splits blocks of lines with numpy
+                  MC, Oct 2026 - chunksize
+                  MC, Oct 2026 - cache
     """
     #
+    # Binary cache
+    if cache and (chunksize <= 0):
+        return readcache(sread, infile, cache=cache,
+                         nc=nc, cname=cname, skip=skip, cskip=cskip, hskip=hskip, hstrip=hstrip,
+                         separator=separator, squeeze=squeeze, reform=reform, skip_blank=skip_blank,
+                         comment=comment, fill=fill, fill_value=fill_value, strip=strip,
+                         encoding=encoding, errors=errors, header=header, full_header=full_header,
+                         transpose=transpose, strarr=strarr, engine=engine)
+    #
+    if engine not in ['python', 'numpy']:
+        raise ValueError('engine must be python or numpy: '+str(engine))
+    #
     # Open file
     import codecs
     f = codecs.open(infile, 'r', encoding=encoding, errors=errors)
@@ -405,27 +449,64 @@ def sread(infile, nc=0, cname=None, skip=0, cskip=0, hskip=0, hstrip=True, separ
     # Values - first line
     if (miinc >= nres) and (not fill):
         f.close()
-        raise ValueError('Line has not enough columns to index: '+s)
+        raise ColumnError('Line has not enough columns to index: '+s)
     var = list()
     null = line2var(res, var, iinc, strip)
     #
-    # Values - rest of file
-    for line in f:
-        s = str(line.rstrip())
-        if len(s) == 0:
-            if skip_blank:
-                continue
+    # Values - rest of file in blocks of chunksize rows
+    if chunksize > 0:
+        def blocks():
+            yield (np.array(var),)
+            for lines in read_blocks(f, skip_blank=skip_blank, comment=comment):
+                sarr = split_block(lines, sep, miinc+1, fill=fill,
+                                   errmsg='Line has not enough columns to index: ')
+                yield (strip_block(sarr[:, list(iinc)], strip, lines=lines),)
+        def post(dat):
+            if (squeeze or reform) and (dat.shape[1] == 1): dat = dat[:, 0]
+            if transpose: dat = dat.T
+            if strarr:
+                if fill: dat = np.where(dat=='', fill_value, dat)
             else:
-                break
-        if comment is not None:
-            if (s[0] in comment): continue
-        res = s.split(sep)
-        nres = len(res)
-        if (miinc >= nres) and (not fill):
-            f.close()
-            raise ValueError('Line has not enough columns to index: '+s)
-        null = line2var(res, var, iinc, strip)
-    f.close()
+                dat = dat.tolist()
+                if fill:
+                    if dat and isinstance(dat[0], list):
+                        dat = [ [ fill_value if i=='' else i for i in row ] for row in dat ]
+                    else:
+                        dat = [ fill_value if i=='' else i for i in dat ]
+            return dat
+        return iter_chunks(f, blocks(), chunksize, post)
+    #
+    # Values - rest of file
+    if engine == 'numpy':
+        var = [np.array(var)]
+        for lines in read_blocks(f, skip_blank=skip_blank, comment=comment):
+            try:
+                sarr = split_block(lines, sep, miinc+1, fill=fill,
+                                   errmsg='Line has not enough columns to index: ')
+            except ValueError:
+                f.close()
+                raise
+            var.append(strip_block(sarr[:, list(iinc)], strip, lines=lines))
+        f.close()
+        var = np.concatenate(var)
+        if not strarr: var = var.tolist()
+    else:
+        for line in f:
+            s = str(line.rstrip())
+            if len(s) == 0:
+                if skip_blank:
+                    continue
+                else:
+                    break
+            if comment is not None:
+                if (s[0] in comment): continue
+            res = s.split(sep)
+            nres = len(res)
+            if (miinc >= nres) and (not fill):
+                f.close()
+                raise ColumnError('Line has not enough columns to index: '+s)
+            null = line2var(res, var, iinc, strip)
+        f.close()
     if strarr:
         var = np.array(var, dtype=np.str)
         if transpose: var = var.T
@@ -151,6 +151,7 @@ def volume_poly(func, x=None, y=None, tri=None, convexhull=False, area=False, al
         Written,  MC & JM, Feb 2013
         Modified, MC, Feb 2013 - tri
                   MC, Feb 2013 - ported to Python 3
+                  MC, Oct 2026 - test all triangles at once with in_poly
     """
 
     # Functions for the three lines of a triangle
@@ -217,21 +218,20 @@ def volume_poly(func, x=None, y=None, tri=None, convexhull=False, area=False, al
     tvol_err = 0.
     volumes = np.zeros(ntriangles, dtype=np.float)
     areas   = np.zeros(ntriangles, dtype=np.float)
+    # Select only Delaunay triangles that are inside the original polygon
+    # i.e. exclude triangles in concave part of polygon
+    # If convexhull=True then this is always true.
+    if trigiven:
+        isin = np.ones(ntriangles, dtype=np.bool)
+    else:
+        isin = in_poly([np.mean(tri[:,:,0],axis=1), np.mean(tri[:,:,1],axis=1)], cxy[:,0], cxy[:,1]) >= 0
     # Calc mean semivariogramm over whole region
     thecount = 0
     for j in range(ntriangles):
         t    = tri[j,:,:]
         ii   = np.argsort(t[:,0])
         tria = t[ii,:]
-        xs   = np.mean(tria[:,0])
-        ys   = np.mean(tria[:,1])
-        # Select only Delaunay triangles that are inside the original polygon
-        # i.e. exclude triangles in concave part of polygon
-        # If convexhull=True then this is always true.
-        check_in_poly = False
-        if not trigiven:
-            check_in_poly = in_poly([xs,ys], cxy[:,0], cxy[:,1]) >= 0
-        if trigiven | check_in_poly:
+        if isin[j]:
             thecount  += 1
             areas[j]   = area_poly(tria[:,0],tria[:,1])
             flaeche   += areas[j]